@@ -1,10 +1,10 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from routers import user, post, comments, chat, admin_users
+from routers import user, post, comments, chat, admin_users, admin_profile
 from database import SessionLocal, engine, Base
-import models, schemas, crud
+import models, schemas, crud, profiler
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
+import uvicorn, os
 
 models.Base.metadata.create_all(bind=engine)
 
@@ -31,6 +31,28 @@ app.include_router(comments.router)      # (list, create)
 app.include_router(comments.standalone)   # (update, delete)
 app.include_router(chat.router)
 app.include_router(admin_users.router)
+app.include_router(admin_profile.router)
+
+# 요청 단위 프로파일링: "X-Profile: <PROFILE_TOKEN>" 헤더가 붙은 요청만 샘플링
+# (토큰 미설정 시 비활성, 헤더가 없으면 조회 한 번뿐 → 평소 오버헤드 없음)
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    flag = request.headers.get("x-profile")
+    if not flag or not PROFILE_TOKEN or flag != PROFILE_TOKEN:
+        return await call_next(request)
+    # 대상 스레드는 비워 두고 시작 → 엔드포인트를 실행하는 스레드만 등록됨(profiler.ProfiledRoute)
+    sampler = profiler.StackSampler(thread_ids=()).start()
+    token = profiler.activate(sampler)
+    try:
+        response = await call_next(request)
+    finally:
+        profiler.deactivate(token)
+        collapsed = sampler.stop()
+    # 결과는 관리자 API(GET /admin/profile/{id})로 조회
+    response.headers["X-Profile-Id"] = profiler.store(collapsed)
+    return response
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
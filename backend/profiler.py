@@ -0,0 +1,166 @@
+"""
+profiler.py
+- 운영 중인 API 프로세스를 잠깐(time-boxed) 샘플링하는 표준 라이브러리 기반 스택 샘플러
+  (SQLAlchemy 쿼리 / bcrypt 해시 / RAG 호출 대기 등 어디서 시간이 쓰이는지 확인용)
+- 결과는 flamegraph.pl / speedscope 호환 collapsed-stack 텍스트 ("스레드;모듈:함수;... 샘플수")
+- 샘플러는 캡처/요청 단위 opt-in 시에만 스레드로 동작 → 꺼져 있을 때 오버헤드 0
+- 요청 단위: main.py 미들웨어가 빈 대상 집합으로 샘플러를 켜고 activate(), 라우터의 ProfiledRoute 가
+  엔드포인트를 실행하는 스레드만 등록(attached) → 동시에 처리 중인 다른 요청은 섞이지 않음
+  (async 엔드포인트는 이벤트 루프 스레드를 샘플하므로 같은 시각의 다른 코루틴도 보일 수 있음)
+
+ProfiledRoute 를 뺀 나머지는 챗봇 서비스의 chatbot/utils/profiler.py 와 같은 코드.
+두 앱은 각자 자기 디렉터리에서 따로 배포/실행되어(import 경로가 다름) 서로의 모듈을 import 할 수 없으므로
+복사본을 둠 — 샘플러를 고치면 두 파일을 같이 고칠 것
+"""
+import sys, os, functools, inspect, threading, time, uuid
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi.routing import APIRoute
+
+MAX_SECONDS = 60.0          # 한 번에 캡처 가능한 최대 시간
+DEFAULT_INTERVAL = 0.005    # 5ms 간격 샘플링 (≈200Hz)
+_RECENT_MAX = 20            # 요청 단위 프로파일 보관 개수
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    mod = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{mod}:{code.co_name}"
+
+class StackSampler:
+    """
+    sys._current_frames()를 주기적으로 읽어 스택별 샘플 수를 센다.
+    - thread_ids를 주면 해당 스레드만(빈 집합이면 add_thread 로 추가될 때까지 없음),
+      None 이면 샘플러 자신을 뺀 전체 스레드
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, thread_ids=None):
+        self.interval = max(0.001, float(interval))
+        self.thread_ids = set(thread_ids) if thread_ids is not None else None
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> str:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return self.collapsed()
+
+    def _run(self):
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for tid, frame in sys._current_frames().items():
+                if tid == me or (self.thread_ids is not None and tid not in self.thread_ids):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if tid not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack.append(names.get(tid, str(tid)))
+                self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def add_thread(self, tid: int):
+        if self.thread_ids is not None:
+            self.thread_ids = self.thread_ids | {tid}   # 샘플링 스레드가 순회 중일 수 있어 새 집합으로 교체
+
+    def remove_thread(self, tid: int):
+        if self.thread_ids is not None:
+            self.thread_ids = self.thread_ids - {tid}
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.counts.most_common())
+
+# --- 시간 제한 캡처 (관리자 엔드포인트용) -------------------------------------
+_CAPTURE_LOCK = threading.Lock()
+
+def capture(seconds: float, interval: float = DEFAULT_INTERVAL) -> str:
+    """
+    seconds 동안 전체 프로세스를 샘플링해 collapsed-stack 문자열 반환.
+    동시에 하나만 허용 — 이미 캡처 중이면 RuntimeError.
+    """
+    if not _CAPTURE_LOCK.acquire(blocking=False):
+        raise RuntimeError("이미 프로파일 캡처가 진행 중입니다.")
+    try:
+        sampler = StackSampler(interval).start()
+        time.sleep(min(max(seconds, 0.1), MAX_SECONDS))
+        return sampler.stop()
+    finally:
+        _CAPTURE_LOCK.release()
+
+# --- 요청 단위 샘플러 (contextvar) ----------------------------------------------
+_ACTIVE: ContextVar[Optional[StackSampler]] = ContextVar("request_sampler", default=None)
+
+def activate(sampler: StackSampler):
+    """요청 컨텍스트에 샘플러 등록 (미들웨어에서 call_next 전에) → deactivate(token) 으로 해제"""
+    return _ACTIVE.set(sampler)
+
+def deactivate(token):
+    _ACTIVE.reset(token)
+
+@contextmanager
+def attached():
+    """
+    요청 단위 프로파일링 중이면 현재 스레드(핸들러를 실행하는 스레드)를 샘플 대상에 추가, 끝나면 제거.
+    프로파일링 중이 아니면 아무것도 안 함(contextvar 조회 한 번)
+    """
+    sampler = _ACTIVE.get()
+    if sampler is None:
+        yield
+        return
+    tid = threading.get_ident()
+    sampler.add_thread(tid)
+    try:
+        yield
+    finally:
+        sampler.remove_thread(tid)
+
+# --- 요청 단위 프로파일 보관소 ------------------------------------------------
+_RECENT: "OrderedDict[str, str]" = OrderedDict()
+_RECENT_LOCK = threading.Lock()
+
+def store(collapsed: str) -> str:
+    """요청 단위 프로파일 결과를 보관하고 조회용 id를 돌려준다(최근 N개만 유지)."""
+    pid = uuid.uuid4().hex[:16]
+    with _RECENT_LOCK:
+        _RECENT[pid] = collapsed
+        while len(_RECENT) > _RECENT_MAX:
+            _RECENT.popitem(last=False)
+    return pid
+
+def get_stored(pid: str) -> Optional[str]:
+    with _RECENT_LOCK:
+        return _RECENT.get(pid)
+
+# --- 엔드포인트 스레드 등록 라우트 ---------------------------------------------
+def _attached(endpoint):
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            with attached():
+                return await endpoint(*args, **kwargs)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            # 동기 엔드포인트는 스레드풀 워커에서 실행 → 그 워커 스레드를 샘플 대상으로
+            with attached():
+                return endpoint(*args, **kwargs)
+    return wrapper
+
+class ProfiledRoute(APIRoute):
+    """APIRouter(route_class=ProfiledRoute): 엔드포인트 실행 스레드를 요청 단위 샘플러에 등록"""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _attached(endpoint), **kwargs)
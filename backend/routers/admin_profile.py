@@ -0,0 +1,41 @@
+"""
+admin_profile.py
+- 관리자 전용 프로파일링 API
+  POST /admin/profile?seconds=10        → 살아있는 프로세스를 N초 샘플링, collapsed-stack 파일 반환
+  GET  /admin/profile/{profile_id}      → X-Profile 헤더로 프로파일링한 단일 요청 결과 조회
+"""
+import time
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+import models, profiler
+from routers.admin_users import require_admin
+
+router = APIRouter(prefix="/admin/profile", tags=["admin-profile"], route_class=profiler.ProfiledRoute)
+
+def _collapsed_response(collapsed: str, name: str):
+    return PlainTextResponse(
+        collapsed,
+        media_type="text/plain; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{name}.collapsed"'},
+    )
+
+# 시간 제한 캡처 (동기 함수 → 스레드풀에서 실행되어 이벤트 루프를 막지 않음)
+@router.post("")
+def capture_profile(
+    seconds: float = 10.0,
+    interval_ms: float = 5.0,
+    _: models.User = Depends(require_admin),
+):
+    try:
+        collapsed = profiler.capture(seconds, interval_ms / 1000.0)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return _collapsed_response(collapsed, f"backend-{int(time.time())}")
+
+# 요청 단위 프로파일 조회
+@router.get("/{profile_id}")
+def get_request_profile(profile_id: str, _: models.User = Depends(require_admin)):
+    collapsed = profiler.get_stored(profile_id)
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="프로파일을 찾을 수 없습니다.")
+    return _collapsed_response(collapsed, f"backend-{profile_id}")
@@ -4,8 +4,9 @@ from database import SessionLocal
 import schemas, crud, models
 from auth import get_current_user
 from typing import Optional 
+from profiler import ProfiledRoute
 
-router = APIRouter(prefix="/admin/users", tags=["admin-users"])
+router = APIRouter(prefix="/admin/users", tags=["admin-users"], route_class=ProfiledRoute)
 
 def get_db():
     db = SessionLocal()
@@ -1,11 +1,15 @@
 # routers/chat.py
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+import anyio
 from sqlalchemy.orm import Session
 from database import SessionLocal
 import schemas, crud
-import httpx  # ← 추가
+import httpx, json, os  # ← 추가
+from profiler import ProfiledRoute
 
-router = APIRouter(prefix="/api/chat", tags=["chat"])
+router = APIRouter(prefix="/api/chat", tags=["chat"], route_class=ProfiledRoute)
 
 def get_db():
     db = SessionLocal()
@@ -15,12 +19,20 @@ def get_db():
         db.close()
 
 RAG_URL = "http://127.0.0.1:9001/rag/ask"
+RAG_STREAM_URL = "http://127.0.0.1:9001/rag/ask/stream"
+# RAG 응답 시간 예산(ms). RAG 서비스가 예산에 맞춰 더 싼 단계(캐시/구조화/어휘 매칭)로 답함 (0: 마감 없음)
+RAG_DEADLINE_MS = int(os.getenv("RAG_DEADLINE_MS", "5000"))
+# 예산을 넘긴 응답도 받을 여유(네트워크/직렬화, 중단할 수 없는 단계) — 이 시간이 지나면 호출 실패
+RAG_TIMEOUT_GRACE_S = 2.0
+# 스트리밍: 조각 사이 최대 대기(초). CPU 생성은 첫 토큰(prefill)까지가 가장 오래 걸림
+RAG_STREAM_READ_TIMEOUT_S = float(os.getenv("RAG_STREAM_READ_TIMEOUT_S", "120"))
 
-def call_rag(question: str, top_k: int = 8) -> str:
+def call_rag(question: str, top_k: int = 8, deadline_ms: int = RAG_DEADLINE_MS) -> str:
+    timeout = deadline_ms / 1000.0 + RAG_TIMEOUT_GRACE_S if deadline_ms > 0 else 300.0
     try:
         # proxies 제거, trust_env=False만 사용
-        with httpx.Client(timeout=300.0, trust_env=False) as client:
-            resp = client.post(RAG_URL, json={"question": question, "top_k": top_k})
+        with httpx.Client(timeout=timeout, trust_env=False) as client:
+            resp = client.post(RAG_URL, json={"question": question, "top_k": top_k, "deadline_ms": deadline_ms})
             resp.raise_for_status()
             return resp.json().get("answer", "(빈 응답)")
     except Exception as e:
@@ -39,3 +51,78 @@ def chat(body: schemas.ChatIn, db: Session = Depends(get_db)):
     crud.create_chat_message(db, thread_id, "assistant", reply)
 
     return {"reply": reply, "thread_id": thread_id}
+
+# ---- 채팅 스트리밍 응답 (text/event-stream) ----
+def _sse(kind: str, data: dict) -> str:
+    return f"event: {kind}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def relay_rag_stream(question: str, acc: dict, top_k: int = 8, deadline_ms: int = RAG_DEADLINE_MS):
+    """
+    RAG /rag/ask/stream 의 SSE 를 줄 단위로 그대로 중계하면서 acc 에 답변을 모음
+    - acc["parts"]: 받은 token 조각들, acc["answer"]: done 이벤트의 최종 답변
+    - 첫 이벤트 전에 실패하면 call_rag 와 같은 "[RAG 호출 실패] …" 를 token/done 으로 보냄
+    """
+    timeout = httpx.Timeout(RAG_STREAM_READ_TIMEOUT_S, connect=5.0)
+    acc.setdefault("parts", [])
+    kind = None
+    try:
+        async with httpx.AsyncClient(timeout=timeout, trust_env=False) as client:
+            async with client.stream("POST", RAG_STREAM_URL,
+                                     json={"question": question, "top_k": top_k, "deadline_ms": deadline_ms}) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    # 빈 줄 = 이벤트 끝 → 바로 흘려보내야 클라이언트가 조각을 받음
+                    yield line + "\n"
+                    if line.startswith("event:"):
+                        kind = line[6:].strip()
+                    elif line.startswith("data:"):
+                        data = json.loads(line[5:])
+                        if kind == "token":
+                            acc["parts"].append(data.get("text", ""))
+                        elif kind == "done":
+                            acc["answer"] = data.get("answer")
+    except Exception as e:
+        if acc.get("answer") is None and not acc["parts"]:
+            acc["answer"] = f"[RAG 호출 실패] {e}"
+            yield _sse("token", {"text": acc["answer"]}) + _sse("done", {"answer": acc["answer"], "error": str(e)})
+        else:
+            print(f"[WARN] RAG 스트림 중단: {e}")
+
+def _save_reply(thread_id: int, reply: str):
+    # 응답이 흐르는 동안 요청 의존성 세션이 닫힐 수 있어 저장은 새 세션으로
+    s = SessionLocal()
+    try:
+        crud.create_chat_message(s, thread_id, "assistant", reply)
+    finally:
+        s.close()
+
+@router.post("/stream")
+async def chat_stream(body: schemas.ChatIn, db: Session = Depends(get_db)):
+    """
+    /api/chat 의 스트리밍 버전
+    - event: thread → {"thread_id"} 를 먼저 보내고, 이후 RAG 이벤트(meta/token/done)를 받는 즉시 중계
+    - 사용자 메시지는 시작 시, 어시스턴트 메시지는 스트림이 끝난 뒤 최종 답변으로 저장
+    - DB 호출(동기 SQLAlchemy)은 스레드풀에서 실행 → 커밋을 기다리는 동안 다른 요청/스트림이 멈추지 않음
+    """
+    thread_id = body.thread_id or await run_in_threadpool(crud.create_chat_thread, db, user_id=None)
+    await run_in_threadpool(crud.create_chat_message, db, thread_id, "user", body.message)
+
+    async def events():
+        yield _sse("thread", {"thread_id": thread_id})
+        acc = {}
+        try:
+            async for chunk in relay_rag_stream(body.message, acc, top_k=8):
+                yield chunk
+        finally:
+            # 클라이언트가 중간에 끊어도 받은 데까지는 기록
+            # (연결이 끊기면 이 태스크는 취소된 상태 → shield 로 막아야 저장이 시작 전에 취소되지 않음)
+            reply = acc.get("answer") or "".join(acc.get("parts", [])).strip()
+            if reply:
+                with anyio.CancelScope(shield=True):
+                    await run_in_threadpool(_save_reply, thread_id, reply)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream; charset=utf-8",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -9,8 +9,9 @@ from sqlalchemy.orm import Session
 from database import get_db
 import models, schemas
 from auth import get_current_user  # 토큰에서 user 반환 (userID, name 포함)
+from profiler import ProfiledRoute
 
-router = APIRouter(prefix="/posts", tags=["comments"])
+router = APIRouter(prefix="/posts", tags=["comments"], route_class=ProfiledRoute)
 
 def get_post_or_404(db: Session, post_id: int): #post_id의 게시글이 존재하는지 확인
     post = db.query(models.Post).filter(models.Post.post_id == post_id).first()
@@ -51,7 +52,7 @@ def create_comment(
     return c
 
 # 개별 수정/삭제
-standalone = APIRouter(prefix="/comments", tags=["comments"])
+standalone = APIRouter(prefix="/comments", tags=["comments"], route_class=ProfiledRoute)
 
 ##주어진 comment_id의 댓글이 존재하는지 확인
 def get_comment_or_404(db: Session, comment_id: int):
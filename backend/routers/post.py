@@ -9,8 +9,9 @@ from database import get_db
 from auth import verify_token
 import schemas, crud, models
 from typing import List
+from profiler import ProfiledRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 # 유틸: 토큰에서 사용자 찾기 (sub가 int(userID)든 str(로그인ID)든 처리)
 def _resolve_user(db: Session, token_data: dict) -> models.User:
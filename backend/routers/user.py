@@ -10,8 +10,9 @@ from auth import verify_password, create_access_token, verify_token, hash_passwo
 from jose import JWTError, jwt
 from schemas import DeleteUserRequest
 from datetime import datetime, timedelta
+from profiler import ProfiledRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 RESET_TOKEN_EXPIRE_MINUTES = 10
 
 # 회원가입
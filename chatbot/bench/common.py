@@ -0,0 +1,140 @@
+# bench/common.py
+# -----------------------------------------------------------------------------
+# 역할: 벤치마크 공용 유틸
+#   - git 커밋/환경 정보 수집 → 결과 JSON에 함께 기록(커밋 간 비교용)
+#   - RSS(현재/최대) 측정, 지연시간 백분위 계산
+#   - 결과 저장(OUTPUTS_DIR/bench/*.json) 및 이전 결과와의 비교 출력
+# -----------------------------------------------------------------------------
+import json, math, os, platform, subprocess, sys, threading, time
+from pathlib import Path
+from typing import Dict, List, Optional
+from config import BASE_DIR, OUTPUTS_DIR
+
+BENCH_DIR = OUTPUTS_DIR / "bench"
+
+def git_sha() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+def env_info() -> Dict:
+    return {
+        "commit": git_sha(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def rss_mb() -> Optional[float]:
+    """현재 RSS(MB). /proc 가 없는 환경(Windows 등)에서는 None"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def peak_rss_mb() -> Optional[float]:
+    """프로세스 최대 RSS(MB). resource 모듈이 없는 환경(Windows)에서는 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: bytes
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+class RssWatcher:
+    """
+    with RssWatcher() as w: ...  → w.peak_mb / w.delta_mb
+    - 구간 동안 10ms 간격으로 RSS를 폴링해 최대값 기록 (ru_maxrss는 프로세스 누적이라 단계별 구분 불가)
+    - tracemalloc 과 달리 측정 대상 코드를 느리게 만들지 않음
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.start_mb = self.peak_mb = None
+        self._stop = threading.Event()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            cur = rss_mb()
+            if cur is not None and (self.peak_mb is None or cur > self.peak_mb):
+                self.peak_mb = cur
+
+    def __enter__(self):
+        self.start_mb = self.peak_mb = rss_mb()
+        self._t = threading.Thread(target=self._run, daemon=True)
+        self._t.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._t.join()
+        cur = rss_mb()
+        if cur is not None and (self.peak_mb is None or cur > self.peak_mb):
+            self.peak_mb = cur
+        return False
+
+    @property
+    def delta_mb(self) -> Optional[float]:
+        if self.start_mb is None or self.peak_mb is None:
+            return None
+        return round(self.peak_mb - self.start_mb, 1)
+
+def percentiles(samples: List[float], ps=(50, 95, 99)) -> Dict[str, float]:
+    """초 단위 샘플 → {"p50": ms, ...} (nearest-rank)"""
+    if not samples:
+        return {f"p{p}": None for p in ps}
+    xs = sorted(samples)
+    out = {}
+    for p in ps:
+        k = max(0, min(len(xs) - 1, math.ceil(p / 100 * len(xs)) - 1))
+        out[f"p{p}"] = round(xs[k] * 1000, 3)
+    return out
+
+def file_size(*paths) -> int:
+    return sum(Path(p).stat().st_size for p in paths if Path(p).exists())
+
+def write_results(name: str, payload: Dict, out: Optional[Path] = None) -> Path:
+    """결과를 JSON으로 저장. 기본 경로: OUTPUTS_DIR/bench/<name>-<commit>-<시각>.json"""
+    env = env_info()
+    payload = {"bench": name, "env": env, **payload}
+    if out is None:
+        stamp = env["timestamp"].replace(":", "").replace("-", "")
+        out = BENCH_DIR / f"{name}-{env['commit']}-{stamp}.json"
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"✔️ [벤치] 결과 저장: {out}")
+    return out
+
+def _flatten(d, prefix=""):
+    flat = {}
+    if isinstance(d, dict):
+        for k, v in d.items():
+            flat.update(_flatten(v, f"{prefix}{k}."))
+    elif isinstance(d, list):
+        for i, v in enumerate(d):
+            # 리스트 원소는 식별 필드(name/size/concurrency)가 있으면 그걸 키로 사용
+            tag = i
+            if isinstance(v, dict):
+                tag = "-".join(str(v[k]) for k in ("name", "stage", "size", "concurrency") if k in v) or i
+            flat.update(_flatten(v, f"{prefix}{tag}."))
+    elif isinstance(d, (int, float)) and not isinstance(d, bool):
+        flat[prefix.rstrip(".")] = d
+    return flat
+
+def compare(baseline_path: Path, current: Dict):
+    """이전 결과 JSON과 수치 필드를 나란히 출력 (비율 = 현재/기준)"""
+    base = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    fb, fc = _flatten(base.get("results", base)), _flatten(current.get("results", current))
+    print(f"\n[비교] 기준={base.get('env', {}).get('commit')} → 현재")
+    for k in sorted(set(fb) & set(fc)):
+        b, c = fb[k], fc[k]
+        ratio = f"{c / b:.2f}x" if b else "-"
+        print(f"  {k:60s} {b:>12} → {c:>12}  ({ratio})")
@@ -0,0 +1,95 @@
+# bench/context.py
+# -----------------------------------------------------------------------------
+# 역할: 생성 프롬프트 포장(rag/context.py) 벤치마크 — 첫 토큰까지 시간(CPU prefill ∝ 프롬프트 길이)의 상한 확인
+#   - 대표 질의 + 청크 본문 구간 질의로 search() → 포장 전(검색 결과 전부) / 예산별 포장 후 프롬프트 토큰 수
+#   - 예산별 p50/p95/max 토큰, 포장 시간(캐시 미스), 캐시 적중 시간, 중복/예산 초과로 뺀 청크 수
+#   - 결과: OUTPUTS_DIR/bench/context-<commit>-<시각>.json
+#
+# 실행 (chatbot/ 에서):
+#   python -m bench.context --budgets 512 1024 2048 --queries 100
+#   python -m bench.context --stub --tokenizer <로컬 토크나이저 경로>   # 모델 없이(스텁 인코더로 만든 인덱스)
+# -----------------------------------------------------------------------------
+import argparse, statistics, time
+from pathlib import Path
+from typing import Dict, List
+
+from config import CHUNKS_PATH, FAISS_INDEX, FAISS_TEXTS, FAISS_METAS, GEN_MODEL_ID, GEN_TEMPLATE_TOKENS
+from bench.common import percentiles, write_results, compare
+from bench.retrieval import make_queries
+from utils.dataset import load_records
+
+def _tokens(values: List[int]) -> Dict:
+    xs = sorted(values)
+    return {"p50": xs[len(xs) // 2], "p95": xs[min(len(xs) - 1, int(len(xs) * 0.95))], "max": xs[-1],
+            "mean": round(statistics.mean(xs), 1)}
+
+def main():
+    ap = argparse.ArgumentParser(description="생성 프롬프트 포장: 예산별 프롬프트 토큰 분포/포장 시간")
+    ap.add_argument("--budgets", type=int, nargs="+", default=[512, 1024, 2048])
+    ap.add_argument("--queries", type=int, default=100)
+    ap.add_argument("--top-k", type=int, default=8)
+    ap.add_argument("--tokenizer", default=GEN_MODEL_ID, help="생성 모델 토크나이저(이름/경로)")
+    ap.add_argument("--index", default=str(FAISS_INDEX))
+    ap.add_argument("--texts", default=str(FAISS_TEXTS))
+    ap.add_argument("--metas", default=str(FAISS_METAS))
+    ap.add_argument("--stub", action="store_true", help="질의 인코더를 스텁으로(인덱스도 스텁으로 만든 경우)")
+    ap.add_argument("--out", default=None, help="결과 JSON 경로(기본: outputs/bench/…)")
+    ap.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    args = ap.parse_args()
+
+    from rag import search as S
+    from rag.context import ContextPacker, SYSTEM_PROMPT, USER_TEMPLATE, BLOCK_TEMPLATE
+    from processor.tokens import TokenCounter
+
+    S.use_index(args.index, args.texts, args.metas)
+    S.use_semantic_cache(None)
+    if args.stub:
+        from bench.stub_encoder import HashingEncoder
+        S.use_encoder(HashingEncoder(dim=S.load_index()[0].d))
+    counter = TokenCounter(args.tokenizer)
+
+    queries = make_queries(load_records(CHUNKS_PATH), args.queries)
+    searched = [(q, S.search(q, top_k=args.top_k)) for q in queries]
+
+    # 포장 전: 검색 결과를 전부 넣은 프롬프트
+    raw = []
+    for q, hits in searched:
+        ctx = "\n".join(BLOCK_TEMPLATE.format(n=i + 1, text=S._norm(h["text"])) for i, h in enumerate(hits))
+        prompt = USER_TEMPLATE.format(context=ctx, query=S._norm(q))
+        raw.append(sum(counter.count([SYSTEM_PROMPT, prompt])) + GEN_TEMPLATE_TOKENS)
+    res: Dict = {"queries": len(queries), "unpacked_tokens": _tokens(raw), "budgets": []}
+    print(f"  unpacked  tokens p50={res['unpacked_tokens']['p50']} p95={res['unpacked_tokens']['p95']} "
+          f"max={res['unpacked_tokens']['max']}")
+
+    for budget in args.budgets:
+        packer = ContextPacker(budget=budget, counter=counter)
+        lat, toks, dup, over, trunc = [], [], 0, 0, 0
+        for q, hits in searched:
+            t0 = time.perf_counter()
+            p = packer.pack(q, hits)
+            lat.append(time.perf_counter() - t0)
+            toks.append(p["n_tokens"])
+            dup += p["dropped_dup"]
+            over += p["dropped_budget"]
+            trunc += p["truncated"]
+        t0 = time.perf_counter()
+        for q, hits in searched:
+            packer.pack(q, hits)
+        cached_us = (time.perf_counter() - t0) / len(searched) * 1e6
+        row = {"budget": budget, "tokens": _tokens(toks), "pack_ms": percentiles(lat, (50, 95)),
+               "cached_pack_us": round(cached_us, 1), "over_budget": sum(t > budget for t in toks),
+               "dropped_dup": dup, "dropped_budget": over, "truncated": trunc}
+        res["budgets"].append(row)
+        print(f"  budget={budget:<5} tokens p50={row['tokens']['p50']} p95={row['tokens']['p95']} "
+              f"max={row['tokens']['max']}  pack p50={row['pack_ms']['p50']}ms  cached={row['cached_pack_us']}us  "
+              f"dup={dup} cut={over} trunc={trunc}")
+
+    payload = {"params": {"budgets": args.budgets, "top_k": args.top_k, "tokenizer": args.tokenizer,
+                          "stub": args.stub},
+               "results": res}
+    write_results("context", payload, Path(args.out) if args.out else None)
+    if args.baseline:
+        compare(Path(args.baseline), payload)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# bench/extract.py
+# -----------------------------------------------------------------------------
+# 역할: 구조화 정보 추출(processor/chunker.py extract_info_chunks) 처리량 벤치마크 (네트워크 불필요)
+#   - raw.jsonl 을 --scale 배로 재생(bench/pipeline.replay_raw) → build_clean → 확대된 clean.jsonl
+#   - extract : clean.jsonl 한 번 읽으며 정보 추출만 — records/sec, MB/sec (중앙값)
+#   - chunk-two-pass : 문장 청크 패스 + clean.jsonl 을 다시 읽는 추출 패스(이전 build_chunks 방식)
+#   - chunk-fused    : 문장 청크 루프에서 바로 추출(clean.jsonl 한 번 읽기, 현재 build_chunks 기본)
+#   - info_sha1 / chunks_sha1: 결과 해시 → 커밋 간(--baseline) 결과가 바뀌지 않았는지 확인
+#
+# 실행 (chatbot/ 에서):
+#   python -m bench.extract --scale 300
+#   python -m bench.extract --scale 300 --baseline outputs/bench/extract-<커밋>-<시각>.json
+# -----------------------------------------------------------------------------
+import argparse, hashlib, json, shutil, statistics, time
+from pathlib import Path
+from typing import Callable, Dict
+
+from config import RAW_PATH
+from bench.common import BENCH_DIR, write_results, compare
+from bench.pipeline import replay_raw
+from utils.dataset import count_records
+
+def _sha1(path: Path) -> str:
+    return hashlib.sha1(Path(path).read_bytes()).hexdigest()[:12]
+
+def _median_wall(fn: Callable[[], object], repeat: int) -> float:
+    lat = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        lat.append(time.perf_counter() - t0)
+    return statistics.median(lat)
+
+def _row(name: str, wall: float, records: int, in_bytes: int, **extra) -> Dict:
+    row = {
+        "name": name,
+        "wall_s": round(wall, 4),
+        "records": records,
+        "records_per_s": round(records / wall, 1) if wall else None,
+        "mb_per_s": round(in_bytes / 2**20 / wall, 3) if wall else None,
+        **extra,
+    }
+    print(f"  {name:15s} {row['wall_s']:>8.4f}s  {row['records_per_s'] or 0:>11.1f} rec/s  "
+          f"{row['mb_per_s'] or 0:>8.3f} MB/s")
+    return row
+
+def main():
+    ap = argparse.ArgumentParser(description="구조화 정보 추출 처리량 벤치마크(오프라인)")
+    ap.add_argument("--raw", default=str(RAW_PATH), help="재생할 기록 raw.jsonl")
+    ap.add_argument("--scale", type=int, default=300, help="raw 레코드 복제 배수")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--workdir", default=str(BENCH_DIR / "work" / "extract"))
+    ap.add_argument("--keep", action="store_true", help="작업 폴더 삭제하지 않음")
+    ap.add_argument("--out", default=None)
+    ap.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    args = ap.parse_args()
+
+    from processor.cleaner import build_clean
+    from processor.chunker import build_chunks, extract_info_chunks
+
+    work = Path(args.workdir)
+    raw, clean, clean_copy = work / "raw.jsonl", work / "clean.jsonl", work / "clean_text.jsonl"
+    chunks, docs = work / "chunks.jsonl", work / "docs.jsonl"
+    replay_raw(Path(args.raw), raw, args.scale, args.seed)
+    build_clean(raw_path=raw, clean_path=clean)
+    # text_path 가 clean_path 와 다른 파일이면 build_chunks 는 추출용으로 clean_path 를 따로 읽음(두 번 읽기)
+    shutil.copyfile(clean, clean_copy)
+    n_rec = count_records(clean)
+    n_bytes = clean.stat().st_size
+
+    print(f"=== extract bench: {n_rec} records ({n_bytes / 2**20:.1f}MB), repeat={args.repeat} ===")
+    info = extract_info_chunks(clean)
+    info_sha1 = hashlib.sha1(json.dumps(info, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    rows = [_row("extract", _median_wall(lambda: extract_info_chunks(clean), args.repeat), n_rec, n_bytes,
+                 info_sha1=info_sha1)]
+
+    def chunk(text_path):
+        return lambda: build_chunks(clean_path=clean, chunks_path=chunks, docs_path=docs, text_path=text_path)
+
+    for name, text_path in (("chunk-two-pass", clean_copy), ("chunk-fused", None)):
+        wall = _median_wall(chunk(text_path), args.repeat)
+        rows.append(_row(name, wall, n_rec, n_bytes, chunks_sha1=_sha1(chunks)))
+
+    payload = {"params": {"raw": args.raw, "scale": args.scale, "repeat": args.repeat,
+                          "records": n_rec, "clean_mb": round(n_bytes / 2**20, 3)},
+               "results": rows}
+    write_results("extract", payload, Path(args.out) if args.out else None)
+    if args.baseline:
+        compare(Path(args.baseline), payload)
+    if not args.keep:
+        shutil.rmtree(work, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# bench/golden.py
+# -----------------------------------------------------------------------------
+# 역할: 골든 질의 회귀 테스트 + 의도별 지연 예산 검사
+#   - bench/golden_queries.jsonl: {"query", "path"(A~E), "answer", ["answer_stub"], ["budget_ms"]}
+#     answer_stub: --stub-encoder 실행의 E 기대 답변 (E 는 인코더에 따라 top1 이 다르므로 따로 기록, A~D 는 answer 공용)
+#   - 각 질의를 rag_answer_routed()로 실행해 (경로, 답변, 지연)을 기록
+#   - 실패 조건:
+#       1) 경로가 바뀜 (예: 구조화 의도가 E 밀집 검색으로 새는 경우)
+#       2) 답변이 바뀜 — 기대 답변이 기록되지 않은 질의도 실패(--allow-unrecorded 로만 통과)
+#       3) 구조화 의도(A~D)가 지연 예산 초과 (인덱스 로드/모델 로드는 워밍업으로 제외)
+#   - 실패가 하나라도 있으면 종료코드 1 → CI/배치에서 바로 감지
+#
+# 실행 (chatbot/ 에서):
+#   python -m bench.golden                  # 검사 (실제 인덱스 + 임베딩 모델)
+#   python -m bench.golden --update         # 현재 결과를 기대값으로 기록(의도적 변경 후)
+#   python -m bench.golden --skip-dense     # 임베딩 모델 없이 A~D만 검사
+#   python -m bench.golden --stub-encoder   # chunks.jsonl 을 결정적 스텁 인코더로 색인해 E 까지 검사(모델 불필요)
+# -----------------------------------------------------------------------------
+import argparse, json, statistics, sys, time
+from pathlib import Path
+from typing import Dict, List
+
+from bench.common import write_results, BENCH_DIR
+from config import CHUNKS_PATH
+
+FIXTURE = Path(__file__).with_name("golden_queries.jsonl")
+STUB_DIM = 256
+
+# 구조화 의도 기본 예산(ms, 워밍업 이후 중앙값 기준). E는 인코딩/검색이 포함되므로 기본 예산 없음
+DEFAULT_BUDGETS_MS = {"A": 50.0, "B": 50.0, "C": 50.0, "D": 50.0}
+STRUCTURED = ("A", "B", "C", "D")
+
+def load_fixture(path: Path) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(l) for l in f if l.strip()]
+
+def save_fixture(path: Path, rows: List[Dict]):
+    with open(path, "w", encoding="utf-8") as f:
+        for r in rows:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+def answer_key(path: str, stub: bool) -> str:
+    """기대 답변 필드 — 스텁 실행의 E 만 answer_stub (구조화 직답은 인코더와 무관)"""
+    return "answer_stub" if stub and path == "E" else "answer"
+
+def use_stub_index(workdir: Path, dim: int = STUB_DIM):
+    """chunks.jsonl → 스텁 인코더 인덱스(workdir)를 만들어 검색 대상으로 지정 (모델 없이 E 경로 재현)"""
+    from bench.stub_encoder import HashingEncoder
+    from embedder.embed_faiss import build_faiss_index
+    from rag import search as S
+
+    encoder = HashingEncoder(dim=dim)
+    index, texts, metas = workdir / "faiss_ip.index", workdir / "texts.jsonl", workdir / "metas.jsonl"
+    build_faiss_index(chunks_path=CHUNKS_PATH, index_path=index, texts_path=texts, metas_path=metas,
+                      encoder=encoder)
+    S.use_encoder(encoder)
+    S.use_index(index, texts, metas)
+
+def run(rows: List[Dict], repeat: int, top_k: int, e_budget_ms=None, stub: bool = False,
+        allow_unrecorded: bool = False) -> List[Dict]:
+    from rag.search import load_index, rag_answer_routed
+
+    # 워밍업: 인덱스 로드(+ E 질의가 있으면 모델 로드)를 측정에서 제외
+    load_index()
+    if any(r.get("path") == "E" for r in rows):
+        rag_answer_routed(rows[[r.get("path") for r in rows].index("E")]["query"], top_k=top_k)
+
+    results = []
+    for r in rows:
+        lat, path, ans = [], None, None
+        for _ in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            path, ans = rag_answer_routed(r["query"], top_k=top_k)
+            lat.append(time.perf_counter() - t0)
+        ms = statistics.median(lat) * 1000
+        exp_path = r.get("path")
+        budget = r.get("budget_ms") or DEFAULT_BUDGETS_MS.get(exp_path) or \
+            (e_budget_ms if exp_path == "E" else None)
+
+        key = answer_key(exp_path, stub)
+        expected = r.get(key)
+        problems = []
+        if exp_path and path != exp_path:
+            problems.append(f"경로 변경 {exp_path}→{path}")
+        if expected is None:
+            if not allow_unrecorded:
+                problems.append(f"기대 답변 미기록({key})")
+        elif ans != expected:
+            problems.append("답변 변경")
+        if budget is not None and ms > budget:
+            problems.append(f"예산 초과 {ms:.1f}ms > {budget:.0f}ms")
+        results.append({"query": r["query"], "expected_path": exp_path, "path": path,
+                        "ms": round(ms, 3), "budget_ms": budget, "answer": ans,
+                        "recorded": expected is not None, "problems": problems})
+    return results
+
+def main():
+    ap = argparse.ArgumentParser(description="골든 질의 회귀 + 의도별 지연 예산")
+    ap.add_argument("--fixture", default=str(FIXTURE))
+    ap.add_argument("--repeat", type=int, default=5, help="질의당 반복 횟수(중앙값 사용)")
+    ap.add_argument("--top-k", type=int, default=5)
+    ap.add_argument("--e-budget-ms", type=float, default=None, help="E(밀집 검색) 경로 예산(기본 없음)")
+    ap.add_argument("--skip-dense", action="store_true", help="E 경로 질의 제외(모델 없이 실행)")
+    ap.add_argument("--stub-encoder", action="store_true",
+                    help="chunks.jsonl 을 스텁 인코더로 색인해 실행, 기대 답변은 answer_stub")
+    ap.add_argument("--allow-unrecorded", action="store_true", help="기대 답변이 없는 질의를 실패로 보지 않음")
+    ap.add_argument("--workdir", default=str(BENCH_DIR / "work" / "golden"), help="--stub-encoder 인덱스 위치")
+    ap.add_argument("--update", action="store_true", help="현재 경로/답변을 기대값으로 기록")
+    ap.add_argument("--out", default=None, help="결과 JSON 경로(기본: outputs/bench/…)")
+    args = ap.parse_args()
+
+    fixture = Path(args.fixture)
+    rows = load_fixture(fixture)
+    todo = [r for r in rows if not (args.skip_dense and r.get("path") == "E")]
+    if args.stub_encoder:
+        use_stub_index(Path(args.workdir))
+    results = run(todo, args.repeat, args.top_k, args.e_budget_ms, stub=args.stub_encoder,
+                  allow_unrecorded=args.allow_unrecorded or args.update)
+
+    if args.update:
+        by_q = {res["query"]: res for res in results}
+        for r in rows:
+            res = by_q.get(r["query"])
+            if res:
+                r["path"], r[answer_key(res["path"], args.stub_encoder)] = res["path"], res["answer"]
+        save_fixture(fixture, rows)
+        print(f"✔️ [골든] 기대값 갱신{'(E: answer_stub)' if args.stub_encoder else ''}: {fixture} ({len(results)}개)")
+        return 0
+
+    failed = [res for res in results if res["problems"]]
+    for res in results:
+        mark = "FAIL" if res["problems"] else ("ok  " if res["recorded"] else "new ")
+        print(f"[{mark}] {res['path'] or '-'} {res['ms']:8.2f}ms  {res['query']}"
+              + (f"  ← {', '.join(res['problems'])}" if res["problems"] else ""))
+    unrecorded = sum(1 for res in results if not res["recorded"])
+    if unrecorded:
+        print(f"[{'INFO' if args.allow_unrecorded else 'WARN'}] 기대 답변 미기록 {unrecorded}개 "
+              f"— {'--stub-encoder ' if args.stub_encoder else ''}--update 로 기록")
+
+    by_path: Dict[str, List[float]] = {}
+    for res in results:
+        by_path.setdefault(res["path"], []).append(res["ms"])
+    summary = {p: {"n": len(v), "median_ms": round(statistics.median(v), 3), "max_ms": max(v)}
+               for p, v in sorted(by_path.items())}
+    write_results("golden", {"params": {"repeat": args.repeat, "top_k": args.top_k,
+                                        "stub_encoder": args.stub_encoder},
+                             "results": {"by_path": summary, "queries": results}},
+                  Path(args.out) if args.out else None)
+
+    print(f"\n{'❌' if failed else '✔️'} [골든] {len(results) - len(failed)}/{len(results)} 통과")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+# bench/jsonl.py
+# -----------------------------------------------------------------------------
+# 역할: JSONL 코덱(utils/jsonl.py) 읽기/쓰기 처리량 벤치마크 (네트워크/모델 불필요)
+#   - 입력: raw.jsonl 을 --scale 배로 재생(긴 본문 레코드) + chunks.jsonl 을 --chunks 개로 합성(짧은 레코드)
+#   - load: stdlib-lines(이전 방식: 텍스트 모드 + 줄마다 json.loads) / codec-json / codec-orjson /
+#           codec-records(orjson + __slots__ 구조체, utils/records.py)
+#   - dump: stdlib-lines(이전 방식: 줄마다 json.dumps(ensure_ascii=False) + write) / codec-json / codec-orjson
+#   - records/sec, MB/sec (중앙값), 읽은 레코드가 차지하는 메모리(tracemalloc, 1회)
+#   - same_bytes: codec-json 과 codec-orjson 출력이 바이트 단위로 같은지
+#   (orjson 이 설치되지 않은 환경에서는 orjson 행을 건너뜀)
+#
+# 실행 (chatbot/ 에서):
+#   python -m bench.jsonl --scale 300 --chunks 200000
+#   python -m bench.jsonl --baseline outputs/bench/jsonl-<커밋>-<시각>.json
+# -----------------------------------------------------------------------------
+import argparse, hashlib, json, shutil, statistics, time, tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from config import RAW_PATH, CHUNKS_PATH
+from bench.common import BENCH_DIR, write_results, compare
+from bench.pipeline import replay_raw
+from bench.retrieval import synthesize_chunks
+from utils import jsonl
+from utils.dataset import load_records
+from utils.records import RawRecord, ChunkRecord
+
+def _median_wall(fn: Callable[[], object], repeat: int) -> float:
+    lat = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        lat.append(time.perf_counter() - t0)
+    return statistics.median(lat)
+
+def _mem_mb(fn: Callable[[], object]) -> float:
+    """fn() 결과를 들고 있는 동안 할당된 메모리(MB)"""
+    tracemalloc.start()
+    keep = fn()
+    cur, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del keep
+    return round(cur / 2**20, 1)
+
+def _stdlib_load(path: Path) -> List:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(l) for l in f if l.strip()]
+
+def _stdlib_dump(path: Path, rows: List):
+    with open(path, "w", encoding="utf-8") as w:
+        for r in rows:
+            w.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+def _codec(backend: str, fn: Callable[[], object]) -> Callable[[], object]:
+    def run():
+        prev = jsonl.BACKEND
+        jsonl.set_backend(backend)
+        try:
+            return fn()
+        finally:
+            jsonl.set_backend(prev)
+    return run
+
+def _row(kind: str, op: str, name: str, wall: float, records: int, n_bytes: int, **extra) -> Dict:
+    row = {
+        "name": f"{kind}-{op}-{name}",   # bench.common.compare 가 행을 구분하는 키
+        "wall_s": round(wall, 4),
+        "records_per_s": round(records / wall, 1) if wall else None,
+        "mb_per_s": round(n_bytes / 2**20 / wall, 2) if wall else None,
+        **extra,
+    }
+    mem = f"  mem={extra['mem_mb']}MB" if "mem_mb" in extra else ""
+    print(f"  {kind:6s} {op:4s} {name:14s} {row['wall_s']:>8.4f}s  {row['records_per_s'] or 0:>11.1f} rec/s  "
+          f"{row['mb_per_s'] or 0:>8.2f} MB/s{mem}")
+    return row
+
+def bench_file(kind: str, path: Path, record, work: Path, repeat: int) -> List[Dict]:
+    backends = ["json"] + (["orjson"] if jsonl.orjson is not None else [])
+    rows_in = jsonl.load_jsonl(path)
+    n, n_bytes = len(rows_in), path.stat().st_size
+    out = []
+
+    loaders = [("stdlib-lines", lambda: _stdlib_load(path))]
+    loaders += [(f"codec-{b}", _codec(b, lambda: jsonl.load_jsonl(path))) for b in backends]
+    loaders.append(("codec-records", lambda: jsonl.load_jsonl(path, record)))
+    for name, fn in loaders:
+        out.append(_row(kind, "load", name, _median_wall(fn, repeat), n, n_bytes, mem_mb=_mem_mb(fn)))
+
+    digests = {}
+    dumpers = [("stdlib-lines", work / f"{kind}.stdlib.jsonl", None)]
+    dumpers += [(f"codec-{b}", work / f"{kind}.{b}.jsonl", b) for b in backends]
+    for name, dst, backend in dumpers:
+        if backend is None:
+            fn = lambda: _stdlib_dump(dst, rows_in)
+        else:
+            fn = _codec(backend, lambda: jsonl.write_jsonl(dst, rows_in))
+        wall = _median_wall(fn, repeat)
+        if backend is not None:
+            digests[backend] = hashlib.sha1(dst.read_bytes()).hexdigest()[:12]
+        out.append(_row(kind, "dump", name, wall, n, dst.stat().st_size,
+                        **({"sha1": digests[backend]} if backend else {})))
+    if len(digests) > 1:
+        same = len(set(digests.values())) == 1
+        print(f"  {kind:6s} codec-json/codec-orjson 출력 동일: {same}")
+        out[-1]["same_bytes"] = same
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description="JSONL 코덱 읽기/쓰기 처리량 벤치마크(오프라인)")
+    ap.add_argument("--raw", default=str(RAW_PATH), help="재생할 기록 raw.jsonl")
+    ap.add_argument("--chunks-src", default=str(CHUNKS_PATH), help="합성 청크의 기반 chunks.jsonl")
+    ap.add_argument("--scale", type=int, default=300, help="raw 레코드 복제 배수")
+    ap.add_argument("--chunks", type=int, default=200_000, help="합성 청크 수")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--workdir", default=str(BENCH_DIR / "work" / "jsonl"))
+    ap.add_argument("--keep", action="store_true", help="작업 폴더 삭제하지 않음")
+    ap.add_argument("--out", default=None)
+    ap.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    args = ap.parse_args()
+
+    work = Path(args.workdir)
+    raw, chunks = work / "raw.jsonl", work / "chunks.jsonl"
+    replay_raw(Path(args.raw), raw, args.scale)
+    synthesize_chunks(load_records(args.chunks_src), args.chunks, chunks)
+
+    print(f"=== jsonl bench: backend={jsonl.BACKEND}, raw {raw.stat().st_size / 2**20:.1f}MB, "
+          f"chunks {chunks.stat().st_size / 2**20:.1f}MB, repeat={args.repeat} ===")
+    rows = bench_file("raw", raw, RawRecord, work, args.repeat)
+    rows += bench_file("chunks", chunks, ChunkRecord, work, args.repeat)
+
+    payload = {"params": {"raw": args.raw, "scale": args.scale, "chunks": args.chunks, "repeat": args.repeat,
+                          "orjson": jsonl.orjson is not None},
+               "results": rows}
+    write_results("jsonl", payload, Path(args.out) if args.out else None)
+    if args.baseline:
+        compare(Path(args.baseline), payload)
+    if not args.keep:
+        shutil.rmtree(work, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# bench/parse.py
+# -----------------------------------------------------------------------------
+# 역할: HTML 파싱 벤치마크 (페이지 1건당 파싱+추출 시간, 메모리)
+#   - 파서(html.parser / lxml / html5lib 중 설치된 것) × 모드(full: 전체 트리, partial: SoupStrainer)
+#   - 페이지 종류별 extractor(main/solution/business)와 링크 추출(process_page)을 측정
+#   - records_equal: 기준(html.parser + full, 기존 동작)과 추출 결과가 같은지 → 파서 교체 전 확인용
+#
+# 입력:
+#   - --archive DIR : 기록된 크롤 아카이브(crawler/archive.py, CRAWL_MODE=record)의 실제 페이지
+#   - 없으면 raw.jsonl 레코드로 사이트 구조(.sSol_box/.cont/H 태그 + 메뉴/스크립트 노이즈)를 흉내 낸
+#     합성 페이지 사용 (--pad-kb 로 페이지 크기 조절)
+#
+# 실행 (chatbot/ 에서):
+#   python -m bench.parse
+#   python -m bench.parse --archive data/archive --repeat 50
+# -----------------------------------------------------------------------------
+import argparse, html, statistics, time, tracemalloc
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from config import RAW_PATH, BASE_URL
+from bench.common import write_results, compare
+from utils.dataset import load_records
+
+def _noise(pad_kb: int) -> Tuple[str, str]:
+    """실제 페이지처럼 head(스크립트/스타일)와 메뉴/푸터 노이즈"""
+    nav = "".join(f'<li><a href="/page/menu{i}.html">메뉴 {i}</a></li>' for i in range(80))
+    script = "var x = 1; " * (pad_kb * 1024 // 24)
+    style = ".a{color:#333;margin:0 auto} " * (pad_kb * 1024 // 60)
+    head = f"<head><meta charset='utf-8'><style>{style}</style><script>{script}</script></head>"
+    body_noise = f"<header><nav><ul>{nav}</ul></nav></header>"
+    footer = "<footer>" + "".join(f"<p>주소/연락처 블록 {i}</p>" for i in range(30)) + "</footer>"
+    return head, body_noise + "{body}" + footer
+
+def synth_pages(raw_path: Path, pad_kb: int) -> List[Tuple[str, str, bytes]]:
+    """raw.jsonl → [(종류, url, html bytes)]"""
+    recs = load_records(raw_path)
+    head, frame = _noise(pad_kb)
+    e = html.escape
+    pages = []
+
+    main = "".join(f"<h2>{e(r['title'])}</h2><div><p>{e(r['content'])}</p></div>"
+                   for r in recs if r.get("section") == "main")
+    pages.append(("main", BASE_URL, main))
+
+    boxes = []
+    for r in (r for r in recs if r.get("section") == "solution"):
+        lines = (r.get("content") or "").split("\n")
+        feats = next((l[len("주요기능: "):] for l in lines if l.startswith("주요기능: ")), "")
+        chars = next((l[len("특징: "):] for l in lines if l.startswith("특징: ")), "")
+        lis = "".join(f"<li>{e(x)}</li>" for x in feats.split("; ") if x)
+        spans = "".join(f"<span>{e(x)}</span>" for x in chars.split("; ") if x)
+        boxes.append(f'<div class="sSol_box"><strong>{e(r["title"])}</strong><h4>{e(lines[0])}</h4>'
+                     f'<div class="sSol_cont"><ul>{lis}</ul></div>'
+                     f'<div class="sSol_char"><div class="sSol_charRow">{spans}</div></div>'
+                     f'<div class="sSol_ex"><dl><dt>사용OS</dt><dd>Windows, LINUX</dd></dl></div></div>')
+    pages.append(("solution", BASE_URL + "page/solution.html", "".join(boxes)))
+
+    for i, r in enumerate(r for r in recs if r.get("section") == "business"):
+        body = (f'<div class="sub_visual"><h2>BUSINESS</h2></div><div class="cont"><h3>'
+                f'<small>{e(r["title"])}</small>사업 소개</h3><p>{e(r["content"])}</p>'
+                f'<ul>' + "".join(f"<li>상세 항목 {j}</li>" for j in range(20)) + "</ul></div>")
+        pages.append(("business", BASE_URL + f"page/biz{i}.html", body))
+
+    return [(kind, url, f"<html>{head}<body>{frame.format(body=body)}</body></html>".encode("utf-8"))
+            for kind, url, body in pages]
+
+def archive_pages(root: Path) -> List[Tuple[str, str, bytes]]:
+    from crawler.archive import CrawlArchive
+    from crawler.web_crawler import EXTRACTORS, extractor_for
+    arc = CrawlArchive(root)
+    names = {id(ex): ex.__name__.replace("extract_", "") for _, ex in EXTRACTORS}
+    pages = []
+    for url, entry in sorted(arc.entries().items()):
+        ctype = (entry.get("headers") or {}).get("content-type", "text/html")
+        if entry.get("status") != 200 or "html" not in ctype:
+            continue
+        _, ex = extractor_for(url)
+        pages.append((names.get(id(ex), "page"), url, arc.lookup(url)[2]))
+    return pages
+
+def _time_call(fn, repeat: int) -> float:
+    lat = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        lat.append(time.perf_counter() - t0)
+    return statistics.median(lat)
+
+def _peak_kb(fn) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+def run(pages, parsers: List[str], repeat: int) -> List[Dict]:
+    from crawler import html_parser
+    from crawler.web_crawler import extractor_for, process_page
+
+    baseline: Dict[str, object] = {}
+    rows = []
+    for parser in parsers:
+        for partial in (False, True):
+            html_parser.configure(parser=parser, partial=partial)
+            mode = "partial" if partial else "full"
+            by_kind: Dict[str, List[Dict]] = {}
+            for kind, url, content in pages:
+                _, ex = extractor_for(url)
+                out = ex(content, url)
+                key = url
+                if parser == "html.parser" and not partial:
+                    baseline[key] = out
+                links = process_page(content, url)["links"]
+                by_kind.setdefault(kind, []).append({
+                    "extract_ms": _time_call(lambda: ex(content, url), repeat) * 1000,
+                    "links_ms": _time_call(lambda: process_page(content, url), repeat) * 1000,
+                    "peak_kb": _peak_kb(lambda: ex(content, url)),
+                    "bytes": len(content),
+                    "equal": out == baseline.get(key),
+                    "links": len(links),
+                })
+            for kind, rs in by_kind.items():
+                rows.append({
+                    "name": f"{parser}-{mode}-{kind}", "parser": parser, "mode": mode, "kind": kind,
+                    "pages": len(rs),
+                    "avg_page_kb": round(sum(r["bytes"] for r in rs) / len(rs) / 1024, 1),
+                    "extract_ms_per_page": round(statistics.mean(r["extract_ms"] for r in rs), 3),
+                    "process_page_ms_per_page": round(statistics.mean(r["links_ms"] for r in rs), 3),
+                    "peak_kb_per_page": round(statistics.mean(r["peak_kb"] for r in rs), 1),
+                    "records_equal": all(r["equal"] for r in rs),
+                })
+    html_parser.configure(parser="html.parser", partial=True)
+    return rows
+
+def main():
+    from crawler.html_parser import available_parsers
+
+    ap = argparse.ArgumentParser(description="HTML 파싱 벤치마크(파서 × 전체/부분 파싱)")
+    ap.add_argument("--archive", default=None, help="크롤 아카이브 디렉터리(없으면 합성 페이지)")
+    ap.add_argument("--raw", default=str(RAW_PATH), help="합성 페이지 원본 raw.jsonl")
+    ap.add_argument("--pad-kb", type=int, default=40, help="합성 페이지 head 노이즈 크기(KB)")
+    ap.add_argument("--parsers", nargs="+", default=None, help="기본: 설치된 파서 전부")
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--out", default=None)
+    ap.add_argument("--baseline", default=None)
+    args = ap.parse_args()
+
+    pages = archive_pages(Path(args.archive)) if args.archive else synth_pages(Path(args.raw), args.pad_kb)
+    parsers = args.parsers or available_parsers()
+    if "html.parser" not in parsers:
+        parsers = ["html.parser"] + parsers   # records_equal 기준
+    print(f"=== parse bench: {len(pages)} pages, parsers={parsers}, repeat={args.repeat} ===")
+    rows = run(pages, parsers, args.repeat)
+
+    print(f"{'parser':12s} {'mode':8s} {'kind':9s} {'pages':>5s} {'KB':>6s} {'extract ms':>11s} "
+          f"{'+links ms':>10s} {'peak KB':>9s}  equal")
+    for r in rows:
+        print(f"{r['parser']:12s} {r['mode']:8s} {r['kind']:9s} {r['pages']:5d} {r['avg_page_kb']:6.1f} "
+              f"{r['extract_ms_per_page']:11.3f} {r['process_page_ms_per_page']:10.3f} "
+              f"{r['peak_kb_per_page']:9.1f}  {r['records_equal']}")
+
+    payload = {"params": {"source": args.archive or f"synth:{args.raw}", "pad_kb": args.pad_kb,
+                          "repeat": args.repeat, "parsers": parsers},
+               "results": rows}
+    write_results("parse", payload, Path(args.out) if args.out else None)
+    if args.baseline:
+        compare(Path(args.baseline), payload)
+
+if __name__ == "__main__":
+    main()
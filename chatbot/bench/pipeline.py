@@ -0,0 +1,207 @@
+# bench/pipeline.py
+# -----------------------------------------------------------------------------
+# 역할: run_all() 단계별 처리량 벤치마크 (네트워크 불필요)
+#   crawl(재생) → clean → chunk → embed 각 단계의
+#     records/sec, MB/sec, wall time, peak RSS(단계 구간 최대치/증가분)
+#   를 측정해 OUTPUTS_DIR/bench/pipeline-<commit>-<시각>.json 으로 저장.
+#
+#   - crawl 단계: 네트워크 대신 기록된 raw.jsonl(기본: 현재 RAW_PATH)을 --scale 배로
+#     변형(단어 치환/순서 흔들기)해 "크롤러 출력"으로 재생 → raw 작성 비용만 측정
+#   - embed 단계: 기본은 결정적 스텁 인코더(모델 다운로드 없이 정제/청크 회귀에 집중)
+#   - --chunk-mode tokens: 토큰 기준 청크(processor/tokens.py). --tokenizer 를 주면 어느 모드든
+#     청크 토큰 길이 분포와 배치 패딩 효율(고정 배치 vs 길이 버킷 배치)을 함께 기록
+#
+# 실행 (chatbot/ 에서):
+#   python -m bench.pipeline --scale 200
+#   python -m bench.pipeline --scale 200 --baseline outputs/bench/pipeline-<커밋>-<시각>.json
+#   python -m bench.pipeline --scale 200 --chunk-mode tokens --tokenizer BAAI/bge-m3
+#   python -m bench.pipeline --scale 1000 --workers 0   # 정제/청크 병렬(CPU 코어 수), 출력은 --workers 1 과 동일
+#   python -m bench.pipeline --scale 1000 --format arrow  # 중간 파일을 Arrow IPC 로(utils/dataset.py, pyarrow 필요)
+# -----------------------------------------------------------------------------
+import argparse, random, shutil, statistics, time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from config import RAW_PATH, EMBED_MODEL_NAME, CHUNK_TARGET_TOKENS, CHUNK_OVERLAP_TOKENS, DATA_FORMAT
+from bench.common import BENCH_DIR, RssWatcher, write_results, compare
+from utils.dataset import load_records, open_writer, count_records
+from bench.stub_encoder import HashingEncoder
+
+def replay_raw(src: Path, out: Path, scale: int, seed: int = 42, noise: float = 0.1) -> int:
+    """
+    기록된 raw 레코드를 scale 배로 재생.
+    - 0번째 사본은 원본 그대로(구조화 추출 경로 유지), 이후 사본은 본문 단어 일부 치환
+    - url 에 사본 번호를 붙여 서로 다른 페이지처럼 보이게 함
+    """
+    rng = random.Random(seed)
+    base = load_records(src)
+    vocab = [w for r in base for w in (r.get("content") or "").split()] or ["-"]
+    out.parent.mkdir(parents=True, exist_ok=True)
+    n = 0
+    with open_writer(out) as w:
+        for copy in range(scale):
+            for r in base:
+                rec = dict(r)
+                if copy:
+                    words = (rec.get("content") or "").split()
+                    for j in range(len(words)):
+                        if rng.random() < noise:
+                            words[j] = rng.choice(vocab)
+                    rec["content"] = " ".join(words)
+                    rec["url"] = f"{rec.get('url')}#copy{copy}"
+                w.write(rec)
+                n += 1
+    return n
+
+def measure(name: str, fn: Callable[[], object], in_path: Path, out_path: Path,
+            by_output: bool = False) -> Dict:
+    """
+    fn 실행 구간의 wall/RSS + 입력 기준 records/sec, MB/sec
+    (by_output=True 이면 산출물 기준 — crawl 처럼 입력이 없는 생산 단계용)
+    """
+    t0 = time.perf_counter()
+    with RssWatcher() as rss:
+        fn()
+    wall = time.perf_counter() - t0
+    counted = out_path if by_output else in_path
+    in_records = count_records(counted) if counted.exists() else 0
+    in_bytes = counted.stat().st_size if counted.exists() else 0
+    out_bytes = out_path.stat().st_size if out_path.exists() else 0
+    row = {
+        "stage": name,
+        "wall_s": round(wall, 3),
+        "records": in_records,
+        "records_per_s": round(in_records / wall, 1) if wall else None,
+        "in_mb": round(in_bytes / 2**20, 3),
+        "mb_per_s": round(in_bytes / 2**20 / wall, 3) if wall else None,
+        "out_mb": round(out_bytes / 2**20, 3),
+        "peak_rss_mb": rss.peak_mb,
+        "rss_delta_mb": rss.delta_mb,
+    }
+    print(f"  {name:6s} {row['wall_s']:>8.3f}s  {row['records_per_s'] or 0:>10.1f} rec/s  "
+          f"{row['mb_per_s'] or 0:>8.3f} MB/s  peakRSS={row['peak_rss_mb']}MB (+{row['rss_delta_mb']})")
+    return row
+
+def token_stats(chunks_path: Path, counter, batch_size: int) -> Dict:
+    """
+    청크 토큰 길이 분포 + 배치 패딩 효율(실제 토큰 / (배치 최대 길이 × 개수), 특수 토큰 2개 포함)
+    - fixed : SentenceTransformer.encode 처럼 글자 길이순 정렬 후 batch_size 개씩
+    - bucket: embed_faiss._length_batches (토큰 길이순, 배치당 EMBED_BATCH_TOKENS 상한)
+    """
+    from embedder.embed_faiss import _length_batches
+    chunks = load_records(chunks_path)
+    texts = [c.get("text") or "" for c in chunks]
+    if all("n_tokens" in c for c in chunks):
+        lengths = [c["n_tokens"] for c in chunks]
+    else:
+        lengths = counter.count(texts)
+
+    def efficiency(batches):
+        real = sum(lengths[i] + 2 for b in batches for i in b)
+        padded = sum((max(lengths[i] for i in b) + 2) * len(b) for b in batches)
+        return round(real / padded, 3) if padded else None
+
+    by_chars = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+    fixed = [by_chars[i:i + batch_size] for i in range(0, len(by_chars), batch_size)]
+    bucket = _length_batches(lengths)
+    xs = sorted(lengths)
+    mean = statistics.mean(xs)
+    row = {
+        "chunks": len(xs), "tokens_mean": round(mean, 1), "tokens_p95": xs[int(0.95 * (len(xs) - 1))],
+        "tokens_max": xs[-1], "tokens_cv": round(statistics.pstdev(xs) / mean, 3) if mean else None,
+        "pad_eff_fixed": efficiency(fixed), "batches_fixed": len(fixed),
+        "pad_eff_bucket": efficiency(bucket), "batches_bucket": len(bucket),
+    }
+    print(f"  tokens  mean={row['tokens_mean']} p95={row['tokens_p95']} max={row['tokens_max']} "
+          f"cv={row['tokens_cv']}  padding eff fixed={row['pad_eff_fixed']} ({len(fixed)} batches) "
+          f"bucket={row['pad_eff_bucket']} ({len(bucket)} batches)")
+    return row
+
+def main():
+    ap = argparse.ArgumentParser(description="run_all 단계별 처리량 벤치마크(오프라인)")
+    ap.add_argument("--raw", default=str(RAW_PATH), help="재생할 기록 raw.jsonl")
+    ap.add_argument("--scale", type=int, default=100, help="raw 레코드 복제 배수")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--target-chars", type=int, default=800)
+    ap.add_argument("--overlap", type=int, default=100)
+    ap.add_argument("--chunk-mode", choices=["chars", "tokens"], default="chars")
+    ap.add_argument("--target-tokens", type=int, default=CHUNK_TARGET_TOKENS)
+    ap.add_argument("--overlap-tokens", type=int, default=CHUNK_OVERLAP_TOKENS)
+    ap.add_argument("--tokenizer", default=None,
+                    help="토큰 길이/패딩 통계용 토크나이저(기본: 토큰 모드일 때 EMBED_MODEL_NAME)")
+    ap.add_argument("--dim", type=int, default=256, help="스텁 인코더 차원")
+    ap.add_argument("--real-encoder", action="store_true", help="스텁 대신 EMBED_MODEL_NAME 사용(느림)")
+    ap.add_argument("--skip-embed", action="store_true")
+    ap.add_argument("--workdir", default=str(BENCH_DIR / "work" / "pipeline"))
+    ap.add_argument("--no-dedup", action="store_true", help="중복 제거 단계 생략(이전 파이프라인과 비교용)")
+    ap.add_argument("--workers", type=int, default=1, help="정제/청크 프로세스 수 (1: 직렬, 0: CPU 코어 수)")
+    ap.add_argument("--format", choices=["jsonl", "arrow"], default=DATA_FORMAT,
+                    help="raw/clean/dedup/chunks/docs 중간 파일 형식 (기본: config.DATA_FORMAT)")
+    ap.add_argument("--keep", action="store_true", help="작업 폴더 삭제하지 않음")
+    ap.add_argument("--out", default=None)
+    ap.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    args = ap.parse_args()
+
+    from processor.cleaner import build_clean
+    from processor.chunker import build_chunks
+    from processor.dedup import build_dedup
+
+    work = Path(args.workdir)
+    ext = args.format
+    raw, clean, chunks = work / f"raw.{ext}", work / f"clean.{ext}", work / f"chunks.{ext}"
+    dedup, docs = work / f"dedup.{ext}", work / f"docs.{ext}"
+    index, texts, metas = work / "faiss_ip.index", work / "texts.jsonl", work / "metas.jsonl"
+    src = Path(args.raw)
+
+    print(f"=== pipeline bench: raw={src} x{args.scale}, format={args.format} ===")
+    stages: List[Dict] = []
+    stages.append(measure("crawl", lambda: replay_raw(src, raw, args.scale, args.seed), src, raw,
+                          by_output=True))
+    stages.append(measure("clean", lambda: build_clean(raw_path=raw, clean_path=clean, workers=args.workers), raw, clean))
+    if args.no_dedup:
+        text = None
+    else:
+        text = dedup
+        stages.append(measure("dedup", lambda: build_dedup(clean_path=clean, dedup_path=dedup,
+                                                           target_chars=args.target_chars,
+                                                           overlap=args.overlap), clean, dedup))
+    counter = None
+    if args.tokenizer or args.chunk_mode == "tokens":
+        from processor.tokens import TokenCounter
+        counter = TokenCounter(args.tokenizer or EMBED_MODEL_NAME)
+    stages.append(measure("chunk", lambda: build_chunks(args.target_chars, args.overlap,
+                                                        clean_path=clean, chunks_path=chunks,
+                                                        text_path=text, docs_path=docs, mode=args.chunk_mode,
+                                                        target_tokens=args.target_tokens,
+                                                        overlap_tokens=args.overlap_tokens,
+                                                        counter=counter, workers=args.workers), clean, chunks))
+    if counter is not None:
+        from embedder.embed_faiss import BATCH_SIZE
+        stages[-1]["tokens"] = token_stats(chunks, counter, BATCH_SIZE)
+    if not args.skip_embed:
+        from embedder.embed_faiss import build_faiss_index
+        if args.real_encoder:
+            from sentence_transformers import SentenceTransformer
+            from config import EMBED_MODEL_NAME
+            encoder = SentenceTransformer(EMBED_MODEL_NAME, device="cpu")
+        else:
+            encoder = HashingEncoder(dim=args.dim)
+        stages.append(measure("embed", lambda: build_faiss_index(
+            chunks_path=chunks, index_path=index, texts_path=texts, metas_path=metas, encoder=encoder,
+            docs_path=docs),
+            chunks, index))
+
+    payload = {"params": {"raw": str(src), "scale": args.scale, "target_chars": args.target_chars,
+                          "overlap": args.overlap, "dedup": not args.no_dedup, "workers": args.workers,
+                          "format": args.format,
+                          "chunk_mode": args.chunk_mode, "target_tokens": args.target_tokens,
+                          "overlap_tokens": args.overlap_tokens, "tokenizer": args.tokenizer, "encoder": "real" if args.real_encoder else "stub"},
+               "results": stages}
+    write_results("pipeline", payload, Path(args.out) if args.out else None)
+    if args.baseline:
+        compare(Path(args.baseline), payload)
+    if not args.keep:
+        shutil.rmtree(work, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# bench/query_encoder.py
+# -----------------------------------------------------------------------------
+# 역할: 질의 인코더 비교 — full(bge-m3) vs projected(작은 모델 + 사영, embedder/query_proj.py)
+#   - 골든 질의(bench/golden_queries.jsonl)를 두 인코더로 각각 인코딩
+#   - 지연: 질의 1건 인코딩(rag.search 와 같은 호출) 중앙값을 질의별로 재고 p50/p95 + 속도 향상 배수
+#   - recall@k: full 질의 벡터의 FAISS top-k 를 정답으로 보고, projected top-k 와 겹치는 비율 평균
+#   - cosine: projected 질의 벡터와 full 질의 벡터의 평균 코사인
+#   - 결과: OUTPUTS_DIR/bench/query_encoder-<commit>-<시각>.json
+#
+# 실행 (chatbot/ 에서):
+#   python -m embedder.query_proj               # 사영 학습(최초 1회/인덱스 재생성 후)
+#   python -m bench.query_encoder --k 1 5 10
+#   python -m bench.query_encoder --stub --train --index /tmp/x/faiss_ip.index …   # 모델 없이 흐름만 확인
+# -----------------------------------------------------------------------------
+import argparse, statistics, time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from config import FAISS_INDEX, FAISS_TEXTS, FAISS_METAS, EMBED_MODEL_NAME, QUERY_SMALL_MODEL_NAME
+from bench.common import percentiles, write_results, compare
+from bench.golden import FIXTURE, load_fixture
+
+def time_encode(encoder, queries: List[str], repeat: int):
+    """질의별 (중앙값 지연 초, 정규화 벡터) — rag.search._encode_query 와 같은 단건 호출"""
+    lat, vecs = [], []
+    for q in queries:
+        xs = []
+        for _ in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            v = encoder.encode([q], convert_to_numpy=True, normalize_embeddings=True)
+            xs.append(time.perf_counter() - t0)
+        lat.append(statistics.median(xs))
+        vecs.append(np.asarray(v, dtype=np.float32)[0])
+    return lat, np.vstack(vecs)
+
+def recall_at_k(index, full_vecs: np.ndarray, proj_vecs: np.ndarray, ks: List[int]) -> Dict[str, float]:
+    """full top-k 대비 projected top-k 겹침 비율(질의 평균)"""
+    kmax = min(max(ks), index.ntotal)
+    _, ref = index.search(full_vecs, kmax)
+    _, got = index.search(proj_vecs, kmax)
+    out = {}
+    for k in ks:
+        k = min(k, kmax)
+        out[f"recall@{k}"] = round(float(np.mean([len(set(r[:k]) & set(g[:k])) / k
+                                                  for r, g in zip(ref, got)])), 4)
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description="질의 인코더 비교: full(bge-m3) vs projected(작은 모델 + 사영)")
+    ap.add_argument("--fixture", default=str(FIXTURE))
+    ap.add_argument("--index", default=str(FAISS_INDEX))
+    ap.add_argument("--texts", default=str(FAISS_TEXTS))
+    ap.add_argument("--metas", default=str(FAISS_METAS))
+    ap.add_argument("--k", type=int, nargs="+", default=[1, 5, 10])
+    ap.add_argument("--repeat", type=int, default=5, help="질의당 인코딩 반복 횟수(중앙값 사용)")
+    ap.add_argument("--train", action="store_true", help="측정 전에 사영을 (다시) 학습")
+    ap.add_argument("--stub", action="store_true", help="모델 대신 스텁 인코더(흐름 확인용, 수치는 의미 없음)")
+    ap.add_argument("--out", default=None, help="결과 JSON 경로(기본: outputs/bench/…)")
+    ap.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    args = ap.parse_args()
+
+    import faiss
+    from embedder.query_proj import train_projection, load_projected_encoder
+
+    index = faiss.read_index(args.index)
+    if args.stub:
+        from bench.stub_encoder import HashingEncoder
+        full, small = HashingEncoder(dim=index.d), HashingEncoder(dim=max(16, index.d // 2), seed=1)
+    else:
+        from sentence_transformers import SentenceTransformer
+        full, small = SentenceTransformer(EMBED_MODEL_NAME, device="cpu"), None
+
+    train = None
+    if args.train:
+        train = train_projection(args.index, args.texts, args.metas, small=small,
+                                 teacher=full, small_name=QUERY_SMALL_MODEL_NAME)
+    proj = load_projected_encoder(args.index, base=small)
+
+    queries = [r["query"] for r in load_fixture(Path(args.fixture))]
+    for enc in (full, proj):                      # 워밍업(첫 호출 그래프/스레드 초기화 제외)
+        enc.encode([queries[0]], convert_to_numpy=True, normalize_embeddings=True)
+    full_lat, full_vecs = time_encode(full, queries, args.repeat)
+    proj_lat, proj_vecs = time_encode(proj, queries, args.repeat)
+
+    lat = {"full": percentiles(full_lat, (50, 95)), "projected": percentiles(proj_lat, (50, 95))}
+    speedup = round(lat["full"]["p50"] / lat["projected"]["p50"], 2) if lat["projected"]["p50"] else None
+    cos = (full_vecs * proj_vecs).sum(axis=1)
+    res = {"queries": len(queries), "encode_ms": lat, "speedup_p50": speedup,
+           "cosine_mean": round(float(cos.mean()), 4), "cosine_min": round(float(cos.min()), 4),
+           **recall_at_k(index, full_vecs, proj_vecs, args.k)}
+
+    print(f"  full      p50={lat['full']['p50']}ms p95={lat['full']['p95']}ms")
+    print(f"  projected p50={lat['projected']['p50']}ms p95={lat['projected']['p95']}ms  (x{speedup})")
+    print("  " + "  ".join(f"{k}={v}" for k, v in res.items() if k.startswith("recall@"))
+          + f"  cosine={res['cosine_mean']}")
+
+    payload = {"params": {"k": args.k, "repeat": args.repeat, "stub": args.stub,
+                          "small_model": proj.name, "index": args.index},
+               "results": res, "train": train}
+    write_results("query_encoder", payload, Path(args.out) if args.out else None)
+    if args.baseline:
+        compare(Path(args.baseline), payload)
+
+if __name__ == "__main__":
+    main()
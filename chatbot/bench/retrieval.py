@@ -0,0 +1,202 @@
+# bench/retrieval.py
+# -----------------------------------------------------------------------------
+# 역할: 코퍼스 규모별 검색 벤치마크 (10k ~ 1M 청크)
+#   1) 현재 chunks.jsonl 을 변형(단어 치환/순서 흔들기)해 N개짜리 합성 코퍼스 생성
+#   2) build_faiss_index(…, encoder=스텁) 로 인덱스 빌드 → 빌드 시간/인덱스 크기/RSS
+#   3) 콜드 로드 시간 측정 (rag.search.load_index)
+#   4) 동시성 레벨별 search()/rag_answer() QPS, p50/p95/p99 지연
+#   5) 결과를 OUTPUTS_DIR/bench/retrieval-<commit>-<시각>.json 으로 저장 (커밋 간 비교)
+#
+# 실행 (chatbot/ 에서):
+#   python -m bench.retrieval --sizes 10000 100000 1000000 --concurrency 1 4 8
+#   python -m bench.retrieval --sizes 10000 --baseline outputs/bench/retrieval-abc123-….json
+#
+# 참고:
+#   - 스텁 인코더(bench.stub_encoder.HashingEncoder)를 쓰므로 모델 다운로드 없이 결정적으로 재현됨.
+#     실제 bge-m3 인코딩 비용은 --real-encoder 로 별도 측정.
+#   - 반복 질의가 의미 캐시(rag/semantic_cache.py)에 적중하면 전체 경로를 재지 못하므로 기본은 끔.
+#     --semcache 로 켜면 rag_answer 에 캐시 적중률/오탐 통계(semcache)를 함께 기록
+# -----------------------------------------------------------------------------
+import argparse, random, shutil, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from config import CHUNKS_PATH
+from bench.common import BENCH_DIR, rss_mb, peak_rss_mb, percentiles, file_size, write_results, compare
+from bench.stub_encoder import HashingEncoder
+from utils.jsonl import JsonlWriter
+from utils.dataset import load_records
+
+# 의도 라우팅(A~E)을 골고루 타도록 섞은 대표 질의
+SEED_QUERIES = [
+    "회사 소개 해줘", "본사 주소 알려줘", "서울지사 위치", "대표이사 누구야",
+    "연혁 최신 알려줘", "2015년 연혁", "솔루션 목록", "비즈니스 요약",
+    "클라우드 사업은 어떤 일을 해?", "전자문서 솔루션 특징", "유지보수 서비스", "데이터 분석 플랫폼",
+]
+
+def _load_base(path: Path) -> List[Dict]:
+    return load_records(path)
+
+def _is_sentence_chunk(r: Dict) -> bool:
+    """본문을 문장 단위로 자른 청크인지 (start/end 위치가 있음). 예전 형식은 meta 에 원문(content)이 있으면 문장 청크"""
+    return "start" in r or "content" in (r.get("meta") or {})
+
+def synthesize_chunks(base: List[Dict], n: int, out_path: Path, seed: int = 42, noise: float = 0.2):
+    """
+    base 로 n개 합성 청크 생성.
+    - 구조화 행(info/연혁/솔루션·비즈니스 이름/요약)은 id·필드 그대로 한 번씩만 기록
+      → id 로 찾는 직답(info_map, _by_id)과 B~D 라우팅이 원본 코퍼스와 같게 동작
+    - 나머지는 문장 청크를 순환하며 채움: 단어의 noise 비율을 코퍼스 어휘에서 무작위 치환 + 인접 단어 swap
+      → 중복 없는 근사 분포, id 는 "원본id#번호"
+    - 청크 필드(doc/section/name/type/year …)는 그대로 복사 (문자 위치 start/end 는 합성 본문과 맞지 않아 제외)
+      예전 형식({"meta": 원본})이면 content(원문 전체)를 뺀 meta 만 유지
+    """
+    rng = random.Random(seed)
+    vocab = [w for r in base for w in (r.get("text") or "").split()]
+    structured = [r for r in base if not _is_sentence_chunk(r)]
+    sentences = [r for r in base if _is_sentence_chunk(r)] or base
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with JsonlWriter(out_path) as w:
+        for r in structured[:n]:
+            w.write(r)
+        for i in range(n - min(n, len(structured))):
+            b = sentences[i % len(sentences)]
+            words = (b.get("text") or "").split() or [rng.choice(vocab)]
+            for j in range(len(words)):
+                r = rng.random()
+                if r < noise:
+                    words[j] = rng.choice(vocab)
+                elif r < noise * 1.5 and j + 1 < len(words):
+                    words[j], words[j + 1] = words[j + 1], words[j]
+            if "meta" in b:
+                extra = {"meta": {k: v for k, v in (b.get("meta") or {}).items() if k != "content"}}
+            else:
+                extra = {k: v for k, v in b.items() if k not in ("id", "text", "start", "end")}
+            w.write({"id": f"{b.get('id')}#{i}", "text": " ".join(words), **extra})
+
+def make_queries(base: List[Dict], n: int, seed: int = 7) -> List[str]:
+    """대표 질의 + 청크 본문에서 잘라낸 3~6 단어 구간(E 경로용)"""
+    rng = random.Random(seed)
+    qs = list(SEED_QUERIES)
+    texts = [r["text"].split() for r in base if len((r.get("text") or "").split()) >= 6]
+    while len(qs) < n and texts:
+        words = rng.choice(texts)
+        k = rng.randint(3, 6)
+        s = rng.randint(0, len(words) - k)
+        qs.append(" ".join(words[s:s + k]))
+    return qs[:n]
+
+def run_load(fn: Callable[[str], object], queries: List[str], concurrency: int) -> Dict:
+    """queries 를 concurrency 개 스레드로 소화하며 지연/처리량 측정"""
+    lat: List[float] = []
+    errors = 0
+
+    def one(q):
+        t0 = time.perf_counter()
+        fn(q)
+        return time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        for fut in [ex.submit(one, q) for q in queries]:
+            try:
+                lat.append(fut.result())
+            except Exception as e:
+                errors += 1
+                if errors == 1:
+                    print(f"[ERROR] 질의 실패: {e}")
+    wall = time.perf_counter() - t0
+    return {"concurrency": concurrency, "n": len(lat), "errors": errors,
+            "qps": round(len(lat) / wall, 2) if wall else None, **percentiles(lat)}
+
+def bench_size(n: int, args, encoder, base: List[Dict]) -> Dict:
+    # 무거운 의존성(faiss 등)은 실제 측정 시점에 로드
+    from embedder.embed_faiss import build_faiss_index
+    from rag import search as S
+    from rag.semantic_cache import SemanticCache
+
+    work = Path(args.workdir) / f"retrieval-{n}"
+    chunks = work / "chunks.jsonl"
+    index, texts, metas = work / "faiss_ip.index", work / "texts.jsonl", work / "metas.jsonl"
+    res: Dict = {"size": n}
+
+    if not (args.reuse and index.exists()):
+        t0 = time.perf_counter()
+        synthesize_chunks(base, n, chunks, seed=args.seed)
+        res["synth_s"] = round(time.perf_counter() - t0, 3)
+
+        t0 = time.perf_counter()
+        build_faiss_index(chunks_path=chunks, index_path=index, texts_path=texts,
+                          metas_path=metas, encoder=encoder)
+        res["build_s"] = round(time.perf_counter() - t0, 3)
+        res["build_peak_rss_mb"] = peak_rss_mb()
+
+    res["index_bytes"] = file_size(index)
+    res["texts_metas_bytes"] = file_size(texts, metas)
+
+    # 콜드 로드
+    S.use_index(index, texts, metas)
+    S.use_encoder(encoder)
+    S.use_semantic_cache(SemanticCache() if args.semcache else None)
+    t0 = time.perf_counter()
+    S.load_index()
+    res["load_s"] = round(time.perf_counter() - t0, 3)
+    res["rss_after_load_mb"] = rss_mb()
+
+    queries = make_queries(base, args.queries, seed=args.seed)
+    S.search(queries[0], top_k=args.top_k)  # 워밍업
+    res["search"] = [run_load(lambda q: S.search(q, top_k=args.top_k), queries, c) for c in args.concurrency]
+    res["rag_answer"] = [run_load(lambda q: S.rag_answer(q, top_k=args.top_k), queries, c) for c in args.concurrency]
+    if args.semcache:
+        res["semcache"] = S.semantic_cache_stats()
+    res["peak_rss_mb"] = peak_rss_mb()
+
+    if not args.keep:
+        shutil.rmtree(work, ignore_errors=True)
+    return res
+
+def main():
+    ap = argparse.ArgumentParser(description="코퍼스 규모별 검색 벤치마크")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    ap.add_argument("--queries", type=int, default=200, help="동시성 레벨별 질의 수")
+    ap.add_argument("--top-k", type=int, default=8)
+    ap.add_argument("--dim", type=int, default=256, help="스텁 인코더 차원")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--real-encoder", action="store_true", help="스텁 대신 EMBED_MODEL_NAME 사용(느림)")
+    ap.add_argument("--workdir", default=str(BENCH_DIR / "work"))
+    ap.add_argument("--semcache", action="store_true", help="rag_answer 측정 시 의미 캐시 사용")
+    ap.add_argument("--reuse", action="store_true", help="기존 작업 폴더의 인덱스 재사용")
+    ap.add_argument("--keep", action="store_true", help="합성 코퍼스/인덱스 삭제하지 않음")
+    ap.add_argument("--out", default=None, help="결과 JSON 경로(기본: outputs/bench/…)")
+    ap.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    args = ap.parse_args()
+
+    if args.real_encoder:
+        from sentence_transformers import SentenceTransformer
+        from config import EMBED_MODEL_NAME
+        encoder = SentenceTransformer(EMBED_MODEL_NAME, device="cpu")
+    else:
+        encoder = HashingEncoder(dim=args.dim)
+
+    base = _load_base(CHUNKS_PATH)
+    results = []
+    for n in args.sizes:
+        print(f"\n=== size={n:,} ===")
+        r = bench_size(n, args, encoder, base)
+        for kind in ("search", "rag_answer"):
+            for row in r[kind]:
+                print(f"  {kind:10s} c={row['concurrency']:<3d} qps={row['qps']:<8} "
+                      f"p50={row['p50']}ms p95={row['p95']}ms p99={row['p99']}ms")
+        results.append(r)
+
+    payload = {"params": {"encoder": type(encoder).__name__, "dim": args.dim, "top_k": args.top_k,
+                          "queries": args.queries, "seed": args.seed},
+               "results": results}
+    write_results("retrieval", payload, Path(args.out) if args.out else None)
+    if args.baseline:
+        compare(Path(args.baseline), payload)
+
+if __name__ == "__main__":
+    main()
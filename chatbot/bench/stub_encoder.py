@@ -0,0 +1,42 @@
+# bench/stub_encoder.py
+# -----------------------------------------------------------------------------
+# 역할: 벤치마크/오프라인 평가용 결정적(deterministic) 스텁 인코더
+#   - SentenceTransformer.encode()와 같은 시그니처 → build_faiss_index / rag.search 에 그대로 주입
+#   - 문자 bigram 을 해시해 dim 차원에 부호 있는 가중치로 누적 → L2 정규화
+#     (모델 없이도 "비슷한 문자열 → 비슷한 벡터"가 되어 검색 결과가 의미 있게 나옴)
+#   - numpy 벡터 연산만 사용 → 수십만~백만 청크도 CPU에서 빠르게 인코딩
+# -----------------------------------------------------------------------------
+import numpy as np
+
+class HashingEncoder:
+    def __init__(self, dim: int = 256, seed: int = 0):
+        self.dim = dim
+        self.seed = np.uint32(seed)
+
+    def _vec(self, text: str) -> np.ndarray:
+        cps = np.frombuffer((text or " ").encode("utf-32-le"), dtype=np.uint32)
+        if cps.size < 2:
+            cps = np.concatenate([cps, np.zeros(2 - cps.size, dtype=np.uint32)])
+        with np.errstate(over="ignore"):
+            h = (cps[:-1] * np.uint32(0x9E3779B1)) ^ (cps[1:] * np.uint32(0x85EBCA77)) ^ self.seed
+            h ^= h >> np.uint32(15)
+            h *= np.uint32(0x2C1B3C6D)
+            h ^= h >> np.uint32(12)
+        sign = np.where(h & np.uint32(1), 1.0, -1.0).astype(np.float32)
+        return np.bincount((h >> np.uint32(1)) % self.dim, weights=sign, minlength=self.dim).astype(np.float32)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=False,
+               convert_to_numpy=True, normalize_embeddings=False, **_):
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+        out = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        for i, s in enumerate(sentences):
+            out[i] = self._vec(s)
+        if normalize_embeddings:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            out /= np.maximum(norms, 1e-12)
+        return out[0] if single else out
@@ -10,10 +10,27 @@ SFT_DIR = BASE_DIR / "sft"
 MODELS_DIR = BASE_DIR / "models"
 OUTPUTS_DIR = BASE_DIR / "outputs"
 
-# raw/clean/chunk jsonl 경로
-RAW_PATH = DATA_DIR / "raw.jsonl"
-CLEAN_PATH = DATA_DIR / "clean.jsonl"
-CHUNKS_PATH = DATA_DIR / "chunks.jsonl"
+# 단계 간 중간 파일 형식(utils/dataset.py, 확장자로 구분) — raw/clean/dedup/chunks/docs
+#   jsonl: 줄 단위 JSON (사람이 읽고 diff 하기 쉬움 → 디버깅용, 기본)
+#   arrow: Arrow IPC(열 단위 이진, 메모리 맵으로 읽기, 배치 단위 쓰기) — pyarrow 필요, pandas.read_feather 로도 열림
+DATA_FORMAT = "jsonl"
+DATA_EXT = "arrow" if DATA_FORMAT == "arrow" else "jsonl"
+
+# raw/clean/chunk 경로
+RAW_PATH = DATA_DIR / f"raw.{DATA_EXT}"
+CLEAN_PATH = DATA_DIR / f"clean.{DATA_EXT}"
+CHUNKS_PATH = DATA_DIR / f"chunks.{DATA_EXT}"
+# 문서 테이블(청크의 원본 레코드, 문서당 1줄) — chunks 는 doc id + 문자 위치로 참조
+DOCS_PATH = DATA_DIR / f"docs.{DATA_EXT}"
+# 근접 중복 제거 결과(clean → dedup → 문장 청크) — processor/dedup.py
+DEDUP_PATH = DATA_DIR / f"dedup.{DATA_EXT}"
+
+# URL별 크롤 상태(ETag/Last-Modified/본문 해시/추출 결과) — 조건부 GET 캐시
+CRAWL_STATE_PATH = DATA_DIR / "crawl_state.json"
+# 크롤 응답 기록/재생 아카이브(crawler/archive.py)
+ARCHIVE_DIR = DATA_DIR / "archive"
+# 파이프라인 단계별 지문(입력/코드/설정) 기록 — pipeline/dag.py
+PIPELINE_STATE_PATH = DATA_DIR / "pipeline_state.json"
 
 # FAISS 인덱스/메타/텍스트
 FAISS_INDEX = INDEX_DIR / "faiss_ip.index"
@@ -34,3 +51,100 @@ EMBED_MODEL_NAME = "BAAI/bge-m3"
 
 
 # 윈도우/리눅스 모두 호환 경로로 관리!
+
+# 크롤러 엔진(crawler/engine.py) — asyncio + 커넥션 풀
+CRAWL_CONCURRENCY = 8        # 전체 동시 요청 수
+CRAWL_PER_HOST = 2           # 호스트별 동시 요청 수 (서버 부하 배려)
+CRAWL_DELAY = 0.25           # 같은 호스트 요청 사이 최소 간격(초)
+CRAWL_TIMEOUT = 10           # 요청 타임아웃(초)
+CRAWL_RETRIES = 3            # 네트워크 오류/429/5xx 재시도 횟수
+CRAWL_BACKOFF = 0.5          # 재시도 대기 기본값(초) → 0.5, 1, 2 … 지수 증가
+CRAWL_PARSE_PROCESSES = 2    # HTML 파싱 전용 프로세스 수 (0이면 스레드에서 파싱)
+CRAWL_MODE = "live"          # live: 실제 요청 / record: 요청 + ARCHIVE_DIR에 기록 / replay: 아카이브에서 재생(오프라인)
+HTML_PARSER = "html.parser"  # html.parser(기본) / lxml(빠름, 설치 필요) / html5lib — crawler/html_parser.py
+HTML_PARTIAL_PARSE = True    # extractor별로 필요한 하위 트리만 파싱(SoupStrainer)
+
+# 링크 탐색형 크롤(crawler/frontier.py) — 시드에서 같은 호스트 링크를 따라 수집
+CRAWL_SEEDS = [BASE_URL]      # 여러 사이트를 넣으면 각 호스트 안에서만 탐색
+CRAWL_USE_SITEMAP = True      # robots.txt/sitemap.xml 의 URL도 시드로 사용
+CRAWL_MAX_PAGES = 300         # 한 번의 크롤에서 요청할 최대 페이지 수(예산)
+CRAWL_MAX_DEPTH = 3           # 시드로부터 최대 링크 깊이
+CRAWL_FRONTIER_MAX = 10000    # 대기 큐 최대 크기(넘치면 우선순위 낮은 URL부터 버림)
+CRAWL_SEEN_CAPACITY = 100000  # 방문 URL 집합(Bloom filter) 설계 용량
+CRAWL_SEEN_FP_RATE = 0.001    # Bloom filter 오탐률 (오탐 = 해당 URL을 건너뜀)
+
+# 근접 중복 제거(processor/dedup.py)
+DEDUP_ENABLED = True          # run_all 에서 clean 과 chunk 사이에 중복 제거 단계 실행
+DEDUP_JACCARD = 0.8           # 레코드 단위 근접 중복 기준(MinHash 추정 Jaccard)
+DEDUP_SHINGLE = 4             # shingle 크기(단어)
+DEDUP_MIN_SPAN = 8            # 이 길이(단어) 이상인 블록만 다른 레코드 안에 통째로 들어 있으면 잘라냄
+DEDUP_NUM_PERM = 64           # MinHash 순열 수
+DEDUP_BANDS = 16              # LSH 밴드 수 (밴드당 행 = NUM_PERM / BANDS)
+
+# 스트리밍 파이프라인 (pipeline/stream.py, main.py --stream)
+PIPELINE_STREAMING = False    # True 면 run_all 이 크롤→정제→청크→임베딩을 동시에 흘려 처리
+STREAM_QUEUE_SIZE = 64        # 단계 사이 큐 최대 길이(가득 차면 상류 단계가 대기 = backpressure)
+STREAM_EMBED_BATCH = 32       # 임베딩 단계가 한 번에 인코딩하는 청크 수
+
+# 증분 파이프라인 (pipeline/dag.py)
+CHUNK_TARGET_CHARS = 800      # 문장 기반 청크 목표 길이(자)
+CHUNK_OVERLAP = 100           # 청크 간 겹침(자)
+PIPELINE_CRAWL_MAX_AGE = 24 * 3600   # 마지막 크롤 후 이 시간(초)이 지나면 다시 크롤 (None: 자동 재크롤 안 함)
+
+# 토큰 기준 청크(processor/tokens.py) — 임베딩 모델(EMBED_MODEL_NAME) fast tokenizer로 문장 길이 측정
+CHUNK_MODE = "chars"          # chars: 글자 수 기준(CHUNK_TARGET_CHARS) / tokens: 토큰 수 기준 + 청크에 n_tokens 기록
+CHUNK_TARGET_TOKENS = 400     # 토큰 모드 청크 목표 길이(토큰, 한국어 800자 ≈ 400토큰 안팎)
+CHUNK_OVERLAP_TOKENS = 50     # 토큰 모드 청크 간 겹침(토큰 경계에서 자름)
+EMBED_BATCH_TOKENS = 8192     # 길이 버킷 배치: 배치당 (최대 길이 × 청크 수) 토큰 상한 (n_tokens 있는 청크만)
+
+# 정제/청크 병렬 처리(processor/shards.py) — 입력 JSONL 을 바이트 구간으로 나눠 프로세스 풀에서 처리, 출력은 직렬과 동일
+PREPROCESS_WORKERS = 1        # 1: 직렬(기존) / N: 프로세스 N개 / 0: CPU 코어 수
+PREPROCESS_SHARD_BYTES = 1 << 20   # 샤드 최소 크기(바이트). 입력이 이보다 작으면 워커 수와 관계없이 직렬
+
+# JSONL 입출력(utils/jsonl.py) — orjson 있으면 사용, 없으면 표준 json (출력 바이트 동일)
+JSONL_BACKEND = "auto"        # auto: orjson 있으면 사용 / orjson / json
+JSONL_BUFFER_BYTES = 1 << 20  # JsonlWriter 가 모아서 한 번에 쓰는 버퍼 크기(바이트)
+ARROW_BATCH_ROWS = 8192       # DATA_FORMAT="arrow" 쓰기 배치 크기(행) — 읽기/병렬 샤드도 이 배치 단위
+
+# 마감 시간 기반 단계 축소(rag/search.py answer_with_deadline, /rag/ask 의 deadline_ms)
+#   예산이 밀집 검색+MMR 추정 시간보다 적으면: 캐시된 답변 → 구조화 직답 → (예산이 되면) MMR 없는 밀집 검색 → 어휘 매칭
+RAG_DEFAULT_DEADLINE_MS = 0   # 요청에 deadline_ms 가 없을 때 예산(ms). 0: 마감 없음(기존 동작)
+RAG_COST_EWMA = 0.2           # 단계 비용 추정(지수 이동 평균) 가중치 — 클수록 최근 부하에 빨리 반응
+RAG_COST_INIT = {             # 관측 전 단계 비용 초기 추정(초)
+    "encode": 0.1, "faiss_search": 0.01, "mmr": 0.3, "model_load": 15.0,
+    "first_token": 3.0,       # 생성 시작 → 첫 토큰(프롬프트 prefill, /rag/ask/stream 의 생성 여부 판단)
+}
+RAG_ANSWER_CACHE_SIZE = 1024  # 전체 경로(밀집+MMR) 답변 LRU 캐시 크기 — 인덱스 버전이 바뀌면 무효
+
+# 의미 기반 답변 캐시(rag/semantic_cache.py) — 질의 벡터가 비슷하면 이전 답변 재사용(FAISS 검색/MMR/조립 생략)
+RAG_SEMCACHE_ENABLED = True   # False: 사용 안 함
+RAG_SEMCACHE_SIZE = 1024      # 보관 항목 수(LRU)
+RAG_SEMCACHE_THRESHOLD = 0.95 # 코사인 유사도 임계값 — 낮출수록 적중↑, 다른 질문에 같은 답(오탐)↑
+RAG_SEMCACHE_AUDIT_RATE = 0.05   # 적중 중 실제 검색과 비교(백그라운드)해 오탐을 세는 비율(오탐 항목은 제거)
+
+# 질의 인코더(rag/search.py) — 문서(인덱스)는 항상 EMBED_MODEL_NAME 벡터, 질의 쪽만 선택
+#   full     : EMBED_MODEL_NAME(bge-m3)으로 질의 인코딩 (기본)
+#   projected: 작은 다국어 모델 + 선형 사영으로 bge-m3 공간에 맞춘 벡터 — embedder/query_proj.py 로 학습,
+#              인덱스 옆 <FAISS_INDEX>.qproj.npz 에 저장(없거나 인덱스 모델과 다르면 full 로 대체)
+QUERY_ENCODER = "full"
+QUERY_SMALL_MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+QUERY_PROJ_RIDGE = 1e-2       # 사영 학습 릿지(L2) 계수 — 학습 쌍이 적을 때 과적합 방지
+QUERY_PROJ_SYNTH_PER_CHUNK = 3   # 청크당 합성 질의 수 (학습 쌍 = 청크 + 합성 질의)
+QUERY_PROJ_MAX_CHUNKS = 20000    # 학습에 쓸 최대 청크 수(넘으면 무작위 표본)
+
+# 생성기(Ollama) 상태 감시(utils/health.py) — 질문마다 HTTP 확인 대신 백그라운드 점검 + 서킷 브레이커
+OLLAMA_URL = "http://localhost:11434"
+OLLAMA_HEALTH_INTERVAL = 5.0  # 정상(closed)일 때 점검 주기(초)
+OLLAMA_HEALTH_TIMEOUT = 2.0   # 점검 요청 타임아웃(초) — 요청 스레드는 기다리지 않음
+OLLAMA_BREAKER_FAILURES = 2   # 연속 실패 이 횟수면 open(생성 안 함)
+OLLAMA_BREAKER_RESET = 30.0   # open 후 이 시간(초)이 지나면 half_open 으로 한 번 시험 점검
+
+# 생성 경로(rag/generate.py) — E) 질의의 검색 결과를 토큰 예산 안으로 포장(rag/context.py)해 Ollama 로 생성
+#   CPU 에서는 prefill 시간이 프롬프트 길이에 비례 → 프롬프트 토큰 상한을 두어 첫 토큰까지 시간을 일정하게
+GEN_OLLAMA_MODEL = "qwen2.5:1.5b-instruct"   # Ollama 모델 태그 (GEN_MODEL_ID 와 같은 모델)
+GEN_PROMPT_BUDGET = 1024      # 프롬프트(시스템 + 자료 + 질문) 토큰 상한 — GEN_MODEL_ID 토크나이저 기준
+GEN_TEMPLATE_TOKENS = 16      # 채팅 템플릿 특수 토큰 여유분(예산에서 미리 뺌)
+GEN_CONTEXT_DEDUP = 0.7       # 이미 넣은 청크와 글자 bigram Jaccard 가 이 값 이상이면 중복으로 버림
+GEN_MIN_CHUNK_TOKENS = 32     # 남은 예산이 이보다 적으면 청크를 잘라 넣지 않고 멈춤
+GEN_PACK_CACHE_SIZE = 256     # 포장된 프롬프트 LRU 캐시 (인덱스 버전 + 질의 + 청크 목록 기준)
+GEN_TIMEOUT = 120             # 생성 요청 타임아웃(초)
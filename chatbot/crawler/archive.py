@@ -0,0 +1,78 @@
+"""
+크롤 응답 기록/재생 아카이브 (WARC 유사, 내용 주소 방식).
+
+구성:
+- ARCHIVE_DIR/
+    index.jsonl              : {"url","status","headers","sha1","size","fetched_at"} — 추가 전용(append-only)
+    bodies/ab/abcdef….gz      : 본문(gzip). 파일명 = 본문 sha1 → 같은 본문은 한 번만 저장
+- CrawlArchive.record(url, status, headers, body): 응답 1건 기록
+- CrawlArchive.lookup(url): 마지막으로 기록된 (status, headers, body) 또는 None
+- CrawlArchive.entries(): URL별 마지막 기록 항목(벤치마크 등에서 페이지 목록 조회)
+
+용도 (config.CRAWL_MODE):
+- "record": 실제로 요청하면서 아카이브에 기록
+- "replay": 네트워크 없이 아카이브에서 응답 재생 → 파이프라인 재구축/프로파일링/회귀 테스트를
+            디스크 속도로 오프라인 실행, 추출 로직을 바꾼 뒤 재수집 없이 다시 처리(main.py --full)
+"""
+import gzip, hashlib, os, threading, time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from config import ARCHIVE_DIR
+from utils.jsonl import read_jsonl, write_jsonl
+
+class CrawlArchive:
+    def __init__(self, root: Path = ARCHIVE_DIR):
+        self.root = Path(root)
+        self.index_path = self.root / "index.jsonl"
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, Dict]] = None
+
+    def _load_index(self) -> Dict[str, Dict]:
+        if self._index is None:
+            entries = {}
+            if self.index_path.exists():
+                for e in read_jsonl(self.index_path):
+                    entries[e["url"]] = e   # 같은 URL은 마지막 기록이 우선
+            self._index = entries
+        return self._index
+
+    def _body_path(self, sha1: str) -> Path:
+        return self.root / "bodies" / sha1[:2] / f"{sha1}.gz"
+
+    def __len__(self):
+        return len(self._load_index())
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return url in self._load_index()
+
+    def entries(self) -> Dict[str, Dict]:
+        """{url: 마지막 기록 항목} (본문은 lookup으로 읽음)"""
+        with self._lock:
+            return dict(self._load_index())
+
+    def record(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> str:
+        sha1 = hashlib.sha1(body).hexdigest()
+        entry = {"url": url, "status": status, "headers": dict(headers), "sha1": sha1,
+                 "size": len(body), "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        with self._lock:
+            path = self._body_path(sha1)
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(".tmp")
+                # mtime=0 → 같은 본문이면 압축 파일도 바이트 단위로 같음
+                tmp.write_bytes(gzip.compress(body, compresslevel=6, mtime=0))
+                os.replace(tmp, path)
+            self.root.mkdir(parents=True, exist_ok=True)
+            write_jsonl(self.index_path, [entry], mode="a")
+            self._load_index()[url] = entry
+        return sha1
+
+    def lookup(self, url: str) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        with self._lock:
+            entry = self._load_index().get(url)
+        if entry is None:
+            return None
+        body = gzip.decompress(self._body_path(entry["sha1"]).read_bytes())
+        return entry["status"], entry.get("headers", {}), body
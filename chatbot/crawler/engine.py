@@ -0,0 +1,244 @@
+"""
+asyncio 기반 크롤러 엔진.
+
+구성:
+- CrawlEngine: 커넥션 풀(httpx.AsyncClient) 하나로 여러 페이지를 동시에 수집
+  - 전체 동시성(CRAWL_CONCURRENCY) + 호스트별 동시성(CRAWL_PER_HOST) 제한
+  - 같은 호스트 요청 사이 최소 간격(CRAWL_DELAY) → 서버 친화(politeness)
+  - 네트워크 오류/429/5xx 는 지수 백오프로 재시도(Retry-After 헤더 우선)
+  - HTML 파싱(BeautifulSoup)은 워커 풀(프로세스)에서 실행 → 파싱 CPU 시간이 I/O를 막지 않음
+  - run_conditional(): 저장된 ETag/Last-Modified로 조건부 GET → 304/본문 해시 동일 시 파싱 생략
+  - mode(CRAWL_MODE): live / record(응답을 crawler/archive.py 아카이브에 기록, 아카이브에 없는 URL 은 조건부 GET 생략) /
+    replay(네트워크 없이 아카이브에서 응답 재생, 딜레이/재시도 없음 — 없는 URL은 404)
+- run_jobs(jobs): 동기 코드(crawl_* 함수)에서 호출하는 진입점
+- run_conditional_jobs(jobs, state): 조건부 GET 버전 (crawler/state.py 의 CrawlState 사용)
+
+작업(job) 형식:
+- (url, extractor) 튜플. extractor(html_bytes, url) -> List[dict] 는 모듈 최상위 함수여야 함
+  (프로세스 풀로 넘기려면 pickle 가능해야 하므로 lambda/내부 함수 불가)
+"""
+import asyncio, hashlib, random, time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from config import (
+    CRAWL_CONCURRENCY, CRAWL_PER_HOST, CRAWL_DELAY, CRAWL_TIMEOUT,
+    CRAWL_RETRIES, CRAWL_BACKOFF, CRAWL_PARSE_PROCESSES, CRAWL_MODE,
+)
+from crawler.archive import CrawlArchive
+
+CRAWL_MODES = ("live", "record", "replay")
+
+# 재시도 대상 상태코드 (일시적 오류)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+Extractor = Callable[[bytes, str], List[Dict]]
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    content: bytes = b""
+    elapsed: float = 0.0
+
+@dataclass
+class PageResult:
+    """
+    조건부 수집 결과
+    - changed=False 면 records 는 prev["records"] 재사용 (prev 에 없으면 None → 호출 측이 CrawlState.records(url) 로 읽음)
+    """
+    url: str
+    status: int
+    records: List[Dict]
+    changed: bool
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    sha1: Optional[str] = None
+
+class _HostSlot:
+    """호스트별 동시성 세마포어 + 마지막 요청 시각(politeness delay 계산용)"""
+
+    def __init__(self, limit: int):
+        self.sem = asyncio.Semaphore(limit)
+        self.lock = asyncio.Lock()
+        self.last = 0.0
+
+class CrawlEngine:
+    def __init__(self, headers: Optional[Dict[str, str]] = None, *,
+                 concurrency: int = CRAWL_CONCURRENCY, per_host: int = CRAWL_PER_HOST,
+                 delay: float = CRAWL_DELAY, timeout: float = CRAWL_TIMEOUT,
+                 retries: int = CRAWL_RETRIES, backoff: float = CRAWL_BACKOFF,
+                 parse_processes: int = CRAWL_PARSE_PROCESSES,
+                 mode: str = CRAWL_MODE, archive: Optional[CrawlArchive] = None):
+        if mode not in CRAWL_MODES:
+            raise ValueError(f"알 수 없는 CRAWL_MODE: {mode} (가능: {', '.join(CRAWL_MODES)})")
+        self.headers = headers or {}
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.delay = delay
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.parse_processes = parse_processes
+        self.mode = mode
+        self.archive = archive if archive is not None else (CrawlArchive() if mode != "live" else None)
+        self._hosts: Dict[str, _HostSlot] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._pool = None
+
+    # --- 수명 주기 -----------------------------------------------------------
+    async def __aenter__(self):
+        limits = httpx.Limits(max_connections=self.concurrency,
+                              max_keepalive_connections=self.concurrency)
+        self._client = httpx.AsyncClient(headers=self.headers, timeout=self.timeout,
+                                         limits=limits, follow_redirects=True)
+        self._pool = (ProcessPoolExecutor(max_workers=self.parse_processes)
+                      if self.parse_processes > 0 else ThreadPoolExecutor(max_workers=1))
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+        self._pool.shutdown(wait=True)
+        return False
+
+    def _slot(self, url: str) -> _HostSlot:
+        host = urlsplit(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = _HostSlot(self.per_host)
+        return self._hosts[host]
+
+    # --- 요청 ---------------------------------------------------------------
+    async def _polite_wait(self, slot: _HostSlot):
+        """같은 호스트의 직전 요청 이후 delay 초가 지나도록 대기"""
+        async with slot.lock:
+            wait = slot.last + self.delay - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            slot.last = time.monotonic()
+
+    def _retry_wait(self, attempt: int, resp: Optional[httpx.Response]) -> float:
+        if resp is not None:
+            ra = resp.headers.get("retry-after", "")
+            if ra.isdigit():
+                return float(ra)
+        # 지수 백오프 + 지터(동시에 재시도가 몰리지 않게)
+        return self.backoff * (2 ** attempt) * (1 + random.random() * 0.25)
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """단일 URL GET (호스트 제한/politeness/재시도 적용). 최종 실패 시 예외 전파."""
+        if self.mode == "replay":
+            return self._replay(url)
+        if self.mode == "record" and headers and url not in self.archive:
+            # 아카이브에 본문이 없는 URL 은 조건부 GET 을 하지 않음 — 304 면 기록할 본문이 없어 재생 시 404
+            headers = {k: v for k, v in headers.items()
+                       if k.lower() not in ("if-none-match", "if-modified-since")} or None
+        res = await self._fetch_live(url, headers)
+        if self.mode == "record" and res.status != 304:
+            # 요청 URL 기준으로 기록(재생 시 같은 URL로 조회). 304는 본문이 없으므로 이전 기록 유지
+            self.archive.record(url, res.status, res.headers, res.content)
+        return res
+
+    def _replay(self, url: str) -> FetchResult:
+        hit = self.archive.lookup(url)
+        if hit is None:
+            return FetchResult(url=url, status=404)
+        status, headers, body = hit
+        return FetchResult(url=url, status=status, headers=headers, content=body)
+
+    async def _fetch_live(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        slot = self._slot(url)
+        attempt = 0
+        while True:
+            resp, err = None, None
+            async with slot.sem:
+                await self._polite_wait(slot)
+                t0 = time.perf_counter()
+                try:
+                    resp = await self._client.get(url, headers=headers)
+                except httpx.TransportError as e:
+                    err = e
+            if err is None and resp.status_code not in RETRY_STATUS:
+                return FetchResult(url=str(resp.url), status=resp.status_code,
+                                   headers=dict(resp.headers), content=resp.content,
+                                   elapsed=time.perf_counter() - t0)
+            if attempt >= self.retries:
+                if err is not None:
+                    raise err
+                resp.raise_for_status()
+            wait = self._retry_wait(attempt, resp)
+            print(f"[WARN] 재시도 {attempt + 1}/{self.retries} ({url}): "
+                  f"{err or resp.status_code} → {wait:.1f}s 후")
+            await asyncio.sleep(wait)
+            attempt += 1
+
+    async def parse(self, extractor: Extractor, content: bytes, url: str) -> List[Dict]:
+        """extractor를 워커 풀에서 실행 (이벤트 루프는 계속 다른 요청 처리)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, extractor, content, url)
+
+    async def run(self, url: str, extractor: Extractor) -> List[Dict]:
+        res = await self.fetch(url)
+        if res.status >= 400:
+            raise RuntimeError(f"HTTP {res.status}: {url}")
+        # 레코드의 url은 요청 URL 기준(리다이렉트 후 주소가 아님) — 기존 크롤러 출력과 동일
+        return await self.parse(extractor, res.content, url)
+
+    async def run_conditional(self, url: str, extractor: Extractor,
+                              validators: Optional[Dict[str, str]] = None,
+                              prev: Optional[Dict] = None) -> PageResult:
+        """
+        조건부 GET + 변경 감지.
+        - 304: 이전 records 재사용 (prev 에 records 가 없으면 None)
+        - 200이지만 본문 해시(sha1)가 이전과 같음(검증 헤더를 안 주는 서버): 파싱 생략, 재사용
+        - 그 외: 파싱해서 changed=True
+        """
+        res = await self.fetch(url, headers=validators or None)
+        if res.status == 304 and prev is not None:
+            return PageResult(url, 304, prev.get("records"), False,
+                              etag=res.headers.get("etag") or prev.get("etag"),
+                              last_modified=res.headers.get("last-modified") or prev.get("last_modified"),
+                              sha1=prev.get("sha1"))
+        if res.status >= 400 or res.status == 304:
+            raise RuntimeError(f"HTTP {res.status}: {url}")
+        digest = hashlib.sha1(res.content).hexdigest()
+        etag, last_modified = res.headers.get("etag"), res.headers.get("last-modified")
+        if prev is not None and prev.get("sha1") == digest:
+            return PageResult(url, res.status, prev.get("records"), False,
+                              etag=etag, last_modified=last_modified, sha1=digest)
+        records = await self.parse(extractor, res.content, url)
+        return PageResult(url, res.status, records, True,
+                          etag=etag, last_modified=last_modified, sha1=digest)
+
+    async def crawl(self, jobs: Sequence[Tuple[str, Extractor]]) -> List[object]:
+        """
+        jobs 를 동시에 실행하고 입력 순서대로 결과 반환.
+        - 각 원소: 성공 시 List[dict], 실패 시 Exception (한 페이지 실패가 전체를 멈추지 않게)
+        """
+        return await asyncio.gather(*(self.run(u, ex) for u, ex in jobs), return_exceptions=True)
+
+def run_jobs(jobs: Sequence[Tuple[str, Extractor]], headers: Optional[Dict[str, str]] = None,
+             **engine_kw) -> List[object]:
+    """동기 진입점: 새 이벤트 루프에서 CrawlEngine.crawl(jobs) 실행"""
+    async def _main():
+        async with CrawlEngine(headers, **engine_kw) as eng:
+            return await eng.crawl(jobs)
+    return asyncio.run(_main())
+
+def run_conditional_jobs(jobs: Sequence[Tuple[str, Extractor]], state,
+                         headers: Optional[Dict[str, str]] = None, **engine_kw) -> List[object]:
+    """
+    동기 진입점(조건부 GET): 입력 순서대로 PageResult 또는 Exception 리스트 반환.
+    - state: crawler.state.CrawlState (validators()/get() 만 사용, 갱신은 호출 측에서)
+      바뀌지 않은 페이지의 records 는 None → state.records(url)
+    """
+    async def _main():
+        async with CrawlEngine(headers, **engine_kw) as eng:
+            return await asyncio.gather(
+                *(eng.run_conditional(u, ex, state.validators(u), state.get(u)) for u, ex in jobs),
+                return_exceptions=True)
+    return asyncio.run(_main())
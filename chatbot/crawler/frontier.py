@@ -0,0 +1,279 @@
+"""
+링크 탐색형(frontier) 사이트 크롤러.
+
+구성:
+- canonicalize(url, base): URL 정규화 (상대경로 해석, scheme/host 소문자, 기본 포트/프래그먼트/
+  추적 파라미터 제거, 쿼리 정렬, 경로의 ./.. 정리, /index.html → /) → 같은 페이지를 한 번만 방문
+- BloomFilter: 방문/등록 URL 집합. URL 수와 무관하게 고정 메모리
+  (예: 10만 URL, 오탐 0.1% ≈ 180KB). 오탐 시 해당 URL을 건너뛸 뿐 중복 방문은 없음
+- Frontier: heapq 기반 우선순위 큐 (작은 값 먼저). 최대 크기를 넘으면 우선순위가 낮은 쪽부터 버림
+- sitemap_seeds(): robots.txt 의 Sitemap: 항목(없으면 /sitemap.xml) → <loc> 목록 (sitemapindex 재귀)
+- crawl_frontier(): 시드 → (fetch + 추출 + 링크 발견) 반복. 깊이/페이지 예산 적용
+
+페이지 처리 함수(process):
+- process(html_bytes, url) -> {"records": [...], "links": [...]} 인 모듈 최상위 함수
+  (엔진의 파싱 워커 프로세스로 넘어가므로 pickle 가능해야 함)
+"""
+import asyncio, hashlib, heapq, math, posixpath, re
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+
+from config import (
+    CRAWL_MAX_PAGES, CRAWL_MAX_DEPTH, CRAWL_FRONTIER_MAX,
+    CRAWL_SEEN_CAPACITY, CRAWL_SEEN_FP_RATE,
+)
+
+# 페이지가 아닌 리소스(확장자 기준) — 큐에 넣지 않음
+_SKIP_EXT = {
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".ico", ".bmp",
+    ".css", ".js", ".json", ".xml", ".zip", ".gz", ".rar", ".7z",
+    ".hwp", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
+    ".mp3", ".mp4", ".avi", ".mov", ".woff", ".woff2", ".ttf", ".eot",
+}
+# 추적용 쿼리 파라미터 (같은 페이지가 여러 URL로 보이는 원인)
+_TRACKING_RE = re.compile(r"^(?:utm_\w+|gclid|fbclid|yclid|mc_eid|_ga)$", re.I)
+_DEFAULT_PORT = {"http": "80", "https": "443"}
+# 디렉터리 기본 문서 (/index.html 과 / 는 같은 페이지로 취급)
+_INDEX_FILE_RE = re.compile(r"/(?:index|default)\.(?:html?|php|aspx?|jsp)$", re.I)
+
+def canonicalize(url: str, base: Optional[str] = None) -> Optional[str]:
+    """정규화된 절대 URL 반환. http(s)가 아니거나(mailto:, javascript: 등) 파싱 불가면 None."""
+    url = (url or "").strip()
+    if not url:
+        return None
+    if base:
+        url = urljoin(base, url)
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https") or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower()
+    port = parts.port if parts.port is not None else None
+    netloc = host if port is None or str(port) == _DEFAULT_PORT[scheme] else f"{host}:{port}"
+
+    path = parts.path or "/"
+    if "." in path:
+        # posixpath.normpath는 끝의 '/'를 지우므로 디렉터리 표기 유지
+        trailing = path.endswith("/")
+        path = posixpath.normpath(path)
+        if path.startswith("//"):
+            path = "/" + path.lstrip("/")
+        if trailing and not path.endswith("/"):
+            path += "/"
+        path = _INDEX_FILE_RE.sub("/", path)
+
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not _TRACKING_RE.match(k)))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+def is_page_url(url: str) -> bool:
+    ext = posixpath.splitext(urlsplit(url).path)[1].lower()
+    return ext not in _SKIP_EXT
+
+class BloomFilter:
+    """
+    고정 크기 비트 배열 + k개 해시(blake2b 128bit → double hashing).
+    - capacity 개를 넣었을 때 오탐률이 fp_rate 가 되도록 비트 수/해시 수 결정
+    - add(x): 새로 추가됐으면 True, (아마) 이미 있으면 False
+    """
+
+    def __init__(self, capacity: int = CRAWL_SEEN_CAPACITY, fp_rate: float = CRAWL_SEEN_FP_RATE):
+        capacity = max(1, int(capacity))
+        self.m = max(8, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.k = max(1, round(self.m / capacity * math.log(2)))
+        self.bits = bytearray((self.m + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        d = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(d[:8], "little")
+        h2 = int.from_bytes(d[8:], "little") | 1
+        return [(h1 + i * h2) % self.m for i in range(self.k)]
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def add(self, key: str) -> bool:
+        new = False
+        for p in self._positions(key):
+            byte, bit = p >> 3, 1 << (p & 7)
+            if not self.bits[byte] & bit:
+                self.bits[byte] |= bit
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+class Frontier:
+    """
+    (priority, 순번, url, depth) 최소 힙. 같은 우선순위는 먼저 들어온 순서(FIFO).
+    - max_size 를 25% 넘기면 우선순위 상위 max_size 개만 남김(일괄 정리 → push 는 평균 O(log n))
+    """
+
+    def __init__(self, max_size: int = CRAWL_FRONTIER_MAX):
+        self.max_size = max(1, int(max_size))
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._seq = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, url: str, depth: int, priority: float):
+        self._seq += 1
+        heapq.heappush(self._heap, (priority, self._seq, url, depth))
+        if len(self._heap) > self.max_size * 1.25:
+            keep = heapq.nsmallest(self.max_size, self._heap)  # 정렬된 리스트 = 유효한 힙
+            self.dropped += len(self._heap) - len(keep)
+            self._heap = keep
+
+    def pop(self) -> Tuple[str, int]:
+        _, _, url, depth = heapq.heappop(self._heap)
+        return url, depth
+
+# --- sitemap ---------------------------------------------------------------
+def _xml_locs(content: bytes) -> Tuple[List[str], bool]:
+    """sitemap XML → (<loc> 목록, sitemapindex 여부). 네임스페이스 무시."""
+    try:
+        root = ET.fromstring(content)
+    except ET.ParseError:
+        return [], False
+    is_index = root.tag.rsplit("}", 1)[-1] == "sitemapindex"
+    locs = [el.text.strip() for el in root.iter() if el.tag.rsplit("}", 1)[-1] == "loc" and el.text]
+    return locs, is_index
+
+async def sitemap_seeds(eng, base: str, limit: int = CRAWL_MAX_PAGES, max_files: int = 10) -> List[str]:
+    """robots.txt/sitemap.xml 에서 시드 URL 수집 (실패는 조용히 무시 — 시드가 없어도 링크 탐색은 동작)"""
+    sitemaps = []
+    try:
+        res = await eng.fetch(urljoin(base, "/robots.txt"))
+        if res.status == 200:
+            for line in res.content.decode("utf-8", "replace").splitlines():
+                if line.lower().startswith("sitemap:"):
+                    sitemaps.append(line.split(":", 1)[1].strip())
+    except Exception:
+        pass
+    if not sitemaps:
+        sitemaps = [urljoin(base, "/sitemap.xml")]
+
+    seeds, done = [], 0
+    while sitemaps and done < max_files and len(seeds) < limit:
+        sm = sitemaps.pop(0)
+        done += 1
+        try:
+            res = await eng.fetch(sm)
+        except Exception:
+            continue
+        if res.status != 200:
+            continue
+        locs, is_index = _xml_locs(res.content)
+        if is_index:
+            sitemaps.extend(locs)
+        else:
+            seeds.extend(locs[:limit - len(seeds)])
+    return seeds
+
+# --- 크롤 루프 --------------------------------------------------------------
+async def crawl_frontier(eng, seeds: Iterable[str], process: Callable, state=None, *,
+                         priority: Optional[Callable[[str, int], float]] = None,
+                         max_pages: int = CRAWL_MAX_PAGES, max_depth: int = CRAWL_MAX_DEPTH,
+                         frontier_max: int = CRAWL_FRONTIER_MAX, use_sitemap: bool = True,
+                         on_page: Optional[Callable] = None):
+    """
+    시드에서 출발해 같은 호스트 안의 링크를 따라가며 수집.
+    - eng: 열린 CrawlEngine (동시성/호스트 제한/재시도는 엔진이 담당)
+    - state: crawler.state.CrawlState (있으면 조건부 GET, 304면 저장된 records/links 재사용)
+      페이지를 처리하는 즉시 state.update() 로 추출 결과를 저장소에 쓰고 PageResult.records 는 비움
+      → 메모리는 페이지 수 × (URL + 검증 헤더) 로 제한, 결과는 state.records(url) 로 읽음
+    - priority(url, depth): 작을수록 먼저 (기본: depth → 너비 우선)
+    - on_page(url, depth, PageResult): 페이지마다 바로 호출되는 코루틴 (스트리밍 파이프라인용).
+      기다리는 동안 해당 워커는 다음 URL을 가져가지 않음(하류가 느리면 수집도 늦춰짐).
+      여기서 난 예외는 페이지 실패가 아니라 크롤 전체를 중단시킴
+    반환: (pages, errors, stats)
+      pages:  {url: (depth, PageResult)}  — PageResult.records 는 process() 반환값 (state 가 있으면 None)
+      errors: {url: Exception}
+    """
+    priority = priority or (lambda url, depth: depth)
+    frontier, seen = Frontier(frontier_max), BloomFilter()
+    seeds = [c for c in (canonicalize(s) for s in seeds) if c]
+    hosts = {urlsplit(s).netloc for s in seeds}
+
+    def enqueue(url: str, depth: int):
+        if urlsplit(url).netloc in hosts and is_page_url(url) and seen.add(url):
+            frontier.push(url, depth, priority(url, depth))
+
+    for s in seeds:
+        enqueue(s, 0)
+    if use_sitemap:
+        for base in sorted({urlunsplit((urlsplit(s).scheme, urlsplit(s).netloc, "/", "", "")) for s in seeds}):
+            for loc in await sitemap_seeds(eng, base, limit=max_pages):
+                c = canonicalize(loc)
+                if c:
+                    enqueue(c, 0)
+
+    pages: Dict[str, Tuple[int, object]] = {}
+    errors: Dict[str, Exception] = {}
+    cond = asyncio.Condition()
+    active, started = 0, 0
+
+    async def worker():
+        nonlocal active, started
+        while True:
+            async with cond:
+                while not len(frontier) and active > 0:
+                    await cond.wait()
+                if not len(frontier) or started >= max_pages:
+                    cond.notify_all()
+                    return
+                url, depth = frontier.pop()
+                active += 1
+                started += 1
+            res = None
+            try:
+                validators = state.validators(url) if state is not None else None
+                prev = state.get(url) if state is not None else None
+                res = await eng.run_conditional(url, process, validators, prev)
+                if res.records is None and state is not None:
+                    # 304/본문 동일: 이전 추출 결과를 상태 저장소에서 한 줄 읽음
+                    res.records = state.records(url)
+                pages[url] = (depth, res)
+                if depth < max_depth:
+                    for link in (res.records or {}).get("links", []):
+                        enqueue(link, depth + 1)
+            except Exception as e:
+                errors[url] = e
+            finally:
+                async with cond:
+                    active -= 1
+                    cond.notify_all()
+            if res is not None:
+                if on_page is not None:
+                    await on_page(url, depth, res)
+                if state is not None:
+                    # 추출 결과는 바로 디스크(상태 저장소)로 → 메모리에는 페이지당 검증 헤더/해시/위치만 남음
+                    state.update(res)
+                    res.records = None
+
+    await asyncio.gather(*(worker() for _ in range(max(1, eng.concurrency))))
+    stats = {"fetched": len(pages), "failed": len(errors), "queued_left": len(frontier),
+             "dropped": frontier.dropped, "seen": seen.count, "seen_bytes": seen.nbytes}
+    return pages, errors, stats
+
+def run_frontier(seeds: Iterable[str], process: Callable, state=None,
+                 headers: Optional[Dict[str, str]] = None, engine_kw: Optional[Dict] = None, **kw):
+    """동기 진입점: 새 이벤트 루프 + CrawlEngine(**engine_kw) 에서 crawl_frontier 실행"""
+    from crawler.engine import CrawlEngine
+
+    async def _main():
+        async with CrawlEngine(headers, **(engine_kw or {})) as eng:
+            return await crawl_frontier(eng, seeds, process, state, **kw)
+    return asyncio.run(_main())
@@ -0,0 +1,53 @@
+"""
+HTML 파서 선택 레이어.
+
+구성:
+- make_soup(content, strainer=None): 설정된 파서(HTML_PARSER)로 BeautifulSoup 생성
+  - strainer(SoupStrainer)를 주고 HTML_PARTIAL_PARSE=True 면 필요한 하위 트리만 만든다
+    (예: 솔루션 페이지는 div.sSol_box 만) → 트리 생성 시간/메모리 절감
+- resolve_parser(name): 설치 여부 확인 후 실제 사용할 파서 이름 (없으면 html.parser 로 대체 + 경고 1회)
+- configure(parser, partial): 실행 중 기본값 변경 (벤치마크/디버깅용, 파싱 워커 프로세스 생성 전에 호출)
+
+파서 비교:
+- "html.parser": 표준 라이브러리, 추가 설치 불필요 (기본값 — 기존 출력과 동일)
+- "lxml": C 구현이라 빠름 (pip install lxml). 깨진 HTML 복구 방식이 달라 결과가 미세하게 다를 수 있으므로
+          바꿀 때는 python -m bench.parse 의 records_equal 로 먼저 확인
+- "html5lib": 브라우저와 같은 복구 규칙, 가장 느림. parse_only(strainer) 미지원 → 전체 트리로 파싱
+"""
+import importlib.util
+from typing import Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from config import HTML_PARSER, HTML_PARTIAL_PARSE
+
+PARSERS = ("html.parser", "lxml", "html5lib")
+
+_settings = {"parser": HTML_PARSER, "partial": HTML_PARTIAL_PARSE}
+_warned = set()
+
+def available_parsers():
+    return [p for p in PARSERS if p == "html.parser" or importlib.util.find_spec(p) is not None]
+
+def resolve_parser(name: Optional[str] = None) -> str:
+    name = name or _settings["parser"]
+    if name not in PARSERS:
+        raise ValueError(f"알 수 없는 HTML_PARSER: {name} (가능: {', '.join(PARSERS)})")
+    if name != "html.parser" and importlib.util.find_spec(name) is None:
+        if name not in _warned:
+            _warned.add(name)
+            print(f"[WARN] HTML 파서 '{name}' 미설치 → html.parser 로 대체 (pip install {name})")
+        return "html.parser"
+    return name
+
+def configure(parser: Optional[str] = None, partial: Optional[bool] = None):
+    if parser is not None:
+        _settings["parser"] = resolve_parser(parser)
+    if partial is not None:
+        _settings["partial"] = bool(partial)
+
+def make_soup(content, strainer: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    parser = resolve_parser()
+    if strainer is not None and _settings["partial"] and parser != "html5lib":
+        return BeautifulSoup(content, parser, parse_only=strainer)
+    return BeautifulSoup(content, parser)
@@ -0,0 +1,126 @@
+"""
+URL별 크롤 상태 저장소 (조건부 GET 캐시).
+
+구성:
+- CrawlState: CRAWL_STATE_PATH(JSON)에 URL별로 아래 값만 보관 (페이지 수 × 상수 크기)
+    {"etag", "last_modified", "sha1"(본문 해시), "offset", "n_records", "checked_at"}
+  - 페이지 추출 결과 {"records", "links"} 는 옆의 페이지 저장소(<상태 파일>.pages.jsonl, 한 줄 = 페이지 하나)에
+    수집되는 대로 쓰고, offset(바이트 위치)으로 한 줄만 읽음 → 크롤 중 메모리에 본문/레코드를 모아 두지 않음
+  - validators(url): 다음 요청에 붙일 If-None-Match / If-Modified-Since 헤더
+  - update(result) / drop(url): 수집 결과 반영(추출 결과는 저장소에 기록) / 실패 페이지 제거
+  - records(url): 저장소에서 페이지 추출 결과 읽기 (이번 크롤에서 쓴 것 또는 이전 크롤 것)
+  - save(): 새 저장소/상태 파일을 임시 파일에 쓴 뒤 교체(중간에 중단돼도 기존 상태 유지)
+- 상태 파일에 "version"(STATE_VERSION)을 기록. 다른 버전(레코드를 상태 파일에 직접 넣던 이전 형식 포함)이면
+  경고 후 무시하고 전체 재수집
+
+동작:
+- 304 Not Modified 또는 본문 해시가 같으면 저장된 추출 결과를 그대로 재사용(파싱 생략)
+- 추출 로직(extract_*)을 고친 경우에는 본문이 같아도 결과가 달라지므로
+  main.py --full 로 상태를 무시하고 전체 재수집할 것
+"""
+import json, os, time
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from config import CRAWL_STATE_PATH
+from utils.jsonl import dumps_bytes, loads
+
+STATE_VERSION = 2
+
+class CrawlState:
+    def __init__(self, path: Path = CRAWL_STATE_PATH, pages: Optional[Dict[str, Dict]] = None):
+        self.path = Path(path)
+        self.store_path = self.path.with_suffix(".pages.jsonl")
+        self.pages: Dict[str, Dict] = pages or {}
+        self._new_path = self.store_path.with_suffix(".jsonl.tmp")
+        self._out = None
+        self._fresh: Set[str] = set()   # offset 이 새 저장소(_new_path)를 가리키는 URL
+
+    @classmethod
+    def load(cls, path: Path = CRAWL_STATE_PATH) -> "CrawlState":
+        path = Path(path)
+        if not path.exists():
+            return cls(path)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            # 상태 파일이 깨졌으면 전체 재수집으로 복구
+            print(f"[WARN] 크롤 상태 파일을 읽지 못해 무시합니다 ({path}): {e}")
+            return cls(path)
+        state = cls(path)
+        if data.get("version") != STATE_VERSION:
+            print(f"[WARN] 크롤 상태 형식이 다릅니다(version={data.get('version')}, 필요 {STATE_VERSION}) "
+                  f"→ 무시하고 전체 재수집 ({path})")
+            return state
+        if data.get("pages") and not state.store_path.exists():
+            print(f"[WARN] 페이지 저장소가 없습니다({state.store_path}) → 크롤 상태 무시, 전체 재수집")
+            return state
+        state.pages = data.get("pages", {})
+        return state
+
+    def get(self, url: str) -> Optional[Dict]:
+        return self.pages.get(url)
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """저장된 ETag/Last-Modified → 조건부 요청 헤더"""
+        prev = self.pages.get(url) or {}
+        headers = {}
+        if prev.get("etag"):
+            headers["If-None-Match"] = prev["etag"]
+        if prev.get("last_modified"):
+            headers["If-Modified-Since"] = prev["last_modified"]
+        return headers
+
+    def _read(self, path: Path, offset: int):
+        with open(path, "rb") as f:
+            f.seek(offset)
+            return loads(f.readline())
+
+    def records(self, url: str):
+        """페이지 추출 결과({"records", "links"}) — 없으면 None"""
+        meta = self.pages.get(url)
+        if meta is None or meta.get("offset") is None:
+            return None
+        return self._read(self._new_path if url in self._fresh else self.store_path, meta["offset"])
+
+    def _write(self, url: str, records) -> int:
+        if self._out is None:
+            self._new_path.parent.mkdir(parents=True, exist_ok=True)
+            self._out = open(self._new_path, "wb")
+        offset = self._out.tell()
+        self._out.write(dumps_bytes(records) + b"\n")
+        self._out.flush()
+        self._fresh.add(url)
+        return offset
+
+    def update(self, result):
+        """engine.PageResult 반영 (result.records 는 저장소에 쓰고 상태에는 위치만 남김)"""
+        records = result.records
+        self.pages[result.url] = {
+            "etag": result.etag,
+            "last_modified": result.last_modified,
+            "sha1": result.sha1,
+            "offset": self._write(result.url, records),
+            "n_records": len((records or {}).get("records") or []),
+            "checked_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+
+    def drop(self, url: str):
+        self.pages.pop(url, None)
+        self._fresh.discard(url)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self._out is not None:
+            # 이번에 다시 쓰지 않은 페이지는 이전 저장소에서 옮겨 온 뒤 새 저장소로 교체
+            for url in [u for u in self.pages if u not in self._fresh]:
+                self.pages[url]["offset"] = self._write(url, self.records(url))
+            self._out.close()
+            self._out = None
+            os.replace(self._new_path, self.store_path)
+            self._fresh.clear()
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": STATE_VERSION, "pages": self.pages}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
@@ -2,22 +2,38 @@
 범일정보 홈페이지용 간단 크롤러.
 
 구성:
-- fetch_soup(url): 요청 + 인코딩 보정 + BeautifulSoup 객체 반환
+- fetch_soup(url): 요청 + 인코딩 보정 + BeautifulSoup 객체 반환 (단건/디버깅용, 세션 재사용)
+- extract_main / extract_solution / extract_business(content, url):
+  HTML 바이트 → 레코드 리스트. 크롤러 엔진의 파싱 워커(프로세스)에서 실행됨
 - crawl_main_page(): 메인 페이지의 섹션(H1~H4)별 제목/본문 크롤링
 - crawl_solution_page(): 솔루션 목록(이름/설명/주요기능/특징/메타정보) 크롤링
 - crawl_business_pages(): 비즈니스(클라우드, 인프라, 플랫폼 등) 요약 설명 크롤링
-- crawl_all(): 전체 파이프라인 실행
+- EXTRACTORS / register_extractor(): URL 경로 패턴별 extractor 규칙
+- process_page(content, url): 규칙에 맞는 extractor 결과 + 페이지 내 링크 (frontier 크롤러용)
+- crawl_all(): 전체 파이프라인 실행 (시드/sitemap에서 링크를 따라 사이트 전체 수집,
+  조건부 GET으로 변경 URL 반환) — crawler/frontier.py
+
+수집은 crawler/engine.py(asyncio + 커넥션 풀 + 호스트별 동시성/딜레이 + 재시도)로 수행.
+CRAWL_MODE=record/replay 로 응답을 아카이브(crawler/archive.py)에 기록/재생 가능(오프라인 재구축).
 
 출력:
 - 결과는 JSON Lines 형식으로 RAW_PATH에 append/write 저장.
   각 라인은 {"url","section","title","content"} 구조를 가짐.
 """
-import requests, json, re, time
-from bs4 import BeautifulSoup
+import requests, re, time
+from bs4 import BeautifulSoup, SoupStrainer
 from pathlib import Path
-from config import BASE_URL, RAW_PATH, DATA_DIR
+from urllib.parse import urlsplit
+from config import BASE_URL, RAW_PATH, DATA_DIR, CRAWL_SEEDS, CRAWL_USE_SITEMAP, CRAWL_MODE
 from utils.text_utils import clean_text
 from utils.file_utils import ensure_dir
+from utils.dataset import write_records
+from utils.records import RawRecord
+from crawler.engine import run_jobs
+from crawler.frontier import canonicalize, run_frontier
+from crawler.archive import CrawlArchive
+from crawler.html_parser import make_soup
+from crawler.state import CrawlState
 
 # 요청에 사용할 UA 헤더 (간단한 봇 차단 회피/서버 친화)
 HEADERS = {
@@ -28,32 +44,79 @@ HEADERS = {
     )
 }
 
+# /page/ 아래의 개별 비즈니스 페이지 파일명들 (crawl_business_pages / 비즈니스 extractor 규칙)
+BUSINESS_PAGES = [
+    "cloud.html",
+    "infra.html",
+    "outsourcing.html",
+    "platform.html",
+    "analysis.html",
+    "portal.html",
+    "dell.html"
+]
+
+# 단건 요청용 세션 (TCP/TLS 연결 재사용)
+_SESSION = requests.Session()
+_SESSION.headers.update(HEADERS)
+
 def fetch_soup(url: str) -> BeautifulSoup:
     """
     단일 URL에 대해 HTTP GET 요청을 수행하고 BeautifulSoup으로 파싱해 반환.
 
     - resp.apparent_encoding을 통해 서버가 명시하지 않은 인코딩을 추정하여
       깨짐 방지 (특히 한글 사이트 대응)
+    - CRAWL_MODE="record"면 응답을 아카이브에 기록, "replay"면 네트워크 없이 아카이브에서 재생
     - 반환: 파싱된 BeautifulSoup 객체
     """
-    resp = requests.get(url, headers=HEADERS, timeout=10)
+    if CRAWL_MODE == "replay":
+        # 아카이브 재생: 기록된 본문 바이트를 그대로 파싱 (없으면 HTTP 404와 같은 취급)
+        hit = _archive().lookup(url)
+        if hit is None:
+            raise requests.HTTPError(f"아카이브에 없음(replay): {url}")
+        return _soup(hit[2])
+    resp = _SESSION.get(url, timeout=10)
+    if CRAWL_MODE == "record":
+        _archive().record(url, resp.status_code, dict(resp.headers), resp.content)
     # 일부 서버가 잘못된/누락된 인코딩 헤더를 보내는 경우가 있어 보정
     resp.encoding = resp.apparent_encoding
     html = resp.text
-    return BeautifulSoup(html, "html.parser")
+    return make_soup(html)
 
-def crawl_main_page():
+_ARCHIVE = None
+
+def _archive() -> CrawlArchive:
+    global _ARCHIVE
+    if _ARCHIVE is None:
+        _ARCHIVE = CrawlArchive()
+    return _ARCHIVE
+
+def _soup(content: bytes, strainer: SoupStrainer = None) -> BeautifulSoup:
     """
-    메인 페이지(BASE_URL)의 H1~H4 섹션을 순회하며:
+    응답 바이트를 그대로 파싱 (파서/부분 파싱 여부는 crawler/html_parser.py 설정).
+    - HTTP 헤더의 charset은 믿지 않고(기존 apparent_encoding 보정과 같은 취지),
+      BeautifulSoup(UnicodeDammit)이 BOM/meta charset/내용 추정으로 인코딩 결정
+    - strainer: extractor가 실제로 보는 하위 트리만 만들도록 제한
+    """
+    return make_soup(content, strainer)
+
+# extractor별 부분 파싱 대상 (메인 페이지는 H 태그의 형제 블록을 따라가므로 전체 트리 필요)
+_SOL_STRAINER = SoupStrainer("div", class_="sSol_box")
+_BIZ_STRAINER = SoupStrainer(class_="cont")
+_LINK_STRAINER = SoupStrainer("a", href=True)
+
+def _write_items(items, mode: str):
+    ensure_dir(DATA_DIR)
+    return write_records(RAW_PATH, items, mode=mode, record=RawRecord)
+
+def _extract_sections(content: bytes, url: str, section: str):
+    """
+    페이지의 H1~H4 섹션을 순회하며:
     - 제목: 해당 헤딩 태그 텍스트
     - 본문: 다음 형제(sibling) 블록들을 H 태그를 만나기 전까지 이어붙여 수집
-    수집된 (제목, 본문)을 JSONL로 RAW_PATH에 저장.
 
     메인 페이지 섹션 카드/블록 기반의 단순 구조에 맞춘 제너럴한 수집 로직.
     """
-    ensure_dir(DATA_DIR)
-    url = BASE_URL
-    soup = fetch_soup(url)
+    soup = _soup(content)
 
     # h1~h4 제목 블록을 섹션 단위로 간주
     h_tags = soup.find_all(re.compile("^h[1-4]$"))
@@ -76,19 +139,21 @@ def crawl_main_page():
         if title and content:
             items.append({
                 "url": url,
-                "section": "main",   # 섹션 종류
+                "section": section,  # 섹션 종류
                 "title": title,      # 섹션 제목(H1~H4)
                 "content": " ".join(content)  # 섹션 본문(문단 합침)
             })
+    return items
 
-    # 결과 저장 (메인은 새로 덮어씀)
-    with open(RAW_PATH, "w", encoding="utf-8") as f:
-        for item in items:
-            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+def extract_main(content: bytes, url: str):
+    """메인 페이지(BASE_URL)의 H1~H4 섹션 → section='main'"""
+    return _extract_sections(content, url, "main")
 
-    print(f"✔️ [크롤러] main page: {len(items)}개 저장 ({RAW_PATH})")
+def extract_page(content: bytes, url: str):
+    """전용 extractor가 없는 페이지(링크 탐색으로 발견)의 H1~H4 섹션 → section='page'"""
+    return _extract_sections(content, url, "page")
 
-def crawl_solution_page():
+def extract_solution(content: bytes, url: str):
     """
     솔루션 페이지(/page/solution.html)에서 솔루션 카드(.sSol_box)를 모두 수집:
     - title: 솔루션 이름(strong) + 보조 설명(h4)
@@ -97,8 +162,7 @@ def crawl_solution_page():
     주의:
     - CSS 클래스/DOM 구조 변화에 취약하므로, 사이트 개편 시 선택자 점검 필요.
     """
-    url = BASE_URL + "page/solution.html"
-    soup = fetch_soup(url)
+    soup = _soup(content, _SOL_STRAINER)
 
     sol_boxes = soup.find_all("div", class_="sSol_box")
     items = []
@@ -146,17 +210,119 @@ def crawl_solution_page():
             "title": sol_name,      # 솔루션 이름
             "content": content.strip(),  # 솔루션 설명 통합
         })
+    return items
+
+def extract_business(content: bytes, url: str):
+    """
+    비즈니스 페이지 1건에서 .cont 블록 아래의 소제목(h3 > small)과 첫 번째 문단(p)만 간단 수집
+    - 결과는 section='business' (블록이 없으면 빈 리스트)
+    """
+    soup = _soup(content, _BIZ_STRAINER)
+    cont = soup.select_one(".cont")
+    if not cont:
+        return []
+
+    # 비즈니스명 (페이지 상단 소제목)
+    biz_name_tag = cont.select_one("h3 > small")
+    biz_name = biz_name_tag.get_text(strip=True) if biz_name_tag else ""
+
+    # 설명(첫 번째 p) — 핵심 요약만 가져오기
+    desc_tag = cont.find("p")
+    desc = desc_tag.get_text(" ", strip=True) if desc_tag else ""
+
+    return [{
+        "url": url,
+        "section": "business",
+        "title": biz_name,
+        "content": desc
+    }]
+
+# --- URL 패턴별 extractor 등록 ---------------------------------------------------
+# (경로 정규식, extractor) — 위에서부터 처음 일치하는 규칙 사용, None 이면 링크만 따라감.
+# 파싱 워커 프로세스에서도 같은 목록을 써야 하므로 규칙은 모듈 import 시점에 등록할 것
+# (register_extractor 는 이 모듈/설정 모듈 최상위에서 호출. 실행 중 등록은 CRAWL_PARSE_PROCESSES=0 일 때만 반영)
+EXTRACTORS = [
+    (re.compile(r"^/?$"), extract_main),
+    (re.compile(r"^/page/solution\.html$"), extract_solution),
+    (re.compile(r"^/page/(?:" + "|".join(re.escape(p) for p in BUSINESS_PAGES) + r")$"), extract_business),
+    (re.compile(r".*"), extract_page),
+]
+
+def register_extractor(pattern: str, extractor, index: int = -1):
+    """새 규칙 추가 (기본: 마지막 기본 규칙(extract_page) 바로 앞)"""
+    rule = (re.compile(pattern), extractor)
+    if index < 0:
+        index = len(EXTRACTORS) + index
+    EXTRACTORS.insert(index, rule)
+
+def extractor_for(url: str):
+    """URL 경로에 맞는 (규칙 번호, extractor). 일치하는 규칙이 없으면 (len(EXTRACTORS), None)"""
+    path = urlsplit(url).path
+    for i, (pat, ex) in enumerate(EXTRACTORS):
+        if pat.match(path):
+            return i, ex
+    return len(EXTRACTORS), None
+
+def process_page(content: bytes, url: str):
+    """
+    frontier 크롤러의 페이지 처리 함수 (파싱 워커에서 실행):
+    - records: URL 패턴에 맞는 extractor 결과
+    - links: 페이지 안의 a[href] (정규화 전 절대 URL — 정규화/범위 판단은 frontier 쪽에서)
+    """
+    _, ex = extractor_for(url)
+    records = ex(content, url) if ex else []
+    links_soup = make_soup(content, _LINK_STRAINER)
+    links = [canonicalize(a["href"], url) for a in links_soup.find_all("a", href=True)]
+    return {"records": records, "links": [l for l in links if l]}
 
-    # 결과 저장 (append)
-    with open(RAW_PATH, "a", encoding="utf-8") as f:
-        for item in items:
-            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+def _page_priority(url: str, depth: int) -> float:
+    # 전용 extractor가 있는 페이지를 같은 깊이의 일반 페이지보다 먼저(페이지 예산이 모자랄 때 대비)
+    rule, _ = extractor_for(url)
+    return depth + (0.0 if rule < len(EXTRACTORS) - 1 else 0.5)
 
+def _main_jobs():
+    return [(BASE_URL, extract_main)]
+
+def _solution_jobs():
+    return [(BASE_URL + "page/solution.html", extract_solution)]
+
+def _business_jobs():
+    return [(BASE_URL + "page/" + page, extract_business) for page in BUSINESS_PAGES]
+
+def _collect(results, jobs, strict: bool):
+    """
+    엔진 결과(job 순서 유지)를 레코드 리스트로 합침.
+    - strict=True: 실패 시 예외 전파 (메인/솔루션 — 기존 동작과 동일)
+    - strict=False: 페이지 단위로 보고만 하고 진행 (비즈니스 페이지)
+    """
+    items = []
+    for (url, _), res in zip(jobs, results):
+        if isinstance(res, BaseException):
+            if strict:
+                raise res
+            # 페이지 구조 변경/네트워크 오류 등은 개별 페이지 단위로 보고만 하고 진행
+            print(f"[ERROR] {url.rsplit('/', 1)[-1]} ({url}) 크롤링 실패: {res}")
+            continue
+        items.extend(res)
+    return items
+
+def crawl_main_page():
+    """메인 페이지 섹션 수집 → RAW_PATH 새로 작성(덮어씀)"""
+    jobs = _main_jobs()
+    items = _collect(run_jobs(jobs, HEADERS), jobs, strict=True)
+    _write_items(items, "w")
+    print(f"✔️ [크롤러] main page: {len(items)}개 저장 ({RAW_PATH})")
+
+def crawl_solution_page():
+    """솔루션 카드 수집 → RAW_PATH에 append"""
+    jobs = _solution_jobs()
+    items = _collect(run_jobs(jobs, HEADERS), jobs, strict=True)
+    _write_items(items, "a")
     print(f" ✔️[크롤러] 솔루션 {len(items)}개 저장 ({RAW_PATH})")
 
 def crawl_business_pages():
     """
-    비즈니스 페이지 묶음(/page/*.html)을 순회하며 요약 텍스트 수집.
+    비즈니스 페이지 묶음(/page/*.html)을 동시에 수집해 RAW_PATH에 append.
     - 각 페이지에서 .cont 블록 아래의 소제목(h3 > small)과 첫 번째 문단(p)만 간단 수집
     - 결과는 section='business'로 저장
 
@@ -164,59 +330,85 @@ def crawl_business_pages():
     - 페이지별 텍스트 배치가 단순하다고 가정한 최소 스키마 크롤링.
     - 상세 문단까지 필요하면 선택자 확장.
     """
-    ensure_dir(DATA_DIR)
+    jobs = _business_jobs()
+    items = _collect(run_jobs(jobs, HEADERS), jobs, strict=False)
+    _write_items(items, "a")
+    print(f" ✔️[크롤러] 비즈니스 {len(items)}개 저장 ({RAW_PATH})")
 
-    # /page/ 아래의 개별 비즈니스 페이지 파일명들
-    business_pages = [
-        "cloud.html",
-        "infra.html",
-        "outsourcing.html",
-        "platform.html",
-        "analysis.html",
-        "portal.html",
-        "dell.html"
-    ]
+def crawl_all(full: bool = False, seeds=None, mode=None, on_page=None):
+    """
+    전체 크롤러 파이프라인 실행 (링크 탐색형):
+    - 시드(CRAWL_SEEDS, 기본 BASE_URL) + sitemap 에서 출발해 같은 호스트의 링크를 따라 수집
+    - 페이지마다 URL 패턴에 맞는 extractor 적용 (EXTRACTORS: 메인/솔루션/비즈니스/일반 페이지)
+    - 깊이(CRAWL_MAX_DEPTH)/페이지 수(CRAWL_MAX_PAGES) 예산, 대기 큐/방문 집합은 고정 크기
 
-    items = []
-    for page in business_pages:
-        url = BASE_URL + "page/" + page
-        try:
-            soup = fetch_soup(url)
-            cont = soup.select_one(".cont")
-            if cont:
-                # 비즈니스명 (페이지 상단 소제목)
-                biz_name_tag = cont.select_one("h3 > small")
-                biz_name = biz_name_tag.get_text(strip=True) if biz_name_tag else ""
-
-                # 설명(첫 번째 p) — 핵심 요약만 가져오기
-                desc_tag = cont.find("p")
-                desc = desc_tag.get_text(" ", strip=True) if desc_tag else ""
-
-                items.append({
-                    "url": url,
-                    "section": "business",
-                    "title": biz_name,
-                    "content": desc
-                })
-        except Exception as e:
-            # 페이지 구조 변경/네트워크 오류 등은 개별 페이지 단위로 보고만 하고 진행
-            print(f"[ERROR] {page} ({url}) 크롤링 실패: {e}")
+    RAW_PATH 기록 순서는 (규칙 순서, 깊이, URL) → 동시 수집이어도 실행마다 같은 순서
+    (메인 → 솔루션 → 비즈니스 → 일반 페이지)
 
-    # 결과 저장 (append)
-    with open(RAW_PATH, "a", encoding="utf-8") as f:
-        for item in items:
-            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+    조건부 GET(crawler/state.py):
+    - URL별 ETag/Last-Modified로 If-None-Match/If-Modified-Since 요청
+    - 304 또는 본문 해시 동일 → 이전 레코드/링크 재사용
+    - 페이지 추출 결과는 수집 즉시 상태 저장소(crawl_state.pages.jsonl)에 쓰고, raw.jsonl 은 끝난 뒤
+      저장소에서 한 페이지씩 읽어 위 순서로 씀 → 메모리는 페이지 수 × (URL + 검증 헤더)
+    - 바뀐 페이지가 없고 RAW_PATH가 있으면 raw.jsonl을 다시 쓰지 않음(mtime 유지)
+    - full=True: 저장된 상태를 무시하고 전체 재수집(추출 로직 변경 시)
 
-    print(f" ✔️[크롤러] 비즈니스 {len(items)}개 저장 ({RAW_PATH})")
+    mode(기본 CRAWL_MODE): "record" 면 응답을 아카이브에 기록, "replay" 면 아카이브에서 재생
+    (replay + full=True → 재수집 없이 새 extractor로 다시 처리)
 
-def crawl_all():
-    """
-    전체 크롤러 파이프라인 실행:
-    1) 메인 페이지 섹션 수집
-    2) 솔루션 상세 수집
-    3) 비즈니스 요약 수집
+    on_page(url, depth, PageResult): 페이지를 받을 때마다 호출되는 코루틴(스트리밍 파이프라인,
+    crawl_frontier 참고). raw.jsonl/상태 저장은 크롤이 끝난 뒤 위 순서대로 동일하게 수행
 
+    반환: 내용이 바뀐(추가/변경/삭제된) URL 리스트 (비어 있으면 후속 단계 생략 가능)
     """
-    crawl_main_page()
-    crawl_solution_page()
-    crawl_business_pages()
+    seeds = list(seeds or CRAWL_SEEDS)
+    state = CrawlState() if full else CrawlState.load()
+    pages, errors, stats = run_frontier(seeds, process_page, state, HEADERS,
+                                        engine_kw={"mode": mode or CRAWL_MODE},
+                                        priority=_page_priority, use_sitemap=CRAWL_USE_SITEMAP,
+                                        on_page=on_page)
+
+    # 시드(메인 페이지)를 하나도 못 받으면 기존 동작처럼 예외 (빈 raw.jsonl로 덮어쓰지 않음)
+    seed_urls = {canonicalize(u) for u in seeds}
+    if not (seed_urls & pages.keys()):
+        raise next((errors[u] for u in seed_urls if u in errors), RuntimeError("시드 페이지 수집 실패"))
+    for url, err in sorted(errors.items()):
+        # 페이지 구조 변경/네트워크 오류 등은 개별 페이지 단위로 보고만 하고 진행
+        print(f"[ERROR] {url.rsplit('/', 1)[-1]} ({url}) 크롤링 실패: {err}")
+
+    changed = [url for url, (_, res) in pages.items() if res.changed]
+    for url in list(state.pages):
+        if url not in pages:
+            # 이번 크롤에서 사라진(실패/링크 끊김/예산 초과) 페이지 → 삭제로 보고
+            if state.pages[url].get("n_records"):
+                changed.append(url)
+            state.drop(url)
+
+    order = sorted(pages, key=lambda u: (extractor_for(u)[0], pages[u][0], u))
+    counts = {}
+
+    def items():
+        # 페이지 추출 결과는 상태 저장소에서 한 페이지씩 읽어 바로 씀 (전체 레코드를 메모리에 모으지 않음)
+        # 다른 URL로 같은 본문이 다시 나오면(별칭/세션 파라미터 등) 앞 순서의 페이지만 사용
+        bodies = set()
+        for u in order:
+            res = pages[u][1]
+            if res.sha1 in bodies:
+                continue
+            bodies.add(res.sha1)
+            for rec in (state.records(u) or {}).get("records") or []:
+                counts[rec["section"]] = counts.get(rec["section"], 0) + 1
+                yield rec
+
+    if changed or not RAW_PATH.exists():
+        n = _write_items(items(), "w")
+        print(f"✔️ [크롤러] {len(pages)}페이지 → {n}개 저장 ({RAW_PATH}) "
+              f"{counts} - 변경 페이지 {len(changed)}")
+        if not changed:
+            # raw.jsonl이 없어서 새로 쓴 경우 → 후속 단계도 전부 다시 해야 함
+            changed = order
+    else:
+        print(f"✔️ [크롤러] 변경된 페이지 없음 ({len(pages)}페이지 확인) → {RAW_PATH} 유지")
+    print(f"[DEBUG] frontier: {stats}")
+    state.save()
+    return sorted(changed)
@@ -12,8 +12,10 @@
 #      → GPU 없이도 빠른 벡터 검색이 가능, 파라미터가 없어 디버깅 용이
 #   3) texts/metas 는 "벡터 순서와 1:1" 로 저장 (매우 중요)
 #      → 검색 결과의 인덱스(i)로 원문/메타를 바로 조회하기 위해서
+#   4) (reuse=True) 이전 인덱스에 같은 텍스트가 있으면 벡터를 재사용(reconstruct)
+#      → 크롤 변경분만 인코딩, 전부 같으면 모델 로드도 생략
 # -----------------------------------------------------------------------------
-import json, os, sys
+import os, sys
 import numpy as np
 from pathlib import Path
 from tqdm import tqdm
@@ -21,8 +23,11 @@ from sentence_transformers import SentenceTransformer
 import faiss
 
 from config import (
-    CHUNKS_PATH, INDEX_DIR, FAISS_INDEX, FAISS_TEXTS, FAISS_METAS, EMBED_MODEL_NAME
+    CHUNKS_PATH, DOCS_PATH, INDEX_DIR, FAISS_INDEX, FAISS_TEXTS, FAISS_METAS, EMBED_MODEL_NAME,
+    EMBED_BATCH_TOKENS,
 )
+from utils.jsonl import load_jsonl, write_jsonl
+from utils.dataset import read_records
 
 # CPU 기준 적당한 배치(너무 크면 메모리/속도 손해, 너무 작으면 오버헤드↑)
 BATCH_SIZE = 8  # CPU면 8~16 권장, GPU면 32~128까지도 가능
@@ -41,10 +46,63 @@ def _atomic_write_lines(path: Path, lines_iter):
             f.write(row + "\n")
     os.replace(tmp, path)
 
-def build_faiss_index():
-    # 출력 디렉터리 준비
-    Path(INDEX_DIR).mkdir(parents=True, exist_ok=True)
+def _model_tag_path(index_path) -> Path:
+    # 인덱스를 만든 모델 이름 기록(다른 모델의 벡터를 섞어 재사용하지 않도록)
+    return Path(str(index_path) + ".model")
+
+def _load_previous_vectors(index_path, texts_path, model_tag: str):
+    """
+    이전 인덱스의 {텍스트: 벡터} 조회용 (texts, 벡터 행렬, 텍스트→행 번호) 반환.
+    - 파일이 없거나, 모델이 다르거나, 개수가 맞지 않으면 None (→ 전체 인코딩)
+    """
+    index_path, texts_path, tag_path = Path(index_path), Path(texts_path), _model_tag_path(index_path)
+    if not (index_path.exists() and texts_path.exists() and tag_path.exists()):
+        return None
+    if tag_path.read_text(encoding="utf-8").strip() != model_tag:
+        print(f"[DEBUG] 이전 인덱스 모델이 달라 벡터 재사용 안 함 ({tag_path})")
+        return None
+    old_texts = load_jsonl(texts_path)
+    old = faiss.read_index(str(index_path))
+    if old.ntotal != len(old_texts):
+        return None
+    rows = {}
+    for i, t in enumerate(old_texts):
+        rows.setdefault(t, i)
+    return old.reconstruct_n(0, old.ntotal), rows
+
+def load_docs(docs_path=DOCS_PATH) -> dict:
+    """docs.jsonl → {doc_id: {"url", "title"}} (청크 → 문서 출처 조회용, 파일이 없으면 빈 dict)"""
+    docs = {}
+    if Path(docs_path).exists():
+        for d in read_records(docs_path, columns=("doc_id", "url", "title")):
+            docs[d["doc_id"]] = {"url": d.get("url"), "title": d.get("title")}
+    return docs
 
+def _chunk_meta(rec, docs=None) -> dict:
+    """
+    chunks.jsonl 레코드 → metas.jsonl 한 줄 (검색에 유용한 필드만)
+    - 문장 청크: {"doc", "start", "end", "section"} → url/title 은 docs(문서 테이블)에서 조회
+    - 구조화 청크: section/name/type/year 가 청크에 바로 있음
+    - 예전 형식({"meta": 원본 레코드})도 그대로 읽음 (processor/migrate_chunks.py 로 변환 가능)
+    """
+    meta = rec.get("meta") or rec
+    doc = (docs or {}).get(rec.get("doc")) or {}
+    return {
+        "id": rec.get("id"),
+        "url": meta.get("url") or doc.get("url"),
+        "title": meta.get("title") or doc.get("title"),
+        "section": meta.get("section"),
+        "name": meta.get("name"),
+        "type": meta.get("type"),
+        "year": meta.get("year"),
+        "doc": rec.get("doc"),
+    }
+
+def _load_encoder(encoder=None):
+    """주입된 encoder가 있으면 그대로, 없으면 EMBED_MODEL_NAME 로드"""
+    if encoder is not None:
+        print(f"[DEBUG] encoder={type(encoder).__name__} (주입)")
+        return encoder
     # SentenceTransformer는 CPU/GPU 모두 지원.
     # 여기서는 배포 간단화를 위해 CPU 고정(Windows 서버 호환성↑).
     device = "cpu"
@@ -59,44 +117,50 @@ def build_faiss_index():
 
     # 1) 임베딩 모델 로드
     #    - BAAI/bge-m3 같은 멀티벡터 모델도 SentenceTransformer 호환
-    model = SentenceTransformer(EMBED_MODEL_NAME, device=device)
+    return SentenceTransformer(EMBED_MODEL_NAME, device=device)
 
-    # 2) 입력 청크 로드
-    #    - 텍스트가 비어있는 레코드는 스킵
-    #    - meta에서 검색에 유용한 필드만 추려 저장(원문 meta는 CHUNKS_PATH에 남아있음)
-    texts, metas = [], []
-    n_in, n_skip = 0, 0
-    with open(CHUNKS_PATH, encoding="utf-8") as f:
-        for line in tqdm(f, desc="임베딩 입력 로드"):
-            n_in += 1
-            rec = json.loads(line)
-            txt = (rec.get("text") or "").strip()
-            if not txt:
-                n_skip += 1
-                continue
-            meta = rec.get("meta", {}) or {}
-            texts.append(txt)
-            metas.append({
-                "id": rec.get("id"),
-                "url": meta.get("url"),
-                "title": meta.get("title"),
-                "section": meta.get("section"),
-                "name": meta.get("name"),
-                "type": meta.get("type"),
-            })
+def _length_batches(lengths, max_tokens=EMBED_BATCH_TOKENS, max_count=256):
+    """
+    토큰 길이 순으로 정렬해 (배치 내 최대 길이 × 개수) ≤ max_tokens 가 되도록 묶은 인덱스 배치 목록
+    - 비슷한 길이끼리 묶여 패딩이 줄고, 짧은 청크는 한 배치에 더 많이 들어감
+    - 길이 = n_tokens + 2(특수 토큰)
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches, cur = [], []
+    for i in order:
+        # 오름차순이므로 i 를 넣으면 배치 최대 길이 = lengths[i]
+        if cur and ((len(cur) + 1) * (lengths[i] + 2) > max_tokens or len(cur) >= max_count):
+            batches.append(cur)
+            cur = []
+        cur.append(i)
+    if cur:
+        batches.append(cur)
+    return batches
 
-    if not texts:
-        # 청크가 비었으면 이후 단계가 모두 무의미 → 즉시 실패 처리
-        raise RuntimeError(f"CHUNKS 비었음: {CHUNKS_PATH}")
+def _encode(model, texts, batch_size=BATCH_SIZE, show_progress_bar=True, lengths=None) -> np.ndarray:
+    """
+    텍스트 목록 → float32 정규화 벡터 (n, dim)
+    - normalize_embeddings=True → 각 벡터를 L2 정규화
+      코사인유사도(a·b / |a||b|) = 정규화 후 내적(a'·b')와 동일 → IndexFlatIP로 검색
+    - lengths(청크별 n_tokens, CHUNK_MODE="tokens")가 있으면 길이 버킷 배치로 인코딩(_length_batches)
+      → 결과는 입력 순서 그대로
+    """
+    if lengths is not None and len(texts) > 1:
+        batches = _length_batches(lengths)
+        if show_progress_bar:
+            print(f"[DEBUG] length-bucketed: {len(texts)}개 → 배치 {len(batches)}개 (≤{EMBED_BATCH_TOKENS} 토큰/배치)")
+        out = None
+        for batch in (tqdm(batches, desc="임베딩 배치") if show_progress_bar else batches):
+            v = _encode(model, [texts[i] for i in batch], batch_size=len(batch), show_progress_bar=False)
+            if out is None:
+                out = np.empty((len(texts), v.shape[1]), dtype=np.float32)
+            out[batch] = v
+        return out
 
-    # 3) 임베딩 계산
-    #    - normalize_embeddings=True → 각 벡터를 L2 정규화
-    #      코사인유사도(a·b / |a||b|) = 정규화 후 내적(a'·b')와 동일 → IndexFlatIP로 검색
-    print(f"[DEBUG] encode start: n={len(texts)}/{n_in} (skip={n_skip}), batch={BATCH_SIZE}, normalize=True")
     vecs = model.encode(
         texts,
-        batch_size=BATCH_SIZE,
-        show_progress_bar=True,
+        batch_size=batch_size,
+        show_progress_bar=show_progress_bar,
         convert_to_numpy=True,
         normalize_embeddings=True,   # ← 코사인 유사도를 Inner Product로 사용
     )
@@ -105,30 +169,107 @@ def build_faiss_index():
     if not isinstance(vecs, np.ndarray):
         vecs = np.asarray(vecs)
 
-    # 4) FAISS는 float32를 권장 (float16/64 사용 시 에러/성능 저하 가능)
+    # FAISS는 float32를 권장 (float16/64 사용 시 에러/성능 저하 가능)
     if vecs.dtype != np.float32:
         vecs = vecs.astype(np.float32, copy=False)
+    return vecs
 
-    print(f"[DEBUG] encode done: shape={vecs.shape}, dtype={vecs.dtype}")
-
-    # 5) FAISS 인덱스 생성/저장
-    #    - IndexFlatIP: 파라미터 없는 브루트포스 IP 인덱스(정확하지만 큰 데이터셋은 느릴 수 있음)
-    #    - 대규모로 가면 IVF/HNSW 등으로 교체 가능(학습 필요), 지금은 디버깅/정확성 우선
+def _write_index(vecs, texts, metas, index_path, texts_path, metas_path, model_tag: str) -> int:
+    """
+    FAISS 인덱스 생성/저장 + texts/metas/모델 태그 저장
+    - IndexFlatIP: 파라미터 없는 브루트포스 IP 인덱스(정확하지만 큰 데이터셋은 느릴 수 있음)
+    - 대규모로 가면 IVF/HNSW 등으로 교체 가능(학습 필요), 지금은 디버깅/정확성 우선
+    """
     dim = vecs.shape[1]
     index = faiss.IndexFlatIP(dim)
     index.add(vecs)  # 벡터 추가
-    faiss.write_index(index, str(FAISS_INDEX))
-    print(f"[DEBUG] faiss index written: {FAISS_INDEX} (ntotal={index.ntotal})")
+    faiss.write_index(index, str(index_path))
+    print(f"[DEBUG] faiss index written: {index_path} (ntotal={index.ntotal})")
 
-    # 6) texts / metas 저장
-    #    - "반드시" 벡터 순서와 동일하게 기록해야 search 시 역매핑이 맞아떨어짐.
-    _atomic_write_lines(Path(FAISS_TEXTS), (json.dumps(t, ensure_ascii=False) for t in texts))
-    _atomic_write_lines(Path(FAISS_METAS), (json.dumps(m, ensure_ascii=False) for m in metas))
+    # texts / metas 저장
+    #  - "반드시" 벡터 순서와 동일하게 기록해야 search 시 역매핑이 맞아떨어짐.
+    #  - 임시 파일에 쓴 뒤 교체(atomic) → 저장 도중 중단돼도 기존 texts/metas 가 깨지지 않음
+    write_jsonl(texts_path, texts, atomic=True)
+    write_jsonl(metas_path, metas, atomic=True)
+    _atomic_write_lines(_model_tag_path(index_path), [model_tag])
 
     print(f"✅ [임베딩] index/texts/metas 저장 완료")
-    print(f"    - index: {FAISS_INDEX}")
-    print(f"    - texts: {FAISS_TEXTS}")
-    print(f"    - metas: {FAISS_METAS}")
+    print(f"    - index: {index_path}")
+    print(f"    - texts: {texts_path}")
+    print(f"    - metas: {metas_path}")
+    return index.ntotal
+
+def build_faiss_index(chunks_path=CHUNKS_PATH, index_path=FAISS_INDEX,
+                      texts_path=FAISS_TEXTS, metas_path=FAISS_METAS, encoder=None,
+                      reuse=False, docs_path=DOCS_PATH):
+    """
+    chunks.jsonl → FAISS 인덱스 + texts/metas 저장.
+    - 경로 인자: 기본값은 config 경로 (벤치마크 등에서 별도 작업 폴더로 돌릴 때 지정)
+    - encoder: SentenceTransformer.encode()와 같은 시그니처의 객체
+               (None이면 EMBED_MODEL_NAME 로드, 벤치마크는 결정적 스텁 인코더 주입)
+    - reuse: 이전 인덱스(index_path/texts_path)에 있는 텍스트는 벡터 재사용, 새 텍스트만 인코딩
+    - docs_path: 문서 테이블(문장 청크의 url/title 조회)
+    반환: 인덱싱된 벡터 수
+    """
+    # 출력 디렉터리 준비
+    Path(index_path).parent.mkdir(parents=True, exist_ok=True)
+    model_tag = type(encoder).__name__ if encoder is not None else EMBED_MODEL_NAME
+    model = None  # 인코딩할 텍스트가 있을 때만 로드(전부 재사용이면 모델 로드 생략)
+
+    # 2) 입력 청크 로드
+    #    - 텍스트가 비어있는 레코드는 스킵
+    #    - 검색에 유용한 필드만 추려 저장(원문은 DOCS_PATH 문서 테이블에 남아있음)
+    docs = load_docs(docs_path)
+    texts, metas, ntoks = [], [], []
+    n_in, n_skip = 0, 0
+    for rec in tqdm(read_records(chunks_path), desc="임베딩 입력 로드"):
+        n_in += 1
+        txt = (rec.get("text") or "").strip()
+        if not txt:
+            n_skip += 1
+            continue
+        texts.append(txt)
+        metas.append(_chunk_meta(rec, docs))
+        ntoks.append(rec.get("n_tokens"))
+
+    if not texts:
+        # 청크가 비었으면 이후 단계가 모두 무의미 → 즉시 실패 처리
+        raise RuntimeError(f"CHUNKS 비었음: {chunks_path}")
+
+    prev = _load_previous_vectors(index_path, texts_path, model_tag) if reuse else None
+    todo = [i for i, t in enumerate(texts) if prev is None or t not in prev[1]]
+
+    if todo:
+        model = _load_encoder(encoder)
+
+    # 3) 임베딩 계산 (L2 정규화 → 내적 = 코사인 유사도)
+    print(f"[DEBUG] encode start: n={len(todo)}/{len(texts)} (skip={n_skip}, reuse={len(texts) - len(todo)}), "
+          f"batch={BATCH_SIZE}, normalize=True")
+    new_vecs = None
+    if todo:
+        # 토큰 모드 청크(n_tokens)면 길이 버킷 배치
+        lengths = [ntoks[i] for i in todo]
+        new_vecs = _encode(model, [texts[i] for i in todo],
+                           lengths=lengths if None not in lengths else None)
+
+    if prev is None:
+        vecs = new_vecs
+    else:
+        # 재사용 벡터 + 새 벡터를 texts 순서대로 배치
+        old_vecs, rows = prev
+        vecs = np.empty((len(texts), old_vecs.shape[1]), dtype=np.float32)
+        for i, t in enumerate(texts):
+            if t in rows:
+                vecs[i] = old_vecs[rows[t]]
+        if todo:
+            if new_vecs.shape[1] != vecs.shape[1]:
+                raise RuntimeError(f"임베딩 차원 불일치: 이전 {vecs.shape[1]} vs 새 {new_vecs.shape[1]}")
+            vecs[todo] = new_vecs
+
+    print(f"[DEBUG] encode done: shape={vecs.shape}, dtype={vecs.dtype}")
+
+    # 5) FAISS 인덱스 생성/저장 + 6) texts / metas 저장
+    return _write_index(vecs, texts, metas, index_path, texts_path, metas_path, model_tag)
 
 if __name__ == "__main__":
     # CLI 실행 시 예외를 stderr로도 출력하여 CI/배치 로그에서 쉽게 발견 가능
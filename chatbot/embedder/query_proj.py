@@ -0,0 +1,193 @@
+# embedder/query_proj.py
+# -----------------------------------------------------------------------------
+# 역할: 비대칭 질의 인코더 — 작은 다국어 모델 + 선형 사영(projection)으로 bge-m3 벡터 공간에 맞춤
+#   - 문서(청크)는 오프라인에서 bge-m3 로 인코딩한 인덱스 그대로, 질의만 작은 모델로 인코딩
+#     → 질의마다 568M 파라미터 forward 대신 작은 모델(~118M) + 행렬곱 한 번
+#   - 사영 W, b 는 릿지 회귀(최소제곱 + L2)로 CPU 에서 학습: small(x) @ W + b ≈ bge(x)
+#       학습 쌍 1) 인덱스 청크 — 목표 벡터는 인덱스에서 reconstruct (bge-m3 재인코딩 없음)
+#               2) 청크에서 뽑은 합성 질의(단어 구간 + 질문 템플릿) — 목표 벡터는 bge-m3 질의 인코딩
+#     합성 질의 일부는 검증용으로 떼어 두고 사영 벡터와 bge-m3 벡터의 평균 코사인을 보고
+#   - 결과는 인덱스 옆 <index>.qproj.npz (인덱스 스냅샷과 함께 배포)
+#     인덱스를 만든 모델 태그(<index>.model)를 같이 기록 → 다른 모델로 다시 만든 인덱스에는 쓰지 않음
+#   - 사용: config.QUERY_ENCODER = "projected" → rag/search.py 가 load_projected_encoder() 로 질의 인코더 교체
+#
+# 실행 (chatbot/ 에서):
+#   python -m embedder.query_proj                 # 학습 → index/faiss_ip.index.qproj.npz
+#   python -m bench.query_encoder                 # 골든 질의로 속도/recall@k 비교
+# -----------------------------------------------------------------------------
+import random, sys, time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np, faiss
+from sentence_transformers import SentenceTransformer
+
+from config import (
+    FAISS_INDEX, FAISS_TEXTS, FAISS_METAS, EMBED_MODEL_NAME, QUERY_SMALL_MODEL_NAME,
+    QUERY_PROJ_RIDGE, QUERY_PROJ_SYNTH_PER_CHUNK, QUERY_PROJ_MAX_CHUNKS,
+)
+from utils.jsonl import load_jsonl
+
+# 합성 질의 템플릿 (챗봇 로그에서 흔한 형태)
+_TEMPLATES = ("{}", "{} 알려줘", "{}에 대해 설명해줘", "{}은 뭐야?", "{} 관련 정보")
+
+def proj_path(index_path=FAISS_INDEX) -> Path:
+    return Path(str(index_path) + ".qproj.npz")
+
+def index_model_tag(index_path=FAISS_INDEX) -> str:
+    """인덱스를 만든 모델 태그(embed_faiss 가 <index>.model 에 기록, 없으면 EMBED_MODEL_NAME)"""
+    tag = Path(str(index_path) + ".model")
+    return tag.read_text(encoding="utf-8").strip() if tag.exists() else EMBED_MODEL_NAME
+
+class ProjectedEncoder:
+    """작은 모델 벡터 → 선형 사영 → (정규화) bge-m3 공간 벡터. SentenceTransformer.encode() 호환"""
+
+    def __init__(self, base, W: np.ndarray, b: np.ndarray, name: str = ""):
+        self.base = base
+        self.W = np.ascontiguousarray(W, dtype=np.float32)
+        self.b = np.asarray(b, dtype=np.float32)
+        self.name = name
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.W.shape[1]
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=False,
+               convert_to_numpy=True, normalize_embeddings=False, **_):
+        single = isinstance(sentences, str)
+        x = self.base.encode([sentences] if single else list(sentences), batch_size=batch_size,
+                             show_progress_bar=show_progress_bar, convert_to_numpy=True,
+                             normalize_embeddings=True)
+        out = np.asarray(x, dtype=np.float32) @ self.W + self.b
+        if normalize_embeddings:
+            out /= np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+        return out[0] if single else out
+
+def synthetic_queries(texts: List[str], metas: Optional[List[Dict]] = None,
+                      per_chunk: int = QUERY_PROJ_SYNTH_PER_CHUNK, seed: int = 42) -> List[str]:
+    """
+    청크 → 합성 질의 (청크당 per_chunk 개)
+    - 본문에서 2~6 단어 연속 구간을 골라 템플릿에 끼움 ("전자문서 솔루션 알려줘")
+    - 메타에 제목/이름이 있으면 그것도 질의로 사용
+    """
+    rng = random.Random(seed)
+    out, seen = [], set()
+    for i, t in enumerate(texts):
+        words = t.split()
+        if not words:
+            continue
+        cands = []
+        m = (metas[i] if metas else None) or {}
+        for key in ("name", "title"):
+            if m.get(key):
+                cands.append(rng.choice(_TEMPLATES).format(m[key]))
+        for _ in range(per_chunk):
+            n = min(len(words), rng.randint(2, 6))
+            s = rng.randrange(len(words) - n + 1)
+            cands.append(rng.choice(_TEMPLATES).format(" ".join(words[s:s + n])))
+        for q in cands[:per_chunk]:
+            if q not in seen:
+                seen.add(q)
+                out.append(q)
+    return out
+
+def fit_projection(X: np.ndarray, Y: np.ndarray, ridge: float = QUERY_PROJ_RIDGE):
+    """릿지 회귀 [X 1] @ [W; b] ≈ Y → (W, b). 정규방정식 (AᵀA + λI)θ = AᵀY (편향은 규제 안 함)"""
+    A = np.hstack([X.astype(np.float64), np.ones((len(X), 1))])
+    reg = ridge * len(X) * np.eye(A.shape[1])
+    reg[-1, -1] = 0.0
+    theta = np.linalg.solve(A.T @ A + reg, A.T @ Y.astype(np.float64))
+    return theta[:-1].astype(np.float32), theta[-1].astype(np.float32)
+
+def _cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return (a * b).sum(axis=1)
+
+def train_projection(index_path=FAISS_INDEX, texts_path=FAISS_TEXTS, metas_path=FAISS_METAS,
+                     small=None, teacher=None, small_name: str = QUERY_SMALL_MODEL_NAME,
+                     ridge: float = QUERY_PROJ_RIDGE, per_chunk: int = QUERY_PROJ_SYNTH_PER_CHUNK,
+                     max_chunks: int = QUERY_PROJ_MAX_CHUNKS, holdout: float = 0.1,
+                     out_path=None, seed: int = 42) -> Dict:
+    """
+    인덱스(청크 벡터) + 합성 질의로 사영 학습 → <index>.qproj.npz 저장
+    - small / teacher: SentenceTransformer.encode() 호환 객체 (None 이면 small_name / EMBED_MODEL_NAME 로드,
+      벤치마크/오프라인 평가는 스텁 인코더 주입)
+    반환: 학습 보고서 dict (쌍 개수, 검증 평균 코사인, 소요 시간, 저장 경로)
+    """
+    t_start = time.perf_counter()
+    index = faiss.read_index(str(index_path))
+    texts, metas = load_jsonl(texts_path), load_jsonl(metas_path)
+    if index.ntotal != len(texts):
+        raise RuntimeError(f"인덱스/텍스트 개수 불일치: {index.ntotal} vs {len(texts)}")
+    tag = index_model_tag(index_path)
+
+    rng = random.Random(seed)
+    rows = list(range(len(texts)))
+    if len(rows) > max_chunks:
+        rows = sorted(rng.sample(rows, max_chunks))
+    chunk_texts = [texts[i] for i in rows]
+    chunk_vecs = index.reconstruct_batch(np.array(rows, dtype=np.int64))
+
+    queries = synthetic_queries(chunk_texts, [metas[i] for i in rows], per_chunk=per_chunk, seed=seed)
+    rng.shuffle(queries)
+    n_val = int(len(queries) * holdout)
+    val_q, train_q = queries[:n_val], queries[n_val:]
+    print(f"[DEBUG] 사영 학습 쌍: 청크 {len(chunk_texts)}개 + 합성 질의 {len(train_q)}개 (검증 {len(val_q)}개)")
+
+    small = small if small is not None else SentenceTransformer(small_name, device="cpu")
+    if teacher is None:
+        if tag != EMBED_MODEL_NAME:
+            raise RuntimeError(f"인덱스 모델({tag})이 EMBED_MODEL_NAME({EMBED_MODEL_NAME})과 다름 → teacher 를 지정")
+        teacher = SentenceTransformer(EMBED_MODEL_NAME, device="cpu")
+    enc = dict(batch_size=32, show_progress_bar=False, convert_to_numpy=True, normalize_embeddings=True)
+
+    # 목표(bge-m3) 벡터: 청크는 인덱스에서, 질의는 teacher 인코딩 (오프라인 1회)
+    Y = np.vstack([chunk_vecs, teacher.encode(train_q, **enc)]).astype(np.float32)
+    X = np.asarray(small.encode(chunk_texts + train_q, **enc), dtype=np.float32)
+    W, b = fit_projection(X, Y, ridge)
+    if W.shape[1] != index.d:
+        raise RuntimeError(f"사영 차원({W.shape[1]})이 인덱스 차원({index.d})과 다름")
+
+    report = {"pairs": len(X), "chunks": len(chunk_texts), "queries": len(train_q),
+              "small_dim": int(X.shape[1]), "dim": int(index.d), "ridge": ridge,
+              "train_cosine": round(float(_cosine_rows(X @ W + b, Y).mean()), 4)}
+    if val_q:
+        pv = np.asarray(small.encode(val_q, **enc), dtype=np.float32) @ W + b
+        report["val_queries"] = len(val_q)
+        report["val_cosine"] = round(float(_cosine_rows(pv, teacher.encode(val_q, **enc)).mean()), 4)
+
+    out = Path(out_path) if out_path else proj_path(index_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(out.name + ".tmp.npz")
+    np.savez(tmp, W=W, b=b, small_model=np.array(small_name), index_model=np.array(tag),
+             ntotal=np.array(index.ntotal))
+    tmp.replace(out)
+    report.update(path=str(out), seconds=round(time.perf_counter() - t_start, 2))
+    print(f"✔️ [사영] {out} 저장 — 학습 코사인 {report['train_cosine']}, 검증 코사인 {report.get('val_cosine')}")
+    return report
+
+def load_projected_encoder(index_path=FAISS_INDEX, base=None) -> ProjectedEncoder:
+    """
+    <index>.qproj.npz → ProjectedEncoder
+    - 파일이 없거나 인덱스 모델 태그가 학습 때와 다르면 RuntimeError (호출자가 full 로 대체)
+    - base: 작은 모델 주입(None 이면 학습 때 기록한 모델 이름으로 로드)
+    """
+    path = proj_path(index_path)
+    if not path.exists():
+        raise RuntimeError(f"질의 사영 파일 없음: {path} (python -m embedder.query_proj 로 학습)")
+    with np.load(path) as z:
+        W, b = z["W"], z["b"]
+        small_name, trained_on = str(z["small_model"]), str(z["index_model"])
+    tag = index_model_tag(index_path)
+    if trained_on != tag:
+        raise RuntimeError(f"사영 학습 인덱스 모델({trained_on})과 현재 인덱스 모델({tag})이 다름: {path}")
+    if base is None:
+        base = SentenceTransformer(small_name, device="cpu")
+    return ProjectedEncoder(base, W, b, name=small_name)
+
+if __name__ == "__main__":
+    try:
+        train_projection()
+    except Exception as e:
+        print(f"[ERROR] train_projection 실패: {e}", file=sys.stderr)
+        sys.exit(1)
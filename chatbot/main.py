@@ -1,41 +1,74 @@
 # main.py
 import argparse, sys
-import requests
-from crawler.web_crawler import crawl_all
-from processor.cleaner import build_clean
-from processor.chunker import build_chunks
-from embedder.embed_faiss import build_faiss_index
 from rag.search import rag_answer as _rag_answer
+from pipeline.dag import Pipeline, default_stages, streaming_stages
+from config import PIPELINE_STREAMING, CHUNK_MODE, PREPROCESS_WORKERS, OLLAMA_HEALTH_TIMEOUT
+from utils.health import ollama_monitor
 
-def ollama_alive(url="http://localhost:11434/api/tags", timeout=2):
-    try:
-        r = requests.get(url, timeout=timeout)
-        return r.status_code == 200
-    except Exception:
-        return False
+def ollama_alive():
+    # 백그라운드 점검 + 서킷 브레이커(utils/health.py)의 캐시된 상태 → 질문마다 HTTP 요청/타임아웃 대기 없음
+    return ollama_monitor().available()
 
 def rag_answer(query, top_k=5, prefer_generate=True):
-    # prefer_generate=True 이지만, Ollama 안 떠있으면 generate=False로 자동 우회
+    # prefer_generate=True 이지만, Ollama 안 떠있으면(서킷 open) generate=False로 자동 우회
     gen_ok = prefer_generate and ollama_alive()
     return _rag_answer(query, top_k=top_k, generate=gen_ok)
 
-def run_all():
-    crawl_all()
-    build_clean()
-    build_chunks()
-    build_faiss_index()
-    print("✔️ 전체 파이프라인 완료!\n")
+def run_all(full=False, crawl_mode=None, stream=PIPELINE_STREAMING, rebuild=False, recrawl=False,
+            chunk_mode=CHUNK_MODE, workers=PREPROCESS_WORKERS):
+    """
+    증분 파이프라인 (pipeline/dag.py): 입력/코드/설정 지문이 그대로인 단계는 건너뜀
+    → 인덱스가 최신이면 크롤/임베딩 없이 바로 시작 (크롤은 PIPELINE_CRAWL_MAX_AGE 가 지나면 다시)
+    - full: 크롤 상태/벡터 재사용 없이 전부 다시 (추출 로직·임베딩 모델 변경 시)
+    - rebuild: 모든 단계 다시 실행 / recrawl: 크롤만 강제(결과가 같으면 하류는 건너뜀)
+    - chunk_mode: "chars"(글자 수 기준) / "tokens"(임베딩 토크나이저 기준 + 길이 버킷 임베딩)
+    - workers: 일괄 모드 정제/청크 프로세스 수 (1: 직렬, 0: CPU 코어 수 — 출력은 같음)
+    """
+    rebuild = rebuild or full
+    force = {"crawl"} if recrawl else set()
+    if stream:
+        # 크롤/정제/청크/임베딩을 큐로 연결해 한 번에 실행 (pipeline/stream.py) → 단계별 지문만 기록
+        pipe = Pipeline(streaming_stages(full, crawl_mode, chunk_mode=chunk_mode))
+        stale = {name: why for name, why in pipe.status().items() if why}
+        if not (rebuild or force or stale):
+            print("✔️ 인덱스 최신 → 파이프라인 생략 (기존 인덱스 사용)\n")
+            return
+        from pipeline.stream import run_streaming
+        run_streaming(full=full, crawl_mode=crawl_mode, chunk_mode=chunk_mode)
+        pipe.mark_done(*(st.name for st in pipe.stages))
+        print("✔️ 전체 파이프라인 완료! (스트리밍)\n")
+        return
+
+    result = Pipeline(default_stages(full, crawl_mode, chunk_mode=chunk_mode, workers=workers)).run(force=force, rebuild=rebuild)
+    if "ran" not in result.values():
+        print("✔️ 인덱스 최신 → 파이프라인 생략 (기존 인덱스 사용)\n")
+    else:
+        print("✔️ 전체 파이프라인 완료!\n")
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--no-gen", action="store_true", help="생성 비활성화(Ollama 미사용)")
     ap.add_argument("--topk", type=int, default=5)
+    ap.add_argument("--full", action="store_true", help="크롤 상태/벡터 재사용 없이 전체 재수집·재인덱싱")
+    ap.add_argument("--rebuild", action="store_true", help="지문이 같아도 모든 단계 다시 실행")
+    ap.add_argument("--recrawl", action="store_true", help="크롤 주기 전이라도 지금 다시 크롤")
+    ap.add_argument("--crawl-mode", choices=["live", "record", "replay"], default=None,
+                    help="크롤 모드(기본: config.CRAWL_MODE). replay = 아카이브에서 오프라인 재생")
+    ap.add_argument("--stream", action="store_true", default=PIPELINE_STREAMING,
+                    help="크롤→정제→청크→임베딩을 단계별 큐로 연결해 동시에 실행")
+    ap.add_argument("--chunk-mode", choices=["chars", "tokens"], default=CHUNK_MODE,
+                    help="청크 길이 기준: 글자 수 / 임베딩 모델 토큰 수")
+    ap.add_argument("--workers", type=int, default=PREPROCESS_WORKERS,
+                    help="정제/청크 프로세스 수 (1: 직렬, 0: CPU 코어 수)")
     args = ap.parse_args()
 
-    run_all()
+    run_all(full=args.full, crawl_mode=args.crawl_mode, stream=args.stream,
+            rebuild=args.rebuild, recrawl=args.recrawl, chunk_mode=args.chunk_mode,
+            workers=args.workers)
 
     prefer_generate = not args.no_gen
-    if prefer_generate and not ollama_alive():
+    # 첫 점검 결과까지만 기다림(시작 시 1회) — 이후 질문은 캐시된 상태 사용
+    if prefer_generate and not ollama_monitor().wait_ready(OLLAMA_HEALTH_TIMEOUT + 0.5):
         print(" Ollama가 감지되지 않아 생성 없이 스니펫만 반환합니다. (--no-gen 동일)")
 
     while True:
@@ -46,5 +79,5 @@ if __name__ == "__main__":
             break
         if q.strip().lower() in ("exit", "quit", "q"):
             break
-        ans = rag_answer(q, top_k=args.topk)
+        ans = rag_answer(q, top_k=args.topk, prefer_generate=prefer_generate)
         print("\n[답변]\n", ans)
@@ -0,0 +1,239 @@
+"""
+증분 파이프라인 실행기: crawl → clean → dedup → chunk → embed 를 작은 DAG로 실행.
+
+각 단계는 실행 후 지문(fingerprint)을 남긴다:
+  sha1(입력 파일 내용 + 단계 코드(소스 파일) + 설정값(target_chars/overlap/모델 등))
+- 지난 실행 지문과 같고 출력 파일도 그대로(해시 동일)면 건너뜀
+- 상류 단계가 다시 실행돼도 출력 내용이 같으면(예: 크롤 결과 변화 없음) 하류는 건너뜀
+- 크롤처럼 입력이 외부(사이트)인 단계는 max_age(초)가 지나면 다시 실행
+- 실패한 단계는 기록하지 않음 → 다음 실행에서 그 단계부터 다시
+- 기록 파일: PIPELINE_STATE_PATH {단계: {fingerprint, outputs: {경로: sha1}, finished_at}}
+
+사용:
+  pipe = Pipeline(default_stages())
+  pipe.status()               # {단계: 다시 실행할 이유 또는 None(최신)} — 실행 없이 확인
+  pipe.run(force={"crawl"})   # 바뀌었거나 오래된 단계만 실행
+"""
+import hashlib, json, os, time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import (
+    BASE_DIR, RAW_PATH, CLEAN_PATH, DEDUP_PATH, CHUNKS_PATH, DOCS_PATH, FAISS_INDEX, FAISS_TEXTS, FAISS_METAS,
+    PIPELINE_STATE_PATH, PIPELINE_CRAWL_MAX_AGE, CHUNK_TARGET_CHARS, CHUNK_OVERLAP,
+    EMBED_MODEL_NAME, CRAWL_MODE, CRAWL_SEEDS, CRAWL_USE_SITEMAP, CRAWL_MAX_PAGES, CRAWL_MAX_DEPTH,
+    HTML_PARSER, HTML_PARTIAL_PARSE, DEDUP_ENABLED, DEDUP_JACCARD, DEDUP_SHINGLE, DEDUP_MIN_SPAN,
+    DEDUP_NUM_PERM, DEDUP_BANDS, CHUNK_MODE, CHUNK_TARGET_TOKENS, CHUNK_OVERLAP_TOKENS, PREPROCESS_WORKERS,
+)
+
+# (경로, 크기, mtime) → sha1. 한 번의 실행에서 같은 파일을 여러 단계가 볼 때 다시 읽지 않음
+_HASH_CACHE: Dict[Tuple[str, int, int], str] = {}
+
+def file_sha1(path) -> Optional[str]:
+    """파일 내용 sha1 (없으면 None)"""
+    p = Path(path)
+    try:
+        st = p.stat()
+    except FileNotFoundError:
+        return None
+    key = (str(p.resolve()), st.st_size, st.st_mtime_ns)
+    if key not in _HASH_CACHE:
+        h = hashlib.sha1()
+        with open(p, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        _HASH_CACHE[key] = h.hexdigest()
+    return _HASH_CACHE[key]
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[], object]
+    inputs: List[Path] = field(default_factory=list)    # 내용이 바뀌면 다시 실행
+    outputs: List[Path] = field(default_factory=list)   # 없어지거나 바뀌면 다시 실행
+    deps: List[str] = field(default_factory=list)       # 먼저 실행돼야 하는 단계
+    code: List[str] = field(default_factory=list)       # 단계 코드(BASE_DIR 기준 소스 경로)
+    params: Dict = field(default_factory=dict)          # 결과에 영향을 주는 설정값
+    max_age: Optional[float] = None                     # 초. 지나면 다시 실행(외부 입력 단계)
+
+class Pipeline:
+    def __init__(self, stages: Iterable[Stage], state_path: Path = PIPELINE_STATE_PATH):
+        self.stages: List[Stage] = []
+        names = set()
+        for st in stages:
+            missing = [d for d in st.deps if d not in names]
+            if missing:
+                raise ValueError(f"단계 {st.name}: 앞에 정의되지 않은 의존 단계 {missing}")
+            names.add(st.name)
+            self.stages.append(st)
+        self.state_path = Path(state_path)
+        self.state: Dict[str, Dict] = {}
+        if self.state_path.exists():
+            with open(self.state_path, encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    def _stage(self, name: str) -> Stage:
+        return next(st for st in self.stages if st.name == name)
+
+    def fingerprint(self, st: Stage) -> str:
+        payload = {
+            "inputs": {str(p): file_sha1(p) for p in st.inputs},
+            "code": {c: file_sha1(BASE_DIR / c) for c in st.code},
+            "params": st.params,
+        }
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def stale_reason(self, st: Stage) -> Optional[str]:
+        """다시 실행해야 하는 이유 (최신이면 None). 상류 단계는 이미 최신이라고 가정"""
+        rec = self.state.get(st.name)
+        if rec is None:
+            return "실행 기록 없음"
+        if rec.get("fingerprint") != self.fingerprint(st):
+            return "입력/코드/설정 변경"
+        for path, digest in (rec.get("outputs") or {}).items():
+            if file_sha1(path) != digest:
+                return f"출력 없음/변경 ({Path(path).name})"
+        if st.max_age is not None:
+            age = time.time() - rec.get("finished_ts", 0)
+            if age > st.max_age:
+                return f"마지막 실행 후 {age / 3600:.1f}시간 경과"
+        return None
+
+    def status(self) -> Dict[str, Optional[str]]:
+        """{단계: 다시 실행할 이유 또는 None} — 상류가 다시 돌아야 하면 하류도 '대기'로 표시"""
+        out: Dict[str, Optional[str]] = {}
+        for st in self.stages:
+            reason = self.stale_reason(st)
+            up = [d for d in st.deps if out.get(d)]
+            if reason is None and up:
+                reason = f"상류 단계 재실행 후 확인 ({', '.join(up)})"
+            out[st.name] = reason
+        return out
+
+    def is_fresh(self) -> bool:
+        return not any(self.status().values())
+
+    def mark_done(self, *names: str):
+        for name in names:
+            st = self._stage(name)
+            self.state[name] = {
+                "fingerprint": self.fingerprint(st),
+                "outputs": {str(p): file_sha1(p) for p in st.outputs},
+                "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "finished_ts": time.time(),
+            }
+        self._save()
+
+    def _save(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(self.state_path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.state_path)
+
+    def run(self, force: Iterable[str] = (), rebuild: bool = False) -> Dict[str, str]:
+        """
+        정의 순서(의존 순서)대로 실행. 지문은 상류가 끝난 뒤의 입력으로 계산.
+        - force: 최신이어도 실행할 단계 이름들 / rebuild: 전부 실행
+        반환: {단계: "ran" | "skipped"}
+        """
+        force = set(force)
+        result = {}
+        for st in self.stages:
+            reason = "강제 실행" if rebuild or st.name in force else self.stale_reason(st)
+            if reason is None:
+                print(f"[DEBUG] 파이프라인 {st.name}: 최신 → 건너뜀")
+                result[st.name] = "skipped"
+                continue
+            print(f"▶ [파이프라인] {st.name} 실행 ({reason})")
+            t0 = time.perf_counter()
+            st.fn()
+            self.mark_done(st.name)
+            print(f"[DEBUG] 파이프라인 {st.name}: {time.perf_counter() - t0:.1f}s")
+            result[st.name] = "ran"
+        return result
+
+# --- 단계 정의 ---------------------------------------------------------------
+_CRAWL_CODE = ["crawler/web_crawler.py", "crawler/engine.py", "crawler/frontier.py",
+               "crawler/state.py", "crawler/archive.py", "crawler/html_parser.py", "utils/text_utils.py"]
+
+def default_stages(full: bool = False, crawl_mode: Optional[str] = None,
+                   target_chars: int = CHUNK_TARGET_CHARS, overlap: int = CHUNK_OVERLAP,
+                   chunk_mode: str = CHUNK_MODE, workers: int = PREPROCESS_WORKERS) -> List[Stage]:
+    """
+    run_all 일괄 모드의 단계 그래프.
+    - full: 크롤 상태(조건부 GET)/이전 벡터 재사용 없이 실행 (지문과는 무관, 실행 방식만)
+    - DEDUP_ENABLED=False 면 dedup 단계 없이 clean → chunk
+    - chunk_mode: "chars" / "tokens" (토큰 모드는 토크나이저(EMBED_MODEL_NAME)도 지문에 포함)
+    - workers: 정제/청크 프로세스 수 (출력이 직렬과 같으므로 지문에는 넣지 않음)
+    """
+    def crawl():
+        from crawler.web_crawler import crawl_all
+        crawl_all(full=full, mode=crawl_mode)
+
+    def clean():
+        from processor.cleaner import build_clean
+        build_clean(workers=workers)
+
+    def dedup():
+        from processor.dedup import build_dedup
+        build_dedup(target_chars=target_chars, overlap=overlap)
+
+    def chunk():
+        from processor.chunker import build_chunks
+        build_chunks(target_chars, overlap, text_path=DEDUP_PATH if DEDUP_ENABLED else None, mode=chunk_mode,
+                     workers=workers)
+
+    def embed():
+        from embedder.embed_faiss import build_faiss_index
+        build_faiss_index(reuse=not full)
+
+    stages = [
+        Stage("crawl", crawl, outputs=[RAW_PATH], code=_CRAWL_CODE,
+              params={"seeds": CRAWL_SEEDS, "sitemap": CRAWL_USE_SITEMAP, "max_pages": CRAWL_MAX_PAGES,
+                      "max_depth": CRAWL_MAX_DEPTH, "parser": HTML_PARSER, "partial": HTML_PARTIAL_PARSE,
+                      "mode": crawl_mode or CRAWL_MODE},
+              max_age=PIPELINE_CRAWL_MAX_AGE),
+        Stage("clean", clean, inputs=[RAW_PATH], outputs=[CLEAN_PATH], deps=["crawl"],
+              code=["processor/cleaner.py", "processor/shards.py", "utils/text_utils.py"]),
+    ]
+    chunk_inputs = [CLEAN_PATH]
+    if DEDUP_ENABLED:
+        stages.append(Stage("dedup", dedup, inputs=[CLEAN_PATH], outputs=[DEDUP_PATH], deps=["clean"],
+                            code=["processor/dedup.py", "processor/chunker.py"],
+                            params={"jaccard": DEDUP_JACCARD, "shingle": DEDUP_SHINGLE, "min_span": DEDUP_MIN_SPAN,
+                                    "num_perm": DEDUP_NUM_PERM, "bands": DEDUP_BANDS}))
+        chunk_inputs.append(DEDUP_PATH)
+    chunk_params = {"target_chars": target_chars, "overlap": overlap, "dedup": DEDUP_ENABLED}
+    if chunk_mode != "chars":
+        chunk_params.update(mode=chunk_mode, target_tokens=CHUNK_TARGET_TOKENS,
+                            overlap_tokens=CHUNK_OVERLAP_TOKENS, tokenizer=EMBED_MODEL_NAME)
+    stages += [
+        Stage("chunk", chunk, inputs=chunk_inputs, outputs=[CHUNKS_PATH, DOCS_PATH],
+              deps=["dedup" if DEDUP_ENABLED else "clean"],
+              code=["processor/chunker.py", "processor/tokens.py", "processor/shards.py", "utils/text_utils.py"],
+              params=chunk_params),
+        Stage("embed", embed, inputs=[CHUNKS_PATH, DOCS_PATH], outputs=[FAISS_INDEX, FAISS_TEXTS, FAISS_METAS],
+              deps=["chunk"], code=["embedder/embed_faiss.py"], params={"model": EMBED_MODEL_NAME}),
+    ]
+    return stages
+
+def streaming_stages(full: bool = False, crawl_mode: Optional[str] = None,
+                     target_chars: int = CHUNK_TARGET_CHARS, overlap: int = CHUNK_OVERLAP,
+                     chunk_mode: str = CHUNK_MODE) -> List[Stage]:
+    """
+    스트리밍 모드(pipeline/stream.py)용 그래프 — 실행은 한 번에(run_streaming), 지문만 단계별로 기록.
+    산출물 순서/중복 제거 방식이 일괄 모드와 달라 params 에 stream=True 를 넣어 서로 구분
+    (모드를 바꾸면 정제 이후 단계가 다시 실행됨)
+    """
+    stages = [st for st in default_stages(full, crawl_mode, target_chars, overlap, chunk_mode)
+              if st.name != "dedup"]
+    for st in stages:
+        if st.name == "chunk":
+            st.inputs, st.deps = [CLEAN_PATH], ["clean"]
+        if st.name != "crawl":
+            st.params = dict(st.params, stream=True)
+            st.code = st.code + ["pipeline/stream.py"]
+    return stages
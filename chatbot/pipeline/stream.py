@@ -0,0 +1,292 @@
+"""
+스트리밍 파이프라인: 크롤 → 정제 → 청크 → 배치 임베딩 → FAISS 를 동시에 실행.
+
+일괄 모드(run_all)는 raw.jsonl → clean.jsonl → chunks.jsonl → 인덱스를 단계별로 끝까지 만든 뒤
+다음 단계로 넘어간다. 스트리밍 모드는 단계마다 스레드를 띄우고 크기 제한 큐로 연결해
+네트워크 수집(asyncio), 정제/청크(정규식 CPU 작업), 모델 추론이 겹쳐서 진행된다.
+
+구성:
+  [crawl] ─pages→ [clean] ─records→ [chunk] ─chunks→ [embed(호출 스레드)]
+- 큐(STREAM_QUEUE_SIZE)가 가득 차면 put 이 대기 → 하류가 느리면 상류(크롤 워커까지) 자동으로 늦춰짐
+  (큐별 put 대기 시간을 backpressure 로 합산해 출력)
+- 한 단계에서 예외가 나면 나머지 단계도 멈추고 그 예외를 다시 던짐(기존 인덱스 파일은 그대로)
+- 임베딩 모델은 전체 재구축(재사용할 이전 벡터 없음)이면 시작과 동시에 별도 스레드에서 로드
+
+중간 파일(디버깅용 부산물):
+- raw.jsonl / crawl_state.json : 크롤이 끝난 뒤 crawl_all 이 일괄 모드와 같은 순서로 저장
+- clean.jsonl / chunks.jsonl / docs.jsonl : 도착 순서대로 기록 (DATA_FORMAT="arrow" 면 .arrow — utils/dataset.py)
+- 구조화 청크(info/연혁/솔루션/비즈니스)는 전체 레코드를 봐야 확정되므로 정제가 끝난 뒤 추가되어 마지막에 흐름
+  (정보 추출 자체는 레코드가 도착할 때마다 InfoExtractor 로 진행, clean.jsonl 을 다시 읽지 않음)
+
+일괄 모드와의 차이:
+- 레코드/청크 순서가 페이지 도착 순서 → 문장 청크 id(제목_번호)의 번호가 일괄 모드와 다를 수 있음
+- 중복 제거는 레코드 단위 근접 중복(MinHash LSH)만 도착 순서로 적용
+  (블록 포함 제거는 전체 레코드를 길이순으로 봐야 하므로 일괄 모드 build_dedup 에서만)
+- 바뀐 페이지가 없어도 후속 단계를 생략하지 않음(이전 인덱스 벡터 재사용으로 인코딩만 생략)
+"""
+import asyncio, queue, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import (
+    CLEAN_PATH, CHUNKS_PATH, DOCS_PATH, FAISS_INDEX, FAISS_TEXTS, FAISS_METAS, EMBED_MODEL_NAME,
+    DEDUP_ENABLED, DEDUP_SHINGLE, STREAM_QUEUE_SIZE, STREAM_EMBED_BATCH, CHUNK_TARGET_CHARS, CHUNK_OVERLAP,
+    CHUNK_MODE,
+)
+from crawler.web_crawler import crawl_all
+from utils.dataset import open_writer
+from utils.records import CleanRecord, DocRecord, ChunkRecord
+from processor.cleaner import clean_record
+from processor.chunker import InfoExtractor, _is_nav_noise, record_chunks, append_structured_chunks
+from processor.dedup import MinHashLSH, _shingles
+from embedder.embed_faiss import (
+    _chunk_meta, _load_encoder, _encode, _load_previous_vectors, _write_index,
+)
+from utils.file_utils import ensure_dir
+
+_DONE = object()
+
+class _Aborted(Exception):
+    """다른 단계가 실패해 중단됨"""
+
+class Pipe:
+    """
+    단계 사이 크기 제한 큐 + 통계.
+    - put/iter 는 다른 단계가 실패하면(abort) _Aborted 로 빠져나옴 → 스레드가 영원히 막히지 않음
+    - items: 통과 개수, blocked: put 대기 누적(초), peak: 최대 적재 수
+    """
+
+    def __init__(self, name: str, abort: threading.Event, maxsize: int = STREAM_QUEUE_SIZE):
+        self.name, self.abort, self.maxsize = name, abort, maxsize
+        self.q = queue.Queue(maxsize)
+        self.items, self.blocked, self.peak = 0, 0.0, 0
+
+    def put(self, item):
+        t0 = time.perf_counter()
+        while True:
+            if self.abort.is_set():
+                raise _Aborted(self.name)
+            try:
+                self.q.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self.blocked += time.perf_counter() - t0
+        if item is not _DONE:
+            self.items += 1
+            self.peak = max(self.peak, self.q.qsize())
+
+    def close(self):
+        self.put(_DONE)
+
+    def __iter__(self):
+        while True:
+            try:
+                item = self.q.get(timeout=0.1)
+            except queue.Empty:
+                if self.abort.is_set():
+                    raise _Aborted(self.name)
+                continue
+            if item is _DONE:
+                return
+            yield item
+
+def _start(name: str, fn, errors: List, abort: threading.Event) -> threading.Thread:
+    def _run():
+        try:
+            fn()
+        except _Aborted:
+            pass
+        except BaseException as e:
+            errors.append((name, e))
+            abort.set()
+    t = threading.Thread(target=_run, name=f"stream-{name}", daemon=True)
+    t.start()
+    return t
+
+# --- 단계 -------------------------------------------------------------------
+def _crawl_stage(out: Pipe, full: bool, crawl_mode: Optional[str], result: Dict):
+    bodies = set()
+
+    async def on_page(url, depth, res):
+        # 별칭 URL 등으로 같은 본문이 다시 오면 먼저 도착한 페이지만 사용
+        if res.sha1 is not None:
+            if res.sha1 in bodies:
+                return
+            bodies.add(res.sha1)
+        recs = (res.records or {}).get("records") or []
+        if recs:
+            # 큐가 가득 차면 이 크롤 워커만 대기(이벤트 루프는 막지 않음)
+            await asyncio.to_thread(out.put, recs)
+
+    result["changed"] = crawl_all(full=full, mode=crawl_mode, on_page=on_page)
+    out.close()
+
+def _clean_stage(inp: Pipe, out: Pipe, clean_path: Path):
+    ensure_dir(Path(clean_path).parent)
+    with open_writer(clean_path, record=CleanRecord) as w:
+        for recs in inp:
+            for rec in recs:
+                rec = clean_record(dict(rec))
+                if rec is None:
+                    continue
+                w.write(rec)
+                out.put(rec)
+    out.close()
+
+def _chunk_stage(inp: Pipe, out: Pipe, clean_path: Path, chunks_path: Path, docs_path: Path,
+                 docs: Dict, target_chars: int, overlap: int, chunk_mode: str, stats: Dict):
+    """
+    docs: 임베딩 단계와 공유하는 {doc_id: {url, title}} — 청크를 큐에 넣기 전에 채움
+    chunk_mode: "tokens" 면 토큰 기준 윈도우 + n_tokens (CHUNK_TARGET_TOKENS/CHUNK_OVERLAP_TOKENS)
+    """
+    counter = None
+    if chunk_mode == "tokens":
+        from processor.tokens import TokenCounter
+        counter = TokenCounter()
+    lsh = MinHashLSH() if DEDUP_ENABLED else None
+    extractor = InfoExtractor()   # 구조화 정보도 도착하는 레코드에서 바로 수집(clean.jsonl 재읽기 없음)
+    idx, n = 0, 0
+    ensure_dir(Path(chunks_path).parent)
+    with open_writer(chunks_path, record=ChunkRecord) as w, open_writer(docs_path, record=DocRecord) as dw:
+        for rec in inp:
+            n += 1
+            extractor.feed(rec)
+            # 네비/푸터 등 노이즈는 통째로 건너뜀
+            if _is_nav_noise(rec.get("title", ""), rec.get("content", "")):
+                continue
+            if lsh is not None:
+                hashes = _shingles((rec.get("content") or "").split(), DEDUP_SHINGLE)
+                if hashes and lsh.query_insert(str(n), hashes) is not None:
+                    stats["near_dup_dropped"] += 1
+                    continue
+            doc, chunks, idx = record_chunks(rec, idx, target_chars, overlap, counter)
+            if chunks and doc["doc_id"] not in docs:
+                docs[doc["doc_id"]] = {"url": doc.get("url"), "title": doc.get("title")}
+                dw.write(doc)
+            for c in chunks:
+                w.write(c)
+                out.put(c)
+
+        # 정제 단계가 끝난 뒤(입력 큐 종료) → 구조화 청크를 같은 파일에 이어 쓰고 그대로 흘려보냄
+        rows = append_structured_chunks(clean_path, chunks_path, info=extractor.result(), counter=counter,
+                                        writer=w)
+    for c in rows:
+        out.put(c)
+    out.close()
+
+def _embed_stage(inp: Pipe, docs: Dict, encoder, reuse: bool, index_path: Path, texts_path: Path,
+                 metas_path: Path, batch_size: int, stats: Dict) -> int:
+    model_tag = type(encoder).__name__ if encoder is not None else EMBED_MODEL_NAME
+    prev = _load_previous_vectors(index_path, texts_path, model_tag) if reuse else None
+    loader = ThreadPoolExecutor(max_workers=1)
+    # 재사용할 벡터가 없으면 어차피 전부 인코딩 → 크롤과 겹치도록 지금 로드 시작
+    model_fut = loader.submit(_load_encoder, encoder) if prev is None else None
+
+    texts, metas, ntoks = [], [], []
+    vecs: List[Optional[np.ndarray]] = []   # texts 와 같은 순서
+    pending: List[int] = []
+
+    def flush():
+        nonlocal model_fut
+        if not pending:
+            return
+        if model_fut is None:
+            model_fut = loader.submit(_load_encoder, encoder)
+        t0 = time.perf_counter()
+        lengths = [ntoks[i] for i in pending]
+        out = _encode(model_fut.result(), [texts[i] for i in pending], batch_size=batch_size,
+                      show_progress_bar=False, lengths=lengths if None not in lengths else None)
+        stats["encode_sec"] += time.perf_counter() - t0
+        for i, v in zip(pending, out):
+            vecs[i] = v
+        stats["encoded"] += len(pending)
+        pending.clear()
+
+    try:
+        for c in inp:
+            txt = (c.get("text") or "").strip()
+            if not txt:
+                continue
+            texts.append(txt)
+            metas.append(_chunk_meta(c, docs))
+            ntoks.append(c.get("n_tokens"))
+            if prev is not None and txt in prev[1]:
+                vecs.append(prev[0][prev[1][txt]])
+                stats["reused"] += 1
+            else:
+                vecs.append(None)
+                pending.append(len(texts) - 1)
+                if len(pending) >= batch_size:
+                    flush()
+        flush()
+    finally:
+        loader.shutdown(wait=False, cancel_futures=True)
+
+    if not texts:
+        raise RuntimeError("스트리밍 파이프라인: 청크가 비었음")
+    dims = {v.shape[0] for v in vecs}
+    if len(dims) != 1:
+        raise RuntimeError(f"임베딩 차원 불일치(이전 벡터 vs 새 벡터): {sorted(dims)}")
+    mat = np.vstack(vecs).astype(np.float32, copy=False)
+    return _write_index(mat, texts, metas, index_path, texts_path, metas_path, model_tag)
+
+# --- 실행 -------------------------------------------------------------------
+def run_streaming(full: bool = False, crawl_mode: Optional[str] = None, encoder=None,
+                  target_chars: int = CHUNK_TARGET_CHARS, overlap: int = CHUNK_OVERLAP,
+                  queue_size: int = STREAM_QUEUE_SIZE, batch_size: int = STREAM_EMBED_BATCH,
+                  chunk_mode: str = CHUNK_MODE,
+                  clean_path=CLEAN_PATH, chunks_path=CHUNKS_PATH, docs_path=DOCS_PATH, index_path=FAISS_INDEX,
+                  texts_path=FAISS_TEXTS, metas_path=FAISS_METAS) -> Dict:
+    """
+    크롤 → 인덱스 스트리밍 실행.
+    - full: 크롤 상태/이전 벡터 재사용 없이 전체 재구축 (run_all 과 동일)
+    - encoder: SentenceTransformer.encode()와 같은 시그니처의 객체 (None이면 EMBED_MODEL_NAME)
+    반환: 단계별 통계 dict
+    """
+    abort, errors = threading.Event(), []
+    pages, records, chunks = (Pipe(n, abort, queue_size) for n in ("pages", "records", "chunks"))
+    stats = {"near_dup_dropped": 0, "encoded": 0, "reused": 0, "encode_sec": 0.0}
+    result: Dict = {}
+    docs: Dict = {}
+
+    t0 = time.perf_counter()
+    threads = [
+        _start("crawl", lambda: _crawl_stage(pages, full, crawl_mode, result), errors, abort),
+        _start("clean", lambda: _clean_stage(pages, records, clean_path), errors, abort),
+        _start("chunk", lambda: _chunk_stage(records, chunks, clean_path, chunks_path, docs_path, docs,
+                                             target_chars, overlap, chunk_mode, stats), errors, abort),
+    ]
+    ntotal = None
+    try:
+        ntotal = _embed_stage(chunks, docs, encoder, not full, index_path, texts_path, metas_path,
+                              batch_size, stats)
+    except _Aborted:
+        pass
+    except BaseException as e:
+        errors.append(("embed", e))
+        abort.set()
+    for t in threads:
+        t.join()
+    if errors:
+        name, err = errors[0]
+        print(f"[ERROR] 스트리밍 파이프라인 {name} 단계 실패: {err}")
+        raise err
+
+    stats.update({
+        "wall_sec": round(time.perf_counter() - t0, 3),
+        "changed_pages": len(result.get("changed") or []),
+        "vectors": ntotal,
+        "queues": {p.name: {"items": p.items, "peak": p.peak, "maxsize": p.maxsize,
+                            "blocked_sec": round(p.blocked, 3)} for p in (pages, records, chunks)},
+    })
+    stats["encode_sec"] = round(stats["encode_sec"], 3)
+    print(f"✔️ [스트리밍] 크롤 → 인덱스 완료 ({stats['wall_sec']:.1f}s) - 벡터 {ntotal}개 "
+          f"(인코딩 {stats['encoded']}, 재사용 {stats['reused']}, 근접중복 제외 {stats['near_dup_dropped']})")
+    for name, q in stats["queues"].items():
+        print(f"    - {name:8s}: {q['items']}개 통과, 최대 적재 {q['peak']}/{q['maxsize']}, "
+              f"put 대기 {q['blocked_sec']:.2f}s")
+    return stats
@@ -2,6 +2,8 @@
 # -----------------------------------------------------------------------------
 # 역할: clean.jsonl(정제본)을 읽어 아래 2종류의 청크를 생성하여 chunks.jsonl로 저장
 #   1) 원본 문장 기반 청크: 길이(target_chars) 기준으로 문장 단위 슬라이딩 윈도우 청크
+#      (CHUNK_MODE="tokens" 이면 임베딩 모델 토크나이저 기준 target_tokens, 청크에 n_tokens 기록)
+#      (원본 레코드는 docs.jsonl 에 한 번만, 청크는 doc id + 문자 위치(start/end)로 참조)
 #   2) 구조화 청크: info(회사명/설립연도/대표이사/주소/연락처/비전/미션), history(연도별),
 #                  solution/business(항목별 상세), summary(목록 요약)
 #
@@ -12,16 +14,61 @@
 #   - 연락처(전화/팩스/문의메일) 등은 필드별로 탐지 후 하나의 info 레코드로 합침
 #   - 솔루션/비즈니스는 항목별 본문에서 홍보성/페이지 이동 텍스트를 제거
 #   - 요약(summary)은 UI/QA에서 빠르게 목록을 노출할 때 사용
+#   - workers > 1 이면 문장 청크를 바이트 구간 샤드(processor/shards.py)별로 프로세스 풀에서 만들고
+#     청크 id 번호는 샤드 순서대로 병합하면서 매김 → 직렬과 같은 chunks.jsonl/docs.jsonl
+#   - 입출력 형식은 경로 확장자를 따름(.jsonl / .arrow — utils/dataset.py, config.DATA_FORMAT)
 # -----------------------------------------------------------------------------
-import json, re
-from config import CLEAN_PATH, CHUNKS_PATH, DATA_DIR
+import hashlib, re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from config import (
+    CLEAN_PATH, CHUNKS_PATH, DOCS_PATH, DATA_DIR, CHUNK_TARGET_CHARS, CHUNK_OVERLAP,
+    CHUNK_MODE, CHUNK_TARGET_TOKENS, CHUNK_OVERLAP_TOKENS, PREPROCESS_WORKERS,
+)
 from utils.text_utils import clean_text
 from utils.file_utils import ensure_dir
+from utils.jsonl import dumps_bytes
+from utils.dataset import read_records, open_writer, is_arrow
+from utils.records import DocRecord, ChunkRecord
+from processor.shards import resolve_workers, shard_ranges, read_shard
 
 _PHONE_RE = re.compile(r"(0\d{1,2}[-.\s]?\d{3,4}[-.\s]?\d{4})")
 _TEL_RE   = re.compile(r"(?:T\.|Tel|전화)[:：]?\s*(0\d{1,2}[-.\s]?\d{3,4}[-.\s]?\d{4})", re.I)
 _FAX_RE   = re.compile(r"(?:F\.|팩스)[:：]?\s*(0\d{1,2}[-.\s]?\d{3,4}[-.\s]?\d{4})", re.I)
 
+# 모듈 로드 시 한 번만 컴파일 (레코드마다 패턴 문자열 → re 캐시 조회를 반복하지 않음)
+_SENT_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|[\n\r]+")
+_ADDR_TAIL_RE = re.compile(
+    r"""^(.*?)
+        (?=\s*(?:                # 다음 꼬리 직전까지 캡쳐
+             T\s*[.:]            # T. / T: / T : 
+            |Tel
+            |전화
+            |F\s*[.:]            # F. / F: / F :
+            |팩스
+            |지도\s*바로가기
+            |바로가기
+            |아이콘
+            |본사
+            |지사
+            |서울\s*지사
+            |0\d{1,2}[-.\s]?\d{3,4}[-.\s]?\d{4}   # 라벨 없는 전화번호
+        )|$)""",
+    flags=re.I | re.X,
+)
+_ADDR_LABEL_RE = re.compile(r"\s*(?:본사|지사|서울\s*지사)\s*$", re.I)
+_MULTI_SPACE_RE = re.compile(r"\s{2,}")
+_YEAR_RE = re.compile(r"((?:19|20)\d{2})")
+_YEAR_WORD_RE = re.compile(r"\b((?:19|20)\d{2})\b")
+_YEAR_HEADER_RE = re.compile(r"^\s*(?:19|20)\d{2}\s*$")
+_RANGE_HEADER_RE = re.compile(r"^\s*(?:19|20)\d{2}\s*-\s*(?:현재|(?:19|20)\d{2})\s*$")
+_HQ_ADDR_RE = re.compile(r"(대구광역시[^\n]+)")
+_SEOUL_ADDR_RE = re.compile(r"(서울[^\n]+)")
+_NAV_MENU_RE = re.compile(r"\b(COMPANY|BUSINESS|SOLUTION|RECRUIT|LOCATION)\b", re.I)
+_MORE_RE = re.compile(r"\s*더 알아보기\s*")
+_PAGE_NAV_RE = re.compile(r"\s+페이지\d+\s*")
+
 # 문장 단위 분리
 def split_sentences(text: str):
     """
@@ -31,35 +78,102 @@ def split_sentences(text: str):
     - 특수 케이스(약어 'e.g.', 'i.e.' 등)는 완벽히 처리하지 않지만,
       이후 슬라이딩 윈도우로 재결합(overlap)하여 의미 단절 완화
     """
-    return re.split(r"(?<=[.!?])\s+|[\n\r]+", text)
+    return _SENT_SPLIT_RE.split(text)
+
+def window_texts(content: str, target_chars=800, overlap=100):
+    """
+    문장 단위 슬라이딩 윈도우 → [(청크 텍스트, 마지막 잔여분 여부)]
+    - 현재 버퍼 + 다음 문장이 target_chars를 넘으면 플러시, overlap 만큼 꼬리를 남겨 다음 청크와 연결
+    - 마지막 잔여분 뒤에는 청크 번호(idx)를 올리지 않음 (기존 id 규칙 유지)
+    """
+    out = []
+    buf = ""
+    for sent in split_sentences(content):
+        if len(buf) + len(sent) > target_chars and buf:
+            out.append((buf.strip(), False))
+            buf = buf[-overlap:]
+        buf += sent + " "
+    if buf.strip():
+        out.append((buf.strip(), True))
+    return out
+
+def _shift(offs, base):
+    return tuple((a - base, b - base) for a, b in offs)
+
+def window_token_texts(content: str, counter, target_tokens=256, overlap_tokens=32):
+    """
+    토큰 기준 슬라이딩 윈도우 → [(청크 텍스트, 마지막 잔여분 여부, 토큰 수)]
+    - 문장 길이는 counter(processor/tokens.TokenCounter)로 레코드당 한 번에 토큰화해 잰다
+    - 현재 버퍼 + 다음 문장이 target_tokens를 넘으면 플러시, 마지막 overlap_tokens 토큰을 남겨 다음 청크와 연결
+      (겹침은 토큰 경계에서 자름 → 글자 기준 buf[-overlap:] 처럼 단어/음절 중간에서 끊기지 않음)
+    - target_tokens 보다 긴 문장은 토큰 경계에서 target_tokens - overlap_tokens 간격으로 나눔
+      (조각끼리 overlap_tokens 만큼 겹침 → 긴 문장 안에서도 청크 사이 문맥이 이어짐)
+    - 토큰 수는 완성된 청크 텍스트를 다시 세어 기록(문장별 합이 아닌 실제 입력 길이)
+      → 조각을 공백으로 이어 붙인 자리에서 target_tokens 보다 1~2 토큰 많을 수 있음
+    """
+    sents = [s.strip() for s in split_sentences(content)]
+    sents = [s for s in sents if s]
+    stride = max(1, target_tokens - overlap_tokens)
+    # 조각: (텍스트, 토큰 오프셋, 앞 조각과의 구분자, 앞 조각과 이미 겹치는지) — 예산보다 긴 문장은
+    # 토큰 경계에서 stride 간격으로 자른 target_tokens 길이의 조각들 (마지막 조각만 짧을 수 있음).
+    # 앞 조각이 예산을 다 채우므로 겹치는 조각은 항상 새 청크의 시작 → 구분자는 쓰이지 않음
+    pieces = []
+    for sent, offs in zip(sents, counter.offsets(sents)):
+        if len(offs) <= target_tokens:
+            pieces.append((sent, offs, " ", False))
+            continue
+        i = 0
+        while True:
+            end = min(i + target_tokens, len(offs))
+            part = offs[i:end]
+            a = 0 if i == 0 else part[0][0]
+            b = len(sent) if end == len(offs) else part[-1][1]
+            pieces.append((sent[a:b], _shift(part, a), " ", i > 0))
+            if end == len(offs):
+                break
+            i += stride
+
+    def tail(buf, k):
+        # 버퍼 끝에서 k 토큰 (조각 중간이면 토큰 시작 위치에서 자름)
+        out = []
+        for text, offs, sep, cont in reversed(buf):
+            if k <= 0:
+                break
+            if len(offs) <= k:
+                out.append((text, offs, sep, cont))
+                k -= len(offs)
+            else:
+                cut = offs[len(offs) - k][0]
+                out.append((text[cut:], _shift(offs[len(offs) - k:], cut), sep, cont))
+                k = 0
+        return out[::-1]
+
+    def join(buf):
+        return "".join((sep if i else "") + text for i, (text, _, sep, _) in enumerate(buf)).strip()
+
+    windows, buf, n = [], [], 0
+    for piece in pieces:
+        if buf and n + len(piece[1]) > target_tokens:
+            windows.append((join(buf), False))
+            # 긴 문장의 이어지는 조각은 이미 앞 조각과 겹치므로 버퍼 꼬리를 더 붙이지 않음
+            buf = [] if piece[3] else tail(buf, min(overlap_tokens, target_tokens - len(piece[1])))
+            n = sum(len(p[1]) for p in buf)
+        buf.append(piece)
+        n += len(piece[1])
+    if buf:
+        windows.append((join(buf), True))
+    counts = counter.count([t for t, _ in windows])
+    return [(t, last, c) for (t, last), c in zip(windows, counts)]
 
 def _clip_addr(line: str) -> str:
     """
     주소 뒤에 흔히 붙는 꼬리(T./T :/Tel/전화/F./F :/팩스/지도바로가기/아이콘/본사/지사/서울지사/라벨 없는 전화번호)를 만나면 그 이전까지만 남긴다.
     """
-    m = re.search(
-        r"""^(.*?)
-            (?=\s*(?:                # 다음 꼬리 직전까지 캡쳐
-                 T\s*[.:]            # T. / T: / T : 
-                |Tel
-                |전화
-                |F\s*[.:]            # F. / F: / F :
-                |팩스
-                |지도\s*바로가기
-                |바로가기
-                |아이콘
-                |본사
-                |지사
-                |서울\s*지사
-                |0\d{1,2}[-.\s]?\d{3,4}[-.\s]?\d{4}   # 라벨 없는 전화번호
-            )|$)""",
-        line,
-        flags=re.I | re.X,
-    )
+    m = _ADDR_TAIL_RE.search(line)
     base = m.group(1).strip() if m else (line or "").strip()
     # 혹시 남은 꼬리 어휘 제거
-    base = re.sub(r"\s*(?:본사|지사|서울\s*지사)\s*$", "", base, flags=re.I)
-    base = re.sub(r"\s{2,}", " ", base)
+    base = _ADDR_LABEL_RE.sub("", base)
+    base = _MULTI_SPACE_RE.sub(" ", base)
     return base
 
 def _find_earliest_year(text: str):
@@ -67,17 +181,17 @@ def _find_earliest_year(text: str):
     텍스트에서 1900~2099 사이 연도를 모두 찾고 가장 이른 연도를 반환합니다.
     HISTORY 섹션에서 '설립연도' 보정에 활용합니다.
     """
-    yrs = re.findall(r"((?:19|20)\d{2})", text)
+    yrs = _YEAR_RE.findall(text)
     return min(yrs) if yrs else None
 
 # HISTORY 파서 (연도별 블록화)
 def _is_year_header(line: str) -> bool:
     """'2021' 같은 단일 연도 헤더인지 검사"""
-    return bool(re.match(r"^\s*(?:19|20)\d{2}\s*$", line))
+    return bool(_YEAR_HEADER_RE.match(line))
 
 def _is_range_header(line: str) -> bool:
     """'2010-현재' 또는 '2000-2009' 같은 범위 헤더인지 검사"""
-    return bool(re.match(r"^\s*(?:19|20)\d{2}\s*-\s*(?:현재|(?:19|20)\d{2})\s*$", line))
+    return bool(_RANGE_HEADER_RE.match(line))
 
 def _parse_history_blocks(text: str):
     """
@@ -104,11 +218,11 @@ def _parse_history_blocks(text: str):
 
         # 단일 연도 헤더
         if _is_year_header(ln):
-            cur_year = re.search(r"((?:19|20)\d{2})", ln).group(1)
+            cur_year = _YEAR_RE.search(ln).group(1)
             continue
 
         # 본문 라인 안에 연도 포함 → 그 연도로 즉시 기록
-        m = re.search(r"\b((?:19|20)\d{2})\b", ln)
+        m = _YEAR_WORD_RE.search(ln)
         if m:
             year = m.group(1)
             out.append((year, ln))
@@ -131,152 +245,172 @@ def _extract_tel_fax(s: str):
         if m: tel = m.group(1)
     return tel, fax
 
+# --- 구조화 정보 추출 -----------------------------------------------------------
+# 같은 필드 묶음의 패턴은 이름 있는 그룹의 alternation 하나로 합쳐 본문을 한 번만 훑는다.
+# 각 패턴을 전방탐색 (?=...) 으로 감싸 폭 0 매치 → 서로 겹치는 위치의 다른 필드 매치를 먹지 않음.
+_Y = r"(?P<{g}>(?:19|20)\d{{2}})(?:[.\-/]\d{{1,2}})?\b"
+# 설립연도: 강한 시그널(s0~s3, 우선순위 순) + 약한 시그널(w0~w1)
+#   예) "1991.07 회사 설립", "법인 설립 1991" / "1991 설립", "설립 1991"
+_FOUNDING_PATS = {
+    "s0": r"\b" + _Y.format(g="s0") + r"[^\n]{0,20}?(?:회사|법인|범일정보)[^\n]{0,10}?설립",
+    "s1": r"(?:회사|법인|범일정보)[^\n]{0,10}?설립[^\n]{0,20}?\b" + _Y.format(g="s1"),
+    "s2": r"\b" + _Y.format(g="s2") + r"[^\n]{0,20}?(?:창립|법인\s*설립)",
+    "s3": r"(?:창립|법인\s*설립)[^\n]{0,20}?\b" + _Y.format(g="s3"),
+    "w0": r"\b" + _Y.format(g="w0") + r"[^\n]{0,10}?설립",
+    "w1": r"설립[^\n]{0,10}?\b" + _Y.format(g="w1"),
+}
+# 연락처(전화/팩스/문의메일) — 패턴 첫 글자가 서로 달라 같은 위치에서 두 필드가 겹치지 않음
+_PHONE = r"0\d{1,2}[-.\s]?\d{3,4}[-.\s]?\d{4}"
+_CONTACT_PATS = {
+    "대표전화": rf"(?:대표전화|전화|Tel|T\.)[:：]?\s*(?P<대표전화>{_PHONE})",
+    "팩스": rf"(?:팩스|F\.)[:：]?\s*(?P<팩스>{_PHONE})",
+    "제품문의": r"제품문의[:：]?\s*(?P<제품문의>[^\s,]+@[^\s,]+)",
+    "기술문의": r"기술문의[:：]?\s*(?P<기술문의>[^\s,]+@[^\s,]+)",
+    "개발문의": r"개발문의[:：]?\s*(?P<개발문의>[^\s,]+@[^\s,]+)",
+}
+_FOUNDING_RE = re.compile("|".join(f"(?={p})" for p in _FOUNDING_PATS.values()))
+_CONTACT_RES = {}   # 아직 못 채운 연락처 필드 조합 → 컴파일된 alternation
+
+def _contact_re(pending):
+    key = tuple(pending)
+    if key not in _CONTACT_RES:
+        _CONTACT_RES[key] = re.compile("|".join(f"(?={_CONTACT_PATS[k]})" for k in key))
+    return _CONTACT_RES[key]
+
+def _first_hits(pattern, text, wanted):
+    """
+    alternation 을 한 번 훑어 그룹별 첫 매치 {그룹명: 값} (wanted 를 다 찾으면 중단)
+    - 한 위치에서는 앞쪽 그룹만 잡히지만, 필드별 '가장 앞 위치'는 개별 re.search 와 같음
+    """
+    hits = {}
+    for m in pattern.finditer(text):
+        g = m.lastgroup
+        if g not in hits:
+            hits[g] = m.group(g)
+            if len(hits) == wanted:
+                break
+    return hits
+
+class InfoExtractor:
+    """
+    레코드를 한 건씩 feed → result() 로 info 딕셔너리 (아래 append_structured_chunks()에서 청크 레코드로 변환)
+    - build_chunks 의 문장 청크 루프/스트리밍 청크 단계가 읽은 레코드를 그대로 넘김 → clean.jsonl 을 다시 읽지 않음
+    - 이미 채운 필드는 더 이상 탐색하지 않음 (설립연도/연락처는 필드 묶음별 정규식 한 번)
+    """
+
+    def __init__(self):
+        self.info = {
+            "회사명": None,
+            "설립연도": None,     # '1991년' 형태로 저장
+            "대표이사": None,
+            "본사주소": None,
+            "지사주소": {},       # 예: {"서울지사": "서울 …"}
+            "연락처": None,        # "제품문의 xxx, 기술문의 yyy, 대표전화 02-..." 한 줄
+            "본사연락처": {"tel": None, "fax": None},
+            "지사연락처": {},
+            "비전": None,
+            "미션": None,
+            "연혁": [],           # (year, text) 튜플 리스트
+            "솔루션": [],          # [(name, body)]
+            "비즈니스": []         # [(name, body)]
+        }
+        # 연락처를 각 필드로 먼저 수집 → result()에서 한 줄로 합쳐 info["연락처"]로 저장
+        self.contact_fields = {k: None for k in _CONTACT_PATS}
+
+    def feed(self, rec):
+        info = self.info
+        title = rec.get("title", "") or ""
+        txt = rec.get("content", "") or ""
+        section = rec.get("section", "") or ""
+
+        # 회사명: 등장 여부로 간단하게 감지(사이트 특화)
+        if info["회사명"] is None and ("범일정보" in title or "범일정보" in txt):
+            info["회사명"] = "범일정보"
+
+        # (A) 설립연도 '강한 시그널' — 우선순위가 가장 높은(번호가 작은) 패턴의 첫 매치
+        #     (약한 시그널 후보도 같은 탐색에서 함께 구해 두고 (C)에서 사용)
+        weak = None
+        if info["설립연도"] is None:
+            hits = _first_hits(_FOUNDING_RE, txt, len(_FOUNDING_PATS))
+            strong = next((hits[g] for g in ("s0", "s1", "s2", "s3") if g in hits), None)
+            weak = next((hits[g] for g in ("w0", "w1") if g in hits), None)
+            if strong:
+                info["설립연도"] = f"{strong}년"
+
+        # (B) HISTORY 블록: 연혁 리스트 확장 + 최솟값으로 설립연도 보정
+        if ("연혁" in title) or ("HISTORY" in title.upper()):
+            parsed = _parse_history_blocks(txt)  # [(year, text)]
+            info["연혁"].extend(parsed)
+
+            earliest = _find_earliest_year(txt)
+            if earliest:
+                cur = (info["설립연도"] or "").rstrip("년") or "9999"
+                if earliest < cur:
+                    info["설립연도"] = f"{earliest}년"
+
+        # (C) '약한 시그널': "1991 설립", "설립 1991" 같이 단서가 짧은 경우
+        if info["설립연도"] is None and weak:
+            info["설립연도"] = f"{weak}년"
+
+        # 대표이사(사이트 특화 키워드)
+        if info["대표이사"] is None and "박영기" in txt:
+            info["대표이사"] = "박영기"
+        # --- 본사 주소 + 연락처 동시 추출 (통일본) ---
+        if info["본사주소"] is None and "대구광역시" in txt:
+            # 쉼표 제한([^\n,]+) 제거 → 라인 끝까지 먼저 잡고 _clip_addr로 꼬리 컷
+            m = _HQ_ADDR_RE.search(txt)
+            if m:
+                info["본사주소"] = _clip_addr(m.group(1))  # 주소만
+                # 같은 블록에서 tel/fax도 최대한 추출
+                tel, fax = _extract_tel_fax(txt)
+                if tel: info["본사연락처"]["tel"] = tel
+                if fax: info["본사연락처"]["fax"] = fax
+
+        # --- 서울지사 주소 + 연락처 동시 추출 ---
+        if "서울지사" in txt or "서울 지사" in txt or "서울지사" in title:
+            m = _SEOUL_ADDR_RE.search(txt)
+            if m:
+                info["지사주소"]["서울지사"] = _clip_addr(m.group(1))  # ← 여기서 강력 컷오프
+                # tel/fax도 같은 블록에서 추출 (지사연락처 저장)
+                tel, fax = _extract_tel_fax(txt)
+                info["지사연락처"].setdefault("서울지사", {"tel": None, "fax": None})
+                if tel: info["지사연락처"]["서울지사"]["tel"] = tel
+                if fax: info["지사연락처"]["서울지사"]["fax"] = fax
+
+        # 연락처(전화/팩스) + 문의 메일(제품/기술/개발): 비어 있는 필드만 한 번에 탐색
+        pending = [k for k, v in self.contact_fields.items() if v is None]
+        if pending:
+            self.contact_fields.update(_first_hits(_contact_re(pending), txt, len(pending)))
+
+        # 비전/미션: 제목 신호가 가장 정확함(본문 키워드는 중복/잡음 가능)
+        if not info["비전"] and ("비전" in title or "VISION" in title.upper()):
+            info["비전"] = txt.strip()
+        if not info["미션"] and ("미션" in title or "MISSION" in title.upper()):
+            info["미션"] = txt.strip()
+
+        # 솔루션/비즈니스 항목 수집
+        if section == "solution" and title and txt:
+            info["솔루션"].append((title.strip(), txt.strip()))
+        if section == "business" and title and txt:
+            info["비즈니스"].append((title.strip(), txt.strip()))
+
+    def result(self):
+        # 연락처 통합 문자열 생성(필드가 있는 것만 순서대로 연결)
+        cf = self.contact_fields
+        contact_answer = [f"{k} {cf[k]}" for k in ("제품문의", "기술문의", "개발문의", "대표전화", "팩스") if cf[k]]
+        self.info["연락처"] = ", ".join(contact_answer) if contact_answer else None
+        return self.info
+
 # 정보 추출 (clean.jsonl → 사전)
 def extract_info_chunks(clean_path):
     """
-    clean.jsonl을 훑으며 구조화 가능한 정보들을 모읍니다.
-    반환: info 딕셔너리 (아래 build_chunks()에서 실제 청크 레코드로 변환)
+    clean.jsonl을 훑으며 구조화 가능한 정보들을 모읍니다. (파일만 따로 처리할 때 — 벤치마크 등)
+    반환: info 딕셔너리
     """
-    info = {
-        "회사명": None,
-        "설립연도": None,     # '1991년' 형태로 저장
-        "대표이사": None,
-        "본사주소": None,
-        "지사주소": {},       # 예: {"서울지사": "서울 …"}
-        "연락처": None,        # "제품문의 xxx, 기술문의 yyy, 대표전화 02-..." 한 줄
-        "본사연락처": {"tel": None, "fax": None},   
-        "지사연락처": {},                            
-        "미션": None,
-        "연혁": [],           # (year, text) 튜플 리스트
-        "솔루션": [],          # [(name, body)]
-        "비즈니스": []         # [(name, body)]
-    }
-
-    # 연락처를 각 필드로 먼저 수집 → 마지막에 한 줄로 합쳐 info["연락처"]로 저장
-    contact_fields = {
-        "대표전화": None,
-        "팩스": None,
-        "제품문의": None,
-        "기술문의": None,
-        "개발문의": None
-    }
-
-    with open(clean_path, encoding="utf-8") as f:
-        for line in f:
-            rec = json.loads(line)
-            title = rec.get("title", "") or ""
-            txt = rec.get("content", "") or ""
-            section = rec.get("section", "") or ""
-
-            # 회사명: 등장 여부로 간단하게 감지(사이트 특화)
-            if info["회사명"] is None and ("범일정보" in title or "범일정보" in txt):
-                info["회사명"] = "범일정보"
-
-            # (A) 설립연도 '강한 시그널' 패턴: "1991.07 회사 설립", "법인 설립 1991" 등
-            if info["설립연도"] is None:
-                strong_pats = [
-                    r"\b((?:19|20)\d{2})(?:[.\-/]\d{1,2})?\b[^\n]{0,20}?(?:회사|법인|범일정보)[^\n]{0,10}?설립",
-                    r"(?:회사|법인|범일정보)[^\n]{0,10}?설립[^\n]{0,20}?\b((?:19|20)\d{2})(?:[.\-/]\d{1,2})?\b",
-                    r"\b((?:19|20)\d{2})(?:[.\-/]\d{1,2})?\b[^\n]{0,20}?(?:창립|법인\s*설립)",
-                    r"(?:창립|법인\s*설립)[^\n]{0,20}?\b((?:19|20)\d{2})(?:[.\-/]\d{1,2})?\b",
-                ]
-                for pat in strong_pats:
-                    m = re.search(pat, txt)
-                    if m:
-                        info["설립연도"] = f"{m.group(1)}년"
-                        break
-
-            # (B) HISTORY 블록: 연혁 리스트 확장 + 최솟값으로 설립연도 보정
-            if ("연혁" in title) or ("HISTORY" in title.upper()):
-                parsed = _parse_history_blocks(txt)  # [(year, text)]
-                info["연혁"].extend(parsed)
-
-                earliest = _find_earliest_year(txt)
-                if earliest:
-                    cur = (info["설립연도"] or "").rstrip("년") or "9999"
-                    if earliest < cur:
-                        info["설립연도"] = f"{earliest}년"
-
-            # (C) '약한 시그널' 패턴: "1991 설립", "설립 1991" 같이 단서가 짧은 경우
-            if info["설립연도"] is None:
-                weak_pats = [
-                    r"\b((?:19|20)\d{2})(?:[.\-/]\d{1,2})?\b[^\n]{0,10}?설립",
-                    r"설립[^\n]{0,10}?\b((?:19|20)\d{2})(?:[.\-/]\d{1,2})?\b",
-                ]
-                for pat in weak_pats:
-                    m = re.search(pat, txt)
-                    if m:
-                        info["설립연도"] = f"{m.group(1)}년"
-                        break
-
-            # 대표이사(사이트 특화 키워드)
-            if info["대표이사"] is None and "박영기" in txt:
-                info["대표이사"] = "박영기"
-            # --- 본사 주소 + 연락처 동시 추출 (통일본) ---
-            if info["본사주소"] is None and "대구광역시" in txt:
-                # 쉼표 제한([^\n,]+) 제거 → 라인 끝까지 먼저 잡고 _clip_addr로 꼬리 컷
-                m = re.search(r"(대구광역시[^\n]+)", txt)
-                if m:
-                    raw = m.group(1)
-                    info["본사주소"] = _clip_addr(raw)  # 주소만
-                    # 같은 블록에서 tel/fax도 최대한 추출
-                    tel, fax = _extract_tel_fax(txt)
-                    if tel: info["본사연락처"]["tel"] = tel
-                    if fax: info["본사연락처"]["fax"] = fax
-
-            # --- 서울지사 주소 + 연락처 동시 추출 ---
-            if "서울지사" in txt or "서울 지사" in txt or "서울지사" in title:
-                m = re.search(r"(서울[^\n]+)", txt)
-                if m:
-                    raw = m.group(1)
-                    addr_only = _clip_addr(raw)  # ← 여기서 강력 컷오프
-                    info["지사주소"]["서울지사"] = addr_only
-                    # tel/fax도 같은 블록에서 추출 (지사연락처 저장)
-                    tel, fax = _extract_tel_fax(txt)
-                    info["지사연락처"].setdefault("서울지사", {"tel": None, "fax": None})
-                    if tel: info["지사연락처"]["서울지사"]["tel"] = tel
-                    if fax: info["지사연락처"]["서울지사"]["fax"] = fax
-            # 연락처(전화/팩스)
-            if contact_fields["대표전화"] is None:
-                m = re.search(r"(?:대표전화|전화|Tel|T\.)[:：]?\s*(0\d{1,2}[-.\s]?\d{3,4}[-.\s]?\d{4})", txt)
-                if m: contact_fields["대표전화"] = m.group(1)
-            if contact_fields["팩스"] is None:
-                m = re.search(r"(?:팩스|F\.)[:：]?\s*(0\d{1,2}[-.\s]?\d{3,4}[-.\s]?\d{4})", txt)
-                if m: contact_fields["팩스"] = m.group(1)
-
-            # 문의 메일(제품/기술/개발)
-            if contact_fields["제품문의"] is None:
-                m = re.search(r"제품문의[:：]?\s*([^\s,]+@[^\s,]+)", txt)
-                if m: contact_fields["제품문의"] = m.group(1)
-            if contact_fields["기술문의"] is None:
-                m = re.search(r"기술문의[:：]?\s*([^\s,]+@[^\s,]+)", txt)
-                if m: contact_fields["기술문의"] = m.group(1)
-            if contact_fields["개발문의"] is None:
-                m = re.search(r"개발문의[:：]?\s*([^\s,]+@[^\s,]+)", txt)
-                if m: contact_fields["개발문의"] = m.group(1)
-
-            # 비전/미션: 제목 신호가 가장 정확함(본문 키워드는 중복/잡음 가능)
-            if not info["비전"] and ("비전" in title or "VISION" in title.upper()):
-                info["비전"] = txt.strip()
-            if not info["미션"] and ("미션" in title or "MISSION" in title.upper()):
-                info["미션"] = txt.strip()
-
-            # 솔루션/비즈니스 항목 수집
-            if section == "solution" and title and txt:
-                info["솔루션"].append((title.strip(), txt.strip()))
-            if section == "business" and title and txt:
-                info["비즈니스"].append((title.strip(), txt.strip()))
-
-    # 연락처 통합 문자열 생성(필드가 있는 것만 순서대로 연결)
-    contact_answer = []
-    if contact_fields["제품문의"]: contact_answer.append("제품문의 " + contact_fields['제품문의'])
-    if contact_fields["기술문의"]: contact_answer.append("기술문의 " + contact_fields['기술문의'])
-    if contact_fields["개발문의"]: contact_answer.append("개발문의 " + contact_fields['개발문의'])
-    if contact_fields["대표전화"]: contact_answer.append("대표전화 " + contact_fields['대표전화'])
-    if contact_fields["팩스"]: contact_answer.append("팩스 " + contact_fields['팩스'])
-    info["연락처"] = ", ".join(contact_answer) if contact_answer else None
-
-    return info
+    ex = InfoExtractor()
+    for rec in read_records(clean_path):
+        ex.feed(rec)
+    return ex.result()
 
 # 네비/푸터 노이즈 필터
 def _is_nav_noise(title: str, content: str) -> bool:
@@ -289,7 +423,7 @@ def _is_nav_noise(title: str, content: str) -> bool:
     c = (content or "")
     if "퀵 메뉴" in t or "주메뉴" in t:
         return True
-    if re.search(r"\b(COMPANY|BUSINESS|SOLUTION|RECRUIT|LOCATION)\b", c, re.I):
+    if _NAV_MENU_RE.search(c):
         return True
     if "facebook" in c.lower() or "intranet" in c.lower():
         return True
@@ -297,56 +431,19 @@ def _is_nav_noise(title: str, content: str) -> bool:
         return True
     return False
 
-# 청크 빌드 (메인 엔트리)
-def build_chunks(target_chars=800, overlap=100):
+def append_structured_chunks(clean_path=CLEAN_PATH, chunks_path=CHUNKS_PATH, info=None, counter=None,
+                             writer=None):
     """
-    clean.jsonl → chunks.jsonl
-    1) 원본 문장 기반 청크
-       - 문장 경계 분할 후 target_chars를 넘지 않도록 슬라이딩 윈도우 결합
-       - 청크 간 overlap을 주어 문맥 단절을 완화
-    2) 구조화 청크
-       - info/history/solution/business/summary 레코드 추가
+    clean.jsonl 전체에서 뽑은 info/history/solution/business/summary 청크를 chunks.jsonl 끝에 추가
+    (※ 반드시 원본 청크 쓰기 이후 한 번만 호출 — build_chunks, 스트리밍 파이프라인 공용)
+    - info: 문장 청크 루프에서 InfoExtractor 로 이미 모은 결과. 없으면 clean_path 를 읽어 추출
+    - counter: 토큰 모드(TokenCounter)면 구조화 청크에도 "n_tokens" 기록
+    - writer: 문장 청크를 쓰던 쓰기 객체(열린 채로)에 이어 씀. 없으면 chunks_path 를 "a" 로 열어 추가
+      (Arrow 는 이어 쓰기 = 기존 배치 복사 → build_chunks/스트리밍은 writer 를 넘김)
+    반환: 추가한 구조화 청크 목록
     """
-    ensure_dir(DATA_DIR)
-
-    # 1) 원본 청크 (문장 단위, 노이즈 제외)
-    with open(CLEAN_PATH, encoding="utf-8") as f, open(CHUNKS_PATH, "w", encoding="utf-8") as w:
-        idx = 0
-        for line in f:
-            rec = json.loads(line)
-            title = rec.get("title", "")
-            content = rec.get("content", "")
-
-            # 네비/푸터 등 노이즈는 통째로 건너뜀
-            if _is_nav_noise(title, content):
-                continue
-
-            sents = split_sentences(content)
-            buf = ""
-            for sent in sents:
-                # 현재 버퍼 + 다음 문장이 target_chars를 넘으면 플러시
-                if len(buf) + len(sent) > target_chars and buf:
-                    w.write(json.dumps({
-                        "id": f"{title or 'NA'}_{idx}",
-                        "text": buf.strip(),
-                        "meta": rec
-                    }, ensure_ascii=False) + "\n")
-                    # overlap 만큼 꼬리를 남겨 다음 청크와 문맥 연결
-                    buf = buf[-overlap:]
-                    idx += 1
-                buf += sent + " "
-
-            # 마지막 버퍼 잔여분도 출력
-            if buf.strip():
-                w.write(json.dumps({
-                    "id": f"{title or 'NA'}_{idx}",
-                    "text": buf.strip(),
-                    "meta": rec
-                }, ensure_ascii=False) + "\n")
-
-    # 2) info / history / solution / business / summary
-    #    (※ 반드시 원본 청크 쓰기 이후, 루프 바깥에서 한 번만 호출)
-    info = extract_info_chunks(CLEAN_PATH)
+    if info is None:
+        info = extract_info_chunks(clean_path)
 
     def _strip_noise(text: str) -> str:
         """
@@ -355,31 +452,32 @@ def build_chunks(target_chars=800, overlap=100):
         - 다중 공백 축소
         """
         t = (text or "")
-        t = re.sub(r"\s*더 알아보기\s*", " ", t)
-        t = re.sub(r"\s+페이지\d+\s*", " ", t)
-        t = re.sub(r"\s{2,}", " ", t).strip()
+        t = _MORE_RE.sub(" ", t)
+        t = _PAGE_NAV_RE.sub(" ", t)
+        t = _MULTI_SPACE_RE.sub(" ", t).strip()
         return t
 
-    #  이 블록 안에서만 w.write() 호출 (파일 닫히기 전까지 한 번에 작성)
-    with open(CHUNKS_PATH, "a", encoding="utf-8") as w:
+    #  이 블록 안에서 rows 에 모아 마지막에 한 번에 작성
+    with nullcontext(writer) if writer is not None else open_writer(chunks_path, "a", record=ChunkRecord) as w:
+        rows = []
         # 2-1) 단일 필드 → info 섹션 레코드로 저장
         for k in ["회사명", "설립연도", "대표이사", "본사주소", "연락처", "비전", "미션"]:
             v = info.get(k)
             if v:
-                w.write(json.dumps({
+                rows.append({
                     "id": k,
                     "text": v,
-                    "meta": {"section": "info"}
-                }, ensure_ascii=False) + "\n")
+                    "section": "info"
+                })
 
         # 2-1-추가) 지사주소 각각 저장 (예: id="지사주소_서울지사")
         for branch_name, addr in (info.get("지사주소") or {}).items():
             if addr:
-                w.write(json.dumps({
+                rows.append({
                     "id": f"지사주소_{branch_name}",
                     "text": addr,
-                    "meta": {"section": "info", "branch": branch_name}
-                }, ensure_ascii=False) + "\n")
+                    "section": "info", "branch": branch_name
+                })
 
         # 2-1-추가) 본사연락처 저장 (전화/팩스만)
         hq_tel = (info.get("본사연락처") or {}).get("tel")
@@ -389,11 +487,11 @@ def build_chunks(target_chars=800, overlap=100):
                 f"전화 {hq_tel}" if hq_tel else None,
                 f"팩스 {hq_fax}" if hq_fax else None
             ] if p])
-            w.write(json.dumps({
+            rows.append({
                 "id": "본사연락처",
                 "text": line,
-                "meta": {"section": "info"}
-            }, ensure_ascii=False) + "\n")
+                "section": "info"
+            })
 
         # 2-1-추가) 지사연락처_* 저장
         for branch_name, cf in (info.get("지사연락처") or {}).items():
@@ -404,11 +502,11 @@ def build_chunks(target_chars=800, overlap=100):
                     f"전화 {tel}" if tel else None,
                     f"팩스 {fax}" if fax else None
                 ] if p])
-                w.write(json.dumps({
+                rows.append({
                     "id": f"지사연락처_{branch_name}",
                     "text": line,
-                    "meta": {"section": "info", "branch": branch_name}
-                }, ensure_ascii=False) + "\n")
+                    "section": "info", "branch": branch_name
+                })
 
         # 2-2) 연혁 저장
         seen_hist = set()
@@ -420,11 +518,11 @@ def build_chunks(target_chars=800, overlap=100):
             if key in seen_hist:
                 continue
             seen_hist.add(key)
-            w.write(json.dumps({
+            rows.append({
                 "id": f"연혁_{year}",
                 "text": t,
-                "meta": {"section": "history", "year": year}
-            }, ensure_ascii=False) + "\n")
+                "section": "history", "year": year
+            })
 
         # 2-3) 솔루션/비즈니스 항목 저장
         sol_names = []
@@ -433,11 +531,11 @@ def build_chunks(target_chars=800, overlap=100):
             body = _strip_noise(txt or "")
             if name and body:
                 sol_names.append(name)
-                w.write(json.dumps({
+                rows.append({
                     "id": f"솔루션_{name}",
                     "text": body,
-                    "meta": {"section": "solution", "name": name}
-                }, ensure_ascii=False) + "\n")
+                    "section": "solution", "name": name
+                })
 
         biz_names = []
         for title, txt in info.get("비즈니스", []):
@@ -445,25 +543,211 @@ def build_chunks(target_chars=800, overlap=100):
             body = _strip_noise(txt or "")
             if name and body:
                 biz_names.append(name)
-                w.write(json.dumps({
+                rows.append({
                     "id": f"비즈니스_{name}",
                     "text": body,
-                    "meta": {"section": "business", "name": name}
-                }, ensure_ascii=False) + "\n")
+                    "section": "business", "name": name
+                })
 
         # 2-4) 요약 저장
         if sol_names:
-            w.write(json.dumps({
+            rows.append({
                 "id": "솔루션_요약",
                 "text": ", ".join(sol_names),
-                "meta": {"section": "solution", "type": "summary"}
-            }, ensure_ascii=False) + "\n")
+                "section": "solution", "type": "summary"
+            })
 
         if biz_names:
-            w.write(json.dumps({
+            rows.append({
                 "id": "비즈니스_요약",
                 "text": ", ".join(biz_names),
-                "meta": {"section": "business", "type": "summary"}
-            }, ensure_ascii=False) + "\n")
+                "section": "business", "type": "summary"
+            })
+
+        # 토큰 모드: 구조화 청크도 토큰 수 기록(임베딩 길이 버킷용, 한 번의 배치로 셈)
+        if counter is not None:
+            for r, n in zip(rows, counter.count([r["text"] for r in rows])):
+                r["n_tokens"] = n
+        w.write_all(rows)
+    return rows
+
+def doc_record(rec):
+    """
+    정제 레코드 → 문서 테이블(docs.jsonl) 한 줄: {"doc_id", ...원본 필드(url/section/title/content)}
+    - doc_id = 레코드 내용 해시 → 같은 레코드는 실행마다 같은 id (같은 내용이면 한 줄로 합쳐짐)
+    """
+    key = "\x1f".join(str(rec.get(k) or "") for k in ("url", "section", "title", "content"))
+    return {"doc_id": hashlib.sha1(key.encode("utf-8")).hexdigest()[:12], **rec}
+
+def record_chunks(rec, idx, target_chars=800, overlap=100, counter=None,
+                  target_tokens=CHUNK_TARGET_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    """
+    레코드 1건 → (문서, 문장 기반 청크 목록, 다음 idx)
+    - 청크: {"id": "제목_idx", "text", "doc": doc_id, "start", "end", "section"}
+      start/end = 문서 content 안의 문자 위치 (원문 공백이 달라 찾지 못하면 None)
+    - id 의 idx 는 파일 전체에서 이어지는 번호
+    - counter(TokenCounter)가 있으면 토큰 기준 윈도우(target_tokens/overlap_tokens) + 청크에 "n_tokens"
+    """
+    doc = doc_record(rec)
+    content, title = doc.get("content", ""), rec.get("title", "")
+    if counter is None:
+        windows = [(text, last, None) for text, last in window_texts(content, target_chars, overlap)]
+    else:
+        windows = window_token_texts(content, counter, target_tokens, overlap_tokens)
+    out, pos = [], 0
+    for text, last, n_tokens in windows:
+        start = content.find(text, pos)
+        if start >= 0:
+            pos = start
+        out.append({
+            "id": f"{title or 'NA'}_{idx}",
+            "text": text,
+            "doc": doc["doc_id"],
+            "start": start if start >= 0 else None,
+            "end": start + len(text) if start >= 0 else None,
+            "section": rec.get("section"),
+        })
+        if n_tokens is not None:
+            out[-1]["n_tokens"] = n_tokens
+        if not last:
+            idx += 1
+    return doc, out, idx
+
+_SHARD_COUNTER = None   # 워커 프로세스별 TokenCounter (토큰 모드, 처음 쓸 때 로드)
+
+def _chunk_shard(text_path, start, end, target_chars, overlap, tokenizer, target_tokens, overlap_tokens,
+                 encode=True):
+    """
+    워커: 입력 [start, end) 구간의 문장 청크 (파일 전체 번호는 병합하는 쪽에서 매김)
+    반환: 레코드별 (doc_id, docs.jsonl 줄, id 접두어, [(레코드 안 번호, "id" 뒤 JSON, n_tokens)], 다음 번호까지 증가분)
+      - 청크 JSON 은 워커에서 직렬화: '{"id":' + id + ',' + 나머지 → dumps_bytes(청크)와 같은 바이트
+      - encode=False(Arrow 출력): 문서/청크를 직렬화하지 않고 dict 로 (청크는 "id" 를 뺀 나머지)
+    """
+    global _SHARD_COUNTER
+    counter = None
+    if tokenizer is not None:
+        if _SHARD_COUNTER is None or _SHARD_COUNTER.model_name != tokenizer:
+            from processor.tokens import TokenCounter
+            _SHARD_COUNTER = TokenCounter(tokenizer)
+        counter = _SHARD_COUNTER
+    out = []
+    for rec in read_shard(text_path, start, end):
+        if _is_nav_noise(rec.get("title", ""), rec.get("content", "")):
+            continue
+        doc, chunks, n = record_chunks(rec, 0, target_chars, overlap, counter, target_tokens, overlap_tokens)
+        if not chunks:
+            continue
+        rows = []
+        for c in chunks:
+            rel = int(c.pop("id").rsplit("_", 1)[1])
+            rows.append((rel, dumps_bytes(c)[1:] if encode else c, c.get("n_tokens")))
+        out.append((doc["doc_id"], dumps_bytes(doc) if encode else doc, rec.get("title") or "NA", rows, n))
+    return out
+
+def _write_shard_chunks(results, idx, w, dw, seen_docs, n_tok):
+    """샤드 결과를 입력 순서대로 기록 + 청크 id 번호 매김 → 다음 idx"""
+    for doc_id, doc, prefix, rows, n in results:
+        if doc_id not in seen_docs:
+            seen_docs.add(doc_id)
+            if isinstance(doc, bytes):
+                dw.write_line(doc)
+            else:
+                dw.write(doc)
+        for rel, tail, n_tokens in rows:
+            if isinstance(tail, bytes):
+                w.write_line(b'{"id":' + dumps_bytes(f"{prefix}_{idx + rel}") + b"," + tail)
+            else:
+                w.write({"id": f"{prefix}_{idx + rel}", **tail})
+            if n_tokens is not None:
+                n_tok.append(n_tokens)
+        idx += n
+    return idx
+
+# 청크 빌드 (메인 엔트리)
+def build_chunks(target_chars=CHUNK_TARGET_CHARS, overlap=CHUNK_OVERLAP, clean_path=CLEAN_PATH, chunks_path=CHUNKS_PATH,
+                 text_path=None, docs_path=DOCS_PATH, mode=CHUNK_MODE, target_tokens=CHUNK_TARGET_TOKENS,
+                 overlap_tokens=CHUNK_OVERLAP_TOKENS, counter=None, workers=PREPROCESS_WORKERS):
+    """
+    clean.jsonl → chunks.jsonl (경로 기본값: config, 벤치마크 등에서 지정 가능)
+    - text_path: 문장 기반 청크의 입력(예: 중복 제거된 dedup.jsonl). 없으면 clean_path
+      (구조화 청크는 항상 clean_path 원문에서 추출)
+    - docs_path: 문서 테이블. 원본 레코드는 여기에 한 번만 쓰고, 청크는 doc id + 문자 위치로 참조
+      (예전에는 청크마다 "meta"로 원본 레코드 전체를 복사 → chunks.jsonl 이 본문 × 청크 수로 커짐)
+    - mode: "chars"(target_chars/overlap, 글자 기준) / "tokens"(target_tokens/overlap_tokens, 임베딩 모델
+      토크나이저 기준 + 청크마다 n_tokens 기록 → 임베딩 단계 길이 버킷 배치). counter: TokenCounter 주입(선택)
+    - workers: 문장 청크 프로세스 수(1: 직렬, 0: CPU 코어 수). 입력이 작아 샤드가 1개면 직렬.
+      병렬일 때 정보 추출은 워커가 도는 동안 이 프로세스에서 clean_path 를 순서대로 읽어 수행
+      (토큰 모드는 워커마다 counter.model_name 토크나이저를 따로 로드)
+    1) 원본 문장 기반 청크
+       - 문장 경계 분할 후 target_chars(토큰 모드: target_tokens)를 넘지 않도록 슬라이딩 윈도우 결합
+       - 청크 간 overlap을 주어 문맥 단절을 완화
+    2) 구조화 청크
+       - info/history/solution/business/summary 레코드 추가
+       - 문장 청크 입력이 clean_path 이면 같은 루프에서 정보 추출(InfoExtractor) → clean.jsonl 한 번만 읽음
+         (dedup.jsonl 을 쓰면 원문 clean_path 를 따로 한 번 읽음)
+    """
+    ensure_dir(Path(chunks_path).parent)
+    if mode not in ("chars", "tokens"):
+        raise ValueError(f"알 수 없는 CHUNK_MODE: {mode} (chars / tokens)")
+    if mode == "tokens" and counter is None:
+        from processor.tokens import TokenCounter
+        counter = TokenCounter()
+    elif mode == "chars":
+        counter = None
+    n_tok = []
+
+    # 1) 원본 청크 (문장 단위, 노이즈 제외)
+    single_pass = text_path is None or Path(text_path) == Path(clean_path)
+    workers = resolve_workers(workers)
+    ranges = shard_ranges(text_path or clean_path, workers) if workers > 1 else []
+    if len(ranges) > 1:
+        print(f"[DEBUG] 병렬 청크: 샤드 {len(ranges)}개, 워커 {workers}개")
+        tokenizer = counter.model_name if counter is not None else None
+        encode = not (is_arrow(chunks_path) or is_arrow(docs_path))
+        with ProcessPoolExecutor(max_workers=workers) as pool, open_writer(chunks_path, record=ChunkRecord) as w, \
+             open_writer(docs_path, record=DocRecord) as dw:
+            futs = [pool.submit(_chunk_shard, str(text_path or clean_path), s, e, target_chars, overlap,
+                                tokenizer, target_tokens, overlap_tokens, encode) for s, e in ranges]
+            info = extract_info_chunks(clean_path)     # 워커가 도는 동안 정보 추출(순서 의존 → 한 프로세스)
+            idx, seen_docs = 0, set()
+            for fut in futs:                           # 샤드(입력) 순서대로 병합
+                idx = _write_shard_chunks(fut.result(), idx, w, dw, seen_docs, n_tok)
+            append_structured_chunks(clean_path, chunks_path, info=info, counter=counter, writer=w)
+        _report(seen_docs, docs_path, n_tok, target_tokens, overlap_tokens, None)
+        return
+
+    extractor = InfoExtractor() if single_pass else None
+    with open_writer(chunks_path, record=ChunkRecord) as w, open_writer(docs_path, record=DocRecord) as dw:
+        idx, seen_docs = 0, set()
+        for rec in read_records(text_path or clean_path):
+            title = rec.get("title", "")
+            content = rec.get("content", "")
+            # 정보 추출은 노이즈(푸터 주소/연락처 등) 레코드까지 모두 봄
+            if extractor is not None:
+                extractor.feed(rec)
+
+            # 네비/푸터 등 노이즈는 통째로 건너뜀
+            if _is_nav_noise(title, content):
+                continue
 
-    print("✔️ [청크] chunks.jsonl 저장 (원본+info/연혁(연도별)/솔루션/비즈니스/요약)")
\ No newline at end of file
+            doc, chunks, idx = record_chunks(rec, idx, target_chars, overlap, counter, target_tokens, overlap_tokens)
+            if chunks and doc["doc_id"] not in seen_docs:
+                seen_docs.add(doc["doc_id"])
+                dw.write(doc)
+            for c in chunks:
+                w.write(c)
+                if counter is not None:
+                    n_tok.append(c["n_tokens"])
+
+        # 2) info / history / solution / business / summary
+        #    (※ 반드시 원본 청크 쓰기 이후, 루프 바깥에서 한 번만 호출 — 같은 writer 에 이어 씀)
+        append_structured_chunks(clean_path, chunks_path, info=extractor.result() if extractor else None,
+                                 counter=counter, writer=w)
+    _report(seen_docs, docs_path, n_tok, target_tokens, overlap_tokens, counter)
+
+def _report(seen_docs, docs_path, n_tok, target_tokens, overlap_tokens, counter):
+    print(f"✔️ [청크] chunks.jsonl 저장 (원본+info/연혁(연도별)/솔루션/비즈니스/요약), 문서 {len(seen_docs)}개 → {docs_path}")
+    if n_tok:
+        cache = f", 토크나이저 캐시 {counter.stats()}" if counter is not None else ""
+        print(f"    - 토큰 모드: 문장 청크 {len(n_tok)}개, 토큰 평균 {sum(n_tok) / len(n_tok):.0f} / 최대 {max(n_tok)} "
+              f"(목표 {target_tokens}, 겹침 {overlap_tokens}){cache}")
@@ -7,16 +7,48 @@ RAW 크롤링 결과(raw.jsonl)를 읽어서
 
 즉, 크롤링된 잡음을 간단히 필터링하고, 학습/RAG 인덱싱에 쓸 수 있는
 깔끔한 텍스트 코퍼스를 만든다.
+
+workers > 1 이면 raw.jsonl 을 바이트 구간(processor/shards.py)으로 나눠 프로세스 풀에서 정제하고
+샤드 순서대로 이어 씀 → 직렬과 같은 clean.jsonl
+(입출력 형식은 경로 확장자를 따름: .jsonl / .arrow — utils/dataset.py, config.DATA_FORMAT)
 """
-import json, re
+import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from config import RAW_PATH, CLEAN_PATH, DATA_DIR
+from config import RAW_PATH, CLEAN_PATH, DATA_DIR, PREPROCESS_WORKERS
 from utils.text_utils import clean_text
 from utils.file_utils import ensure_dir
+from utils.jsonl import dumps_bytes
+from utils.dataset import read_records, open_writer, is_arrow
+from utils.records import CleanRecord
+from processor.shards import resolve_workers, shard_ranges, read_shard
+
+def clean_record(rec):
+    """
+    레코드 1건 정제 (build_clean, 스트리밍 파이프라인 공용)
+    - content 에 clean_text 적용, 20자 미만이면 None(버림)
+    """
+    content = clean_text(rec.get("content", ""))  # 텍스트 정제
+    if len(content) < 20:
+        return None
+    rec["content"] = content                      # 정제된 content로 덮어쓰기
+    return rec
 
-def build_clean():
+def _clean_shard(raw_path, start, end, encode=True):
     """
-    raw.jsonl → clean.jsonl 변환 파이프라인
+    워커: raw 의 [start, end) 구간 정제 → clean 에 이어 쓸 레코드 목록
+    (encode: JSONL 출력이면 워커에서 JSON 줄(bytes)로 직렬화, Arrow 출력이면 dict 그대로)
+    """
+    out = []
+    for rec in read_shard(raw_path, start, end):
+        rec = clean_record(rec)
+        if rec is not None:
+            out.append(dumps_bytes(rec) if encode else rec)
+    return out
+
+def build_clean(raw_path=RAW_PATH, clean_path=CLEAN_PATH, workers=PREPROCESS_WORKERS):
+    """
+    raw.jsonl → clean.jsonl 변환 파이프라인 (경로 기본값: config, 벤치마크 등에서 지정 가능)
     Steps:
     1. RAW_PATH 열기
     2. 각 라인(JSON dict) 파싱
@@ -25,19 +57,36 @@ def build_clean():
     4. 길이가 너무 짧은 콘텐츠(<20자)는 버림
     5. 남은 레코드를 clean.jsonl에 기록
     6. 몇 개 저장했는지 출력
+    - workers: 프로세스 수(1: 직렬, 0: CPU 코어 수). 입력이 작아 샤드가 1개면 직렬
+    반환: 저장한 레코드 수
     """
-    ensure_dir(DATA_DIR)  # data 디렉토리 없으면 생성
+    ensure_dir(Path(clean_path).parent)  # 출력 디렉토리 없으면 생성
     count = 0
 
-    with open(RAW_PATH, encoding="utf-8") as f, \
-         open(CLEAN_PATH, "w", encoding="utf-8") as w:
-        for line in f:
-            rec = json.loads(line)                # JSON 한 줄 로드
-            content = clean_text(rec.get("content", ""))  # 텍스트 정제
-            if len(content) < 20:                 # 너무 짧으면 skip
+    workers = resolve_workers(workers)
+    ranges = shard_ranges(raw_path, workers) if workers > 1 else []
+    if len(ranges) > 1:
+        print(f"[DEBUG] 병렬 정제: 샤드 {len(ranges)}개, 워커 {workers}개")
+        encode = not is_arrow(clean_path)
+        with ProcessPoolExecutor(max_workers=workers) as pool, open_writer(clean_path, record=CleanRecord) as w:
+            futs = [pool.submit(_clean_shard, str(raw_path), s, e, encode) for s, e in ranges]
+            for fut in futs:                      # 샤드(입력) 순서대로 병합
+                for row in fut.result():
+                    if encode:
+                        w.write_line(row)
+                    else:
+                        w.write(row)
+            count = w.count
+        print(f"✔️ [정제] clean.jsonl 저장 ({clean_path}) - {count}개")
+        return count
+
+    with open_writer(clean_path, record=CleanRecord) as w:
+        for rec in read_records(raw_path):
+            rec = clean_record(rec)               # 정제
+            if rec is None:                       # 너무 짧으면 skip
                 continue
-            rec["content"] = content              # 정제된 content로 덮어쓰기
-            w.write(json.dumps(rec, ensure_ascii=False) + "\n")  # 출력 파일에 append
+            w.write(rec)                          # 출력 버퍼에 추가 (모아서 한 번에 씀)
             count += 1
 
-    print(f"✔️ [정제] clean.jsonl 저장 ({CLEAN_PATH}) - {count}개")
\ No newline at end of file
+    print(f"✔️ [정제] clean.jsonl 저장 ({clean_path}) - {count}개")
+    return count
\ No newline at end of file
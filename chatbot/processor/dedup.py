@@ -0,0 +1,194 @@
+# processor/dedup.py
+"""
+clean.jsonl → dedup.jsonl : 근접 중복(near-duplicate) 블록 제거 단계 (build_clean 과 build_chunks 사이)
+
+크롤 결과에는 같은 메뉴/푸터/슬로건 텍스트가 여러 레코드에 반복되고,
+메인 페이지의 '본문' 같은 상위 블록은 뒤따르는 섹션들의 텍스트를 통째로 다시 담고 있다.
+그대로 청크를 만들면 chunks.jsonl/임베딩 시간/인덱스 크기가 늘고, 검색 top-k를 같은 내용이 차지한다.
+
+단계:
+1) 레코드 단위 근접 중복: 단어 shingle(DEDUP_SHINGLE 단어) MinHash + LSH(band) 로 후보를 찾고
+   추정 Jaccard ≥ DEDUP_JACCARD 이면 뒤 레코드 제거
+2) 블록 단위 중복: 짧은 레코드부터 본문(블록)을 첫 shingle 해시로 색인하고, 더 긴 레코드 안에
+   앞서 남긴 블록(DEDUP_MIN_SPAN 단어 이상)이 통째로 들어 있으면 그 구간(+바로 앞 제목)을 잘라냄
+   → 구체적인 섹션(VISION, MISSION …)은 남고, 그 내용을 다시 담은 상위 블록/반복 푸터에서만 빠짐
+   (제품별 공통 기능 문구처럼 일부만 겹치는 구절은 각 항목 문맥에 필요하므로 유지)
+3) 남은 본문이 20자 미만(정제 단계 기준)이면 레코드 제거
+
+참고:
+- 구조화 청크(info/연혁/솔루션/비즈니스)는 원문 위치/문맥에 의존하므로 build_chunks 가 계속 clean.jsonl 에서 추출
+  (dedup.jsonl 은 문장 기반 슬라이딩 윈도우 청크에만 사용)
+- 청크 단계에서 통째로 버려질 네비/푸터 레코드(_is_nav_noise)는 원문 기준으로 여기서 먼저 제외
+  → 중복 제거 후 남은 조각이 노이즈 필터를 우회해 새 청크가 되는 일이 없음
+- 절감량(레코드/문자/예상 청크·벡터·인덱스 바이트)을 출력하고 반환
+"""
+import hashlib
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from config import (
+    CLEAN_PATH, DEDUP_PATH, DEDUP_JACCARD, DEDUP_SHINGLE, DEDUP_MIN_SPAN,
+    DEDUP_NUM_PERM, DEDUP_BANDS, FAISS_INDEX, CHUNK_TARGET_CHARS, CHUNK_OVERLAP,
+)
+from processor.chunker import _is_nav_noise, window_texts
+from utils.file_utils import ensure_dir
+from utils.dataset import load_records, write_records
+from utils.records import CleanRecord
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+
+def _h64(s: str) -> int:
+    return int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+
+def _shingles(words: List[str], k: int) -> List[int]:
+    """단어 k-gram 해시 목록 (k개보다 짧으면 전체 한 덩어리)"""
+    if len(words) <= k:
+        return [_h64(" ".join(words))] if words else []
+    return [_h64(" ".join(words[i:i + k])) for i in range(len(words) - k + 1)]
+
+class MinHashLSH:
+    """
+    MinHash 서명(num_perm개) + LSH(bands개 밴드).
+    - query_insert(key, shingles): 같은 밴드 버킷에 있던 후보 중 추정 Jaccard ≥ threshold 인 첫 key 반환,
+      없으면 등록하고 None
+    """
+
+    def __init__(self, threshold: float = DEDUP_JACCARD, num_perm: int = DEDUP_NUM_PERM,
+                 bands: int = DEDUP_BANDS, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm 은 bands 의 배수여야 합니다.")
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, int(_MERSENNE), size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, int(_MERSENNE), size=num_perm, dtype=np.uint64)
+        self.threshold = threshold
+        self.bands, self.rows = bands, num_perm // bands
+        self.buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(bands)]
+        self.sigs: Dict[str, np.ndarray] = {}
+
+    def signature(self, shingles: List[int]) -> np.ndarray:
+        x = (np.asarray(shingles, dtype=np.uint64) % _MERSENNE)[:, None]
+        # (a*x + b) mod p — uint64 곱셈 오버플로는 해시 품질에 영향이 없어 그대로 사용
+        return ((x * self.a + self.b) % _MERSENNE).min(axis=0)
+
+    def query_insert(self, key: str, shingles: List[int]):
+        sig = self.signature(shingles)
+        keys = [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+        for band, bk in zip(self.buckets, keys):
+            for other in band.get(bk, ()):
+                if float(np.mean(self.sigs[other] == sig)) >= self.threshold:
+                    return other
+        self.sigs[key] = sig
+        for band, bk in zip(self.buckets, keys):
+            band.setdefault(bk, []).append(key)
+        return None
+
+class BlockIndex:
+    """
+    이미 남긴 레코드 본문(블록)의 단어 시퀀스를 첫 shingle 해시로 색인.
+    - strip(words): 다른 레코드 블록이 통째로(연속으로) 들어 있는 구간을 제거
+      (바로 앞에 그 블록의 제목이 붙어 있으면 제목까지 함께 제거)
+    - 일부 구절만 겹치는 경우(제품별 공통 기능 문구 등)는 각 항목 문맥에서 의미가 있으므로 유지
+    """
+
+    def __init__(self, k: int = DEDUP_SHINGLE, min_words: int = DEDUP_MIN_SPAN):
+        self.k, self.min_words = k, min_words
+        self._by_head: Dict[int, List[tuple]] = {}
+
+    def add(self, title: str, words: List[str]):
+        if len(words) < self.min_words:
+            return
+        head = _h64(" ".join(words[:self.k]))
+        self._by_head.setdefault(head, []).append((tuple(title.split()), tuple(words)))
+
+    def strip(self, words: List[str]) -> List[str]:
+        if len(words) < self.min_words or not self._by_head:
+            return words
+        covered = [False] * len(words)
+        for i in range(len(words) - self.k + 1):
+            cands = self._by_head.get(_h64(" ".join(words[i:i + self.k])))
+            if not cands:
+                continue
+            for t_words, b_words in cands:
+                n = len(b_words)
+                if tuple(words[i:i + n]) != b_words:
+                    continue
+                start = i
+                if t_words and tuple(words[max(0, i - len(t_words)):i]) == t_words:
+                    start = i - len(t_words)
+                for j in range(start, i + n):
+                    covered[j] = True
+                break
+        return [w for w, c in zip(words, covered) if not c]
+
+def _estimate_windows(recs: List[Dict], target_chars: int, overlap: int) -> int:
+    return sum(len(window_texts(r.get("content", ""), target_chars, overlap)) for r in recs)
+
+def _index_dim(default: int = 1024) -> int:
+    try:
+        import faiss
+        return faiss.read_index(str(FAISS_INDEX)).d if Path(FAISS_INDEX).exists() else default
+    except Exception:
+        return default
+
+def build_dedup(clean_path=CLEAN_PATH, dedup_path=DEDUP_PATH, target_chars=CHUNK_TARGET_CHARS,
+                overlap=CHUNK_OVERLAP) -> Dict:
+    """
+    clean.jsonl → dedup.jsonl (레코드 순서 유지, 스키마 동일)
+    반환: 절감량 통계 dict
+    """
+    ensure_dir(Path(dedup_path).parent)
+    recs = load_records(clean_path)
+
+    # 노이즈 레코드는 청크 단계에서도 버려지므로 먼저 제외(원문 기준)
+    kept = [i for i, r in enumerate(recs) if not _is_nav_noise(r.get("title", ""), r.get("content", ""))]
+    n_noise = len(recs) - len(kept)
+
+    # 짧은(구체적인) 레코드부터 처리 → 긴 상위 블록에서 중복 구간을 덜어냄
+    order = sorted(kept, key=lambda i: len(recs[i].get("content", "")))
+    lsh, blocks = MinHashLSH(), BlockIndex()
+    out: Dict[int, Dict] = {}
+    n_near, n_short = 0, 0
+    for i in order:
+        rec = recs[i]
+        words = (rec.get("content") or "").split()
+        hashes = _shingles(words, DEDUP_SHINGLE)
+        if not hashes:
+            continue
+        if lsh.query_insert(str(i), hashes) is not None:
+            n_near += 1
+            continue
+        rest = blocks.strip(words)
+        content = " ".join(rest)
+        if len(content) < 20:
+            n_short += 1
+            continue
+        blocks.add(rec.get("title", "") or "", rest)
+        out[i] = dict(rec, content=content) if len(rest) != len(words) else rec
+
+    result = [out[i] for i in sorted(out)]
+    write_records(dedup_path, result, record=CleanRecord)
+
+    chars_in = sum(len(recs[i].get("content", "")) for i in kept)
+    chars_out = sum(len(r["content"]) for r in result)
+    win_in = _estimate_windows([recs[i] for i in kept], target_chars, overlap)
+    win_out = _estimate_windows(result, target_chars, overlap)
+    dim = _index_dim()
+    stats = {
+        "records_in": len(recs), "records_out": len(result), "noise_dropped": n_noise,
+        "near_dup_dropped": n_near, "emptied_dropped": n_short,
+        "spans_trimmed": sum(1 for i, r in out.items() if r is not recs[i]),
+        "chars_in": chars_in, "chars_out": chars_out,
+        "text_chunks_in": win_in, "text_chunks_out": win_out,
+        "index_bytes_saved": (win_in - win_out) * dim * 4,
+    }
+    saved = 1 - chars_out / chars_in if chars_in else 0.0
+    print(f"✔️ [중복제거] dedup.jsonl 저장 ({dedup_path}) - {len(result)}/{len(recs)}개 "
+          f"(노이즈 {n_noise}, 근접중복 {n_near}, 구간삭제 후 소멸 {n_short}, 구간 잘림 {stats['spans_trimmed']})")
+    print(f"    - 본문 {chars_in:,} → {chars_out:,}자 ({saved:.1%} 절감), "
+          f"문장 청크 {win_in} → {win_out}개, 인덱스 약 {stats['index_bytes_saved'] / 1024:,.0f}KB 절감(dim={dim})")
+    return stats
+
+if __name__ == "__main__":
+    build_dedup()
@@ -0,0 +1,101 @@
+# processor/migrate_chunks.py
+"""
+예전 형식 chunks.jsonl → 문서 테이블(docs.jsonl) + 압축 청크 형식으로 변환
+
+예전 형식: 문장 청크마다 "meta"에 원본 레코드 전체(url/section/title/content)를 복사
+  {"id", "text", "meta": {"url", "section", "title", "content"}}   ← 본문이 청크 수만큼 반복 저장
+  {"id", "text", "meta": {"section": "history", "year": "2020"}}   ← 구조화 청크
+새 형식 (processor/chunker.py build_chunks 와 같은 출력):
+  docs.jsonl  : {"doc_id", "url", "section", "title", "content"}  (문서당 1줄)
+  chunks.jsonl: {"id", "text", "doc", "start", "end", "section"}   (문장 청크)
+                {"id", "text", "section", "year"}                  (구조화 청크: meta 필드를 펼침)
+
+- 재크롤/재임베딩 없이 기존 파일만 변환. 청크 id/text/순서는 그대로 → FAISS 벡터는 그대로 유효
+- index/metas.jsonl 도 texts.jsonl 과 청크 순서가 맞으면 새 형식 기준으로 다시 씀(year/doc 필드 추가)
+- 이미 새 형식이면 아무것도 하지 않음
+
+실행 (chatbot/ 에서):
+  python -m processor.migrate_chunks
+"""
+from pathlib import Path
+from typing import Dict, List
+
+from config import CHUNKS_PATH, DOCS_PATH, FAISS_TEXTS, FAISS_METAS
+from processor.chunker import doc_record
+from utils.jsonl import load_jsonl, write_jsonl
+from utils.dataset import load_records, write_records
+from utils.records import DocRecord, ChunkRecord
+
+def convert(old: List[Dict]):
+    """예전 형식 청크 목록 → (docs, chunks)"""
+    docs, chunks, seen = [], [], set()
+    last_doc, pos = None, 0
+    for rec in old:
+        meta = rec.get("meta") or {}
+        if "content" not in meta:
+            # 구조화 청크: meta 필드를 청크에 바로
+            chunks.append({"id": rec.get("id"), "text": rec.get("text"), **meta})
+            continue
+        doc = doc_record(meta)
+        doc_id = doc["doc_id"]
+        if doc_id not in seen:
+            seen.add(doc_id)
+            docs.append(doc)
+        if doc_id != last_doc:
+            last_doc, pos = doc_id, 0
+        content, text = meta.get("content", ""), rec.get("text", "")
+        start = content.find(text, pos)
+        if start >= 0:
+            pos = start
+        chunks.append({
+            "id": rec.get("id"),
+            "text": text,
+            "doc": doc_id,
+            "start": start if start >= 0 else None,
+            "end": start + len(text) if start >= 0 else None,
+            "section": meta.get("section"),
+        })
+    return docs, chunks
+
+def migrate(chunks_path=CHUNKS_PATH, docs_path=DOCS_PATH, texts_path=FAISS_TEXTS,
+            metas_path=FAISS_METAS) -> Dict:
+    """
+    chunks.jsonl 을 새 형식으로 변환 (+ docs.jsonl 생성, metas.jsonl 갱신)
+    반환: 변환 전후 크기 통계 dict (이미 새 형식이면 {"migrated": False})
+    """
+    chunks_path = Path(chunks_path)
+    old = load_records(chunks_path)
+    if not any("meta" in r for r in old):
+        print(f"[DEBUG] {chunks_path}: 이미 새 형식 → 변환 생략")
+        return {"migrated": False}
+
+    bytes_before = chunks_path.stat().st_size
+    docs, chunks = convert(old)
+    write_records(Path(docs_path), docs, atomic=True, record=DocRecord)
+    write_records(chunks_path, chunks, atomic=True, record=ChunkRecord)
+    stats = {
+        "migrated": True, "chunks": len(chunks), "docs": len(docs),
+        "chunks_bytes_before": bytes_before, "chunks_bytes_after": chunks_path.stat().st_size,
+        "docs_bytes": Path(docs_path).stat().st_size, "metas_rewritten": False,
+    }
+
+    # metas.jsonl: 인덱스 벡터 순서(texts.jsonl)와 청크 순서가 같을 때만 다시 씀
+    if Path(texts_path).exists() and Path(metas_path).exists():
+        from embedder.embed_faiss import _chunk_meta
+        texts = load_jsonl(texts_path)
+        kept = [c for c in chunks if (c.get("text") or "").strip()]
+        if [(c.get("text") or "").strip() for c in kept] == texts:
+            lookup = {d["doc_id"]: {"url": d.get("url"), "title": d.get("title")} for d in docs}
+            write_jsonl(Path(metas_path), (_chunk_meta(c, lookup) for c in kept), atomic=True)
+            stats["metas_rewritten"] = True
+        else:
+            print(f"[WARN] {texts_path} 와 청크 순서가 달라 metas.jsonl 은 그대로 둠 (다시 임베딩하면 새 형식으로 생성)")
+
+    before, after = stats["chunks_bytes_before"], stats["chunks_bytes_after"] + stats["docs_bytes"]
+    print(f"✔️ [청크 변환] {chunks_path} 새 형식 저장 - 청크 {len(chunks)}개, 문서 {len(docs)}개 → {docs_path}")
+    print(f"    - {before:,} → {after:,} bytes (chunks {stats['chunks_bytes_after']:,} + docs {stats['docs_bytes']:,}, "
+          f"{after / before - 1:+.1%}), metas 갱신={stats['metas_rewritten']}")
+    return stats
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,73 @@
+# processor/shards.py
+"""
+중간 파일 입력을 구간(샤드)으로 나눠 프로세스 풀에서 처리하기 위한 도우미
+(processor/cleaner.py build_clean, processor/chunker.py build_chunks 의 병렬 모드)
+
+- byte_ranges(path, workers): 파일을 [start, end) 바이트 구간들로 분할. 경계는 항상 줄 시작에 맞춤
+  → 각 레코드(한 줄)는 정확히 한 샤드에만 속함, 샤드 순서 = 입력 순서
+- read_lines(path, start, end): 워커가 자기 구간의 줄만 읽음 (파일 전체를 넘기지 않음 → pickle 비용 없음)
+- 워커 결과는 샤드 순서대로 이어 붙임 → 직렬 처리와 같은 바이트 출력
+  (파일 전체에 걸친 번호(청크 id 등)는 워커가 아니라 병합하는 쪽에서 매김)
+- shard_ranges / read_shard: 형식별 분할·읽기 (JSONL: 바이트 구간, Arrow: RecordBatch 번호 구간 — utils/dataset.py)
+"""
+import os
+from pathlib import Path
+from typing import Any, List, Tuple
+
+from config import PREPROCESS_WORKERS, PREPROCESS_SHARD_BYTES
+from utils.dataset import is_arrow, num_batches, read_batches
+from utils.jsonl import loads
+
+def resolve_workers(workers=PREPROCESS_WORKERS) -> int:
+    """워커 수 설정값 → 실제 프로세스 수 (0 이하: CPU 코어 수)"""
+    return workers if workers and workers > 0 else (os.cpu_count() or 1)
+
+def byte_ranges(path, workers: int, min_bytes: int = PREPROCESS_SHARD_BYTES) -> List[Tuple[int, int]]:
+    """
+    파일 → 줄 경계에 맞춘 바이트 구간 목록
+    - 샤드 수 = 워커 수 × 4 (길이가 고르지 않은 레코드가 한 워커에 몰리지 않게), 샤드당 최소 min_bytes
+    - 샤드가 1개면 병렬로 처리할 이유가 없음 → 호출 쪽에서 직렬 경로 사용
+    """
+    size = Path(path).stat().st_size
+    n = max(1, min(workers * 4, size // max(1, min_bytes)))
+    cuts = [0]
+    with open(path, "rb") as f:
+        for i in range(1, n):
+            f.seek(max(size * i // n, cuts[-1]))
+            if f.tell() > 0:
+                f.seek(f.tell() - 1)
+                f.readline()          # 직전 바이트부터 읽어 줄 끝까지 건너뜀 → 다음 줄 시작
+            pos = f.tell()
+            if cuts[-1] < pos < size:
+                cuts.append(pos)
+    cuts.append(size)
+    return list(zip(cuts[:-1], cuts[1:]))
+
+def read_lines(path, start: int, end: int) -> List[bytes]:
+    """
+    [start, end) 구간의 줄 목록 (bytes 그대로 → utils/jsonl.loads, 빈 줄 제외)
+    - 줄바꿈 바이트로만 자름 (str.splitlines 는 본문 속 U+2028 등에서도 잘라 JSON 줄이 깨짐)
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return [l for l in data.split(b"\n") if l.strip()]
+
+def shard_ranges(path, workers: int) -> List[Tuple[int, int]]:
+    """
+    입력 파일 → 샤드 구간 목록
+    - JSONL: byte_ranges (줄 경계 바이트 구간)
+    - Arrow: [시작, 끝) 배치 번호 구간 (배치 = ARROW_BATCH_ROWS 행, 배치 수가 적으면 샤드도 적음)
+    """
+    if not is_arrow(path):
+        return byte_ranges(path, workers)
+    total = num_batches(path)
+    n = max(1, min(workers * 4, total))
+    cuts = [total * i // n for i in range(n + 1)]
+    return [(s, e) for s, e in zip(cuts[:-1], cuts[1:]) if s < e]
+
+def read_shard(path, start: int, end: int) -> List[Any]:
+    """shard_ranges 구간 하나의 레코드(dict) 목록 — 워커가 자기 구간만 읽음"""
+    if is_arrow(path):
+        return list(read_batches(path, start, end))
+    return [loads(l) for l in read_lines(path, start, end)]
@@ -0,0 +1,84 @@
+# processor/tokens.py
+"""
+토큰 기준 청크(CHUNK_MODE="tokens")용 토크나이저 래퍼
+
+글자 수 기준 윈도우는 한국어/영문 비율에 따라 같은 800자도 토큰 수가 크게 달라
+청크 길이(모델 입력 길이)가 들쭉날쭉하고, 임베딩 배치 안에서 패딩이 고르지 않다.
+→ 임베딩 모델(EMBED_MODEL_NAME, bge-m3)의 fast tokenizer 로 문장 길이를 토큰 단위로 잰다.
+
+- TokenCounter.offsets(texts): 문장 목록을 한 번의 배치 호출로 토큰화 → 문장별 토큰 (시작, 끝) 글자 위치
+  같은 문장(반복되는 메뉴/슬로건/사본)은 캐시에서 꺼냄
+- 특수 토큰(<s>, </s>)은 세지 않음 — 모델 입력 길이 = n_tokens + 2
+- transformers 는 sentence-transformers 의존성으로 함께 설치됨 (토큰 모드를 쓸 때만 import)
+- 생성 프롬프트 포장(rag/context.py)도 생성 모델(GEN_MODEL_ID) 토크나이저로 같은 래퍼를 사용
+  (토크나이저를 못 받는 환경(Ollama 만 설치)에서는 CharTokenizer 로 대체 — 공백 아닌 글자 1개 = 토큰 1개)
+"""
+from typing import Dict, List, Optional, Tuple
+
+from config import EMBED_MODEL_NAME
+
+Offsets = Tuple[Tuple[int, int], ...]
+
+class CharTokenizer:
+    """
+    fast tokenizer 호출 형식만 흉내 낸 글자 단위 대체 토크나이저 (공백 아닌 글자마다 토큰 1개)
+    - 한국어는 실제 BPE 토큰 수 ≤ 글자 수 → 예산을 넘지 않는 보수적 추정
+    """
+    is_fast = True
+
+    def __call__(self, texts: List[str], **_) -> Dict[str, List[List[Tuple[int, int]]]]:
+        return {"offset_mapping": [[(i, i + 1) for i, c in enumerate(t) if not c.isspace()] for t in texts]}
+
+class TokenCounter:
+    def __init__(self, model_name: str = EMBED_MODEL_NAME, tokenizer=None, cache_size: int = 100_000):
+        """
+        - model_name: AutoTokenizer.from_pretrained 경로/이름 (기본: 임베딩 모델과 같은 토크나이저)
+        - tokenizer: 이미 로드한 fast tokenizer 주입(벤치마크 등)
+        - cache_size: 캐시 문장 수 상한(넘으면 비우고 다시 채움)
+        """
+        self.model_name = model_name
+        self._tok = tokenizer
+        self._cache: Dict[str, Offsets] = {}
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def tokenizer(self):
+        if self._tok is None:
+            try:
+                from transformers import AutoTokenizer
+            except ImportError as e:
+                raise RuntimeError("토큰 수 측정(CHUNK_MODE='tokens', 생성 컨텍스트 포장)에는 transformers 가 필요합니다 "
+                                   "(pip install sentence-transformers)") from e
+            tok = AutoTokenizer.from_pretrained(self.model_name, use_fast=True)
+            if not tok.is_fast:
+                raise RuntimeError(f"fast tokenizer 를 찾지 못했습니다: {self.model_name}")
+            print(f"[DEBUG] tokenizer={self.model_name} ({type(tok).__name__})")
+            self._tok = tok
+        return self._tok
+
+    def offsets(self, texts: List[str]) -> List[Offsets]:
+        """문장 목록 → 문장별 토큰 (시작, 끝) 글자 위치 (캐시에 없는 문장만 한 번에 토큰화)"""
+        todo = list(dict.fromkeys(t for t in texts if t not in self._cache))
+        self.misses += len(todo)
+        self.hits += len(texts) - len(todo)
+        new: Dict[str, Offsets] = {}
+        if todo:
+            enc = self.tokenizer(todo, add_special_tokens=False, return_offsets_mapping=True,
+                                 return_attention_mask=False, return_token_type_ids=False)
+            new = {t: tuple(map(tuple, offs)) for t, offs in zip(todo, enc["offset_mapping"])}
+        out = [new[t] if t in new else self._cache[t] for t in texts]
+        if len(self._cache) + len(new) > self.cache_size:
+            self._cache.clear()
+        self._cache.update(new)
+        return out
+
+    def count(self, texts: List[str]) -> List[int]:
+        """문장 목록 → 토큰 수 목록"""
+        return [len(o) for o in self.offsets(texts)]
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        total = self.hits + self.misses
+        return {"cache_hits": self.hits, "cache_misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else None}
@@ -0,0 +1,161 @@
+# context.py
+# -----------------------------------------------------------------------------
+# 역할: 검색 결과(search() 의 MMR 순서) → 토큰 예산 안의 생성 프롬프트 (search() 와 생성 사이)
+#   - 토큰 수는 생성 모델(GEN_MODEL_ID) 토크나이저로 셈 (processor/tokens.TokenCounter, 청크별 캐시)
+#     토크나이저를 불러올 수 없으면(오프라인, Ollama 만 설치) 글자 수 기준(CharTokenizer)으로 대체
+#   - 중복 제거: 이미 넣은 청크와 글자 bigram Jaccard ≥ GEN_CONTEXT_DEDUP 이거나 통째로 포함되면 버림
+#     (같은 문단이 여러 페이지에 걸쳐 청크로 들어가 있는 경우가 많음)
+#   - 예산: 시스템 지시 + 질문 + 템플릿 여유분을 먼저 빼고, 남은 토큰을 MMR 순서대로 채움
+#     마지막 청크가 넘치면 토큰 경계에서 잘라 넣고(남은 예산 ≥ GEN_MIN_CHUNK_TOKENS) 멈춤
+#     → 프롬프트 길이 상한 = GEN_PROMPT_BUDGET → CPU prefill 시간(첫 토큰까지)이 예측 가능
+#   - 포장 결과는 (인덱스 버전, 질의, 청크 목록, 예산) 키로 LRU 캐시
+# -----------------------------------------------------------------------------
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from config import (
+    GEN_MODEL_ID, GEN_PROMPT_BUDGET, GEN_TEMPLATE_TOKENS, GEN_CONTEXT_DEDUP, GEN_MIN_CHUNK_TOKENS,
+    GEN_PACK_CACHE_SIZE,
+)
+from processor.tokens import CharTokenizer, TokenCounter
+from rag.search import _bigrams, _norm
+from utils.metrics import stage, cache_event
+
+SYSTEM_PROMPT = ("당신은 범일정보 안내 챗봇입니다. 아래 [자료]에 있는 내용만 근거로 한국어로 간결하게 답하세요. "
+                 "자료에 없는 내용은 모른다고 답하세요.")
+USER_TEMPLATE = "[자료]\n{context}\n\n[질문]\n{query}"
+BLOCK_TEMPLATE = "({n}) {text}"
+
+class ContextPacker:
+    def __init__(self, budget: int = GEN_PROMPT_BUDGET, counter: Optional[TokenCounter] = None,
+                 dedup: float = GEN_CONTEXT_DEDUP, min_chunk: int = GEN_MIN_CHUNK_TOKENS,
+                 cache_size: int = GEN_PACK_CACHE_SIZE):
+        """
+        - budget: 프롬프트 토큰 상한 (시스템 + 자료 + 질문, 템플릿 여유분 GEN_TEMPLATE_TOKENS 포함)
+        - counter: 토큰 카운터 주입 (None 이면 GEN_MODEL_ID 토크나이저, 처음 포장할 때 로드)
+        """
+        self.budget = budget
+        self.dedup = dedup
+        self.min_chunk = min_chunk
+        self.cache_size = cache_size
+        self._counter = counter
+        self._cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()           # LRU 캐시 전용 (짧게만 잡음)
+        self._counter_lock = threading.Lock()   # 토크나이저 로드 전용 (다운로드 동안 캐시 조회를 막지 않게)
+
+    @property
+    def counter(self) -> TokenCounter:
+        counter = self._counter
+        if counter is not None:
+            return counter
+        with self._counter_lock:
+            if self._counter is None:
+                counter = TokenCounter(GEN_MODEL_ID)
+                try:
+                    counter.tokenizer
+                except (OSError, ValueError, RuntimeError) as e:
+                    print(f"[WARN] 생성 모델 토크나이저 로드 실패 → 글자 수 기준 예산: {e}")
+                    counter = TokenCounter("chars", tokenizer=CharTokenizer())
+                self._counter = counter
+            return self._counter
+
+    def _ntok(self, text: str) -> int:
+        return self.counter.count([text])[0]
+
+    def _trim(self, text: str, n: int) -> str:
+        """text 앞쪽 n 토큰만 (토큰 경계의 글자 위치에서 자름)"""
+        offs = self.counter.offsets([text])[0]
+        return text[:offs[n - 1][1]].rstrip() + " …" if 0 < n < len(offs) else text
+
+    def _is_dup(self, text: str, grams: set, kept: List[Dict]) -> bool:
+        for k in kept:
+            if text in k["text"]:
+                return True
+            union = len(grams | k["grams"])
+            if union and len(grams & k["grams"]) / union >= self.dedup:
+                return True
+        return False
+
+    def pack(self, query: str, hits: List[Dict], version: Optional[str] = None) -> Dict:
+        """
+        (질의, 검색 결과) → {"system", "prompt", "n_tokens", "chunks"(넣은 hit 의 i), "truncated",
+                             "dropped_dup", "dropped_budget", "budget"}
+        - hits: search() 결과 (MMR 순서 그대로 우선순위)
+        """
+        qnorm = _norm(query)
+        key = (version, qnorm, tuple(h.get("i") for h in hits), self.budget)
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+        cache_event("prompt", hit is not None)
+        if hit is not None:
+            return hit
+
+        with stage("pack"):
+            packed = self._pack(qnorm, hits)
+        with self._lock:
+            self._cache[key] = packed
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return packed
+
+    def _pack(self, qnorm: str, hits: List[Dict]) -> Dict:
+        fixed = self._ntok(SYSTEM_PROMPT) + self._ntok(USER_TEMPLATE.format(context="", query=qnorm))
+        left = self.budget - GEN_TEMPLATE_TOKENS - fixed
+        kept: List[Dict] = []
+        n_dup = n_budget = 0
+        truncated = False
+        for h in hits:
+            text = _norm(h.get("text"))
+            if not text:
+                continue
+            grams = _bigrams(text)
+            if self._is_dup(text, grams, kept):
+                n_dup += 1
+                continue
+            if truncated or left < self.min_chunk:
+                n_budget += 1
+                continue
+            block = BLOCK_TEMPLATE.format(n=len(kept) + 1, text=text)
+            cost = self._ntok(block) + 1          # + 블록 사이 줄바꿈
+            if cost > left:
+                # 남은 예산만큼 잘라 넣고 멈춤 (블록 머리 "(n) " 토큰은 cost - 본문 토큰으로 계산)
+                # 자른 자리/말줄임표에서 토큰이 달라질 수 있으므로 넘친 만큼 더 줄여 다시 셈
+                truncated = True
+                full, n = text, left - cost + self._ntok(text)
+                while cost > left and n > 0:
+                    text = self._trim(full, n)
+                    block = BLOCK_TEMPLATE.format(n=len(kept) + 1, text=text)
+                    cost = self._ntok(block) + 1
+                    n -= max(1, cost - left)
+                if cost > left:
+                    n_budget += 1
+                    continue
+            kept.append({"i": h.get("i"), "text": text, "grams": grams, "block": block})
+            left -= cost
+
+        # 블록을 이어 붙이면 경계에서 토큰이 달라질 수 있음 → 전체를 다시 세고 넘치면 뒤에서부터 뺌
+        while True:
+            prompt = USER_TEMPLATE.format(context="\n".join(k["block"] for k in kept), query=qnorm)
+            n_tokens = self._ntok(SYSTEM_PROMPT) + self._ntok(prompt) + GEN_TEMPLATE_TOKENS
+            if n_tokens <= self.budget or not kept:
+                break
+            kept.pop()
+            n_budget += 1
+        return {
+            "system": SYSTEM_PROMPT,
+            "prompt": prompt,
+            "n_tokens": n_tokens,
+            "chunks": [k["i"] for k in kept],
+            "truncated": truncated,
+            "dropped_dup": n_dup,
+            "dropped_budget": n_budget,
+            "budget": self.budget,
+        }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            size = len(self._cache)
+        return {"cache_size": size, **self.counter.stats()}
@@ -0,0 +1,175 @@
+# generate.py
+# -----------------------------------------------------------------------------
+# 역할: 생성 경로 — 질의 → (구조화 직답 | 검색 → 컨텍스트 포장 → Ollama 생성)
+#   - A~D 구조화 의도는 이미 정확한 직답이 있으므로 생성하지 않음 (rag.search.structured_answer)
+#   - E) 는 search() 결과(MMR 순서)를 rag/context.ContextPacker 로 GEN_PROMPT_BUDGET 토큰 안에 포장해
+#     Ollama /api/generate 로 생성 (num_ctx = 예산 + GEN_MAX_TOKENS → 모델 컨텍스트도 고정)
+#   - Ollama 상태는 utils/health.ollama_monitor() 의 캐시된 값만 봄(요청마다 HTTP 확인 없음),
+#     생성 실패는 서킷 브레이커에 보고하고 top1 스니펫으로 대체
+#   - stream_answer(): 생성 토큰을 만들어지는 대로 이벤트로 내보냄 (service.py /rag/ask/stream → SSE)
+# -----------------------------------------------------------------------------
+import json, threading, time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+from config import (
+    OLLAMA_URL, GEN_OLLAMA_MODEL, GEN_MAX_TOKENS, GEN_TEMPERATURE, GEN_TOP_P, GEN_TIMEOUT,
+)
+from rag import search as S
+from rag.context import ContextPacker
+from utils.deadline import Deadline
+from utils.health import ollama_monitor
+from utils.metrics import stage, STAGE_SECONDS
+
+_PACKER: Optional[ContextPacker] = None
+_PACKER_LOCK = threading.Lock()
+
+def get_packer() -> ContextPacker:
+    """컨텍스트 포장기 싱글턴 (토크나이저는 처음 포장할 때 로드)"""
+    global _PACKER
+    with _PACKER_LOCK:
+        if _PACKER is None:
+            _PACKER = ContextPacker()
+        return _PACKER
+
+def warm_packer():
+    """포장기 토크나이저를 백그라운드로 미리 로드 (서비스 시작 시, 로드 실패면 글자 수 기준으로 대체됨)"""
+    threading.Thread(target=lambda: get_packer().counter, name="packer-warmup", daemon=True).start()
+
+def use_packer(packer: Optional[ContextPacker]):
+    """포장기 교체 (벤치마크/테스트에서 예산·토크나이저 지정). None 이면 기본값으로 다시 생성"""
+    global _PACKER
+    with _PACKER_LOCK:
+        _PACKER = packer
+
+def ollama_request(packed: Dict, stream: bool = False) -> Dict:
+    """포장된 프롬프트 → Ollama /api/generate 요청 본문"""
+    return {
+        "model": GEN_OLLAMA_MODEL,
+        "system": packed["system"],
+        "prompt": packed["prompt"],
+        "stream": stream,
+        "options": {
+            "num_predict": GEN_MAX_TOKENS,
+            "temperature": GEN_TEMPERATURE,
+            "top_p": GEN_TOP_P,
+            "num_ctx": packed["budget"] + GEN_MAX_TOKENS,
+        },
+    }
+
+def pack_context(query: str, top_k: int = 5) -> Tuple[List[Dict], Dict]:
+    """E) 질의 → (검색 결과, 포장된 프롬프트)"""
+    hits = S.search(query, top_k=top_k)
+    return hits, get_packer().pack(query, hits, S.index_version())
+
+def generate_answer(query: str, top_k: int = 5) -> Tuple[str, str]:
+    """
+    질의 → (경로, 답변)
+    - A~D: 구조화 직답 그대로
+    - E: 검색 → 포장 → Ollama 생성. 서킷이 open 이거나 생성이 실패하면 top1 스니펫
+    """
+    path, ans = S.structured_answer(query)
+    if path is not None:
+        return path, ans
+
+    # 생성기를 못 쓰면 포장(토크나이저)까지 가지 않고 스니펫
+    monitor = ollama_monitor()
+    if not monitor.available():
+        hits = S.search(query, top_k=top_k)
+        return "E", hits[0]["text"] if hits else "자료 부족"
+    hits, packed = pack_context(query, top_k)
+    snippet = hits[0]["text"] if hits else "자료 부족"
+    if not hits:
+        return "E", snippet
+    try:
+        with stage("generate"):
+            r = requests.post(f"{OLLAMA_URL.rstrip('/')}/api/generate", json=ollama_request(packed),
+                              timeout=GEN_TIMEOUT)
+            r.raise_for_status()
+            text = (r.json().get("response") or "").strip()
+    except (requests.RequestException, ValueError) as e:
+        print(f"[WARN] 생성 실패 → 스니펫 반환: {e}")
+        monitor.record_failure()
+        return "E", snippet
+    monitor.record_success()
+    return "E", text or snippet
+
+def _ollama_tokens(packed: Dict) -> Iterator[str]:
+    """Ollama 스트리밍 생성(NDJSON 한 줄 = 조각 하나) → 텍스트 조각"""
+    with requests.post(f"{OLLAMA_URL.rstrip('/')}/api/generate", json=ollama_request(packed, stream=True),
+                       stream=True, timeout=GEN_TIMEOUT) as r:
+        r.raise_for_status()
+        # chunk_size=None: 도착한 청크(Ollama 는 조각마다 chunked 전송)를 바로 줄로 나눔 (기본 512B 는 모아서 읽음)
+        for line in r.iter_lines(chunk_size=None):
+            if not line:
+                continue
+            part = json.loads(line)
+            if part.get("error"):
+                raise ValueError(part["error"])
+            if part.get("response"):
+                yield part["response"]
+            if part.get("done"):
+                break
+
+def stream_answer(query: str, top_k: int = 5, deadline: Optional[Deadline] = None) -> Iterator[Dict]:
+    """
+    질의 → 이벤트 스트림
+      {"event": "meta", "tier", "path"} → {"event": "token", "text"}… → {"event": "done", "answer", "tier", "path"}
+    - Ollama 사용 가능 + E): 검색 → 포장 → 생성 토큰을 받는 즉시 token 이벤트 (tier="generate")
+    - 그 외(A~D 직답, 서킷 open): 기존 답변 경로(answer_with_deadline, 마감 시간 단계 축소 포함)를 token 한 번으로
+    - 마감 시간: 남은 예산이 밀집 검색+MMR+첫 토큰 추정 시간보다 적으면 생성하지 않고 answer_with_deadline 경로
+      (첫 토큰이 나온 뒤의 생성 시간은 예산에 넣지 않음 — 스트리밍은 첫 토큰부터 클라이언트에 보임)
+    - 검색 결과가 없으면 생성하지 않고 "자료 부족" (generate_answer 와 같음)
+    - 생성이 첫 토큰 전에 실패하면 스니펫으로 대체, 도중에 끊기면 받은 데까지를 답변으로 (done 에 "error" 표시)
+    """
+    monitor = ollama_monitor()
+    gen_ok = monitor.available()
+    path, ans = S.structured_answer(query) if gen_ok else (None, None)
+    if gen_ok and path is None and deadline is not None and not deadline.allows(
+            S.estimate_cost("retrieval", "first_token")):
+        gen_ok = False
+    if not gen_ok or path is not None:
+        if path is None:
+            tier, path, ans = S.answer_with_deadline(query, top_k=top_k, deadline=deadline)
+        else:
+            tier = "structured"
+        yield {"event": "meta", "tier": tier, "path": path}
+        yield {"event": "token", "text": ans}
+        yield {"event": "done", "answer": ans, "tier": tier, "path": path}
+        return
+
+    hits, packed = pack_context(query, top_k)
+    if not hits:
+        yield {"event": "meta", "tier": "snippet", "path": "E"}
+        yield {"event": "token", "text": "자료 부족"}
+        yield {"event": "done", "answer": "자료 부족", "tier": "snippet", "path": "E"}
+        return
+    snippet = hits[0]["text"]
+    yield {"event": "meta", "tier": "generate", "path": "E", "prompt_tokens": packed["n_tokens"]}
+    parts: List[str] = []
+    error = None
+    t0 = time.perf_counter()
+    try:
+        for text in _ollama_tokens(packed):
+            if not parts:
+                STAGE_SECONDS.observe(time.perf_counter() - t0, stage="first_token")
+                S.observe_cost("first_token", time.perf_counter() - t0)
+            parts.append(text)
+            yield {"event": "token", "text": text}
+    except (requests.RequestException, ValueError) as e:
+        print(f"[WARN] 스트리밍 생성 실패: {e}")
+        monitor.record_failure()
+        error = str(e)
+    else:
+        monitor.record_success()
+    STAGE_SECONDS.observe(time.perf_counter() - t0, stage="generate")
+
+    answer = "".join(parts).strip()
+    if not answer:
+        answer = snippet
+        yield {"event": "token", "text": snippet}
+    done = {"event": "done", "answer": answer, "tier": "generate" if parts else "snippet", "path": "E"}
+    if error:
+        done["error"] = error
+    yield done
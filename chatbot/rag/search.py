@@ -9,11 +9,39 @@
 #   1) 유틸 함수 (_norm, _load_all, _get_field_hits, _history_map, _mmr 등)
 #   2) search() → 벡터 검색 + MMR 재랭크
 #   3) rag_answer() → 검색결과를 유형별로 해석해 "최종 답변" 반환
+#
+# 성능:
+#   - 인덱스/텍스트/메타와 임베딩 모델은 프로세스 내 캐시(파일 mtime/size가 바뀌면 재로드)
+#   - 단계별 소요시간은 utils.metrics.stage()로 기록 → service.py의 /metrics, Server-Timing
+#
+# 마감 시간(answer_with_deadline, /rag/ask 의 deadline_ms):
+#   - 단계 비용(모델 로드/인코딩/FAISS/MMR)을 EWMA 로 추정(utils/deadline.py) → 남은 예산으로 못 끝낼 단계는 건너뜀
+#   - 예산이 전체 경로(밀집 검색 + MMR)에 모자라면 더 싼 단계 순서로:
+#       cache(같은 질의의 이전 전체 경로 답변) → structured(A~D 직답) → dense(MMR 없이) → lexical(글자 bigram 매칭)
+#   - 응답에 어느 단계(tier)가 답했는지 포함 → 과부하에서도 꼬리 지연이 예산 안에 머묾
+#
+# 의미 캐시(rag/semantic_cache.py): E) 경로에서 질의 인코딩 직후 비슷한 이전 질의의 답변을 찾으면
+#   FAISS 검색/MMR/조립을 건너뜀 (tier="semantic")
+#
+# 질의 인코더(config.QUERY_ENCODER): full = EMBED_MODEL_NAME(bge-m3),
+#   projected = 작은 다국어 모델 + bge-m3 공간 선형 사영(embedder/query_proj.py) — 문서 벡터(인덱스)는 그대로
 # -----------------------------------------------------------------------------
-import json, re, numpy as np, faiss
-from typing import List, Dict, Tuple
+import re, hashlib, threading, time, numpy as np, faiss
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional
 from sentence_transformers import SentenceTransformer
-from config import FAISS_INDEX, FAISS_TEXTS, FAISS_METAS, EMBED_MODEL_NAME
+from config import (
+    FAISS_INDEX, FAISS_TEXTS, FAISS_METAS, EMBED_MODEL_NAME, RAG_ANSWER_CACHE_SIZE, RAG_SEMCACHE_ENABLED,
+    QUERY_ENCODER,
+)
+from rag.semantic_cache import SemanticCache
+from utils.jsonl import load_jsonl
+from utils.deadline import Deadline, CostModel
+from utils.metrics import stage, cache_event, set_index_version, ROUTE_TOTAL, TIER_TOTAL, SEMCACHE_EVENTS
+# 인덱스 경로 (기본: config). 벤치마크 등은 use_index()로 교체
+_PATHS = {"index": FAISS_INDEX, "texts": FAISS_TEXTS, "metas": FAISS_METAS}
 # --- util ---------------------------------------------------
 def _norm(s: str) -> str:
     """문자열 전처리: 공백 정리/strip → 검색 일관성 향상"""
@@ -28,11 +56,9 @@ def _load_all() -> Tuple[faiss.Index, List[str], List[Dict]]:
     - texts: 각 벡터에 대응하는 원문 텍스트
     - metas: 각 벡터에 대응하는 메타데이터
     """
-    index = faiss.read_index(str(FAISS_INDEX))
-    with open(FAISS_TEXTS, encoding="utf-8") as f:
-        texts = [json.loads(l) for l in f]
-    with open(FAISS_METAS, encoding="utf-8") as f:
-        metas = [json.loads(l) for l in f]
+    index = faiss.read_index(str(_PATHS["index"]))
+    texts = load_jsonl(_PATHS["texts"])
+    metas = load_jsonl(_PATHS["metas"])
     return index, texts, metas
 
 def _get_field_hits(metas: List[Dict], texts: List[str]) -> Dict[str, str]:
@@ -89,7 +115,7 @@ def _is_company_intro_query(q: str) -> bool:
 def _history_map(metas: List[Dict], texts: List[str]) -> Dict[str, List[str]]:
     """
     연혁(year -> [lines]) 맵핑
-    - meta.section == 'history' and meta.year 값 기준
+    - section == 'history' and year 값 기준
     - 없으면 id=연혁_YYYY에서 보조 추출
     """
     out: Dict[str, List[str]] = {}
@@ -97,7 +123,7 @@ def _history_map(metas: List[Dict], texts: List[str]) -> Dict[str, List[str]]:
         sec = (m.get("meta", {}) or {}).get("section") or m.get("section")
         if sec != "history":
             continue
-        year = (m.get("meta", {}) or {}).get("year")
+        year = m.get("year") or (m.get("meta", {}) or {}).get("year")
         if not year:
             mid = m.get("id") or ""
             mm = re.search(r"연혁_(\d{4})", mid)
@@ -159,26 +185,175 @@ def _format_addr_line(label: str, addr: str, tel: str|None, fax: str|None):
 def _get(info_map, key):  # 안전 get
     v = info_map.get(key)
     return v if isinstance(v, str) else None
+# --- 캐시 -----------------------------------------------------
+# 인덱스 파일 3종의 (mtime_ns, size)를 키로 삼아, 파이프라인이 인덱스를 다시 쓰면 자동 재로드
+_INDEX_CACHE: Dict[str, object] = {"key": None, "data": None, "version": None}
+_INDEX_LOCK = threading.Lock()
+_MODEL: Optional[SentenceTransformer] = None
+_MODEL_LOCK = threading.Lock()
+# 백그라운드 예열(warm_up) 스레드와 시작 시각 — 로드 중에는 남은 로드 시간만 비용으로 봄
+_WARMUP: Optional[threading.Thread] = None
+_WARMUP_STARTED = 0.0
+_WARMUP_LOCK = threading.Lock()
+# 단계 비용 추정(초, EWMA) — 마감 시간 안에 끝낼 수 있는 단계 판단용
+_COSTS = CostModel()
+# 전체 경로(밀집+MMR) 답변 LRU: (인덱스 버전, 정규화 질의, top_k) → (경로, 답변). 예산이 모자랄 때만 사용
+_ANSWERS: "OrderedDict[Tuple, Tuple[str, str]]" = OrderedDict()
+_ANSWERS_LOCK = threading.Lock()
+# 의미 캐시 + 적중 표본 검사(오탐 측정) 스레드 — 검사는 한 번에 하나만(밀리면 건너뜀)
+_SEMCACHE: Optional[SemanticCache] = SemanticCache() if RAG_SEMCACHE_ENABLED else None
+_AUDIT = ThreadPoolExecutor(max_workers=1, thread_name_prefix="semcache-audit")
+_AUDIT_SLOT = threading.Semaphore(1)
+
+def _index_key() -> Tuple:
+    return tuple((st.st_mtime_ns, st.st_size)
+                 for st in (Path(_PATHS[k]).stat() for k in ("index", "texts", "metas")))
+
+def _load_query_encoder():
+    """
+    config.QUERY_ENCODER 에 따른 질의 인코더
+    - projected: 작은 모델 + 사영(embedder/query_proj.py, 인덱스 옆 .qproj.npz). 없거나 맞지 않으면 경고 후 full
+    """
+    if QUERY_ENCODER == "projected":
+        from embedder.query_proj import load_projected_encoder
+        try:
+            enc = load_projected_encoder(_PATHS["index"])
+            print(f"[DEBUG] 질의 인코더: {enc.name} + 사영 → {EMBED_MODEL_NAME} 공간")
+            return enc
+        except RuntimeError as e:
+            print(f"[WARN] 사영 질의 인코더 사용 불가 → {EMBED_MODEL_NAME} 사용: {e}")
+    return SentenceTransformer(EMBED_MODEL_NAME, device="cpu")
+
+def _get_model() -> SentenceTransformer:
+    """질의 인코더(SentenceTransformer 호환) 싱글턴. 최초 1회만 로드."""
+    global _MODEL
+    with _MODEL_LOCK:
+        cache_event("model", _MODEL is not None)
+        if _MODEL is None:
+            t0 = time.perf_counter()
+            _MODEL = _load_query_encoder()
+            _COSTS.observe("model_load", time.perf_counter() - t0)
+        return _MODEL
+
+def _warm():
+    try:
+        load_index()
+        _get_model()
+        print("✔️ 질의 인코더/인덱스 예열 완료")
+    except Exception as e:
+        print(f"[WARN] 예열 실패 (첫 밀집 검색 때 다시 로드): {e}")
+
+def warm_up(background: bool = True):
+    """
+    인덱스 + 질의 인코더 미리 로드 (서비스 시작 시)
+    - background: 스레드로 로드 → 그동안 마감이 있는 요청은 로드가 끝날 때까지 더 싼 단계로 답함
+    - 이미 로드됐거나 로드 중이면 아무것도 안 함
+    """
+    global _WARMUP, _WARMUP_STARTED
+    with _WARMUP_LOCK:
+        if _MODEL is None and (_WARMUP is None or not _WARMUP.is_alive()):
+            _WARMUP_STARTED = time.perf_counter()
+            _WARMUP = threading.Thread(target=_warm, name="rag-warmup", daemon=True)
+            _WARMUP.start()
+        thread = _WARMUP
+    if not background and thread is not None:
+        thread.join()
+
+def reset_cache():
+    """인덱스 캐시 비우기 → 다음 load_index()는 디스크에서 다시 읽음(콜드 로드 측정용)"""
+    with _INDEX_LOCK:
+        _INDEX_CACHE.update(key=None, data=None, version=None)
+    with _ANSWERS_LOCK:
+        _ANSWERS.clear()
+    if _SEMCACHE is not None:
+        _SEMCACHE.clear()
+
+def use_index(index_path, texts_path, metas_path):
+    """검색 대상 인덱스 파일 교체 (벤치마크/오프라인 평가용). 캐시도 함께 비움."""
+    _PATHS.update(index=Path(index_path), texts=Path(texts_path), metas=Path(metas_path))
+    reset_cache()
+
+def use_encoder(encoder):
+    """
+    질의 인코더 주입 (SentenceTransformer.encode 호환 객체).
+    None이면 다음 호출 시 EMBED_MODEL_NAME을 다시 로드.
+    (질의 벡터 공간이 바뀌므로 의미 캐시도 비움)
+    """
+    global _MODEL
+    with _MODEL_LOCK:
+        _MODEL = encoder
+    if _SEMCACHE is not None:
+        _SEMCACHE.clear()
+
+def use_semantic_cache(cache: Optional[SemanticCache]):
+    """의미 캐시 교체 (None: 끔) — 벤치마크에서 캐시 없는 지연과 비교할 때"""
+    global _SEMCACHE
+    _SEMCACHE = cache
+
+def semantic_cache_stats() -> Optional[Dict]:
+    """의미 캐시 적중/오탐 통계 (꺼져 있으면 None)"""
+    return _SEMCACHE.stats() if _SEMCACHE is not None else None
+
 # --- public API ---------------------------------------------
 def load_index():
-    return _load_all()
-
-def search(query: str, top_k: int = 8, mmr_lambda: float = 0.6) -> List[Dict]:
+    """캐시된 (index, texts, metas) 반환. 인덱스 파일이 바뀌었으면 다시 읽는다."""
+    key = _index_key()
+    with _INDEX_LOCK:
+        hit = _INDEX_CACHE["key"] == key
+        cache_event("index", hit)
+        if not hit:
+            with stage("index_load"):
+                data = _load_all()
+            _INDEX_CACHE.update(
+                key=key, data=data,
+                version=hashlib.sha1(repr(key).encode()).hexdigest()[:12],
+            )
+            set_index_version(_INDEX_CACHE["version"], data[0].ntotal)
+        return _INDEX_CACHE["data"]
+
+def index_version() -> Optional[str]:
+    """현재 로드된 인덱스 버전(파일 mtime/size 해시). 아직 로드 전이면 None."""
+    return _INDEX_CACHE["version"]
+
+def search(query: str, top_k: int = 8, mmr_lambda: float = 0.6, deadline: Optional[Deadline] = None) -> List[Dict]:
     """
     기본 검색 함수:
       1) 질의 벡터화 → FAISS 검색(top_k*3개)
       2) 요약(summary) 항목에 가점
       3) MMR 재랭크 → 최종 top_k 결과 반환
+    - deadline: MMR 추정 시간만큼 예산이 남지 않았으면 3) 대신 점수순 top_k
     """
-    index, texts, metas = _load_all()
-    model = SentenceTransformer(EMBED_MODEL_NAME, device="cpu")
+    return _dense_search(query, top_k, mmr_lambda, deadline)[0]
+
+def _encode_query(query: str) -> np.ndarray:
+    """질의 → 정규화 벡터 (1, dim). 소요 시간은 비용 추정(_COSTS)에도 반영"""
+    model = _get_model()
+    with stage("normalize"):
+        q = _norm(query)
+    t0 = time.perf_counter()
+    with stage("encode"):
+        qvec = model.encode([q], convert_to_numpy=True, normalize_embeddings=True).astype(np.float32)
+    _COSTS.observe("encode", time.perf_counter() - t0)
+    return qvec
+
+def _dense_search(query: str, top_k: int, mmr_lambda: float = 0.6, deadline: Optional[Deadline] = None,
+                  qvec: Optional[np.ndarray] = None) -> Tuple[List[Dict], bool]:
+    """
+    search() 본체 → (결과, MMR 재랭크 여부). 단계 시간은 비용 추정(_COSTS)에도 반영
+    - qvec: 이미 인코딩한 질의 벡터(의미 캐시 조회 후 이어서 검색할 때)
+    """
+    index, texts, metas = load_index()
+    model = _get_model()
 
     # 질의 벡터
-    q = _norm(query)
-    qvec = model.encode([q], convert_to_numpy=True, normalize_embeddings=True).astype(np.float32)
+    if qvec is None:
+        qvec = _encode_query(query)
 
     # 1차: FAISS 검색 (여유있게 top_k*3 뽑음)
-    scores, idx = index.search(qvec, top_k * 3)
+    t0 = time.perf_counter()
+    with stage("faiss_search"):
+        scores, idx = index.search(qvec, top_k * 3)
+    _COSTS.observe("faiss_search", time.perf_counter() - t0)
     idx = idx[0]; scores = scores[0]
 
     # hits 구성
@@ -193,25 +368,114 @@ def search(query: str, top_k: int = 8, mmr_lambda: float = 0.6) -> List[Dict]:
         if (sec in ("solution", "business")) and (typ == "summary"):
             h["score"] += 0.2
 
-    # MMR 재랭크
-    doc_vecs = model.encode([_norm(h["text"]) for h in hits],
-                            convert_to_numpy=True, normalize_embeddings=True).astype(np.float32)
-    order = _mmr(qvec[0], doc_vecs, k=min(top_k, len(hits)), lam=mmr_lambda)
+    # 예산 부족: MMR(후보 재인코딩) 생략 → 가점 반영한 점수순
+    if deadline is not None and not deadline.allows(_COSTS.estimate("mmr")):
+        hits.sort(key=lambda h: -h["score"])
+        return hits[:top_k], False
+
+    # MMR 재랭크 (후보 문서 재인코딩 포함)
+    t0 = time.perf_counter()
+    with stage("mmr"):
+        doc_vecs = model.encode([_norm(h["text"]) for h in hits],
+                                convert_to_numpy=True, normalize_embeddings=True).astype(np.float32)
+        order = _mmr(qvec[0], doc_vecs, k=min(top_k, len(hits)), lam=mmr_lambda)
+    _COSTS.observe("mmr", time.perf_counter() - t0)
     re_ranked = [hits[i] for i in order]
-    return re_ranked[:top_k]
+    return re_ranked[:top_k], True
+
+def _bigrams(s: str) -> set:
+    """공백을 뺀 소문자 글자 bigram 집합 (한국어는 조사가 붙어 단어 단위보다 부분 일치에 강함)"""
+    s = _norm(s).lower().replace(" ", "")
+    return {s[i:i + 2] for i in range(len(s) - 1)}
 
-def rag_answer(query, top_k=5, **_):
+_LEXICAL: Dict[str, object] = {"src": None}
+
+def _lexical_views(texts: List[str]) -> Dict:
     """
-    고급 응답 함수:
-    - 질의 intent를 분류하여 맞춤 응답:
-      A) 회사 소개 → 슬로건 반환
-      B) info 직답 (회사명, 대표이사 등)
-      C) 연혁 질의 → 특정 연도/최신/전체
-      D) 솔루션/비즈니스 → 요약 or 개별 항목
-      E) 기본 → top1 스니펫
+    어휘 매칭용 bigram 역색인 {bigram: 청크 번호 배열} — 인덱스 로드 단위로 1회 계산(_structured_views 와 같은 방식)
+    (처음 쓰일 때 만듦 → 예산이 충분한 동안은 비용 없음)
+    """
+    global _LEXICAL
+    v = _LEXICAL
+    if v["src"] is texts:
+        return v
+    postings: Dict[str, List[int]] = {}
+    lens = np.zeros(len(texts), dtype=np.float32)
+    for i, t in enumerate(texts):
+        grams = _bigrams(t if isinstance(t, str) else "")
+        lens[i] = len(grams)
+        for g in grams:
+            postings.setdefault(g, []).append(i)
+    v = {
+        "src": texts,
+        "postings": {g: np.asarray(ids, dtype=np.int64) for g, ids in postings.items()},
+        "norm": 1.0 / np.sqrt(np.maximum(lens, 1.0)),
+    }
+    _LEXICAL = v
+    return v
+
+def lexical_search(query: str, top_k: int = 8) -> List[Dict]:
+    """
+    인코더 없이 글자 bigram 겹침으로 검색 (마감 시간 최후 단계)
+    - 점수 = 겹치는 bigram 수 / sqrt(청크 bigram 수) — 긴 청크가 우연한 겹침으로 이기지 않게
     """
     index, texts, metas = load_index()
-    qnorm = _norm(query)
+    with stage("lexical"):
+        lex = _lexical_views(texts)
+        post = [lex["postings"][g] for g in _bigrams(query) if g in lex["postings"]]
+        if not post:
+            return []
+        counts = np.bincount(np.concatenate(post), minlength=len(texts))
+        scores = counts * lex["norm"]
+        top = np.argsort(-scores, kind="stable")[:top_k]
+    return [{"i": int(i), "score": float(scores[i]), "text": texts[i], "meta": metas[i]}
+            for i in top if counts[i] > 0]
+
+def _by_id(views: Dict, target_id: str) -> str:
+    return views["by_id"].get(target_id, "")
+
+_VIEWS: Dict[str, object] = {"src": None}
+
+def _structured_views(metas: List[Dict], texts: List[str]) -> Dict:
+    """
+    구조화 의도(A~D)에 쓰는 파생 맵을 인덱스 로드 단위로 1회만 계산해 재사용.
+    - 예전에는 질의마다 metas 전체를 여러 번 순회(O(N)) → 코퍼스가 커지면 구조화 의도도 느려짐
+    - load_index()가 새 리스트를 돌려주면(인덱스 교체) 자동으로 다시 계산
+    """
+    global _VIEWS
+    v = _VIEWS
+    if v["src"] is metas:
+        return v
+    title_to_text: Dict[str, str] = {}
+    by_id: Dict[str, str] = {}
+    for i, m in enumerate(metas):
+        meta = m.get("meta", {}) or {}
+        sec = meta.get("section") or m.get("section")
+        title = m.get("title") or meta.get("title") or m.get("id") or ""
+        if sec == "main" and isinstance(texts[i], str):
+            title_to_text[title] = texts[i].strip()
+        mid = m.get("id")
+        # _get_by_id와 동일하게 "첫 번째" 일치 항목 사용
+        if mid is not None and isinstance(texts[i], str) and mid not in by_id:
+            by_id[mid] = texts[i]
+    v = {
+        "src": metas,
+        "main_titles": title_to_text,
+        "by_id": by_id,
+        "info_map": _get_field_hits(metas, texts),
+        "history": _history_map(metas, texts),
+        "sol_names": _collect_names(metas, "solution"),
+        "biz_names": _collect_names(metas, "business"),
+    }
+    _VIEWS = v
+    return v
+
+def _answer_structured(query: str, qnorm: str, metas: List[Dict], texts: List[str]):
+    """
+    구조화 의도(A~D) 라우팅 + 직답 구성. 벡터 검색 없이 메타/텍스트만으로 처리.
+    반환: (경로, 답변) — 어떤 의도에도 해당하지 않으면 (None, None) → 호출측에서 E) 처리
+    """
+    views = _structured_views(metas, texts)
 
     # ---------- A) 회사 소개 의도 ----------
     if _is_company_intro_query(query):
@@ -221,14 +485,7 @@ def rag_answer(query, top_k=5, **_):
             "Bumil Power to make Everything Possible",
             "Enjoy the Change!!",
         ]
-        title_to_text = {}
-        for i, m in enumerate(metas):
-            meta = m.get("meta", {}) or {}
-            sec = meta.get("section") or m.get("section")
-            title = m.get("title") or meta.get("title") or m.get("id") or ""
-            if sec == "main" and isinstance(texts[i], str):
-                title_to_text[title] = texts[i].strip()
-
+        title_to_text = views["main_titles"]
         lines = [title_to_text[t] for t in want_titles if t in title_to_text]
 
         # 부족하면 main 페이지의 짧은 슬로건 보충
@@ -244,11 +501,10 @@ def rag_answer(query, top_k=5, **_):
                     break
 
         if lines:
-            return "\n".join(lines)
-    # 검색 실행
-    hits = search(query, top_k=top_k)
+            return "A", "\n".join(lines)
+
     # ---------- B) info 직답 & 주소 질의 통일 처리 ----------
-    info_map = _get_field_hits(metas, texts)
+    info_map = views["info_map"]
 
     # (B-0) 본사/지사 주소 의도 감지
     asks_addr = any(k in qnorm for k in ["주소", "위치", "어디"])
@@ -261,7 +517,7 @@ def rag_answer(query, top_k=5, **_):
         addr = _strip_tail_from_addr(_get(info_map, "본사주소"))
         hq_contact = _get(info_map, "본사연락처") or _get(info_map, "연락처") or ""
         tel, fax = _extract_tel_fax(hq_contact)
-        return _format_addr_line("본사", addr, tel, fax)
+        return "B", _format_addr_line("본사", addr, tel, fax)
 
     # --- 특정 지사(서울지사) ---
     if asks_addr and (("서울지사" in qnorm) or ("서울 지사" in qnorm)):
@@ -269,7 +525,7 @@ def rag_answer(query, top_k=5, **_):
         if addr:
             branch_contact = _get(info_map, "지사연락처_서울지사") or ""
             tel, fax = _extract_tel_fax(branch_contact)
-            return _format_addr_line("서울지사", addr, tel, fax)
+            return "B", _format_addr_line("서울지사", addr, tel, fax)
 
     # --- 지사 전체 목록 ---
     if asks_addr and asks_branch_any:
@@ -282,7 +538,7 @@ def rag_answer(query, top_k=5, **_):
                 tel, fax = _extract_tel_fax(contact)
                 lines.append(_format_addr_line(branch, addr, tel, fax))
         if lines:
-            return "\n".join(lines)
+            return "B", "\n".join(lines)
     
     # (B-4) 일반 info 질의 매칭
     key_syn = {
@@ -304,7 +560,7 @@ def rag_answer(query, top_k=5, **_):
                 matched_fields.append(field)
     if matched_fields:
         parts = [f"{f}: {info_map[f]}" for f in matched_fields]
-        return " / ".join(parts)
+        return "B", " / ".join(parts)
     # ---------- C) 연혁 ----------
     def _join_lines(lines, year=None, sep="\n"):
         """연혁 라인에 연도 prefix 보정"""
@@ -322,21 +578,21 @@ def rag_answer(query, top_k=5, **_):
         return sep.join(outs)
 
     if ("연혁" in qnorm) or ("역사" in qnorm) or ("히스토리" in qnorm) or re.search(r"\b(19|20)\d{2}년", qnorm) or ("최신" in qnorm) or ("최근" in qnorm):
-        hmap = _history_map(metas, texts)
+        hmap = views["history"]
         if not hmap:
-            return "자료 부족"
+            return "C", "자료 부족"
 
         # 특정 연도
         y = re.search(r"\b((?:19|20)\d{2})년?", qnorm)
         if y:
             yy = y.group(1)
             if yy in hmap:
-                return _join_lines(hmap[yy], year=yy)
+                return "C", _join_lines(hmap[yy], year=yy)
 
         # 최신/최근
         if ("최신" in qnorm) or ("최근" in qnorm):
             max_year = max(hmap.keys())
-            return _join_lines(hmap[max_year], year=max_year)
+            return "C", _join_lines(hmap[max_year], year=max_year)
 
         # 전체 연혁 (연도 내림차순)
         items = sorted(hmap.items(), key=lambda kv: kv[0], reverse=True)
@@ -344,48 +600,193 @@ def rag_answer(query, top_k=5, **_):
         for yy, lines in items:
             for ln in lines:
                 out_lines.append(f"{yy} - {_norm(ln)}")
-        return "\n".join(out_lines)
+        return "C", "\n".join(out_lines)
 
     # ---------- D) 솔루션/비즈니스 ----------
-    sol_names = _collect_names(metas, "solution")
-    biz_names = _collect_names(metas, "business")
+    sol_names = views["sol_names"]
+    biz_names = views["biz_names"]
 
     wants_solution = ("솔루션" in qnorm) or any(n.lower() in qnorm.lower() for n in sol_names)
     wants_business = ("비즈니스" in qnorm) or ("사업" in qnorm) or any(n.lower() in qnorm.lower() for n in biz_names)
 
     # 둘 다 요약
     if wants_solution and wants_business and any(k in qnorm for k in ["요약", "목록", "리스트", "전체", "종류"]):
-        sol_txt = _get_by_id(metas, texts, "솔루션_요약")
-        biz_txt = _get_by_id(metas, texts, "비즈니스_요약")
+        sol_txt = _by_id(views, "솔루션_요약")
+        biz_txt = _by_id(views, "비즈니스_요약")
         parts = []
         if sol_txt: parts.append(f"[솔루션]\n{sol_txt}")
         if biz_txt: parts.append(f"[비즈니스]\n{biz_txt}")
         if parts:
-            return "\n\n".join(parts)
+            return "D", "\n\n".join(parts)
 
     # 솔루션만
     if wants_solution:
         if any(k in qnorm for k in ["요약", "목록", "리스트", "전체", "종류"]):
-            txt = _get_by_id(metas, texts, "솔루션_요약")
+            txt = _by_id(views, "솔루션_요약")
             if txt:
-                return txt
+                return "D", txt
         for name in sol_names:
             if name.lower() in qnorm.lower():
-                txt = _get_by_id(metas, texts, f"솔루션_{name}")
+                txt = _by_id(views, f"솔루션_{name}")
                 if txt:
-                    return txt
+                    return "D", txt
 
     # 비즈니스만
     if wants_business:
         if any(k in qnorm for k in ["요약", "목록", "리스트", "전체", "종류"]):
-            txt = _get_by_id(metas, texts, "비즈니스_요약")
+            txt = _by_id(views, "비즈니스_요약")
             if txt:
-                return txt
+                return "D", txt
         for name in biz_names:
             if name.lower() in qnorm.lower():
-                txt = _get_by_id(metas, texts, f"비즈니스_{name}")
+                txt = _by_id(views, f"비즈니스_{name}")
                 if txt:
-                    return txt
+                    return "D", txt
+
+    return None, None
+
+def structured_answer(query: str) -> Tuple[Optional[str], Optional[str]]:
+    """A~D 구조화 직답 → (경로, 답변), 해당 없으면 (None, None) — 생성 경로(rag/generate.py)용"""
+    _, texts, metas = load_index()
+    with stage("normalize"):
+        qnorm = _norm(query)
+    with stage("intent"):
+        return _answer_structured(query, qnorm, metas, texts)
+
+def _audit_semantic(cache: SemanticCache, query: str, qvec: np.ndarray, top_k: int, sem: Dict):
+    """의미 캐시 적중 표본: 실제 검색 답변과 비교해 오탐 집계, 오탐이면 그 항목 제거 (백그라운드 스레드)"""
+    try:
+        hits, _ = _dense_search(query, top_k, qvec=qvec)
+        same = (hits[0]["text"] if hits else "자료 부족") == sem["answer"]
+        invalidated = cache.record_audit(same, entry_id=sem.get("id"))
+        SEMCACHE_EVENTS.inc(event="audited")
+        if not same:
+            SEMCACHE_EVENTS.inc(event="false_hit")
+        if invalidated:
+            SEMCACHE_EVENTS.inc(event="invalidated")
+    except Exception as e:
+        print(f"[WARN] 의미 캐시 검사 실패: {e}")
+    finally:
+        _AUDIT_SLOT.release()
+
+def _dense_cost() -> float:
+    """
+    질의 인코딩 + FAISS 검색 추정 시간
+    - 모델이 아직 없으면 로드 시간 포함 (예열 중이면 이미 지난 만큼 뺀 남은 로드 시간)
+    """
+    cost = _COSTS.estimate("encode", "faiss_search")
+    if _MODEL is None:
+        load = _COSTS.estimate("model_load")
+        warming = _WARMUP
+        if warming is not None and warming.is_alive():
+            load = max(0.0, load - (time.perf_counter() - _WARMUP_STARTED))
+        cost += load
+    return cost
+
+def estimate_cost(*names: str) -> float:
+    """
+    단계 추정 시간 합(초) — 다른 모듈(rag/generate.py 스트리밍)의 마감 시간 판단용
+    - "retrieval": 밀집 검색 + MMR (모델이 없으면 남은 로드 시간 포함)
+    """
+    total = 0.0
+    for n in names:
+        total += (_dense_cost() + _COSTS.estimate("mmr")) if n == "retrieval" else _COSTS.estimate(n)
+    return total
+
+def observe_cost(name: str, seconds: float):
+    """단계 소요 시간 관측 → 비용 추정(EWMA)에 반영"""
+    _COSTS.observe(name, seconds)
 
-    # ---------- E) 기본 ----------
-    return hits[0]["text"] if hits else "자료 부족"
\ No newline at end of file
+def answer_with_deadline(query, top_k=5, deadline: Optional[Deadline] = None) -> Tuple[str, str, str]:
+    """
+    마감 시간 안에서 가능한 가장 좋은 단계로 답변 → (tier, 경로 A~E, 답변)
+    - 예산이 충분하면(또는 deadline 없음) 기존과 같음: structured(A~D) → dense_mmr(E)
+    - 예산 < 밀집 검색+MMR 추정 시간이면 더 싼 단계 순서로:
+        cache      : 같은 질의(같은 인덱스 버전)의 이전 dense_mmr 답변
+        structured : 구조화 직답(A~D, 인코딩 없음)
+        dense      : 밀집 검색(MMR 생략) — 인코딩+검색 예산이 남을 때
+        lexical    : 글자 bigram 매칭 — 그것도 모자라면(모델 미로드 포함)
+    - 밀집 검색 도중에도 MMR 직전에 다시 확인 → 인코딩이 느렸으면 MMR 생략(dense)
+    - 질의를 인코딩했으면(dense/dense_mmr 경로) 먼저 의미 캐시 조회 → 적중 시 semantic
+    """
+    deadline = deadline or Deadline()
+    index, texts, metas = load_index()
+    with stage("normalize"):
+        qnorm = _norm(query)
+    key = (index_version(), qnorm, top_k)
+    degraded = not deadline.allows(_dense_cost() + _COSTS.estimate("mmr"))
+    if degraded and _MODEL is None:
+        # 모델 로드를 기다릴 예산이 없어도 다음 요청부터는 밀집 검색을 쓰도록 백그라운드 로드 시작
+        warm_up()
+
+    tier, path, ans = None, None, None
+    if degraded:
+        with _ANSWERS_LOCK:
+            hit = _ANSWERS.get(key)
+            if hit is not None:
+                _ANSWERS.move_to_end(key)
+        cache_event("answer", hit is not None)
+        if hit is not None:
+            tier, (path, ans) = "cache", hit
+
+    if tier is None:
+        with stage("intent"):
+            path, ans = _answer_structured(query, qnorm, metas, texts)
+        tier = "structured"
+    if path is None:
+        # ---------- E) 기본 ----------
+        sem, qvec, cache = None, None, _SEMCACHE
+        if deadline.allows(_dense_cost()):
+            qvec = _encode_query(query)
+            if cache is not None:
+                sem = cache.lookup(qvec[0], key[0], top_k)
+                cache_event("semantic", sem is not None)
+        if sem is not None:
+            tier, path, ans = "semantic", sem["path"], sem["answer"]
+            if cache.should_audit() and _AUDIT_SLOT.acquire(blocking=False):
+                _AUDIT.submit(_audit_semantic, cache, query, qvec, top_k, sem)
+        else:
+            if qvec is not None:
+                hits, used_mmr = _dense_search(query, top_k, deadline=deadline, qvec=qvec)
+                tier = "dense_mmr" if used_mmr else "dense"
+            else:
+                hits, tier = lexical_search(query, top_k), "lexical"
+            with stage("assemble"):
+                path, ans = "E", (hits[0]["text"] if hits else "자료 부족")
+        if tier == "dense_mmr":
+            with _ANSWERS_LOCK:
+                _ANSWERS[key] = (path, ans)
+                _ANSWERS.move_to_end(key)
+                while len(_ANSWERS) > RAG_ANSWER_CACHE_SIZE:
+                    _ANSWERS.popitem(last=False)
+            if cache is not None:
+                cache.put(qvec[0], key[0], top_k, qnorm, path, ans)
+    ROUTE_TOTAL.inc(path=path)
+    TIER_TOTAL.inc(tier=tier)
+    return tier, path, ans
+
+def rag_answer_routed(query, top_k=5, deadline: Optional[Deadline] = None) -> Tuple[str, str]:
+    """
+    rag_answer와 동일하되 (경로, 답변)을 함께 반환 — 골든 회귀/메트릭용.
+    - 질의 intent를 분류하여 맞춤 응답:
+      A) 회사 소개 → 슬로건 반환
+      B) info 직답 (회사명, 대표이사 등)
+      C) 연혁 질의 → 특정 연도/최신/전체
+      D) 솔루션/비즈니스 → 요약 or 개별 항목
+      E) 기본 → top1 스니펫
+    - 벡터 검색(search)은 E)에서만 수행 → 구조화 의도는 인코딩 비용을 내지 않음
+    - deadline: 예산에 따른 단계 축소는 answer_with_deadline() 참고
+    """
+    _, path, ans = answer_with_deadline(query, top_k=top_k, deadline=deadline)
+    return path, ans
+
+def rag_answer(query, top_k=5, generate=False, **_):
+    """
+    고급 응답 함수: 의도별 맞춤 응답(A~E)을 문자열로 반환.
+    경로 구분은 rag_answer_routed() 참고.
+    - generate=True: E) 는 검색 결과를 토큰 예산 안으로 포장해 LLM 생성(rag/generate.py, Ollama 불가 시 스니펫)
+    """
+    if generate:
+        from rag.generate import generate_answer
+        return generate_answer(query, top_k=top_k)[1]
+    return rag_answer_routed(query, top_k=top_k)[1]
@@ -0,0 +1,114 @@
+# semantic_cache.py
+# -----------------------------------------------------------------------------
+# 역할: 의미 기반 답변 캐시 — 표현만 다른 같은 질문("본사 어디야" / "본사 주소 알려줘")을 재사용
+#   - (질의 벡터, 답변, 인덱스 버전)을 작은 메모리 FAISS 인덱스(IndexFlatIP + ID 매핑)에 보관
+#   - 새 질의 벡터와 코사인 유사도(정규화 벡터의 내적)가 threshold 이상인 항목이 있으면 그 답변 반환
+#     → rag/search.py 가 FAISS 검색/MMR/답변 조립을 건너뜀 (질의 인코딩은 이미 끝난 상태)
+#   - LRU: 조회/저장 때마다 최근으로 옮기고, capacity 를 넘으면 가장 오래된 항목을 인덱스에서 제거
+#   - 인덱스 버전(rag.search.index_version)이 바뀌면 전체 무효화 (예전 인덱스로 만든 답변은 버림)
+#
+# 오탐(false hit) 측정:
+#   - 적중 중 audit_rate 비율만 골라, 응답은 캐시로 바로 내보내고 별도 스레드에서 실제 검색 답변과 비교
+#   - 다르면 false_hit → stats()/메트릭(rag_semcache_events_total)으로 threshold 조정 근거 제공
+#   - 오탐으로 판정된 항목은 바로 제거(invalidated) → 같은 항목이 다음 질의에도 틀린 답을 내지 않음
+#     (답변만 바꾸면 그 항목을 만든 원래 질의가 틀린 답을 받으므로 교체하지 않음, 다음 전체 경로 답변이 다시 저장됨)
+# -----------------------------------------------------------------------------
+import random, threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np, faiss
+
+from config import RAG_SEMCACHE_SIZE, RAG_SEMCACHE_THRESHOLD, RAG_SEMCACHE_AUDIT_RATE
+
+class SemanticCache:
+    def __init__(self, capacity: int = RAG_SEMCACHE_SIZE, threshold: float = RAG_SEMCACHE_THRESHOLD,
+                 audit_rate: float = RAG_SEMCACHE_AUDIT_RATE, probe: int = 4):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.audit_rate = audit_rate
+        self.probe = probe                      # 같은 top_k 항목을 찾기 위해 볼 최근접 후보 수
+        self._index: Optional[faiss.Index] = None
+        self._entries: "OrderedDict[int, Tuple]" = OrderedDict()   # id → (질의, top_k, 경로, 답변)
+        self._version: Optional[str] = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "audited": 0, "false_hits": 0, "evictions": 0, "invalidated": 0}
+
+    def _reset(self, version: Optional[str], dim: Optional[int] = None):
+        self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim)) if dim else None
+        self._entries.clear()
+        self._version = version
+
+    def lookup(self, qvec: np.ndarray, version: str, top_k: int) -> Optional[Dict]:
+        """
+        qvec(정규화된 1차원 질의 벡터)와 가장 가까운 캐시 항목 → {"id", "query", "path", "answer", "score"} / None
+        - 같은 인덱스 버전, 같은 top_k 이고 유사도 >= threshold 일 때만 적중
+        """
+        with self._lock:
+            if version != self._version:
+                self._reset(version)
+            hit = None
+            if self._index is not None and self._index.ntotal:
+                scores, ids = self._index.search(qvec.reshape(1, -1), min(self.probe, self._index.ntotal))
+                for s, i in zip(scores[0], ids[0]):
+                    if i == -1 or s < self.threshold:
+                        break                   # 유사도 내림차순 → 이후 후보도 임계값 미만
+                    q, k, path, ans = self._entries[int(i)]
+                    if k == top_k:
+                        self._entries.move_to_end(int(i))
+                        hit = {"id": int(i), "query": q, "path": path, "answer": ans, "score": float(s)}
+                        break
+            self._stats["hits" if hit else "misses"] += 1
+            return hit
+
+    def put(self, qvec: np.ndarray, version: str, top_k: int, query: str, path: str, answer: str):
+        """전체 경로로 만든 답변 저장 (capacity 초과 시 LRU 제거)"""
+        vec = np.ascontiguousarray(qvec.reshape(1, -1), dtype=np.float32)
+        with self._lock:
+            if version != self._version or self._index is None or self._index.d != vec.shape[1]:
+                self._reset(version, vec.shape[1])
+            _id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(vec, np.array([_id], dtype=np.int64))
+            self._entries[_id] = (query, top_k, path, answer)
+            while len(self._entries) > self.capacity:
+                old, _ = self._entries.popitem(last=False)
+                self._index.remove_ids(np.array([old], dtype=np.int64))
+                self._stats["evictions"] += 1
+
+    def should_audit(self) -> bool:
+        return self.audit_rate > 0 and random.random() < self.audit_rate
+
+    def record_audit(self, same: bool, entry_id: Optional[int] = None) -> bool:
+        """
+        샘플 적중의 실제 답변 비교 결과 기록 (다르면 오탐)
+        - 오탐이면 적중했던 항목(lookup 결과의 "id") 제거 → 제거했으면 True
+          (그 사이 LRU/버전 변경으로 이미 빠졌으면 False, id 는 재사용하지 않으므로 다른 항목을 지우지 않음)
+        """
+        with self._lock:
+            self._stats["audited"] += 1
+            if same:
+                return False
+            self._stats["false_hits"] += 1
+            if entry_id is None or self._entries.pop(entry_id, None) is None:
+                return False
+            self._index.remove_ids(np.array([entry_id], dtype=np.int64))
+            self._stats["invalidated"] += 1
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._reset(None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """hits/misses/audited/false_hits/evictions/invalidated + 적중률, 표본 오탐률"""
+        with self._lock:
+            s = dict(self._stats, size=len(self._entries))
+        looked = s["hits"] + s["misses"]
+        s["hit_ratio"] = round(s["hits"] / looked, 4) if looked else 0.0
+        s["false_hit_ratio"] = round(s["false_hits"] / s["audited"], 4) if s["audited"] else None
+        return s
@@ -1,29 +1,169 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Header, HTTPException
 from pydantic import BaseModel
-from fastapi.responses import JSONResponse
-import os
-from rag.search import rag_answer
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+import json, os, time
+from config import RAG_DEFAULT_DEADLINE_MS
+from rag.search import answer_with_deadline, warm_up
+from rag.generate import stream_answer, warm_packer
+from utils import metrics, profiler
+from utils.deadline import Deadline
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 질의 인코더/인덱스를 백그라운드로 미리 로드 — 안 하면 마감 있는 요청은 모델 로드(수십 초)를
+    # 기다릴 수 없어 계속 lexical 로만 답하게 됨. 로드가 끝나기 전 요청은 더 싼 단계로 답함
+    warm_up()
+    warm_packer()
+    yield
+
+app = FastAPI(lifespan=lifespan)
+
+# 관리자 엔드포인트/요청 단위 프로파일링용 토큰 (미설정 시 관리자 기능 비활성)
+ADMIN_TOKEN = os.getenv("RAG_ADMIN_TOKEN")
+
+def _is_admin(token: str | None) -> bool:
+    return bool(ADMIN_TOKEN) and token == ADMIN_TOKEN
+
+def _require_admin(token: str | None):
+    if not _is_admin(token):
+        raise HTTPException(status_code=403, detail="관리자 토큰이 필요합니다.")
+
+def _collapsed_response(collapsed: str, name: str):
+    return PlainTextResponse(
+        collapsed,
+        media_type="text/plain; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{name}.collapsed"'},
+    )
 
 class AskIn(BaseModel):
     question: str
     top_k: int | None = 8
+    deadline_ms: int | None = None   # 응답 시간 예산(ms). 없으면 RAG_DEFAULT_DEADLINE_MS (0: 마감 없음)
 
 class AskOut(BaseModel):
     answer: str
+    tier: str    # 답변을 만든 단계: cache / semantic / structured / lexical / dense / dense_mmr
+    path: str    # 의도 경로 A~E
+
+@app.middleware("http")
+async def track_requests(request: Request, call_next):
+    # 처리 중 요청 수(in-flight) + 요청 전체 시간 히스토그램
+    metrics.INFLIGHT.inc()
+    t0 = time.perf_counter()
+    # 마감 시간은 요청 수신 시점부터 (스레드풀 대기 등 과부하 대기 시간도 예산에 포함)
+    request.state.received = t0
+    try:
+        return await call_next(request)
+    finally:
+        metrics.INFLIGHT.dec()
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - t0, path=request.url.path)
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    # 요청 단위 opt-in: "X-Profile: <관리자 토큰>" 헤더가 있을 때만 샘플러를 켠다
+    # (헤더가 없으면 딕셔너리 조회 한 번뿐 → 꺼져 있을 때 오버헤드 없음)
+    flag = request.headers.get("x-profile")
+    if not flag or not _is_admin(flag):
+        return await call_next(request)
+    # 대상 스레드는 비워 두고 시작 → 핸들러(ask)가 자기 스레드를 등록(profiler.attached)
+    sampler = profiler.StackSampler(thread_ids=()).start()
+    token = profiler.activate(sampler)
+    try:
+        response = await call_next(request)
+    finally:
+        profiler.deactivate(token)
+        collapsed = sampler.stop()
+    response.headers["X-Profile-Id"] = profiler.store(collapsed)
+    return response
+
+def _deadline(body: AskIn, request: Request) -> Deadline:
+    budget = body.deadline_ms if body.deadline_ms is not None else RAG_DEFAULT_DEADLINE_MS
+    return Deadline(budget, start=getattr(request.state, "received", None))
 
 @app.post("/rag/ask", response_model=AskOut)
-def ask(body: AskIn):
-    print("[DEBUG] CWD =", os.getcwd())
-    print("[DEBUG] Q   =", body.question)
-    ans = rag_answer(body.question, top_k=body.top_k or 8)
-    print("[DEBUG] A   =", ans[:200].replace('\n',' '))
+def ask(body: AskIn, request: Request):
+    # 단계별 시간은 같은 스레드/컨텍스트에서 기록되므로 엔드포인트 안에서 버퍼를 연다
+    token = metrics.begin_request()
+    t0 = time.perf_counter()
+    # 예산은 요청 수신 시점(track_requests)부터 계산 (단계마다 남은 시간으로 다음 단계를 고름)
+    deadline = _deadline(body, request)
+    try:
+        # X-Profile 요청이면 이 스레드(스레드풀 워커)만 샘플
+        with profiler.attached():
+            print("[DEBUG] CWD =", os.getcwd())
+            print("[DEBUG] Q   =", body.question)
+            tier, path, ans = answer_with_deadline(body.question, top_k=body.top_k or 8, deadline=deadline)
+            print(f"[DEBUG] A   = ({tier}/{path})", ans[:200].replace('\n',' '))
+    finally:
+        timings = metrics.end_request(token)
     return JSONResponse(
-        content={"answer": ans},
-        media_type="application/json; charset=utf-8"
+        content={"answer": ans, "tier": tier, "path": path},
+        media_type="application/json; charset=utf-8",
+        headers={"Server-Timing": metrics.server_timing_header(timings, time.perf_counter() - t0)},
     )
 
+def _sse(event: dict) -> str:
+    # Server-Sent Events 한 건: "event: <종류>\ndata: <JSON>\n\n"
+    kind = event.pop("event")
+    return f"event: {kind}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+@app.post("/rag/ask/stream")
+def ask_stream(body: AskIn, request: Request):
+    """
+    /rag/ask 의 스트리밍 버전 (text/event-stream)
+    - event: meta  → {"tier", "path"}          (tier=generate 이면 생성 토큰이 이어짐)
+    - event: token → {"text"}                  (생성기가 만든 조각을 받는 즉시 전달)
+    - event: done  → {"answer", "tier", "path"} (최종 답변 전체, 생성 실패 시 "error")
+    - Ollama 가 없거나 A~D 직답이거나 예산이 첫 토큰까지도 모자라면 /rag/ask 와 같은 답을 token 한 번으로 보냄
+    """
+    deadline = _deadline(body, request)
+    print("[DEBUG] Q(stream) =", body.question)
+
+    def events():
+        # 동기 제너레이터 → StreamingResponse 가 스레드풀에서 돌림 (생성 대기가 이벤트 루프를 막지 않음)
+        for ev in stream_answer(body.question, top_k=body.top_k or 8, deadline=deadline):
+            if ev["event"] == "done":
+                print(f"[DEBUG] A(stream) = ({ev['tier']}/{ev['path']})", ev["answer"][:200].replace('\n', ' '))
+            yield _sse(ev)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream; charset=utf-8",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/metrics")
+def prometheus_metrics():
+    # Prometheus text exposition format 0.0.4
+    return PlainTextResponse(
+        metrics.REGISTRY.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+@app.post("/admin/profile")
+def capture_profile(seconds: float = 10.0, interval_ms: float = 5.0,
+                    x_admin_token: str | None = Header(default=None)):
+    """
+    살아있는 프로세스를 seconds초 동안 샘플링해 collapsed-stack 파일로 반환.
+    (flamegraph.pl / speedscope 호환, 최대 profiler.MAX_SECONDS초)
+    """
+    _require_admin(x_admin_token)
+    try:
+        collapsed = profiler.capture(seconds, interval_ms / 1000.0)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return _collapsed_response(collapsed, f"rag-{int(time.time())}")
+
+@app.get("/admin/profile/{profile_id}")
+def get_request_profile(profile_id: str, x_admin_token: str | None = Header(default=None)):
+    """X-Profile 헤더로 프로파일링한 단일 요청의 결과 조회 (응답 헤더 X-Profile-Id)"""
+    _require_admin(x_admin_token)
+    collapsed = profiler.get_stored(profile_id)
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="프로파일을 찾을 수 없습니다.")
+    return _collapsed_response(collapsed, f"rag-{profile_id}")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("service:app", host="0.0.0.0", port=9001, reload=False)
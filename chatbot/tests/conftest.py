@@ -0,0 +1,91 @@
+# tests/conftest.py
+# -----------------------------------------------------------------------------
+# 공용 픽스처: 스레드에서 도는 로컬 HTTP 서버 (크롤러 엔진 / 생성 스트리밍 테스트용)
+#   - http_server.route(path, fn): fn(handler) → (status, headers, body)
+#     body 가 bytes 면 Content-Length, 이터레이터면 chunked 전송(조각마다 flush — Ollama NDJSON 흉내)
+#   - 요청 로그(경로, 시작 시각)와 호스트별 동시 처리 수 최대값을 기록
+#
+# 실행 (chatbot/ 에서):
+#   python -m pytest -q tests
+# -----------------------------------------------------------------------------
+import sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))   # chatbot/ (config, crawler, rag …)
+
+class FixtureServer:
+    def __init__(self):
+        self.routes = {}
+        self.log = []               # (경로, 요청 시작 time.monotonic())
+        self.inflight = {}          # Host 헤더별 처리 중 요청 수
+        self.max_inflight = {}
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server._handle(self)
+
+            def do_POST(self):
+                server._handle(self)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def route(self, path: str, fn):
+        self.routes[path] = fn
+
+    def hits(self, path: str) -> int:
+        return sum(1 for p, _ in self.log if p == path)
+
+    def _handle(self, h: BaseHTTPRequestHandler):
+        path = h.path.split("?", 1)[0]
+        host = h.headers.get("Host", "")
+        with self.lock:
+            self.log.append((path, time.monotonic()))
+            self.inflight[host] = self.inflight.get(host, 0) + 1
+            self.max_inflight[host] = max(self.max_inflight.get(host, 0), self.inflight[host])
+        try:
+            fn = self.routes.get(path)
+            status, headers, body = fn(h) if fn else (404, {}, b"not found")
+            h.send_response(status)
+            for k, v in headers.items():
+                h.send_header(k, v)
+            if isinstance(body, (bytes, bytearray)):
+                h.send_header("Content-Length", str(len(body)))
+                h.end_headers()
+                h.wfile.write(body)
+            else:
+                h.send_header("Transfer-Encoding", "chunked")
+                h.end_headers()
+                for part in body:
+                    h.wfile.write(b"%x\r\n%s\r\n" % (len(part), part))
+                    h.wfile.flush()
+                h.wfile.write(b"0\r\n\r\n")
+            h.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with self.lock:
+                self.inflight[host] -= 1
+
+@pytest.fixture
+def http_server():
+    server = FixtureServer()
+    server.thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
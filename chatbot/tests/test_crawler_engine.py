@@ -0,0 +1,133 @@
+# tests/test_crawler_engine.py
+# -----------------------------------------------------------------------------
+# crawler/engine.py — 재시도/백오프, 404, 호스트별 동시성, politeness 간격,
+# crawl_main_page / crawl_solution_page / crawl_business_pages 가 엔진으로 수집하는지
+# (로컬 HTTP 픽스처 서버, tests/conftest.py)
+# -----------------------------------------------------------------------------
+import asyncio, time
+
+import httpx
+import pytest
+
+from crawler.engine import CrawlEngine, run_jobs
+import crawler.web_crawler as W
+from utils.dataset import read_records
+
+def _ok(body: bytes = b"<html><body>ok</body></html>"):
+    return lambda h: (200, {"Content-Type": "text/html; charset=utf-8"}, body)
+
+def _run(coro_fn, **engine_kw):
+    async def _main():
+        async with CrawlEngine(**engine_kw) as eng:
+            return await coro_fn(eng)
+    return asyncio.run(_main())
+
+def _gaps(times):
+    times = sorted(times)
+    return [b - a for a, b in zip(times, times[1:])]
+
+def test_retry_with_backoff_on_503(http_server):
+    calls = []
+
+    def flaky(h):
+        calls.append(time.monotonic())
+        return (503, {}, b"busy") if len(calls) <= 2 else (200, {}, b"ok")
+    http_server.route("/flaky", flaky)
+
+    res = _run(lambda eng: eng.fetch(http_server.url + "/flaky"),
+               retries=3, backoff=0.05, delay=0, parse_processes=0)
+    assert res.status == 200 and res.content == b"ok"
+    assert len(calls) == 3
+    # 지수 백오프: 0.05 → 0.1 (지터는 +25% 이내)
+    first, second = _gaps(calls)
+    assert first >= 0.05 and second >= 0.1
+
+def test_retry_after_header_and_give_up(http_server):
+    http_server.route("/down", lambda h: (503, {"Retry-After": "0"}, b"down"))
+    with pytest.raises(httpx.HTTPStatusError):
+        _run(lambda eng: eng.fetch(http_server.url + "/down"),
+             retries=2, backoff=10.0, delay=0, parse_processes=0)   # Retry-After 가 백오프보다 우선
+    assert http_server.hits("/down") == 3
+
+def test_404_is_not_retried(http_server):
+    url = http_server.url + "/missing"
+    res = _run(lambda eng: eng.fetch(url), retries=3, backoff=0.01, delay=0, parse_processes=0)
+    assert res.status == 404
+    assert http_server.hits("/missing") == 1
+
+    # run()/crawl(): 실패 페이지는 예외로 제자리에, 나머지는 정상 결과
+    http_server.route("/ok", _ok())
+    out = run_jobs([(url, W.extract_page), (http_server.url + "/ok", W.extract_page)],
+                   delay=0, parse_processes=0)
+    assert isinstance(out[0], RuntimeError) and "404" in str(out[0])
+    assert out[1] == []
+
+def test_per_host_concurrency_limit(http_server):
+    def slow(h):
+        time.sleep(0.15)
+        return 200, {}, b"<html></html>"
+    for i in range(6):
+        http_server.route(f"/slow{i}", slow)
+
+    jobs = [(f"{http_server.url}/slow{i}", W.extract_page) for i in range(6)]
+    out = run_jobs(jobs, concurrency=8, per_host=2, delay=0, parse_processes=0)
+    assert all(r == [] for r in out)
+    assert max(http_server.max_inflight.values()) == 2
+
+def test_politeness_delay(http_server):
+    for i in range(4):
+        http_server.route(f"/p{i}", _ok())
+    jobs = [(f"{http_server.url}/p{i}", W.extract_page) for i in range(4)]
+    run_jobs(jobs, concurrency=8, per_host=4, delay=0.2, parse_processes=0)
+    starts = [t for p, t in http_server.log if p.startswith("/p")]
+    assert len(starts) == 4
+    assert min(_gaps(starts)) >= 0.19
+
+MAIN_HTML = """<html><body>
+<h2>회사 소개</h2><p>최고의 경험, 신뢰할 수 있는 전문성</p>
+<h3>사업 분야</h3><div>클라우드, 인프라, 플랫폼</div>
+</body></html>""".encode("utf-8")
+
+SOLUTION_HTML = """<html><body>
+<div class="sSol_box"><strong>Chainform</strong><h4>전자서식 솔루션</h4>
+  <div class="sSol_cont"><ul><li>서식 작성</li><li>전자 서명</li></ul></div></div>
+<div class="sSol_box"><strong>Rexpert</strong><h4>리포팅 도구</h4></div>
+</body></html>""".encode("utf-8")
+
+def _business_html(name: str) -> bytes:
+    return (f'<html><body><div class="cont"><h3><small>{name}</small> 사업</h3>'
+            f"<p>{name} 구축 및 운영 서비스</p></div></body></html>").encode("utf-8")
+
+def test_crawl_functions_use_engine(http_server, tmp_path, monkeypatch):
+    http_server.route("/", _ok(MAIN_HTML))
+    http_server.route("/page/solution.html", _ok(SOLUTION_HTML))
+    for page in W.BUSINESS_PAGES[:-1]:
+        http_server.route(f"/page/{page}", _ok(_business_html(page.split(".")[0])))
+    # 마지막 비즈니스 페이지는 404 → 보고만 하고 진행(strict=False)
+
+    monkeypatch.setattr(W, "BASE_URL", http_server.url + "/")
+    monkeypatch.setattr(W, "RAW_PATH", tmp_path / "raw.jsonl")
+    monkeypatch.setattr(W, "DATA_DIR", tmp_path)
+    engines = []
+    orig_init = CrawlEngine.__init__
+
+    def spy(self, *a, **kw):
+        orig_init(self, *a, **kw)
+        engines.append(self)
+    monkeypatch.setattr(CrawlEngine, "__init__", spy)
+
+    W.crawl_main_page()
+    W.crawl_solution_page()
+    W.crawl_business_pages()
+
+    assert len(engines) == 3
+    rows = list(read_records(tmp_path / "raw.jsonl"))
+    sections = [r["section"] for r in rows]
+    assert sections.count("main") == 2
+    assert [r["title"] for r in rows if r["section"] == "solution"] == ["Chainform", "Rexpert"]
+    assert sections.count("business") == len(W.BUSINESS_PAGES) - 1
+    assert http_server.hits(f"/page/{W.BUSINESS_PAGES[-1]}") == 1
+    # 메인/솔루션 실패는 예외 전파
+    monkeypatch.setattr(W, "BASE_URL", http_server.url + "/nothing/")
+    with pytest.raises(RuntimeError):
+        W.crawl_main_page()
@@ -0,0 +1,124 @@
+# tests/test_health.py
+# -----------------------------------------------------------------------------
+# utils/health.py — CircuitBreaker / HealthMonitor (가짜 probe + 짧은 reset_timeout, 네트워크 없음)
+#   - 연속 2회 실패 → open, open 동안은 probe 안 함
+#   - reset_timeout 후 half_open 시험은 정확히 1건, 성공이면 closed / 실패면 다시 open
+# -----------------------------------------------------------------------------
+import threading, time
+
+from utils.health import CircuitBreaker, HealthMonitor, CLOSED, HALF_OPEN, OPEN
+
+RESET = 0.1
+
+class FakeProbe:
+    """결과를 바꿀 수 있는 probe (호출 수 기록, gate 가 있으면 열릴 때까지 대기)"""
+
+    def __init__(self, ok: bool = True):
+        self.ok = ok
+        self.calls = 0
+        self.gate = None
+
+    def __call__(self) -> bool:
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(2)
+        if isinstance(self.ok, Exception):
+            raise self.ok
+        return self.ok
+
+def _monitor(probe: FakeProbe) -> HealthMonitor:
+    states = []
+    breaker = CircuitBreaker(failures=2, reset_timeout=RESET, on_change=states.append)
+    m = HealthMonitor(probe=probe, breaker=breaker, name="test")
+    m.states = states
+    return m
+
+def test_starts_open_and_first_check_closes():
+    probe = FakeProbe(ok=True)
+    m = _monitor(probe)
+    assert not m.available() and m.breaker.state == OPEN
+    assert m.check() and m.breaker.state == CLOSED
+    assert probe.calls == 1
+    assert m.states == [OPEN, HALF_OPEN, CLOSED]
+
+def test_two_consecutive_failures_open():
+    probe = FakeProbe(ok=True)
+    m = _monitor(probe)
+    m.check()
+    probe.ok = False
+    assert m.check()                                    # 1회 실패: 아직 closed
+    probe.ok = True
+    m.check()                                           # 성공하면 연속 실패 수 초기화
+    probe.ok = RuntimeError("connection refused")       # 예외도 실패
+    assert m.check() and m.breaker.state == CLOSED
+    assert not m.check() and m.breaker.state == OPEN
+    assert m.last_ok is False and "connection refused" in m.last_error
+
+def test_no_probe_while_open():
+    probe = FakeProbe(ok=False)
+    m = _monitor(probe)
+    m.check()                                           # 첫 시험(half_open) 실패 → open
+    assert m.breaker.state == OPEN and probe.calls == 1
+    for _ in range(5):
+        assert not m.check()
+    assert probe.calls == 1
+    assert 0 < m.breaker.retry_in() <= RESET
+
+def test_exactly_one_half_open_probe():
+    probe = FakeProbe(ok=False)
+    m = _monitor(probe)
+    m.check()
+    time.sleep(RESET + 0.02)
+    probe.ok, probe.gate = True, threading.Event()
+    threads = [threading.Thread(target=m.check) for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    assert m.breaker.state == HALF_OPEN
+    assert probe.calls == 2                             # 첫 점검 + 시험 1건 (나머지 4건은 건너뜀)
+    assert not m.available()                            # half_open 동안 요청 경로는 여전히 사용 안 함
+    probe.gate.set()
+    for t in threads:
+        t.join()
+    assert probe.calls == 2
+
+def test_half_open_success_closes():
+    probe = FakeProbe(ok=False)
+    m = _monitor(probe)
+    m.check()
+    time.sleep(RESET + 0.02)
+    probe.ok = True
+    assert m.check() and m.breaker.state == CLOSED
+    assert m.states[-2:] == [HALF_OPEN, CLOSED]
+
+def test_half_open_failure_reopens():
+    probe = FakeProbe(ok=True)
+    m = _monitor(probe)
+    m.check()
+    probe.ok = False
+    m.check(); m.check()                                # closed → open
+    time.sleep(RESET + 0.02)
+    assert not m.check()                                # 시험 1회 실패 → 바로 다시 open (연속 2회 필요 없음)
+    assert m.breaker.state == OPEN and probe.calls == 4
+    assert m.states[-2:] == [HALF_OPEN, OPEN]
+    assert m.breaker.retry_in() > 0
+    assert not m.check() and probe.calls == 4
+
+def test_record_failure_from_caller_opens_without_probe():
+    probe = FakeProbe(ok=True)
+    m = _monitor(probe)
+    m.check()
+    m.record_failure(); m.record_failure()              # 실제 생성 호출 실패 보고
+    assert m.breaker.state == OPEN and probe.calls == 1
+
+def test_background_thread_respects_open():
+    probe = FakeProbe(ok=False)
+    breaker = CircuitBreaker(failures=2, reset_timeout=0.3)
+    m = HealthMonitor(probe=probe, breaker=breaker, interval=0.01, name="test").start()
+    try:
+        assert m.wait_ready(1) is False
+        time.sleep(0.45)
+        # 0.45초 동안 interval(0.01)마다가 아니라 reset_timeout(0.3)마다 시험 → 첫 점검 + 시험 1회
+        assert probe.calls == 2
+    finally:
+        m.stop()
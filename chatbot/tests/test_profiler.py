@@ -0,0 +1,196 @@
+# tests/test_profiler.py
+# -----------------------------------------------------------------------------
+# 스택 샘플러 — chatbot/utils/profiler.py 와 그 복사본 backend/profiler.py 를 같은 테스트로 검사
+#   - 공유 부분(샘플러/캡처/보관소/contextvar)의 소스가 두 파일에서 같은지 (복사본이 따로 바뀌면 실패)
+#   - capture(): collapsed-stack 형식 ("스레드;모듈:함수;... 샘플수"), 동시 캡처 거부
+#   - X-Profile 요청: 핸들러를 실행한 스레드만 샘플 (같은 시각 다른 스레드는 섞이지 않음)
+#     RAG 서비스 /rag/ask, 백엔드 ProfiledRoute(동기/비동기 엔드포인트)
+# -----------------------------------------------------------------------------
+import importlib.util, inspect, re, sys, threading, time
+from pathlib import Path
+
+import pytest
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from utils import profiler as chatbot_profiler
+
+BACKEND_PROFILER = Path(__file__).resolve().parents[2] / "backend" / "profiler.py"
+SHARED = ("_frame_label", "StackSampler", "capture", "activate", "deactivate", "attached", "store", "get_stored")
+TOKEN = "test-admin-token"
+LINE_RE = re.compile(r"^(.+) (\d+)$")
+
+def _load_backend_profiler():
+    spec = importlib.util.spec_from_file_location("backend_profiler", BACKEND_PROFILER)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = mod                # inspect.getsource 가 클래스 소스를 찾도록
+    spec.loader.exec_module(mod)
+    return mod
+
+backend_profiler = _load_backend_profiler()
+
+@pytest.fixture(params=["chatbot", "backend"])
+def prof(request):
+    return chatbot_profiler if request.param == "chatbot" else backend_profiler
+
+def _busy(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+def _spin(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(1000))
+
+@pytest.fixture
+def noise():
+    """같은 시각에 CPU 를 쓰는 다른 스레드 (요청 단위 프로파일에 섞이면 안 됨)"""
+    stop = threading.Event()
+    t = threading.Thread(target=_busy, args=(stop,), name="noise-worker", daemon=True)
+    t.start()
+    yield t
+    stop.set()
+    t.join()
+
+def _parse(collapsed: str):
+    """collapsed-stack → [(스레드 이름, [모듈:함수 …], 샘플 수)] (형식이 틀리면 실패)"""
+    rows = []
+    for line in collapsed.splitlines():
+        m = LINE_RE.match(line)
+        assert m, f"형식 오류: {line!r}"
+        thread, *frames = m.group(1).split(";")
+        assert thread and frames
+        assert all(re.fullmatch(r"[^;:]+:[^;:\s]+", f) for f in frames), line   # "<frozen runpy>:…" 도 허용
+        rows.append((thread, frames, int(m.group(2))))
+    return rows
+
+def test_copies_share_sampler_code():
+    for name in SHARED:
+        assert inspect.getsource(getattr(chatbot_profiler, name)) == \
+            inspect.getsource(getattr(backend_profiler, name)), f"{name} 이 두 profiler.py 에서 다름"
+    for name in ("MAX_SECONDS", "DEFAULT_INTERVAL", "_RECENT_MAX"):
+        assert getattr(chatbot_profiler, name) == getattr(backend_profiler, name)
+
+def test_capture_returns_collapsed_stacks(prof, noise):
+    rows = _parse(prof.capture(0.3, 0.005))
+    assert rows and all(n > 0 for _, _, n in rows)
+    mine = [(frames, n) for thread, frames, n in rows if thread == "noise-worker"]
+    assert mine and all("test_profiler:_busy" in frames for frames, _ in mine)
+    # 샘플러 자신은 빠짐
+    assert not any(thread == "stack-sampler" for thread, _, _ in rows)
+
+def test_capture_rejects_concurrent(prof):
+    t = threading.Thread(target=prof.capture, args=(0.3,))
+    t.start()
+    time.sleep(0.05)
+    try:
+        with pytest.raises(RuntimeError):
+            prof.capture(0.1)
+    finally:
+        t.join()
+
+def test_attached_registers_only_current_thread(prof, noise):
+    sampler = prof.StackSampler(0.005, thread_ids=()).start()
+    token = prof.activate(sampler)
+    try:
+        with prof.attached():
+            assert sampler.thread_ids == {threading.get_ident()}
+            _spin(0.2)
+        assert sampler.thread_ids == set()
+    finally:
+        prof.deactivate(token)
+    rows = _parse(sampler.stop())
+    assert {thread for thread, _, _ in rows} == {threading.current_thread().name}
+    assert any("test_profiler:_spin" in frames for _, frames, _ in rows)
+
+def _profiled_stacks(prof, resp):
+    pid = resp.headers["X-Profile-Id"]
+    return _parse(prof.get_stored(pid))
+
+def test_rag_ask_x_profile_samples_handler_thread(noise, monkeypatch):
+    import service
+
+    def _slow_answer(question, top_k=8, deadline=None):
+        _spin(0.3)
+        return "test", "E", "ok"
+
+    monkeypatch.setattr(service, "ADMIN_TOKEN", TOKEN)
+    monkeypatch.setattr(service, "answer_with_deadline", _slow_answer)
+    resp = TestClient(service.app).post("/rag/ask", json={"question": "q"}, headers={"X-Profile": TOKEN})
+    assert resp.status_code == 200 and resp.json()["answer"] == "ok"
+    rows = _profiled_stacks(chatbot_profiler, resp)
+    assert len({thread for thread, _, _ in rows}) == 1                    # 핸들러 스레드 하나
+    assert any("test_profiler:_slow_answer" in frames for _, frames, _ in rows)
+    assert not any("test_profiler:_busy" in frames for _, frames, _ in rows)
+    # 헤더가 없으면 프로파일하지 않음
+    assert "X-Profile-Id" not in TestClient(service.app).post("/rag/ask", json={"question": "q"}).headers
+
+class Item(BaseModel):
+    name: str
+
+def _profiled_router() -> APIRouter:
+    router = APIRouter(prefix="/t", route_class=backend_profiler.ProfiledRoute)
+
+    @router.post("/sync/{n}")
+    def sync_endpoint(n: int, item: Item, q: str = "x"):
+        _spin(0.2)
+        return {"n": n, "name": item.name, "q": q, "thread": threading.current_thread().name}
+
+    @router.get("/async/{n}")
+    async def async_endpoint(n: int, q: str = "y"):
+        _spin(0.2)
+        return {"n": n, "q": q}
+
+    return router
+
+def _backend_app(router: APIRouter | None = None) -> FastAPI:
+    """ProfiledRoute 라우터 + backend/main.py 와 같은 X-Profile 미들웨어"""
+    prof = backend_profiler
+    app = FastAPI()
+    app.include_router(router or _profiled_router())
+
+    @app.middleware("http")
+    async def profile_request(request: Request, call_next):
+        if request.headers.get("x-profile") != TOKEN:
+            return await call_next(request)
+        sampler = prof.StackSampler(thread_ids=()).start()
+        token = prof.activate(sampler)
+        try:
+            response = await call_next(request)
+        finally:
+            prof.deactivate(token)
+            collapsed = sampler.stop()
+        response.headers["X-Profile-Id"] = prof.store(collapsed)
+        return response
+
+    return app
+
+def test_profiled_route_keeps_endpoints_working():
+    router = _profiled_router()
+    assert all(isinstance(r, backend_profiler.ProfiledRoute) for r in router.routes)
+    app = _backend_app(router)
+    client = TestClient(app)
+    r = client.post("/t/sync/3?q=z", json={"name": "a"})
+    assert r.status_code == 200 and r.json()["n"] == 3 and r.json()["name"] == "a" and r.json()["q"] == "z"
+    assert client.post("/t/sync/x", json={"name": "a"}).status_code == 422       # 검증도 그대로
+    assert client.get("/t/async/5").json() == {"n": 5, "q": "y"}
+    # 시그니처가 유지되어 OpenAPI 에 경로/쿼리/본문 파라미터가 그대로 보임
+    ops = app.openapi()["paths"]
+    sync_op = ops["/t/sync/{n}"]["post"]
+    assert {p["name"] for p in sync_op["parameters"]} == {"n", "q"} and "requestBody" in sync_op
+    assert {p["name"] for p in ops["/t/async/{n}"]["get"]["parameters"]} == {"n", "q"}
+    assert [r.endpoint.__name__ for r in router.routes] == ["sync_endpoint", "async_endpoint"]
+
+@pytest.mark.parametrize("method,path,kw,fn", [
+    ("post", "/t/sync/1", {"json": {"name": "a"}}, "sync_endpoint"),
+    ("get", "/t/async/1", {}, "async_endpoint"),
+])
+def test_profiled_route_samples_handler_thread(noise, method, path, kw, fn):
+    client = TestClient(_backend_app())
+    resp = getattr(client, method)(path, headers={"X-Profile": TOKEN}, **kw)
+    assert resp.status_code == 200
+    rows = _profiled_stacks(backend_profiler, resp)
+    assert len({thread for thread, _, _ in rows}) == 1
+    assert any(f"test_profiler:{fn}" in frames and "test_profiler:_spin" in frames for _, frames, _ in rows)
+    assert not any("test_profiler:_busy" in frames for _, frames, _ in rows)
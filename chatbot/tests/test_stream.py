@@ -0,0 +1,197 @@
+# tests/test_stream.py
+# -----------------------------------------------------------------------------
+# 스트리밍 생성 경로 — OLLAMA_URL 을 chunked NDJSON 스텁(tests/conftest.py 픽스처 서버)으로 돌려서
+#   - RAG 서비스 /rag/ask/stream: meta → token… → done 순서, 토큰 = 스텁 조각
+#   - 백엔드 /api/chat/stream: thread → meta → token… → done 중계,
+#     어시스턴트 메시지가 done 이후 저장되는지 / 클라이언트가 중간에 끊어도 받은 데까지 저장되는지
+#     (백엔드는 sqlalchemy 등 백엔드 의존성이 있을 때만 — DB 호출은 crud 함수를 기록용으로 바꿔 확인)
+# -----------------------------------------------------------------------------
+import asyncio, json, threading, time
+from pathlib import Path
+
+import anyio
+import pytest
+import uvicorn
+from fastapi.testclient import TestClient
+
+from bench.stub_encoder import HashingEncoder
+from config import FAISS_INDEX, FAISS_TEXTS, FAISS_METAS
+from embedder.embed_faiss import build_faiss_index
+from processor.tokens import CharTokenizer, TokenCounter
+from rag import generate as G
+from rag import search as S
+from rag.context import ContextPacker
+from utils import health
+from utils.jsonl import JsonlWriter
+
+QUESTION = "클라우드 사업은 어떤 일을 해?"
+PIECES = ["클라우드 ", "인프라를 ", "구축하고 ", "운영합니다."]
+ANSWER = "".join(PIECES).strip()
+
+CHUNKS = [
+    {"id": "클라우드_0", "text": "클라우드 인프라 구축 및 운영 서비스를 제공합니다.", "section": "business", "start": 0, "end": 27},
+    {"id": "데이터_0", "text": "빅데이터 분석 플랫폼을 공급합니다.", "section": "business", "start": 0, "end": 18},
+    {"id": "전자문서_0", "text": "전자서식과 전자 서명을 지원하는 솔루션입니다.", "section": "solution", "start": 0, "end": 25},
+]
+
+def _ndjson():
+    for p in PIECES:
+        time.sleep(0.02)                # 조각 사이 생성 시간 → 중계 중 실제로 다음 조각을 기다림
+        yield json.dumps({"response": p, "done": False}).encode() + b"\n"
+    yield json.dumps({"response": "", "done": True}).encode() + b"\n"
+
+@pytest.fixture
+def rag_stub(http_server, tmp_path, monkeypatch):
+    """작은 인덱스 + 스텁 인코더 + 글자 수 포장기 + Ollama 스텁(닫힌 서킷)"""
+    http_server.route("/api/tags", lambda h: (200, {"Content-Type": "application/json"}, b'{"models": []}'))
+    http_server.route("/api/generate", lambda h: (200, {"Content-Type": "application/x-ndjson"}, _ndjson()))
+
+    chunks = tmp_path / "chunks.jsonl"
+    with JsonlWriter(chunks) as w:
+        for c in CHUNKS:
+            w.write(c)
+    encoder = HashingEncoder(dim=64)
+    paths = (tmp_path / "i.index", tmp_path / "t.jsonl", tmp_path / "m.jsonl")
+    build_faiss_index(chunks_path=chunks, index_path=paths[0], texts_path=paths[1], metas_path=paths[2],
+                      encoder=encoder, docs_path=tmp_path / "docs.jsonl")
+    S.use_encoder(encoder)
+    S.use_index(*paths)
+    G.use_packer(ContextPacker(counter=TokenCounter("chars", tokenizer=CharTokenizer())))
+
+    monitor = health.HealthMonitor(url=http_server.url + "/api/tags", name="ollama-test")
+    assert monitor.check()
+    monkeypatch.setattr(G, "OLLAMA_URL", http_server.url)
+    monkeypatch.setattr(G, "ollama_monitor", lambda: monitor)
+    yield http_server
+    # 모듈 전역 상태 복구 — 기본 인덱스(지운 임시 인덱스를 가리키지 않게, 답변/의미 캐시도 비움), 인코더, 포장기
+    S.use_index(FAISS_INDEX, FAISS_TEXTS, FAISS_METAS)
+    G.use_packer(None)
+    S.use_encoder(None)
+
+def _events(text: str):
+    """SSE 본문 → [(종류, data)]"""
+    out = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(l.split(": ", 1) for l in block.splitlines())
+        out.append((lines["event"], json.loads(lines["data"])))
+    return out
+
+def _check_order(events, first=("meta",)):
+    kinds = [k for k, _ in events]
+    n = len(first)
+    assert tuple(kinds[:n]) == first
+    assert kinds[n:] == ["token"] * len(PIECES) + ["done"]
+    assert [d["text"] for k, d in events if k == "token"] == PIECES
+    done = events[-1][1]
+    assert done["answer"] == ANSWER and done["tier"] == "generate" and "error" not in done
+
+def test_rag_stream_relays_ollama_tokens(rag_stub):
+    import service
+    resp = TestClient(service.app).post("/rag/ask/stream", json={"question": QUESTION, "deadline_ms": 5000})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = _events(resp.text)
+    _check_order(events)
+    assert events[0][1]["tier"] == "generate" and events[0][1]["path"] == "E"
+    assert rag_stub.hits("/api/generate") == 1
+
+def test_rag_stream_respects_deadline(rag_stub):
+    import service
+    # 예산 < 밀집 검색+MMR+첫 토큰 추정 → 생성 없이 /rag/ask 와 같은 단계 축소 답변
+    resp = TestClient(service.app).post("/rag/ask/stream", json={"question": QUESTION, "deadline_ms": 1})
+    events = _events(resp.text)
+    assert [k for k, _ in events] == ["meta", "token", "done"]
+    assert events[0][1]["tier"] not in ("generate", "dense_mmr")
+    assert rag_stub.hits("/api/generate") == 0
+
+def test_rag_stream_no_hits_skips_generation(rag_stub, monkeypatch):
+    monkeypatch.setattr(S, "search", lambda query, top_k=5: [])
+    events = [(e.pop("event"), e) for e in G.stream_answer(QUESTION)]
+    assert [k for k, _ in events] == ["meta", "token", "done"]
+    assert events[-1][1] == {"answer": "자료 부족", "tier": "snippet", "path": "E"}
+    assert rag_stub.hits("/api/generate") == 0
+
+@pytest.fixture
+def rag_service(rag_stub):
+    """RAG 서비스 앱을 스레드의 uvicorn 으로 (백엔드가 실제 HTTP 스트림으로 중계하도록)"""
+    import service
+    server = uvicorn.Server(uvicorn.Config(service.app, host="127.0.0.1", port=0,
+                                           log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    end = time.monotonic() + 5
+    while not server.started and time.monotonic() < end:
+        time.sleep(0.01)
+    assert server.started
+    yield f"http://127.0.0.1:{server.servers[0].sockets[0].getsockname()[1]}"
+    server.should_exit = True
+    thread.join(5)
+
+@pytest.fixture
+def backend(rag_service, monkeypatch):
+    """백엔드 채팅 라우터: RAG 호출은 스레드에서 도는 RAG 서비스로, crud 는 저장 기록으로"""
+    for mod in ("sqlalchemy", "pymysql", "dotenv", "jose", "passlib"):   # 백엔드 의존성
+        pytest.importorskip(mod)
+    for k, v in {"DB_USER": "u", "DB_PASSWORD": "p", "DB_HOST": "127.0.0.1", "DB_PORT": "3306", "DB_NAME": "db"}.items():
+        monkeypatch.setenv(k, v)
+    monkeypatch.syspath_prepend(str(Path(__file__).resolve().parents[2] / "backend"))
+    from routers import chat
+    import schemas
+
+    saved, threads = [], []
+
+    def create_thread(db, user_id=None, title=None):
+        threads.append(threading.get_ident())
+        return 7
+
+    def create_message(db, thread_id, role, content):
+        threads.append(threading.get_ident())
+        saved.append((thread_id, role, content))
+
+    monkeypatch.setattr(chat.crud, "create_chat_thread", create_thread)
+    monkeypatch.setattr(chat.crud, "create_chat_message", create_message)
+    monkeypatch.setattr(chat, "SessionLocal", lambda: type("S", (), {"close": lambda self: None})())
+    monkeypatch.setattr(chat, "RAG_STREAM_URL", rag_service + "/rag/ask/stream")
+    return chat, schemas, saved, threads
+
+def test_backend_stream_persists_after_done(backend):
+    chat, schemas, saved, threads = backend
+
+    async def run():
+        resp = await chat.chat_stream(schemas.ChatIn(message=QUESTION), db=None)
+        text, at_done = "", None
+        async for chunk in resp.body_iterator:
+            text += chunk
+            if at_done is None and "event: done" in text:
+                at_done = list(saved)
+        return text, at_done, threading.get_ident()
+
+    text, at_done, loop_thread = asyncio.run(run())
+    events = _events(text)
+    _check_order(events, first=("thread", "meta"))
+    assert events[0][1] == {"thread_id": 7}
+    # 사용자 메시지는 시작 시, 어시스턴트 메시지는 done 을 보낸 뒤
+    assert at_done == [(7, "user", QUESTION)]
+    assert saved == [(7, "user", QUESTION), (7, "assistant", ANSWER)]
+    # DB 호출은 이벤트 루프 스레드가 아닌 스레드풀에서
+    assert len(threads) == 3 and loop_thread not in threads
+
+def test_backend_stream_persists_on_client_disconnect(backend):
+    chat, schemas, saved, threads = backend
+
+    async def run():
+        resp = await chat.chat_stream(schemas.ChatIn(message=QUESTION), db=None)
+        text = ""
+        # Starlette 처럼 연결이 끊기면 응답을 보내던 태스크를 취소
+        async with anyio.create_task_group() as tg:
+            async def consume():
+                nonlocal text
+                async for chunk in resp.body_iterator:
+                    text += chunk
+                    # 토큰 이벤트 2개를 끝(빈 줄)까지 받은 뒤 연결 끊김
+                    if text.count("event: token") == 2 and text.endswith("\n\n"):
+                        tg.cancel_scope.cancel()
+            tg.start_soon(consume)
+
+    asyncio.run(run())
+    assert saved == [(7, "user", QUESTION), (7, "assistant", "".join(PIECES[:2]).strip())]
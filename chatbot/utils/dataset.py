@@ -0,0 +1,215 @@
+# utils/dataset.py
+"""
+파이프라인 단계 간 중간 파일(raw/clean/dedup/chunks/docs) 읽기/쓰기 — 형식은 확장자로 구분
+(어느 형식으로 만들지는 config.DATA_FORMAT → RAW_PATH 등의 확장자)
+
+- .jsonl : 줄 단위 JSON → utils/jsonl.py 코덱 그대로 (사람이 읽고 diff 하기 쉬움, 디버깅용 기본)
+- .arrow : Arrow IPC 파일(= Feather v2, 압축 없음) — pyarrow 필요(선택 의존성)
+    - 쓰기: 레코드를 ARROW_BATCH_ROWS 개씩 모아 RecordBatch 하나로 기록 (열 단위 이진 → 줄마다 JSON 직렬화 없음)
+    - 읽기: 파일을 메모리 맵으로 열어 배치 단위로 꺼냄 (배치 데이터는 복사 없이 페이지 캐시를 그대로 참조,
+      columns 로 필요한 열만 골라 dict 로 변환)
+    - 열 스키마 = 레코드 구조체의 FIELDS (utils/records.py: INT_FIELDS 는 int64, 나머지는 문자열, 모두 null 허용)
+      → 스키마에 없는 키는 ValueError, 읽을 때 null 인 열은 키 없음으로 돌려줌
+        (파이프라인은 c.get("start") 처럼 읽으므로 None 과 키 없음을 구분하지 않음)
+    - pandas.read_feather(path) / pyarrow.feather.read_table(path) 로도 바로 열림
+- 형식 변환(디버깅): python -m utils.dataset data/chunks.arrow data/chunks.jsonl
+
+사용:
+  for rec in read_records(path): ...
+  with open_writer(path, record=ChunkRecord) as w: w.write(rec)
+  write_records(path, rows)                 # 반환: 레코드 수
+"""
+import os
+import sys
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+
+from config import ARROW_BATCH_ROWS
+from utils.jsonl import read_jsonl, JsonlWriter
+from utils.records import RawRecord, CleanRecord, DocRecord, ChunkRecord
+
+ARROW_SUFFIXES = (".arrow", ".feather")
+
+# 파일 이름(stem) → 레코드 구조체 (record 를 넘기지 않았을 때 Arrow 스키마 결정용)
+_RECORDS_BY_STEM = {
+    "raw": RawRecord,
+    "clean": CleanRecord,
+    "dedup": CleanRecord,
+    "docs": DocRecord,
+    "chunks": ChunkRecord,
+}
+
+def is_arrow(path) -> bool:
+    return Path(path).suffix in ARROW_SUFFIXES
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc   # noqa: F401 (pa.ipc 하위 모듈 로드)
+    except ImportError:
+        raise RuntimeError("Arrow 형식(DATA_FORMAT='arrow', *.arrow)에는 pyarrow 가 필요합니다 (pip install pyarrow)")
+    return pyarrow
+
+def _record_for(path, record=None):
+    if record is not None:
+        return record
+    stem = Path(path).stem
+    if stem not in _RECORDS_BY_STEM:
+        raise ValueError(f"레코드 스키마를 알 수 없는 Arrow 파일: {path} (record= 로 지정)")
+    return _RECORDS_BY_STEM[stem]
+
+def arrow_schema(record):
+    """레코드 구조체 → Arrow 스키마 (FIELDS 순서 → dict 로 읽을 때 키 순서도 같음)"""
+    pa = _pyarrow()
+    return pa.schema([(k, pa.int64() if k in record.INT_FIELDS else pa.string()) for k in record.FIELDS])
+
+# --- 읽기 --------------------------------------------------------------------
+def _batch_rows(batch, columns: Optional[Sequence[str]]) -> List[dict]:
+    if columns is not None:
+        batch = batch.select([c for c in columns if c in batch.schema.names])
+    return [{k: v for k, v in row.items() if v is not None} for row in batch.to_pylist()]
+
+def num_batches(path) -> int:
+    """Arrow 파일의 RecordBatch 수 (병렬 샤드 분할용, processor/shards.py)"""
+    pa = _pyarrow()
+    with pa.memory_map(str(path)) as src:
+        return pa.ipc.open_file(src).num_record_batches
+
+def read_batches(path, start: int = 0, end: Optional[int] = None,
+                 columns: Optional[Sequence[str]] = None) -> Iterator[dict]:
+    """Arrow 파일의 [start, end) 번째 배치 레코드 (메모리 맵, 배치 단위 변환)"""
+    pa = _pyarrow()
+    with pa.memory_map(str(path)) as src:
+        reader = pa.ipc.open_file(src)
+        for i in range(start, reader.num_record_batches if end is None else end):
+            yield from _batch_rows(reader.get_batch(i), columns)
+
+def read_records(path, record=None, columns: Optional[Sequence[str]] = None) -> Iterator[Any]:
+    """
+    중간 파일 → 레코드 이터레이터 (.jsonl / .arrow)
+    - record: from_dict 를 가진 구조체 클래스(선택)
+    - columns: 필요한 필드만 (Arrow 는 그 열만 변환, JSONL 은 줄 전체를 읽은 뒤 골라냄)
+    """
+    if is_arrow(path):
+        rows = read_batches(path, columns=columns)
+    elif columns is not None:
+        rows = ({k: r[k] for k in columns if k in r} for r in read_jsonl(path))
+    else:
+        rows = read_jsonl(path)
+    if record is None:
+        return rows
+    return (record.from_dict(r) for r in rows)
+
+def load_records(path, record=None, columns: Optional[Sequence[str]] = None) -> List[Any]:
+    """중간 파일 → 레코드 리스트"""
+    return list(read_records(path, record, columns))
+
+def count_records(path) -> int:
+    """레코드 수 (Arrow 는 배치 메타데이터만 봄, JSONL 은 빈 줄 제외 줄 수)"""
+    if is_arrow(path):
+        pa = _pyarrow()
+        with pa.memory_map(str(path)) as src:
+            reader = pa.ipc.open_file(src)
+            return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+    with open(path, "rb") as f:
+        return sum(1 for line in f if line.strip())
+
+# --- 쓰기 --------------------------------------------------------------------
+class ArrowWriter:
+    """
+    배치 Arrow IPC 쓰기 (JsonlWriter 와 같은 사용법: write/write_all/count, with 문)
+    - mode="a": 기존 배치를 새 파일로 복사한 뒤 이어 씀 (IPC 파일은 끝에 footer 가 있어 제자리 추가 불가)
+    - atomic=True 또는 mode="a": path.tmp 에 쓴 뒤 닫을 때 교체 (예외 시 기존 파일 유지)
+    """
+
+    def __init__(self, path, mode: str = "w", atomic: bool = False, record=None,
+                 batch_rows: int = ARROW_BATCH_ROWS):
+        pa = self._pa = _pyarrow()
+        self.path = Path(path)
+        self.record = _record_for(path, record)
+        self.schema = arrow_schema(self.record)
+        self._names = set(self.schema.names)
+        append = mode == "a" and self.path.exists()
+        self._target = Path(str(path) + ".tmp") if atomic or append else self.path
+        self._target.parent.mkdir(parents=True, exist_ok=True)
+        self._sink = pa.OSFile(str(self._target), "wb")
+        self._w = pa.ipc.new_file(self._sink, self.schema)
+        self._rows: List[dict] = []
+        self.batch_rows = batch_rows
+        self.count = 0
+        if append:
+            with pa.memory_map(str(self.path)) as src:
+                reader = pa.ipc.open_file(src)
+                if not reader.schema.equals(self.schema):
+                    self.close(ok=False)
+                    raise ValueError(f"기존 Arrow 파일 스키마가 다름: {self.path}")
+                for i in range(reader.num_record_batches):
+                    batch = reader.get_batch(i)
+                    self._w.write_batch(batch)
+                    self.count += batch.num_rows
+
+    def write(self, obj: Any):
+        """레코드 하나 추가 (dict 또는 to_dict() 를 가진 구조체)"""
+        if hasattr(obj, "to_dict"):
+            obj = obj.to_dict()
+        if not self._names.issuperset(obj):
+            extra = sorted(set(obj) - self._names)
+            raise ValueError(f"{self.record.__name__} 스키마에 없는 필드 {extra} → Arrow 로 쓸 수 없음 ({self.path})")
+        self._rows.append(obj)
+        self.count += 1
+        if len(self._rows) >= self.batch_rows:
+            self.flush()
+
+    def write_all(self, rows: Iterable[Any]):
+        for r in rows:
+            self.write(r)
+
+    def flush(self):
+        if self._rows:
+            self._w.write_batch(self._pa.RecordBatch.from_pylist(self._rows, schema=self.schema))
+            self._rows = []
+
+    def close(self, ok: bool = True):
+        if self._sink.closed:
+            return
+        if ok:
+            self.flush()
+        self._w.close()
+        self._sink.close()
+        if self._target != self.path:
+            if ok:
+                os.replace(self._target, self.path)
+            else:
+                self._target.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(ok=exc_type is None)
+        return False
+
+def open_writer(path, mode: str = "w", atomic: bool = False, record=None):
+    """
+    확장자에 맞는 쓰기 객체 (.jsonl → JsonlWriter, .arrow → ArrowWriter)
+    - record: Arrow 스키마로 쓸 레코드 구조체 (없으면 파일 이름으로 결정, JSONL 은 무시)
+    """
+    if is_arrow(path):
+        return ArrowWriter(path, mode, atomic=atomic, record=record)
+    return JsonlWriter(path, mode, atomic=atomic)
+
+def write_records(path, rows: Iterable[Any], mode: str = "w", atomic: bool = False, record=None) -> int:
+    """레코드들 → 중간 파일 (.jsonl / .arrow), 반환: 레코드 수"""
+    with open_writer(path, mode, atomic=atomic, record=record) as w:
+        w.write_all(rows)
+    return w.count
+
+def convert(src, dst, record=None) -> int:
+    """형식 변환 (예: chunks.arrow → chunks.jsonl 로 내용 확인), 반환: 레코드 수"""
+    return write_records(dst, read_records(src), record=record or _RECORDS_BY_STEM.get(Path(src).stem))
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("사용: python -m utils.dataset <입력.jsonl|.arrow> <출력.jsonl|.arrow>")
+    n = convert(sys.argv[1], sys.argv[2])
+    print(f"✔️ [변환] {sys.argv[1]} → {sys.argv[2]} - {n}개")
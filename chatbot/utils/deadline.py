@@ -0,0 +1,59 @@
+# utils/deadline.py
+"""
+요청 마감 시간(deadline)과 단계 비용 추정 — rag/search.py 의 단계 축소(graceful degradation)용
+
+- Deadline: 요청이 쓸 수 있는 남은 시간. 호출자(backend)가 보낸 예산(ms)으로 만들고 단계마다 remaining() 확인
+  (절대 시각이 아니라 상대 예산을 받음 → 서버 간 시계 차이와 무관)
+  시작 시각(start)은 요청을 받은 시점(service.py 미들웨어) → 스레드풀 대기 시간도 예산에 포함
+- CostModel: 단계별 소요 시간의 지수 이동 평균(EWMA). 부하가 걸려 인코더가 느려지면 추정치도 따라 올라감
+  → "남은 예산으로 이 단계를 끝낼 수 있나"를 단계 시작 전에 판단
+  (추정치는 관측이 없을 때 config.RAG_COST_INIT 초기값 사용)
+"""
+import threading, time
+from typing import Dict, Optional
+
+from config import RAG_COST_EWMA, RAG_COST_INIT
+
+class Deadline:
+    """budget_ms 안에 끝내야 하는 요청 (None/0 이하: 마감 없음)"""
+
+    def __init__(self, budget_ms: Optional[float] = None, start: Optional[float] = None):
+        """start: 예산을 세기 시작한 time.perf_counter() 값 (None 이면 지금)"""
+        self.budget_ms = budget_ms if budget_ms and budget_ms > 0 else None
+        t0 = time.perf_counter() if start is None else start
+        self._at = t0 + self.budget_ms / 1000.0 if self.budget_ms else None
+
+    @property
+    def bounded(self) -> bool:
+        return self._at is not None
+
+    def remaining(self) -> float:
+        """남은 시간(초). 마감이 없으면 inf, 지났으면 0"""
+        if self._at is None:
+            return float("inf")
+        return max(0.0, self._at - time.perf_counter())
+
+    def allows(self, seconds: float) -> bool:
+        """seconds 걸리는 작업을 마감 전에 끝낼 수 있는지"""
+        return self.remaining() >= seconds
+
+class CostModel:
+    """단계 이름 → 소요 시간(초) EWMA (여러 요청 스레드가 공유)"""
+
+    def __init__(self, init: Optional[Dict[str, float]] = None, alpha: float = RAG_COST_EWMA):
+        self._est = dict(RAG_COST_INIT if init is None else init)
+        self._alpha = alpha
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            prev = self._est.get(name)
+            self._est[name] = seconds if prev is None else prev + self._alpha * (seconds - prev)
+
+    def estimate(self, *names: str) -> float:
+        """단계들의 추정 시간 합(초)"""
+        return sum(self._est.get(n, 0.0) for n in names)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._est)
@@ -0,0 +1,190 @@
+# utils/health.py
+"""
+외부 의존 서비스(Ollama 생성기) 상태 감시 — 요청 경로에서 HTTP 확인을 없애기 위함
+
+- CircuitBreaker: closed(정상) → 연속 실패 failures 회 → open(호출 안 함)
+    → reset_timeout 초 후 half_open(시험 호출 1번만 허용) → 성공이면 closed, 실패면 다시 open
+- HealthMonitor: 백그라운드 스레드가 주기적으로 점검(probe)해 결과를 브레이커에 기록
+    - closed 일 때 interval 마다 점검, open 이면 reset_timeout 이 지날 때까지 점검도 쉼(죽은 서버에 타임아웃 반복 X)
+    - available() 은 캐시된 상태만 읽음 → 요청마다 비용 없음
+    - 시작 상태는 open(상태 모름) → 첫 점검이 곧 half_open 시험, 성공해야 closed (죽은 서버로 시작해도 바로 False)
+    - 실제 생성 호출 결과도 record_success()/record_failure() 로 알려주면 다음 점검을 기다리지 않고 반영
+- ollama_monitor(): config.OLLAMA_* 설정의 공유 인스턴스 (처음 호출 시 감시 시작)
+"""
+import threading, time
+from typing import Callable, Dict, Optional
+
+import requests
+
+from config import (
+    OLLAMA_URL, OLLAMA_HEALTH_INTERVAL, OLLAMA_HEALTH_TIMEOUT, OLLAMA_BREAKER_FAILURES, OLLAMA_BREAKER_RESET,
+)
+from utils.metrics import GENERATOR_BREAKER
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+class CircuitBreaker:
+    """연속 실패 횟수 기반 서킷 브레이커 (half_open 에서는 시험 호출 1건만 통과)"""
+
+    def __init__(self, failures: int = OLLAMA_BREAKER_FAILURES, reset_timeout: float = OLLAMA_BREAKER_RESET,
+                 on_change: Optional[Callable[[str], None]] = None):
+        self.failures = max(1, failures)
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._fails = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._on_change = on_change
+        self._lock = threading.Lock()
+
+    def _set(self, state: str):
+        if state != self.state:
+            self.state = state
+            if self._on_change:
+                self._on_change(state)
+
+    def trip(self, retry_in: Optional[float] = None):
+        """강제로 open (retry_in 초 후 half_open 시험, 기본 reset_timeout)"""
+        with self._lock:
+            delay = self.reset_timeout if retry_in is None else retry_in
+            self._opened_at = time.monotonic() - self.reset_timeout + delay
+            self._probing = False
+            self._set(OPEN)
+
+    def retry_in(self) -> float:
+        """open 상태에서 half_open 시험까지 남은 시간(초), 그 외 0"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        """지금 호출해도 되는지 (open 이 만료되면 half_open 으로 바꾸고 시험 호출 1건 허용)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.retry_in() > 0:
+                return False
+            if self._probing:
+                return False
+            self._set(HALF_OPEN)
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._fails = 0
+            self._probing = False
+            self._set(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._fails += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self._fails >= self.failures:
+                self._opened_at = time.monotonic()
+                self._set(OPEN)
+
+class HealthMonitor:
+    """
+    probe() 를 백그라운드에서 주기적으로 실행해 상태를 캐시
+    - probe: 성공 여부를 반환하는 함수 (예외도 실패로 처리). 기본은 GET url (200 이면 정상)
+    """
+
+    def __init__(self, url: Optional[str] = None, probe: Optional[Callable[[], bool]] = None,
+                 interval: float = OLLAMA_HEALTH_INTERVAL, timeout: float = OLLAMA_HEALTH_TIMEOUT,
+                 breaker: Optional[CircuitBreaker] = None, name: str = "health"):
+        self.url = url
+        self.interval = interval
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.name = name
+        self._probe = probe or self._http_probe
+        self.breaker.trip(retry_in=0)       # 첫 점검 전에는 상태를 모름 → open, 첫 점검이 half_open 시험
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.last_check: Optional[float] = None
+        self.last_ok: Optional[bool] = None
+        self.last_error: Optional[str] = None
+        self.last_latency: Optional[float] = None
+
+    def _http_probe(self) -> bool:
+        return requests.get(self.url, timeout=self.timeout).status_code == 200
+
+    def check(self) -> bool:
+        """점검 1회 (브레이커가 막고 있으면 건너뜀) → 현재 사용 가능 여부"""
+        if not self.breaker.allow():
+            return self.available()
+        t0 = time.perf_counter()
+        try:
+            ok, err = bool(self._probe()), None
+        except Exception as e:
+            ok, err = False, f"{type(e).__name__}: {e}"
+        self.last_latency = time.perf_counter() - t0
+        self.last_check, self.last_ok, self.last_error = time.time(), ok, err
+        if ok:
+            self.record_success()
+        else:
+            self.record_failure()
+        return self.available()
+
+    def record_success(self):
+        self.breaker.record_success()
+
+    def record_failure(self):
+        """실제 호출 실패 보고 (브레이커가 open 되면 감시 스레드도 reset_timeout 까지 쉼)"""
+        self.breaker.record_failure()
+        self._wake.set()
+
+    def available(self) -> bool:
+        """캐시된 상태만 읽음(I/O 없음) — closed 일 때만 True"""
+        return self.breaker.state == CLOSED
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.check()
+            wait = self.breaker.retry_in() if self.breaker.state == OPEN else self.interval
+            self._wake.clear()
+            self._wake.wait(max(wait, 0.05))
+
+    def start(self):
+        """감시 스레드 시작 (이미 실행 중이면 무시)"""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name=f"{self.name}-monitor", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout + 1)
+
+    def wait_ready(self, timeout: float) -> bool:
+        """첫 점검 결과가 나올 때까지 최대 timeout 초 대기 (CLI 시작 안내용)"""
+        end = time.monotonic() + timeout
+        while self.last_check is None and time.monotonic() < end:
+            time.sleep(0.02)
+        return self.available()
+
+    def status(self) -> Dict:
+        return {"available": self.available(), "state": self.breaker.state, "last_ok": self.last_ok,
+                "last_check": self.last_check, "last_error": self.last_error,
+                "last_latency_ms": round(self.last_latency * 1000, 1) if self.last_latency is not None else None}
+
+_OLLAMA: Optional[HealthMonitor] = None
+_OLLAMA_LOCK = threading.Lock()
+
+def ollama_monitor() -> HealthMonitor:
+    """Ollama 상태 감시 공유 인스턴스 (GET {OLLAMA_URL}/api/tags, 처음 호출 시 시작)"""
+    global _OLLAMA
+    with _OLLAMA_LOCK:
+        if _OLLAMA is None:
+            breaker = CircuitBreaker(on_change=lambda s: GENERATOR_BREAKER.set(_STATE_VALUE[s]))
+            _OLLAMA = HealthMonitor(url=f"{OLLAMA_URL.rstrip('/')}/api/tags", breaker=breaker,
+                                    name="ollama").start()
+        return _OLLAMA
@@ -0,0 +1,172 @@
+# utils/jsonl.py
+"""
+파이프라인 공용 JSONL 코덱 (크롤/정제/중복 제거/청크/임베딩/검색 로드가 모두 이 모듈로 읽고 씀)
+
+- orjson 이 설치돼 있으면 사용(파싱/직렬화 수 배 빠름), 없으면 표준 json 으로 대체
+  → 어느 쪽이든 같은 바이트: 공백 없는 compact 형식, 한글은 그대로(UTF-8, ensure_ascii=False 와 동일)
+  → 설치 여부가 파이프라인 지문(pipeline/dag.py)/결과 파일을 바꾸지 않음
+    (파이프라인 레코드는 문자열/정수/None 뿐. 실수는 지수 표기가 라이브러리마다 다를 수 있음)
+- 파일은 바이너리로 열고 b"\\n" 기준으로 줄을 나눔 (본문 속 U+2028 등에서 줄이 갈라지지 않음)
+- JsonlWriter: 직렬화한 줄을 버퍼에 모아 JSONL_BUFFER_BYTES 단위로 한 번에 write
+- orjson 이 못 다루는 값(64비트를 넘는 정수, NaN/Infinity 읽기 등)은 그 줄만 표준 json 으로 처리
+
+사용:
+  for rec in read_jsonl(path): ...
+  rows = load_jsonl(path, record=ChunkRecord)   # 선택: __slots__ 구조체로 (utils/records.py)
+  write_jsonl(path, rows)                      # 반환: 줄 수
+  with JsonlWriter(path) as w: w.write(rec)
+"""
+import json, os
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List
+
+from config import JSONL_BACKEND, JSONL_BUFFER_BYTES
+
+try:
+    import orjson
+except ImportError:   # 선택 의존성 — 없으면 표준 json
+    orjson = None
+
+# json.dumps(..., separators=...) 는 호출마다 인코더를 새로 만듦 → 한 번 만들어 재사용
+_STD_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+def _std_dumps(obj: Any) -> bytes:
+    return _STD_ENCODER.encode(obj).encode("utf-8")
+
+def _std_loads(line) -> Any:
+    # bytes 를 그대로 넘기면 json.loads 가 줄마다 인코딩 추정 + surrogatepass 디코드 → 직접 UTF-8 디코드
+    return json.loads(line.decode("utf-8") if isinstance(line, bytes) else line)
+
+def _orjson_dumps(obj: Any) -> bytes:
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)   # 표준 json 처럼 숫자 키는 문자열로
+    except TypeError:   # orjson.JSONEncodeError: 64비트를 넘는 정수 등 → 표준 json
+        return _std_dumps(obj)
+
+def _orjson_loads(line) -> Any:
+    try:
+        return orjson.loads(line)
+    except orjson.JSONDecodeError:   # NaN/Infinity 등 표준 json 만 읽는 값
+        return _std_loads(line)
+
+BACKEND = "json"
+_dumps, _loads = _std_dumps, _std_loads
+
+def set_backend(name: str = "auto") -> str:
+    """
+    백엔드 선택: "auto"(orjson 있으면 orjson) / "orjson" / "json" → 실제 사용 백엔드 이름
+    (벤치마크에서 같은 프로세스로 두 백엔드를 비교할 때 사용, 기본은 config.JSONL_BACKEND)
+    """
+    global BACKEND, _dumps, _loads
+    if name not in ("auto", "orjson", "json"):
+        raise ValueError(f"알 수 없는 JSONL 백엔드: {name} (auto / orjson / json)")
+    if name == "orjson" and orjson is None:
+        raise RuntimeError("JSONL_BACKEND='orjson' 에는 orjson 이 필요합니다 (pip install orjson)")
+    if name != "json" and orjson is not None:
+        BACKEND, _dumps, _loads = "orjson", _orjson_dumps, _orjson_loads
+    else:
+        BACKEND, _dumps, _loads = "json", _std_dumps, _std_loads
+    return BACKEND
+
+set_backend(JSONL_BACKEND)
+
+def dumps_bytes(obj: Any) -> bytes:
+    """객체 → JSON 한 줄(bytes, 줄바꿈 없음)"""
+    return _dumps(obj)
+
+def loads(line) -> Any:
+    """JSON 한 줄(str/bytes) → 객체"""
+    return _loads(line)
+
+def dumps(obj: Any) -> str:
+    """객체 → JSON 한 줄(str, 줄바꿈 없음)"""
+    return dumps_bytes(obj).decode("utf-8")
+
+def read_jsonl(path, record=None) -> Iterator[Any]:
+    """JSONL 파일 → 레코드 이터레이터 (빈 줄 건너뜀). record: from_dict 를 가진 구조체 클래스(선택)"""
+    with open(path, "rb") as f:
+        if record is None:
+            for line in f:
+                if line.strip():
+                    yield loads(line)
+        else:
+            for line in f:
+                if line.strip():
+                    yield record.from_dict(loads(line))
+
+def load_jsonl(path, record=None) -> List[Any]:
+    """JSONL 파일 → 레코드 리스트"""
+    return list(read_jsonl(path, record))
+
+class JsonlWriter:
+    """
+    버퍼링 JSONL 쓰기 (with 문으로 사용, 닫을 때 남은 버퍼 기록)
+    - mode: "w"(새로 쓰기) / "a"(이어 쓰기), 상위 폴더가 없으면 만듦
+    - atomic=True: path.tmp 에 쓴 뒤 닫을 때 교체 (중간 실패로 기존 파일이 망가지지 않게, 예외 시 기존 파일 유지)
+    """
+
+    def __init__(self, path, mode: str = "w", atomic: bool = False, buffer_bytes: int = JSONL_BUFFER_BYTES):
+        self.path = Path(path)
+        self._target = Path(str(path) + ".tmp") if atomic else self.path
+        self._target.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self._target, mode + "b")
+        self._buf: List[bytes] = []
+        self._size = 0
+        self.buffer_bytes = buffer_bytes
+        self.count = 0
+
+    def write(self, obj: Any):
+        """레코드 한 줄 추가 (dict 또는 to_dict() 를 가진 구조체)"""
+        if hasattr(obj, "to_dict"):
+            obj = obj.to_dict()
+        self.write_line(dumps_bytes(obj))
+
+    def write_line(self, line):
+        """이미 직렬화한 JSON 한 줄(str/bytes, 줄바꿈 없이) 추가"""
+        if isinstance(line, str):
+            line = line.encode("utf-8")
+        self._buf.append(line)
+        self._size += len(line) + 1
+        self.count += 1
+        if self._size >= self.buffer_bytes:
+            self.flush()
+
+    def write_all(self, rows: Iterable[Any]):
+        for r in rows:
+            self.write(r)
+
+    def flush(self):
+        if self._buf:
+            self._buf.append(b"")
+            self._f.write(b"\n".join(self._buf))
+            self._buf, self._size = [], 0
+
+    def tell(self) -> int:
+        """지금까지 쓴 바이트 위치 (버퍼 포함)"""
+        self.flush()
+        return self._f.tell()
+
+    def close(self, ok: bool = True):
+        if self._f.closed:
+            return
+        if ok or self._target == self.path:
+            self.flush()
+        self._f.close()
+        if self._target != self.path:
+            if ok:
+                os.replace(self._target, self.path)
+            else:
+                self._target.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(ok=exc_type is None)
+        return False
+
+def write_jsonl(path, rows: Iterable[Any], mode: str = "w", atomic: bool = False) -> int:
+    """레코드들 → JSONL 파일 (버퍼링 쓰기), 반환: 줄 수"""
+    with JsonlWriter(path, mode, atomic=atomic) as w:
+        w.write_all(rows)
+    return w.count
@@ -0,0 +1,233 @@
+# utils/metrics.py
+# -----------------------------------------------------------------------------
+# 역할:
+#   - RAG 서비스의 단계별 지연시간/캐시 적중/동시 처리 요청 수를 수집하고
+#     Prometheus text exposition format(0.0.4)으로 내보내는 경량 메트릭 모듈
+#   - 외부 의존성(prometheus_client) 없이 표준 라이브러리만 사용
+#
+# 구성:
+#   1) Counter / Gauge / Histogram → 라벨별 값 보관 + render()
+#   2) stage(name) 컨텍스트 매니저 → 단계 시간을 히스토그램 + Server-Timing 버퍼에 기록
+#   3) begin_request()/end_request() → 요청 단위 Server-Timing 버퍼 관리
+# -----------------------------------------------------------------------------
+import threading, time, contextvars
+from contextlib import contextmanager
+from typing import Dict, List, Tuple, Optional
+
+# 초 단위 버킷 (1ms ~ 30s): 캐시 히트(수 ms) ~ CPU 인코딩(수 초)까지 커버
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _fmt_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _fmt_num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, doc: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        return float(self._values.get(self._key(labels), 0.0))
+
+    def render(self) -> List[str]:
+        out = self._header()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, v in items:
+            out.append(f"{self.name}{_fmt_labels(self.labelnames, key)} {_fmt_num(v)}")
+        return out
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, doc, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, doc, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            st = self._values.get(key)
+            if st is None:
+                # [버킷별 카운트..., sum, count]
+                st = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    st[i] += 1
+            st[-2] += value
+            st[-1] += 1
+
+    def render(self) -> List[str]:
+        out = self._header()
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for key, st in items:
+            for i, b in enumerate(self.buckets):
+                le = 'le="' + _fmt_num(b) + '"'
+                out.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, key, le)} {st[i]}")
+            inf = 'le="+Inf"'
+            out.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, key, inf)} {st[-1]}")
+            out.append(f"{self.name}_sum{_fmt_labels(self.labelnames, key)} {_fmt_num(st[-2])}")
+            out.append(f"{self.name}_count{_fmt_labels(self.labelnames, key)} {st[-1]}")
+        return out
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for m in self._metrics:
+            lines.extend(m.render())
+        lines.extend(_render_hit_ratios())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+# --- RAG 서비스 공용 메트릭 ----------------------------------------------------
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "rag_stage_seconds",
+    "RAG 단계별 처리 시간(초): index_load/normalize/intent/encode/faiss_search/mmr/assemble",
+    labelnames=("stage",),
+))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "rag_request_seconds", "HTTP 요청 전체 처리 시간(초)", labelnames=("path",),
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "rag_cache_requests_total", "캐시 조회 횟수(result=hit|miss)", labelnames=("cache", "result"),
+))
+ROUTE_TOTAL = REGISTRY.register(Counter(
+    "rag_route_total", "rag_answer 응답 경로별 처리 건수(A~E)", labelnames=("path",),
+))
+TIER_TOTAL = REGISTRY.register(Counter(
+    "rag_tier_total", "응답을 만든 단계별 처리 건수(cache/semantic/structured/lexical/dense/dense_mmr)",
+    labelnames=("tier",),
+))
+SEMCACHE_EVENTS = REGISTRY.register(Counter(
+    "rag_semcache_events_total", "의미 캐시 적중 표본 검사(event=audited|false_hit|invalidated)", labelnames=("event",),
+))
+INFLIGHT = REGISTRY.register(Gauge(
+    "rag_inflight_requests", "현재 처리 중인 HTTP 요청 수",
+))
+INDEX_INFO = REGISTRY.register(Gauge(
+    "rag_index_info", "현재 로드된 인덱스 버전(값은 항상 1)", labelnames=("version",),
+))
+INDEX_VECTORS = REGISTRY.register(Gauge(
+    "rag_index_vectors", "현재 로드된 인덱스의 벡터 수",
+))
+GENERATOR_BREAKER = REGISTRY.register(Gauge(
+    "rag_generator_breaker_state", "생성기(Ollama) 서킷 브레이커 상태(0=closed, 1=half_open, 2=open)",
+))
+
+def _render_hit_ratios() -> List[str]:
+    """캐시별 적중률 = hit / (hit + miss). PromQL 없이도 바로 볼 수 있게 함께 노출."""
+    caches = sorted({k[0] for k in list(CACHE_REQUESTS._values)})
+    if not caches:
+        return []
+    out = ["# HELP rag_cache_hit_ratio 캐시 적중률(누적)", "# TYPE rag_cache_hit_ratio gauge"]
+    for c in caches:
+        hit = CACHE_REQUESTS.get(cache=c, result="hit")
+        miss = CACHE_REQUESTS.get(cache=c, result="miss")
+        total = hit + miss
+        ratio = hit / total if total else 0.0
+        out.append(f'rag_cache_hit_ratio{{cache="{_escape(c)}"}} {_fmt_num(ratio)}')
+    return out
+
+def cache_event(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+def set_index_version(version: str, ntotal: int):
+    INDEX_INFO.clear()
+    INDEX_INFO.set(1, version=version)
+    INDEX_VECTORS.set(ntotal)
+
+# --- 요청 단위 Server-Timing ---------------------------------------------------
+# 요청 시작 시 리스트를 심어두면, 같은 컨텍스트에서 실행되는 stage()들이 여기에 (name, sec)를 쌓음
+_TIMINGS: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = \
+    contextvars.ContextVar("rag_server_timing", default=None)
+
+def begin_request():
+    """현재 컨텍스트에 Server-Timing 버퍼를 만든다. 반환값은 end_request()에 넘길 토큰."""
+    return _TIMINGS.set([])
+
+def end_request(token) -> List[Tuple[str, float]]:
+    buf = _TIMINGS.get() or []
+    _TIMINGS.reset(token)
+    return buf
+
+def server_timing_header(timings: List[Tuple[str, float]], total: Optional[float] = None) -> str:
+    """
+    [(name, sec), ...] → 'encode;dur=35.1, faiss_search;dur=0.4, total;dur=40.2'
+    - 같은 단계가 여러 번 찍히면 합산(등장 순서 유지)
+    """
+    agg: Dict[str, float] = {}
+    for name, sec in timings:
+        agg[name] = agg.get(name, 0.0) + sec
+    parts = [f"{n};dur={v * 1000:.1f}" for n, v in agg.items()]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+@contextmanager
+def stage(name: str):
+    """
+    with stage("encode"): ...
+    - 히스토그램(rag_stage_seconds{stage=name})에 기록
+    - 요청 컨텍스트가 있으면 Server-Timing 버퍼에도 추가
+    """
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        STAGE_SECONDS.observe(dt, stage=name)
+        buf = _TIMINGS.get()
+        if buf is not None:
+            buf.append((name, dt))
@@ -0,0 +1,91 @@
+# utils/records.py
+"""
+파이프라인 레코드용 __slots__ 구조체 (선택 — 기본 경로는 dict 그대로 사용)
+
+- RawRecord / CleanRecord : raw.jsonl / clean.jsonl 한 줄 {"url", "section", "title", "content"}
+- DocRecord               : docs.jsonl 한 줄 {"doc_id", "url", "section", "title", "content"}
+- ChunkRecord             : chunks.jsonl 한 줄
+    문장 청크  {"id", "text", "doc", "start", "end", "section"(, "n_tokens")}
+    구조화 청크 {"id", "text", "section", "name" | "type" | "year" | "branch"(, "n_tokens")}
+
+레코드를 많이 메모리에 들고 있을 때(중복 제거/벤치마크 등) dict 보다 작고 속성 접근이 빠름.
+- read_jsonl(path, record=RawRecord) 처럼 코덱(utils/jsonl.py)에 넘기면 구조체로 읽음
+- JsonlWriter.write() 는 구조체도 받음 (to_dict() → dict 와 같은 키 순서 → 같은 바이트)
+- get()/[]/in 을 지원 → rec.get("content") 로 쓰는 기존 함수(clean_record, InfoExtractor.feed 등)에 그대로 넘길 수 있음
+- 정의되지 않은 키는 extra 에 보관 (스키마가 늘어나도 왕복 시 필드를 잃지 않음)
+- FIELDS/INT_FIELDS 는 Arrow 형식(utils/dataset.py)의 열 스키마로도 사용 (INT_FIELDS 는 int64, 나머지는 문자열)
+"""
+from typing import Any, Dict, Optional
+
+_MISSING = object()   # "키 없음" (값이 None 인 것과 구분: start/end 는 None 이 올 수 있음)
+
+class _Record:
+    __slots__ = ("extra",)
+    FIELDS: tuple = ()
+    INT_FIELDS: tuple = ()
+
+    def __init__(self, **fields):
+        for k in self.FIELDS:
+            setattr(self, k, fields.pop(k, _MISSING))
+        self.extra: Optional[Dict[str, Any]] = fields or None
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]):
+        return cls(**d)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """dict 로 (FIELDS 순서, 없는 키 제외, extra 는 뒤에)"""
+        out = {}
+        for k in self.FIELDS:
+            v = getattr(self, k)
+            if v is not _MISSING:
+                out[k] = v
+        if self.extra:
+            out.update(self.extra)
+        return out
+
+    def get(self, key: str, default=None):
+        if key in self.FIELDS:
+            v = getattr(self, key)
+            return default if v is _MISSING else v
+        return (self.extra or {}).get(key, default)
+
+    def __getitem__(self, key: str):
+        v = self.get(key, _MISSING)
+        if v is _MISSING:
+            raise KeyError(key)
+        return v
+
+    def __setitem__(self, key: str, value):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __eq__(self, other):
+        return isinstance(other, _Record) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+class RawRecord(_Record):
+    FIELDS = ("url", "section", "title", "content")
+    __slots__ = FIELDS
+
+class CleanRecord(RawRecord):
+    """정제 레코드 (스키마는 RawRecord 와 같음, content 만 정제됨)"""
+    __slots__ = ()
+
+class DocRecord(_Record):
+    FIELDS = ("doc_id",) + RawRecord.FIELDS
+    __slots__ = FIELDS
+
+class ChunkRecord(_Record):
+    FIELDS = ("id", "text", "doc", "start", "end", "section", "name", "type", "year", "branch", "n_tokens")
+    INT_FIELDS = ("start", "end", "n_tokens")
+    __slots__ = FIELDS
@@ -8,12 +8,27 @@ import ChatInput from "../components/chat/ChatInput";
   - 최근 응답 시간(초)들을 durations에 저장하고 이동 평균으로 ETA 추정
   - 전송 시작 시 타이머 시작, 응답/에러 시 타이머 정지
   - ChatMessageList로 elapsed/eta 내려서 "생성 중…" 말풍선에 1s/~12s 형태로 표기
+  - /api/chat/stream(SSE)으로 토큰을 받는 즉시 어시스턴트 말풍선에 이어 붙임
+    (첫 토큰이 오면 "생성 중…" 말풍선을 내리고 타이머 정지 → ETA는 첫 토큰까지 시간 기준)
+    입력창은 done 이벤트(스트림 끝)까지 잠금
 */
 
+// SSE 한 덩어리("event: x\ndata: {...}") → { event, data }
+const parseSSE = (block) => {
+  let event = "message";
+  let data = "";
+  for (const line of block.split("\n")) {
+    if (line.startsWith("event:")) event = line.slice(6).trim();
+    else if (line.startsWith("data:")) data += line.slice(5).trim();
+  }
+  return { event, data: data ? JSON.parse(data) : {} };
+};
+
 export default function ChatPage() {
   const [threadId, setThreadId] = useState(null);
   const [messages, setMessages] = useState([]);
   const [loading, setLoading] = useState(false);
+  const [streaming, setStreaming] = useState(false);   // 첫 토큰을 받은 뒤(말풍선이 채워지는 중)
 
   // ⏱ 경과 시간 & ETA 추정 관련 상태
   const [elapsed, setElapsed] = useState(0);           // 현재 요청의 경과 시간(초)
@@ -67,31 +82,63 @@ export default function ChatPage() {
     // UI에 사용자 메시지 먼저 반영
     setMessages(prev => [...prev, { id: Date.now(), role: "user", content: text }]);
     setLoading(true);
+    setStreaming(false);
     startTimer();
 
+    const replyId = Date.now() + 1;
+    let started = false;
+    // 어시스턴트 말풍선: 첫 토큰에 추가, 이후 이어 붙이기 (done 이면 최종 답변으로 교체)
+    const upsertReply = (update) => {
+      if (!started) {
+        started = true;
+        setStreaming(true);
+        stopTimerAndRecord(true);
+        setMessages(prev => [...prev, { id: replyId, role: "assistant", content: update("") }]);
+        return;
+      }
+      setMessages(prev => prev.map(m => (m.id === replyId ? { ...m, content: update(m.content) } : m)));
+    };
+
     try {
-      const res = await fetch("http://127.0.0.1:8000/api/chat", {
+      const res = await fetch("http://127.0.0.1:8000/api/chat/stream", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         credentials: "include", // 세션/쿠키 사용 시
         body: JSON.stringify({ message: text, thread_id: threadId }),
       });
-      if (!res.ok) throw new Error("chat api error");
-      const data = await res.json();
-      setThreadId(data.thread_id);
-      setMessages(prev => [
-        ...prev,
-        { id: Date.now() + 1, role: "assistant", content: data.reply }
-      ]);
-      stopTimerAndRecord(true);
+      if (!res.ok || !res.body) throw new Error("chat api error");
+
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder("utf-8");
+      let buf = "";
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buf += decoder.decode(value, { stream: true });
+        // 이벤트 구분 = 빈 줄
+        let sep;
+        while ((sep = buf.indexOf("\n\n")) >= 0) {
+          const block = buf.slice(0, sep);
+          buf = buf.slice(sep + 2);
+          if (!block.trim()) continue;
+          const { event, data } = parseSSE(block);
+          if (event === "thread") setThreadId(data.thread_id);
+          else if (event === "token") upsertReply(prev => prev + (data.text || ""));
+          else if (event === "done" && data.answer) upsertReply(() => data.answer);
+        }
+      }
+      if (!started) throw new Error("empty stream");
     } catch (e) {
-      setMessages(prev => [
-        ...prev,
-        { id: Date.now() + 2, role: "assistant", content: "문제가 발생했어요. 잠시 후 다시 시도해 주세요." }
-      ]);
-      stopTimerAndRecord(false);
+      if (!started) {
+        setMessages(prev => [
+          ...prev,
+          { id: Date.now() + 2, role: "assistant", content: "문제가 발생했어요. 잠시 후 다시 시도해 주세요." }
+        ]);
+        stopTimerAndRecord(false);
+      }
     } finally {
       setLoading(false);
+      setStreaming(false);
     }
   };
 
@@ -112,7 +159,7 @@ export default function ChatPage() {
           <div className="flex-1 min-h-0">
             <ChatMessageList
               messages={messages}
-              loading={loading}
+              loading={loading && !streaming}
               elapsed={elapsed}
               eta={eta}
             />